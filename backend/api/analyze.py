@@ -7,9 +7,23 @@ Box Structural Analysis API
 - เปลี่ยนกล่อง 3D เป็น Heatmap (แดง/เขียว)
 """
 
+import hashlib
+import json
 import math
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel, Field
+import os
+from typing import Any, Dict, List, Literal, Optional, Tuple
+
+import numpy as np
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import Response
+from pydantic import BaseModel, Field, validator
+
+from api.pricing import CoatingModel, StampingModel
+from services.strength_derating import (
+    DEFAULT_STACKING_FACTOR, DERATING_STAGES, STACKING_PATTERNS, canonical_profile, profile_derating,
+)
+from utils.http_cache import etag_matches
+from utils.lru_cache import LRUCache
 
 
 # ===================================
@@ -33,12 +47,26 @@ FLUTE_SPECS = {
 # ===================================
 # Request / Response Models
 # ===================================
+class DeratingProfileModel(BaseModel):
+    """สภาพใช้งานจริง (services/strength_derating.py) — ค่า default = วิเคราะห์แบบเดิม"""
+    stacking_factor: float = Field(DEFAULT_STACKING_FACTOR, gt=0, le=20, description="ตัวหารแรงกดจากการซ้อน (เดิม 3)")
+    relative_humidity: float = Field(50, ge=0, le=100, description="ความชื้นสัมพัทธ์ที่จัดเก็บ (%)")
+    storage_days: float = Field(0, ge=0, le=3650, description="ระยะเวลาที่ซ้อนเก็บ (วัน)")
+    stacking_pattern: Optional[Literal["column", "misaligned", "interlocked", "overhang"]] = Field(
+        None, description="รูปแบบการซ้อน (ไม่ระบุ = ไม่ลดทอน)"
+    )
+    pallet_overhang_cm: float = Field(0, ge=0, le=30, description="ยื่นเกินขอบพาเลท (cm)")
+    print_coverage_pct: float = Field(0, ge=0, le=100, description="พื้นที่พิมพ์บนผนัง (%)")
+    cutout_area_pct: float = Field(0, ge=0, le=50, description="ช่องเจาะ/หน้าต่าง die-cut (% ของผนัง)")
+
+
 class AnalyzeRequest(BaseModel):
     length: float = Field(..., gt=0, description="ความยาว (cm)")
     width: float = Field(..., gt=0, description="ความกว้าง (cm)")
     height: float = Field(..., gt=0, description="ความสูง (cm)")
     weight: float = Field(0, ge=0, description="น้ำหนักสินค้า (kg)")
     flute_type: str = Field("C", description="ลอนกระดาษ (A/B/C/E/BC)")
+    profile: Optional[DeratingProfileModel] = Field(None, description="สภาพใช้งานจริง (ไม่ระบุ = แบบเดิม)")
 
 
 class AnalyzeResponse(BaseModel):
@@ -49,11 +77,196 @@ class AnalyzeResponse(BaseModel):
     flute_type: str
     bct_kgf: float = Field(..., description="Box Compression Test (kgf)")
     safety_factor: float
+    derating: Optional[Dict[str, Any]] = Field(
+        None, description="ตัวคูณที่ใช้ (stacking_factor, combined, factors) — null = ไม่มีการลดทอน"
+    )
+
+
+class OptimizeRequest(BaseModel):
+    length: float = Field(..., gt=0, description="ความยาว (cm)")
+    width: float = Field(..., gt=0, description="ความกว้าง (cm)")
+    height: float = Field(..., gt=0, description="ความสูง (cm)")
+    weight: float = Field(..., gt=0, description="น้ำหนักสินค้า (kg)")
+    quantity: int = Field(..., ge=500, description="จำนวนกล่อง (ขั้นต่ำ 500)")
+    max_slack_cm: float = Field(0, ge=0, le=40, description="ยอมให้ ยาว/กว้าง ขยายได้สูงสุด (cm)")
+    slack_step_cm: float = Field(1, gt=0, description="ระยะห่างของขนาดที่ลอง (cm)")
+    min_safety_factor: float = Field(1.5, gt=0, description="safety factor ขั้นต่ำ (1.5 = เกณฑ์ SAFE)")
+    box_types: Optional[List[str]] = Field(None, description="จำกัดประเภทกล่อง (ไม่ระบุ = ทุกประเภท)")
+    flutes: Optional[List[str]] = Field(None, description="จำกัดลอน (ไม่ระบุ = ทุกลอน)")
+    inner: Optional[str] = Field(None, description="Inner (Optional)")
+    coatings: Optional[List[CoatingModel]] = Field(None, description="การเคลือบ (Optional)")
+    stampings: Optional[List[StampingModel]] = Field(None, description="การป๊ัม (Optional)")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "length": 30, "width": 20, "height": 20,
+                "weight": 8, "quantity": 1000, "max_slack_cm": 5
+            }
+        }
+
+
+class OptimizeResponse(BaseModel):
+    front: List[Dict[str, Any]] = Field(..., description="Pareto front ราคา vs safety factor (ถูกสุดก่อน)")
+    evaluated: int = Field(..., description="จำนวนตัวเลือกทั้งหมด")
+    feasible: int = Field(..., description="จำนวนตัวเลือกที่ถึง safety factor ขั้นต่ำ")
+    catalog_version: str
+
+
+class AnalyzeBatchRequest(BaseModel):
+    """วิเคราะห์ N จุด — แต่ละ field เป็น list ยาว N หรือ 1 ค่า (ใช้ค่าเดียวทุกจุด)"""
+    length: List[float] = Field(..., min_length=1, description="ความยาว (cm)")
+    width: List[float] = Field(..., min_length=1, description="ความกว้าง (cm)")
+    weight: List[float] = Field([0], min_length=1, description="น้ำหนักสินค้า (kg)")
+    flute_type: List[str] = Field(["C"], min_length=1, description="ลอนกระดาษ (A/B/C/E/BC)")
+    profile: Optional[DeratingProfileModel] = Field(None, description="สภาพใช้งานจริง (ใช้กับทุกจุด)")
+
+    @validator("length", "width")
+    def validate_dimensions(cls, v):
+        if min(v) <= 0:
+            raise ValueError("dimensions must be greater than 0")
+        return v
+
+    @validator("weight")
+    def validate_weight(cls, v):
+        if min(v) < 0:
+            raise ValueError("weight must not be negative")
+        return v
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "length": [30], "width": [20],
+                "weight": [0.5, 1, 1.5, 2, 2.5, 3], "flute_type": ["C"]
+            }
+        }
+
+
+class AnalyzeBatchResponse(BaseModel):
+    count: int
+    bct_kgf: List[float]
+    max_load_kg: List[float]
+    safety_factor: List[float]
+    safety_score: List[int]
+    status: List[str]
+
+
+class StrengthGridRequest(BaseModel):
+    """แกนของตาราง (ผลคูณคาร์ทีเซียน) — ลำดับมิติ: flute_type, weight, length, width"""
+    flute_types: List[str] = Field(["C"], min_length=1, max_length=10)
+    weights: List[float] = Field(..., min_length=1, max_length=500)
+    lengths: List[float] = Field(..., min_length=1, max_length=500)
+    widths: List[float] = Field(..., min_length=1, max_length=500)
+    metrics: List[Literal["bct_kgf", "max_load_kg", "safety_factor", "safety_score"]] = Field(
+        default=["safety_factor", "safety_score"], min_length=1
+    )
+    profile: Optional[DeratingProfileModel] = Field(None, description="สภาพใช้งานจริง (ใช้กับทุกช่อง)")
+
+    @validator("lengths", "widths")
+    def validate_dimensions(cls, v):
+        if min(v) <= 0:
+            raise ValueError("dimensions must be greater than 0")
+        return v
+
+    @validator("weights")
+    def validate_weights(cls, v):
+        if min(v) < 0:
+            raise ValueError("weights must not be negative")
+        return v
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "flute_types": ["B", "C", "BC"],
+                "weights": [2],
+                "lengths": [20, 25, 30, 35, 40],
+                "widths": [15, 20, 25, 30]
+            }
+        }
+
+
+class InverseRequest(BaseModel):
+    length: float = Field(..., gt=0, description="ความยาวปัจจุบัน (cm)")
+    width: float = Field(..., gt=0, description="ความกว้างปัจจุบัน (cm)")
+    weight: float = Field(..., gt=0, description="น้ำหนักสินค้า (kg)")
+    target_safety_factor: float = Field(1.5, gt=0, description="safety factor ที่ต้องการ (1.5 = เกณฑ์ SAFE)")
+    flutes: Optional[List[str]] = Field(None, description="จำกัดลอน (ไม่ระบุ = ทุกลอน)")
+
+    class Config:
+        json_schema_extra = {
+            "example": {"length": 30, "width": 20, "weight": 8, "target_safety_factor": 1.5}
+        }
+
+
+class InverseResponse(BaseModel):
+    weight_kg: float
+    target_safety_factor: float
+    current_perimeter_cm: float
+    flutes: List[Dict[str, Any]] = Field(..., description="ทุกลอน เรียงจากขอบรอบขั้นต่ำน้อยสุด")
+
+
+class RiskRequest(BaseModel):
+    length: float = Field(..., gt=0, description="ความยาว (cm)")
+    width: float = Field(..., gt=0, description="ความกว้าง (cm)")
+    weight: float = Field(..., gt=0, description="น้ำหนักสินค้า (kg)")
+    flute_type: str = Field("C", description="ลอนกระดาษ (A/B/C/E/BC)")
+    relative_humidity: float = Field(50, ge=0, le=100, description="ความชื้นสัมพัทธ์ที่จัดเก็บ (%)")
+    storage_days: float = Field(0, ge=0, le=3650, description="ระยะเวลาที่ซ้อนเก็บ (วัน)")
+    stacking_pattern: Literal["column", "misaligned", "interlocked", "overhang"] = Field(
+        "column", description="รูปแบบการซ้อน"
+    )
+    stack_load_kg: Optional[float] = Field(None, gt=0, description="แรงกดบนกล่องล่างสุด (ไม่ระบุ = น้ำหนัก × 3)")
+    samples: int = Field(100_000, ge=1000, le=1_000_000, description="จำนวนตัวอย่าง Monte Carlo")
+    seed: int = Field(0, ge=0, description="seed (ค่าเดิม → ผลเดิม)")
+    max_failure_probability: float = Field(0.01, gt=0, lt=1, description="โอกาสยุบสูงสุดที่ยังถือว่า SAFE")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "length": 30, "width": 20, "weight": 1, "flute_type": "C",
+                "relative_humidity": 80, "storage_days": 30, "stacking_pattern": "interlocked"
+            }
+        }
+
+
+class RiskResponse(BaseModel):
+    status: str = Field(..., description="SAFE หรือ DANGER (จากโอกาสยุบ)")
+    failure_probability: float
+    failure_ci95: List[float] = Field(..., description="ช่วงความเชื่อมั่น 95% ของโอกาสยุบ")
+    safety_factor: Dict[str, float] = Field(..., description="mean, p05, p50, p95")
+    bct_kgf: Dict[str, float]
+    nominal_safety_factor: float
+    samples: int
+    seed: int
+    max_failure_probability: float
+    conditions: Dict[str, Any]
+
+
+class StressFieldRequest(BaseModel):
+    length: float = Field(..., gt=0, description="ความยาว (cm) — แกน z ของ BoxGeometry")
+    width: float = Field(..., gt=0, description="ความกว้าง (cm) — แกน x")
+    height: float = Field(..., gt=0, description="ความสูง (cm) — แกน y")
+    weight: float = Field(0, ge=0, description="น้ำหนักสินค้า (kg)")
+    flute_type: str = Field("C", description="ลอนกระดาษ (A/B/C/E/BC)")
+    stack_load_kg: Optional[float] = Field(None, ge=0, description="แรงกดจากด้านบน (ไม่ระบุ = น้ำหนัก × 3)")
+    resolution: int = Field(32, ge=4, le=128, description="จำนวน texel ต่อด้านของแต่ละ face")
+    format: Literal["binary", "json"] = Field(
+        "binary", description="binary = float32 little-endian (ดู X-Field-* headers), json = list"
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {"length": 30, "width": 20, "height": 20, "weight": 2, "flute_type": "C", "resolution": 32}
+        }
 
 
 # ===================================
 # McKee Formula
 # ===================================
+MCKEE_CONSTANT = 2.028
+MCKEE_EXPONENT = 0.746
+
+
 def mckee_bct(ect_kn_m: float, caliper_mm: float, perimeter_mm: float) -> float:
     """
     คำนวณ Box Compression Test (BCT) ด้วย McKee Formula
@@ -71,8 +284,8 @@ def mckee_bct(ect_kn_m: float, caliper_mm: float, perimeter_mm: float) -> float:
     z_in = perimeter_mm / 25.4          # mm → in
     h_in = caliper_mm / 25.4            # mm → in
 
-    k = 2.028
-    a = 0.746
+    k = MCKEE_CONSTANT
+    a = MCKEE_EXPONENT
 
     bct_lbf = k * (ect_lbf_in ** a) * (z_in ** (1 - a)) * (h_in ** a)
     bct_kgf = bct_lbf * 0.453592
@@ -82,17 +295,28 @@ def mckee_bct(ect_kn_m: float, caliper_mm: float, perimeter_mm: float) -> float:
 
 def analyze_box_strength(
     length_cm: float, width_cm: float, height_cm: float,
-    weight_kg: float, flute_type: str
+    weight_kg: float, flute_type: str,
+    profile: Optional[Dict[str, Any]] = None,
 ) -> dict:
-    """วิเคราะห์ความแข็งแรงของกล่อง"""
+    """
+    วิเคราะห์ความแข็งแรงของกล่อง
+
+    profile: สภาพใช้งานจริง (services/strength_derating.py) — ไม่ระบุ / ค่า default = แบบเดิม
+             (ลดทอน BCT + เปลี่ยน stacking factor, ผลมี "derating" เพิ่ม)
+    """
 
     flute = FLUTE_SPECS.get(flute_type.upper(), FLUTE_SPECS["C"])
     perimeter_mm = 2 * (length_cm + width_cm) * 10
 
     bct_kgf = mckee_bct(flute["ect"], flute["caliper"], perimeter_mm)
 
-    # Safety Factor — stacking factor = 3
-    stacking_factor = 3
+    # Safety Factor — stacking factor = 3 (หรือตาม profile)
+    stacking_factor = DEFAULT_STACKING_FACTOR
+    profile_key = canonical_profile(profile)
+    derating = profile_derating(profile_key) if profile_key else None
+    if derating:
+        bct_kgf *= derating["combined"]
+        stacking_factor = derating["stacking_factor"]
     max_load_kg = bct_kgf / stacking_factor
 
     if weight_kg > 0:
@@ -138,7 +362,7 @@ def analyze_box_strength(
             f"⚠️ กล่อง {flute['name']} ไม่แข็งแรงพอสำหรับ {weight_kg:.1f} kg — {suggestion}"
         )
 
-    return {
+    result = {
         "status": status,
         "safety_score": score,
         "max_load_kg": round(max_load_kg, 2),
@@ -147,6 +371,114 @@ def analyze_box_strength(
         "bct_kgf": round(bct_kgf, 2),
         "safety_factor": round(safety_factor, 2),
     }
+    if derating:
+        result["derating"] = {
+            "stacking_factor": derating["stacking_factor"],
+            "combined": round(derating["combined"], 4),
+            "factors": {name: round(f, 4) for name, f in derating["factors"].items()},
+        }
+    return result
+
+
+# ===================================
+# Canonical Input & Analysis Cache
+# ===================================
+# ผล 1 ตัว ≈ 1 KB → 4096 ตัว ≈ 4 MB
+ANALYSIS_CACHE_SIZE = int(os.getenv("ANALYSIS_CACHE_SIZE", "4096"))
+_ANALYSIS_CACHE = LRUCache(maxsize=ANALYSIS_CACHE_SIZE)
+_MISSING = object()
+
+
+def model_fingerprint(
+    flutes: Dict[str, Dict[str, Any]] = FLUTE_SPECS,
+    stages: Tuple[Dict[str, Any], ...] = DERATING_STAGES,
+    default_stacking_factor: float = DEFAULT_STACKING_FACTOR,
+) -> str:
+    """
+    hash ของค่าคงที่ทุกตัวที่ผลขึ้นกับมัน (FLUTE_SPECS, McKee, ตาราง derating ทุกขั้น, stacking factor default)
+    → แก้ตารางไหนก็ตาม ETag เปลี่ยนเอง (cache ฝั่ง browser/proxy ไม่ค้าง)
+    """
+    payload = {
+        "flutes": flutes,
+        "k": MCKEE_CONSTANT,
+        "a": MCKEE_EXPONENT,
+        "derating": [
+            {"name": stage["name"], "x": list(stage["x"]), "factor": list(stage["factor"])}
+            for stage in stages
+        ],
+        "stacking_patterns": list(STACKING_PATTERNS),
+        "stacking_factor": default_stacking_factor,
+    }
+    return hashlib.sha256(
+        json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    ).hexdigest()[:16]
+
+
+MODEL_FINGERPRINT = model_fingerprint()
+# browser / reverse proxy เก็บได้ 1 วัน (ผลขึ้นกับ input + MODEL_FINGERPRINT เท่านั้น)
+ANALYSIS_CACHE_CONTROL = "public, max-age=86400"
+
+AnalysisKey = Tuple[Any, ...]
+
+
+def canonical_analysis_key(
+    length_cm: float, width_cm: float, weight_kg: float, flute_type: str,
+    profile: Optional[Dict[str, Any]] = None,
+) -> AnalysisKey:
+    """
+    key ของผลวิเคราะห์ (input ที่ให้ผลเหมือนกันได้ key เดียวกัน)
+
+    - ตัวเลขเป็น float (20 กับ 20.0 คือกล่องเดียวกัน)
+    - McKee ใช้ขอบรอบ → ยาว/กว้าง สลับกันได้ (เรียงจากน้อยไปมาก), ความสูงไม่มีผล → ไม่อยู่ใน key
+    - ลอนเป็นตัวพิมพ์ใหญ่ (ลอนที่ไม่รู้จักคงไว้ตามเดิม — flute_type ในผลยังเป็นค่าที่ส่งมา)
+    - profile ต่อท้ายเฉพาะเมื่อไม่ใช่ค่า default (canonical_profile) → key ของการวิเคราะห์แบบเดิมไม่เปลี่ยน
+
+    Raises:
+        ValueError: profile ไม่ถูกต้อง
+    """
+    short, long = sorted((float(length_cm), float(width_cm)))
+    key = (short, long, float(weight_kg), flute_type.upper())
+    profile_key = canonical_profile(profile)
+    return key + (profile_key,) if profile_key else key
+
+
+def analysis_etag(key: AnalysisKey) -> str:
+    """strong ETag ของผลวิเคราะห์ (ผลเป็น deterministic จาก key + MODEL_FINGERPRINT)"""
+    payload = f"{MODEL_FINGERPRINT}|{key!r}"
+    return f'"{hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]}"'
+
+
+def cached_box_strength(
+    length_cm: float, width_cm: float, height_cm: float,
+    weight_kg: float, flute_type: str,
+    profile: Optional[Dict[str, Any]] = None,
+) -> dict:
+    """
+    analyze_box_strength + LRU cache ตาม canonical_analysis_key
+
+    ใช้แทน analyze_box_strength ได้ทันที (signature เดียวกัน, ผลเท่ากันทุก field)
+    — คืนสำเนา → caller แก้ dict ได้โดยไม่กระทบ cache
+    """
+    key = canonical_analysis_key(length_cm, width_cm, weight_kg, flute_type, profile)
+    result = _ANALYSIS_CACHE.get(key, _MISSING)
+    if result is _MISSING:
+        # คำนวณจาก key เสมอ → ผลจาก cache กับคำนวณใหม่เท่ากันทุกตัวเลข
+        result = analyze_box_strength(key[0], key[1], height_cm, key[2], key[3], profile)
+        _ANALYSIS_CACHE.put(key, result)
+    copied = dict(result)
+    if "derating" in result:
+        copied["derating"] = {**result["derating"], "factors": dict(result["derating"]["factors"])}
+    return copied
+
+
+def get_analysis_cache_stats() -> Dict[str, Any]:
+    """สถิติของ analysis cache (size, maxsize, hits, misses, evictions, hit_rate)"""
+    return _ANALYSIS_CACHE.stats()
+
+
+def clear_analysis_cache() -> None:
+    """ล้าง analysis cache + สถิติ (ใช้ใน benchmark/tests)"""
+    _ANALYSIS_CACHE.clear()
 
 
 # ===================================
@@ -162,46 +494,60 @@ def suggest_alternatives(
     """
     เมื่อ DANGER → หาตัวเลือกที่ทำให้ SAFE
 
-    Strategy:
+    Strategy (ย้อนสูตร McKee แบบ closed form — services/strength_inverse.py):
     1. หา flute ที่แข็งแรงพอกับขนาดกล่องปัจจุบัน
     2. หาขนาดกล่องขั้นต่ำที่ทำให้ SAFE กับ flute ที่แข็งแรงที่สุด (BC)
-    3. ถ้าไม่มี flute ใดรับได้ → แนะนำขนาดกล่องโดย BC flute
+    3. ถ้าไม่มี flute ใดรับได้ → แนะนำขนาดกล่องโดย BC flute (คงสัดส่วน ยาว:กว้าง เดิม)
+    4. ขนาดที่แนะนำกางออกแล้วใหญ่เกินแผ่นลูกฟูก (BOARD_SHEETS["rsc"]) → ผลิตไม่ได้ ไม่แนะนำ (None)
+       (/analyze/inverse ยังคืนค่าจริงแบบไม่จำกัด)
 
     Returns:
         {
           "recommended_flutes": [...] or [],  # ว่างถ้าทุก flute รับไม่ได้ที่ขนาดนี้
-          "min_perimeter_cm": X,              # ขอบรอบขั้นต่ำที่ SAFE ด้วย BC
+          "min_perimeter_cm": X or None,      # ขอบรอบขั้นต่ำที่ SAFE ด้วย BC (ทีละ 1 ซม. จากขนาดปัจจุบัน)
+          "min_dimensions": {"length", "width"} or None,  # ขนาดขั้นต่ำที่ SAFE ด้วย BC คงสัดส่วนเดิม
+                                              # None = ใหญ่เกินกล่องที่ผลิตได้
           "current_max_load_kg": X,
           "needs_larger_box": bool,           # True ถ้าต้องการกล่องใหญ่ขึ้น
         }
     """
+    # import ในฟังก์ชัน: services.strength_inverse import FLUTE_SPECS / McKee จาก module นี้
+    from services.board_nesting import fits_board_sheet
+    from services.strength_inverse import SAFE_SAFETY_FACTOR, inverse_design, min_perimeter_on_grid
+
     stacking_factor = 3
     perimeter_mm = 2 * (length_cm + width_cm) * 10
 
-    # 1. หา flute ทั้งหมดที่ SAFE กับขนาดปัจจุบัน
+    # 1. flute ทั้งหมดที่ SAFE กับขนาดปัจจุบัน (ทุกลอนพร้อมกัน)
     recommended = []
-    for flute_key, spec in FLUTE_SPECS.items():
-        bct = mckee_bct(spec["ect"], spec["caliper"], perimeter_mm)
-        max_load = bct / stacking_factor
-        if weight_kg > 0 and max_load / weight_kg >= 1.5:
-            recommended.append({
-                "flute": flute_key,
-                "name": spec["name"],
-                "max_load_kg": round(max_load, 1),
-                "safety_factor": round(max_load / weight_kg, 2),
-            })
+    min_dimensions = None
+    if weight_kg > 0:
+        design = inverse_design(length_cm, width_cm, weight_kg, SAFE_SAFETY_FACTOR)
+        recommended = [
+            {
+                "flute": option["flute"],
+                "name": option["name"],
+                "max_load_kg": round(
+                    mckee_bct(FLUTE_SPECS[option["flute"]]["ect"], FLUTE_SPECS[option["flute"]]["caliper"], perimeter_mm)
+                    / stacking_factor, 1
+                ),
+                "safety_factor": option["safety_factor"],
+            }
+            for option in design["flutes"] if option["meets_target"]
+        ]
+        min_dimensions = next(o["min_dimensions"] for o in design["flutes"] if o["flute"] == "BC")
     recommended.sort(key=lambda x: FLUTE_SPECS[x["flute"]]["ect"])
 
-    # 2. หา min perimeter ที่ทำให้ SAFE — ลอง BC ก่อน (แข็งแรงสุด)
-    best_flute_key = "BC"
-    best_spec = FLUTE_SPECS[best_flute_key]
-    min_perimeter_cm = None
-    # ค้นหาจาก current size ขึ้นไปจนถึง 5000mm (500cm perimeter)
-    for p_mm in range(int(perimeter_mm), 5000, 10):
-        bct = mckee_bct(best_spec["ect"], best_spec["caliper"], p_mm)
-        if bct / stacking_factor >= weight_kg * 1.5:
-            min_perimeter_cm = round(p_mm / 10, 1)
-            break
+    # 2. min perimeter ที่ทำให้ SAFE ด้วย BC (แข็งแรงสุด) — บนตารางทีละ 10 mm จากขนาดปัจจุบัน
+    p_mm = min_perimeter_on_grid(weight_kg, perimeter_mm, "BC", SAFE_SAFETY_FACTOR)
+    min_perimeter_cm = round(p_mm / 10, 1)
+
+    # 3. ซ่อนขนาดที่ผลิตไม่ได้ (ขอบรอบ → ยาว/กว้างตามสัดส่วนเดิม, สูงเท่าเดิม)
+    scale = min_perimeter_cm / (2 * (length_cm + width_cm))
+    if not fits_board_sheet("rsc", width_cm * scale, length_cm * scale, height_cm):
+        min_perimeter_cm = None
+    if min_dimensions and not fits_board_sheet("rsc", min_dimensions["width"], min_dimensions["length"], height_cm):
+        min_dimensions = None
 
     flute = FLUTE_SPECS.get(current_flute.upper(), FLUTE_SPECS["C"])
     current_bct = mckee_bct(flute["ect"], flute["caliper"], perimeter_mm)
@@ -209,6 +555,7 @@ def suggest_alternatives(
     return {
         "recommended_flutes": recommended[:3],
         "min_perimeter_cm": min_perimeter_cm,
+        "min_dimensions": min_dimensions,
         "current_max_load_kg": round(current_bct / stacking_factor, 2),
         "needs_larger_box": len(recommended) == 0,
     }
@@ -256,13 +603,240 @@ def format_analysis_for_chat(analysis: dict, weight_kg: float, flute_type: str)
 async def analyze(request: AnalyzeRequest):
     """วิเคราะห์ความแข็งแรงของกล่องด้วย McKee Formula"""
     try:
-        result = analyze_box_strength(
+        result = cached_box_strength(
             length_cm=request.length,
             width_cm=request.width,
             height_cm=request.height,
             weight_kg=request.weight,
             flute_type=request.flute_type,
+            profile=request.profile.dict() if request.profile else None,
         )
         return AnalyzeResponse(**result)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Analysis error: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Analysis error: {str(e)}")
+
+
+@router.get(
+    "/analyze",
+    response_model=AnalyzeResponse,
+    responses={304: {"description": "Not modified (ETag ตรงกับ If-None-Match)"}}
+)
+async def analyze_get(
+    response: Response,
+    length: float = Query(..., gt=0, description="ความยาว (cm)"),
+    width: float = Query(..., gt=0, description="ความกว้าง (cm)"),
+    height: float = Query(..., gt=0, description="ความสูง (cm)"),
+    weight: float = Query(0, ge=0, description="น้ำหนักสินค้า (kg)"),
+    flute_type: str = Query("C", description="ลอนกระดาษ (A/B/C/E/BC)"),
+    stacking_factor: Optional[float] = Query(None, gt=0, le=20, description="ตัวหารแรงกดจากการซ้อน (เดิม 3)"),
+    relative_humidity: Optional[float] = Query(None, ge=0, le=100, description="ความชื้นสัมพัทธ์ (%)"),
+    storage_days: Optional[float] = Query(None, ge=0, le=3650, description="ระยะเวลาที่ซ้อนเก็บ (วัน)"),
+    stacking_pattern: Optional[Literal["column", "misaligned", "interlocked", "overhang"]] = Query(
+        None, description="รูปแบบการซ้อน"
+    ),
+    pallet_overhang_cm: Optional[float] = Query(None, ge=0, le=30, description="ยื่นเกินขอบพาเลท (cm)"),
+    print_coverage_pct: Optional[float] = Query(None, ge=0, le=100, description="พื้นที่พิมพ์บนผนัง (%)"),
+    cutout_area_pct: Optional[float] = Query(None, ge=0, le=50, description="ช่องเจาะ die-cut (% ของผนัง)"),
+    if_none_match: Optional[str] = Header(None),
+):
+    """
+    วิเคราะห์ความแข็งแรงแบบ GET (ผลเดียวกับ POST /analyze) — browser / reverse proxy cache ได้
+
+    - query: length, width, height, weight, flute_type (ชื่อเดียวกับ body ของ POST)
+      + field ของ profile (stacking_factor, relative_humidity, ...) — ไม่ระบุ = แบบเดิม
+    - **ETag** (strong): จาก input ที่ canonical แล้ว → ?length=20 กับ ?length=20.0,
+      ยาว/กว้าง สลับกัน, ความสูงต่างกัน, ลอนตัวเล็ก/ใหญ่ ได้ ETag เดียวกัน
+    - **If-None-Match** (header): ETag ที่ client มี → 304
+    - **Cache-Control**: public, max-age=86400
+    """
+    profile = {
+        "stacking_factor": stacking_factor,
+        "relative_humidity": relative_humidity,
+        "storage_days": storage_days,
+        "stacking_pattern": stacking_pattern,
+        "pallet_overhang_cm": pallet_overhang_cm,
+        "print_coverage_pct": print_coverage_pct,
+        "cutout_area_pct": cutout_area_pct,
+    }
+    key = canonical_analysis_key(length, width, weight, flute_type, profile)
+    etag = analysis_etag(key)
+    headers = {"ETag": etag, "Cache-Control": ANALYSIS_CACHE_CONTROL}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return AnalyzeResponse(**cached_box_strength(length, width, height, weight, flute_type, profile))
+
+
+@router.get("/analyze/cache-stats")
+async def analysis_cache_stats():
+    """
+    สถิติ cache ผลวิเคราะห์ (cached_box_strength)
+
+    Returns:
+    - size, maxsize, hits, misses, evictions, hit_rate + model_fingerprint ปัจจุบัน
+    """
+    return {**get_analysis_cache_stats(), "model_fingerprint": MODEL_FINGERPRINT}
+
+
+@router.post("/analyze/optimize", response_model=OptimizeResponse)
+async def optimize(request: OptimizeRequest):
+    """
+    หากล่องลูกฟูกที่ถูกที่สุดที่ยังรับน้ำหนักได้
+
+    ค้นหา box_type × วัสดุลูกฟูก × ลอน × ขนาดที่ยอมขยาย แล้วคืน Pareto front ของราคา vs safety factor
+    """
+    # import ในฟังก์ชัน: services.config_optimizer import FLUTE_SPECS / McKee จาก module นี้
+    from services.config_optimizer import optimize_configuration
+
+    base = {
+        "dimensions": {"width": request.width, "length": request.length, "height": request.height},
+        "quantity": request.quantity,
+        "inner": request.inner,
+        "coatings": [c.dict() for c in request.coatings or []],
+        "stampings": [s.dict() for s in request.stampings or []],
+    }
+    try:
+        result = optimize_configuration(
+            base,
+            weight_kg=request.weight,
+            max_slack_cm=request.max_slack_cm,
+            slack_step_cm=request.slack_step_cm,
+            min_safety_factor=request.min_safety_factor,
+            box_types=request.box_types,
+            flutes=request.flutes,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return OptimizeResponse(**result)
+
+
+@router.post("/analyze/batch", response_model=AnalyzeBatchResponse)
+async def analyze_batch_points(request: AnalyzeBatchRequest):
+    """
+    วิเคราะห์หลายจุดในครั้งเดียว (เช่น ทั้งเส้นกราฟตอนลาก slider น้ำหนัก)
+
+    ผลเป็น columnar (list ต่อ field ตามลำดับจุด) — ทุกจุดเท่ากับ POST /analyze ของจุดนั้น
+    (ความสูงไม่มีผลต่อ McKee จึงไม่ต้องส่ง)
+    """
+    from services.strength_batch import analyze_batch
+
+    try:
+        return analyze_batch(
+            request.length, request.width, request.weight, request.flute_type,
+            request.profile.dict() if request.profile else None,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/analyze/grid")
+async def analyze_strength_grid(request: StrengthGridRequest):
+    """
+    ตารางความแข็งแรง flute_type × weight × length × width (heatmap ใน Studio)
+
+    Returns: {"axes", "order", "shape", "values": {metric: [ค่าเรียงแบบ row-major]}}
+    """
+    from services.strength_batch import STRENGTH_GRID_AXES, analyze_grid
+
+    try:
+        grid = analyze_grid(request.dict(exclude={"metrics"}))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "axes": grid["axes"],
+        "order": list(STRENGTH_GRID_AXES),
+        "shape": grid["shape"],
+        "values": {metric: grid["values"][metric].ravel().tolist() for metric in request.metrics},
+    }
+
+
+@router.post("/analyze/inverse", response_model=InverseResponse)
+async def inverse(request: InverseRequest):
+    """
+    ย้อนสูตร McKee: ทุกลอนพร้อมกัน
+
+    - รับน้ำหนักได้เท่าไรที่ขนาดปัจจุบัน
+    - ขอบรอบขั้นต่ำ + ขนาด ยาว×กว้าง ขั้นต่ำ (คงสัดส่วนเดิม) ที่ถึง target_safety_factor
+    """
+    from services.strength_inverse import inverse_design
+
+    try:
+        return inverse_design(
+            request.length, request.width, request.weight, request.target_safety_factor, request.flutes
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/analyze/risk", response_model=RiskResponse)
+def analyze_risk(request: RiskRequest):
+    """
+    วิเคราะห์ความแข็งแรงแบบ Monte Carlo (ความแปรปรวนของแผ่น + ความชื้น + เวลาจัดเก็บ + รูปแบบการซ้อน)
+
+    SAFE/DANGER ตัดสินจากโอกาสที่กล่องยุบ (failure_probability ≤ max_failure_probability)
+    — def ธรรมดา (ไม่ใช่ async): งาน CPU ล้วน FastAPI รันใน threadpool ไม่บล็อก event loop
+    """
+    from services.strength_montecarlo import simulate_strength
+
+    try:
+        return simulate_strength(
+            request.length,
+            request.width,
+            request.weight,
+            flute_type=request.flute_type,
+            relative_humidity=request.relative_humidity,
+            storage_days=request.storage_days,
+            stacking_pattern=request.stacking_pattern,
+            stack_load_kg=request.stack_load_kg,
+            samples=request.samples,
+            seed=request.seed,
+            max_failure_probability=request.max_failure_probability,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/analyze/stress-field")
+async def stress_field(request: StressFieldRequest):
+    """
+    สนาม utilization รายผนัง สำหรับ heatmap 3D (≥ 1 = รับแรงเกิน)
+
+    - **format=binary** (default): float32 little-endian shape (6, resolution, resolution)
+      เรียง face ตาม THREE.BoxGeometry (px, nx, py, ny, pz, nz) → ใส่ DataTexture ได้ทันที
+      (headers: X-Field-Shape, X-Field-Faces, X-Field-Max, X-BCT-Kgf)
+    - **format=json**: {"faces", "shape", "max_utilization", "bct_kgf", "stack_load_kg", "values": [...]}
+    """
+    from services.stress_field import compute_stress_field
+
+    try:
+        field = compute_stress_field(
+            request.length, request.width, request.height, request.weight,
+            flute_type=request.flute_type,
+            stack_load_kg=request.stack_load_kg,
+            resolution=request.resolution,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if request.format == "binary":
+        return Response(
+            content=field["data"],
+            media_type="application/octet-stream",
+            headers={
+                "X-Field-Shape": ",".join(str(n) for n in field["shape"]),
+                "X-Field-Faces": ",".join(field["faces"]),
+                "X-Field-Max": str(field["max_utilization"]),
+                "X-BCT-Kgf": str(field["bct_kgf"]),
+            }
+        )
+
+    values = np.frombuffer(field["data"], dtype="<f4").astype(np.float64).round(4)
+    return {
+        "faces": field["faces"],
+        "shape": field["shape"],
+        "max_utilization": field["max_utilization"],
+        "bct_kgf": field["bct_kgf"],
+        "stack_load_kg": field["stack_load_kg"],
+        "values": values.tolist(),
+    }
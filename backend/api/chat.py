@@ -3,32 +3,49 @@ Chat API Endpoints
 จัดการ chatbot conversations
 """
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, status, WebSocket, WebSocketDisconnect, Header, Response, Depends
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Literal
+import asyncio
+import json
+import time
 import uuid
 
+from middleware.auth import require_admin, AuthUser
 from services.chatbot_flow import ChatbotFlowManager
+from services.fake_llm import FakeLLMService
 from models.chat_state import session_storage, ConversationState
+from utils.http_cache import etag_matches
 from utils.quick_replies import get_quick_replies
+from utils.state_delta import snapshot_collected_data, diff_collected_data
 
 
 # ===================================
 # Request/Response Models
 # ===================================
 
+# ข้อความยาวสุดที่รับ (spec / อีเมลที่ลูกค้าวางทั้งก้อน ≈ 8,000 ตัวอักษร)
+MAX_MESSAGE_LENGTH = 10_000
+
+
 class ChatMessageRequest(BaseModel):
     """Request model สำหรับส่งข้อความ"""
-    message: str = Field(..., min_length=1, description="ข้อความจากลูกค้า")
+    message: str = Field(..., min_length=1, max_length=MAX_MESSAGE_LENGTH, description="ข้อความจากลูกค้า")
     session_id: Optional[str] = Field(None, description="Session ID (ถ้ามีอยู่แล้ว)")
     user_id: Optional[str] = Field(None, description="User ID (Optional)")
+    base_version: Optional[int] = Field(
+        None,
+        description="state_version ที่ client มีอยู่ — ถ้าตรงกับ server จะได้แค่ collected_data_delta (ไม่ส่ง collected_data เต็ม)"
+    )
     
     class Config:
         json_schema_extra = {
             "example": {
                 "message": "สวัสดีครับ",
                 "session_id": None,
-                "user_id": "user_12345"
+                "user_id": "user_12345",
+                "base_version": None
             }
         }
 
@@ -38,7 +55,15 @@ class ChatMessageResponse(BaseModel):
     response: str = Field(..., description="ข้อความตอบกลับจาก chatbot")
     session_id: str = Field(..., description="Session ID")
     current_step: int = Field(..., description="ขั้นตอนปัจจุบัน (1-14)")
-    collected_data: Dict[str, Any] = Field(default_factory=dict, description="ข้อมูลที่เก็บได้")
+    collected_data: Optional[Dict[str, Any]] = Field(
+        default_factory=dict,
+        description="ข้อมูลที่เก็บได้ (ไม่ส่งถ้า base_version ตรงกับ state ก่อนประมวลผล)"
+    )
+    collected_data_delta: List[Dict[str, Any]] = Field(
+        default_factory=list,
+        description="JSON-patch ops ของ collected_data เทียบกับ state ก่อนรอบนี้"
+    )
+    state_version: int = Field(0, description="version ของ state หลังประมวลผล")
     is_waiting_confirmation: bool = Field(default=False, description="กำลังรอการยืนยันหรือไม่")
     is_complete: bool = Field(default=False, description="สนทนาเสร็จสมบูรณ์แล้วหรือไม่")
     quick_replies: List[str] = Field(default_factory=list, description="ปุ่มเลือกตอบสำหรับลูกค้า")
@@ -50,6 +75,8 @@ class ChatMessageResponse(BaseModel):
                 "session_id": "sess_abc123",
                 "current_step": 1,
                 "collected_data": {},
+                "collected_data_delta": [],
+                "state_version": 1,
                 "is_waiting_confirmation": False,
                 "is_complete": False
             }
@@ -65,6 +92,7 @@ class SessionResponse(BaseModel):
     is_complete: bool
     created_at: str
     last_activity: str
+    state_version: int = 0
 
 
 class SessionListResponse(BaseModel):
@@ -73,6 +101,36 @@ class SessionListResponse(BaseModel):
     total: int
 
 
+class ReplayConversation(BaseModel):
+    """บทสนทนา 1 ชุดสำหรับ replay"""
+    id: Optional[str] = Field(None, description="ชื่อ/ID ของบทสนทนา (ถ้าไม่ระบุใช้ลำดับ)")
+    messages: List[str] = Field(..., min_length=1, description="ข้อความลูกค้าตามลำดับ")
+    recorded_responses: Optional[List[str]] = Field(
+        None, description="LLM responses ที่บันทึกไว้ (ใช้กับ llm='fake')"
+    )
+
+
+class ReplayRequest(BaseModel):
+    """Request model สำหรับ replay บทสนทนาหลายชุดพร้อมกัน"""
+    conversations: List[ReplayConversation] = Field(..., min_length=1, max_length=5000)
+    concurrency: int = Field(8, ge=1, le=256, description="จำนวนบทสนทนาที่รันพร้อมกันสูงสุด")
+    llm: Literal["fake", "live"] = Field("fake", description="fake = ไม่เรียก LLM จริง, live = ใช้ Groq")
+    llm_latency_ms: float = Field(0, ge=0, le=10000, description="จำลอง latency ของ fake LLM")
+    include_responses: bool = Field(True, description="ใส่ข้อความตอบกลับในแต่ละ turn หรือไม่")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "conversations": [
+                    {"id": "rsc-happy", "messages": ["สวัสดี", "สินค้าทั่วไป", "RSC", "1",
+                                                     "20x15x10 จำนวน 1000", "ถูกต้อง"]}
+                ],
+                "concurrency": 8,
+                "llm": "fake"
+            }
+        }
+
+
 # ===================================
 # Router
 # ===================================
@@ -86,15 +144,29 @@ router = APIRouter(
     }
 )
 
+# WebSocket router — mount ที่ root (/ws/chat/{session_id}) แยกจาก REST prefix /api
+ws_router = APIRouter(tags=["Chat"])
+
 # Initialize chatbot flow manager
 chatbot_manager = ChatbotFlowManager()
 
+# WebSocket settings
+WS_HEARTBEAT_INTERVAL = 20      # วินาที — ส่ง ping ถ้า client เงียบนานเท่านี้
+WS_MAX_MISSED_HEARTBEATS = 3    # ไม่มีอะไรตอบกลับเกินจำนวนนี้ → ปิด connection
+WS_INBOUND_QUEUE_SIZE = 4       # ข้อความที่รอประมวลผลได้สูงสุด (เกิน → ตอบ busy)
+WS_OUTBOUND_QUEUE_SIZE = 32     # frame ที่รอส่งได้สูงสุด (เต็ม → flow หยุดรอ client)
+
 
 # ===================================
 # Endpoints
 # ===================================
 
-@router.post("/message", response_model=ChatMessageResponse, status_code=status.HTTP_200_OK)
+@router.post(
+    "/message",
+    response_model=ChatMessageResponse,
+    response_model_exclude_none=True,
+    status_code=status.HTTP_200_OK
+)
 async def send_message(request: ChatMessageRequest):
     """
     ส่งข้อความไปยัง chatbot
@@ -102,12 +174,15 @@ async def send_message(request: ChatMessageRequest):
     - **message**: ข้อความจากลูกค้า
     - **session_id**: Session ID (Optional - ถ้าไม่มีจะสร้างใหม่)
     - **user_id**: User ID (Optional)
+    - **base_version**: state_version ที่ client ถืออยู่ (Optional)
     
     Returns:
     - **response**: ข้อความตอบกลับ
     - **session_id**: Session ID
     - **current_step**: ขั้นตอนปัจจุบัน
-    - **collected_data**: ข้อมูลที่เก็บได้
+    - **collected_data**: ข้อมูลที่เก็บได้ (ตัดออกถ้า base_version ตรง)
+    - **collected_data_delta**: JSON-patch ของ collected_data ในรอบนี้
+    - **state_version**: version ใหม่ของ state
     """
     try:
         # สร้าง session_id ใหม่ถ้าไม่มี
@@ -119,6 +194,10 @@ async def send_message(request: ChatMessageRequest):
         if not state:
             state = ConversationState(session_id=request.session_id)
         
+        # เก็บ snapshot ก่อนประมวลผล (สำหรับ delta)
+        prev_version = state.state_version
+        prev_data = snapshot_collected_data(state.collected_data)
+        
         # ประมวลผลข้อความ
         # chatbot_flow.process_message(user_message, state) → Tuple[str, ConversationState]
         response_text, state = await chatbot_manager.process_message(
@@ -139,12 +218,17 @@ async def send_message(request: ChatMessageRequest):
             is_edit_mode=getattr(state, 'edit_mode', False),
         )
         
+        # client มี base ตรงกับ state ก่อนรอบนี้ → ส่งแค่ delta
+        client_in_sync = request.base_version is not None and request.base_version == prev_version
+        
         # Return response
         return ChatMessageResponse(
             response=response_text,
             session_id=request.session_id,
             current_step=int(state.current_step),
-            collected_data=state.collected_data,
+            collected_data=None if client_in_sync else state.collected_data,
+            collected_data_delta=diff_collected_data(prev_data, state.collected_data),
+            state_version=state.state_version,
             is_waiting_confirmation=getattr(state, 'is_waiting_for_confirmation', False),
             is_complete=int(state.current_step) >= 14,
             quick_replies=replies
@@ -157,15 +241,24 @@ async def send_message(request: ChatMessageRequest):
         )
 
 
-@router.get("/session/{session_id}", response_model=SessionResponse)
-async def get_session(session_id: str):
+@router.get(
+    "/session/{session_id}",
+    response_model=SessionResponse,
+    responses={304: {"description": "Not modified (ETag ตรงกับ If-None-Match)"}}
+)
+async def get_session(
+    session_id: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(None)
+):
     """
     ดึงข้อมูล session
     
     - **session_id**: Session ID ที่ต้องการดู
+    - **If-None-Match** (header): ETag ที่ client มี → 304 ถ้า state ไม่เปลี่ยน
     
     Returns:
-    - ข้อมูล session ทั้งหมด
+    - ข้อมูล session ทั้งหมด (พร้อม ETag header)
     """
     try:
         # ดึง session
@@ -177,6 +270,14 @@ async def get_session(session_id: str):
                 detail=f"Session {session_id} not found"
             )
         
+        etag = state.get_etag()
+        if etag_matches(if_none_match, etag):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={"ETag": etag}
+            )
+        response.headers["ETag"] = etag
+        
         # Return session info
         return SessionResponse(
             session_id=state.session_id,
@@ -185,7 +286,8 @@ async def get_session(session_id: str):
             message_count=len(state.messages),
             is_complete=state.current_step == 14,  # ChatbotStep.END
             created_at=state.created_at.isoformat(),
-            last_activity=state.last_activity.isoformat()
+            last_activity=state.last_activity.isoformat(),
+            state_version=state.state_version
         )
         
     except HTTPException:
@@ -260,6 +362,154 @@ async def list_sessions():
         )
 
 
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    """percentile แบบ nearest-rank (sorted_values ต้องเรียงแล้ว)"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+async def _replay_conversation(
+    index: int,
+    conversation: ReplayConversation,
+    request: ReplayRequest,
+    out: asyncio.Queue
+) -> List[float]:
+    """
+    รันบทสนทนา 1 ชุดใน session ชั่วคราว (ไม่บันทึกลง session_storage / ไม่สร้าง order)
+    ส่งผลแต่ละ turn เข้า queue → คืนเวลาของแต่ละ turn (ms)
+    """
+    conv_id = conversation.id or f"conv_{index}"
+    state = ConversationState(session_id=f"replay_{uuid.uuid4().hex[:12]}")
+
+    if request.llm == "live":
+        llm = chatbot_manager.groq_service
+    else:
+        llm = FakeLLMService(
+            recorded_responses=conversation.recorded_responses,
+            latency_ms=request.llm_latency_ms
+        )
+    # replay = session ทิ้งได้ → จบแชทแล้วไม่สร้าง order จริง
+    manager = ChatbotFlowManager(groq_service=llm, persist_orders=False)
+
+    turn_times: List[float] = []
+    conv_start = time.perf_counter()
+    error = None
+
+    for turn, message in enumerate(conversation.messages):
+        step_before = int(state.current_step)
+        calls_before = getattr(llm, "call_count", 0)
+        start = time.perf_counter()
+        try:
+            response_text, state = await manager.process_message(message, state)
+        except Exception as e:
+            error = f"turn {turn}: {str(e)}"
+            await out.put({"type": "error", "conversation": conv_id, "turn": turn, "detail": str(e)})
+            break
+        duration_ms = (time.perf_counter() - start) * 1000
+        turn_times.append(duration_ms)
+
+        line = {
+            "type": "turn",
+            "conversation": conv_id,
+            "turn": turn,
+            "message": message,
+            "step_before": step_before,
+            "step_after": int(state.current_step),
+            "sub_step": state.sub_step,
+            "transitioned": int(state.current_step) != step_before,
+            "llm_calls": getattr(llm, "call_count", 0) - calls_before,
+            "duration_ms": round(duration_ms, 3),
+        }
+        if request.include_responses:
+            line["response"] = response_text
+        await out.put(line)
+
+    await out.put({
+        "type": "conversation_done",
+        "conversation": conv_id,
+        "turns": len(turn_times),
+        "final_step": int(state.current_step),
+        "collected_data": state.collected_data,
+        "duration_ms": round((time.perf_counter() - conv_start) * 1000, 3),
+        "error": error,
+    })
+    return turn_times
+
+
+@router.post("/replay")
+async def replay_conversations(request: ReplayRequest, user: AuthUser = Depends(require_admin)):
+    """
+    Replay บทสนทนาหลายชุดพร้อมกัน (admin only) — สำหรับ regression + วัด throughput
+
+    - แต่ละบทสนทนารันใน session ชั่วคราวแยกกัน ผ่าน ChatbotFlowManager.process_message
+    - จำกัดจำนวนที่รันพร้อมกันด้วย **concurrency**
+    - **llm**: "fake" (default) ไม่เรียก Groq / "live" ใช้ Groq จริง
+
+    Returns (NDJSON stream, 1 JSON ต่อบรรทัด):
+    - {"type": "turn", ...}               ผลแต่ละ turn + step transition + เวลา
+    - {"type": "conversation_done", ...}  สรุปต่อบทสนทนา
+    - {"type": "summary", ...}            บรรทัดสุดท้าย: throughput, p50/p99
+    """
+    async def stream():
+        out: asyncio.Queue = asyncio.Queue()
+        semaphore = asyncio.Semaphore(request.concurrency)
+        all_turn_times: List[float] = []
+        wall_start = time.perf_counter()
+
+        async def run(index: int, conversation: ReplayConversation):
+            async with semaphore:
+                try:
+                    all_turn_times.extend(
+                        await _replay_conversation(index, conversation, request, out)
+                    )
+                except Exception as e:
+                    await out.put({"type": "error", "conversation": conversation.id or f"conv_{index}",
+                                   "detail": str(e)})
+
+        tasks = [
+            asyncio.create_task(run(i, conv))
+            for i, conv in enumerate(request.conversations)
+        ]
+        pending = set(tasks)
+        try:
+            while pending or not out.empty():
+                if out.empty():
+                    # รอจนมีผลใหม่ หรือ task จบ
+                    getter = asyncio.create_task(out.get())
+                    done, _ = await asyncio.wait(
+                        pending | {getter}, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    pending -= done
+                    if getter in done:
+                        yield json.dumps(getter.result(), ensure_ascii=False) + "\n"
+                    else:
+                        getter.cancel()
+                    continue
+                yield json.dumps(out.get_nowait(), ensure_ascii=False) + "\n"
+
+            wall_ms = (time.perf_counter() - wall_start) * 1000
+            sorted_times = sorted(all_turn_times)
+            yield json.dumps({
+                "type": "summary",
+                "conversations": len(request.conversations),
+                "turns": len(sorted_times),
+                "concurrency": request.concurrency,
+                "llm": request.llm,
+                "wall_time_ms": round(wall_ms, 3),
+                "turns_per_sec": round(len(sorted_times) / (wall_ms / 1000), 2) if wall_ms > 0 else 0,
+                "p50_turn_ms": round(_percentile(sorted_times, 50), 3),
+                "p99_turn_ms": round(_percentile(sorted_times, 99), 3),
+            }) + "\n"
+        finally:
+            # client ตัด connection กลางทาง → หยุดทุก task
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
 @router.post("/session/{session_id}/reset", status_code=status.HTTP_200_OK)
 async def reset_session(session_id: str):
     """
@@ -278,17 +528,22 @@ async def reset_session(session_id: str):
         
         # Reset state
         state.current_step = 1  # ChatbotStep.GREETING
+        state.sub_step = 0
         state.collected_data = {}
+        state.partial_data = {}
+        state.prefilled_data = {}  # one-shot prefill ของบทสนทนาเดิมต้องไม่ข้ามไปบทสนทนาใหม่
         state.temp_data = {}
         state.is_waiting_for_confirmation = False
         state.messages = []
+        state.bump_version()
         
         # Update session
         session_storage.update_session(session_id, state)
         
         return {
             "message": "Session reset successfully",
-            "session_id": session_id
+            "session_id": session_id,
+            "state_version": state.state_version
         }
         
     except HTTPException:
@@ -335,4 +590,179 @@ async def get_conversation_history(session_id: str, limit: Optional[int] = None)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error retrieving history: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+# ===================================
+# WebSocket Endpoint
+# ===================================
+
+def _build_turn_payload(state: ConversationState) -> Dict[str, Any]:
+    """ข้อมูลสถานะท้าย turn (ใช้ร่วมกับ REST response shape)"""
+    return {
+        "session_id": state.session_id,
+        "current_step": int(state.current_step),
+        "is_waiting_confirmation": getattr(state, 'is_waiting_for_confirmation', False),
+        "is_complete": int(state.current_step) >= 14,
+        "state_version": state.state_version,
+        "quick_replies": get_quick_replies(
+            current_step=int(state.current_step),
+            sub_step=getattr(state, 'sub_step', 0),
+            collected_data=state.collected_data,
+            partial_data=getattr(state, 'partial_data', {}),
+            is_waiting_confirmation=getattr(state, 'is_waiting_for_confirmation', False),
+            is_edit_mode=getattr(state, 'edit_mode', False),
+        ),
+    }
+
+
+def _parse_client_frame(raw: str) -> Dict[str, Any]:
+    """
+    แปลง frame จาก client
+    รองรับทั้ง JSON ({"type": "message", "message": "..."}) และ plain text (= ข้อความแชท)
+    """
+    try:
+        frame = json.loads(raw)
+    except ValueError:
+        return {"type": "message", "message": raw}
+    if not isinstance(frame, dict):
+        return {"type": "message", "message": raw}
+    return frame
+
+
+@ws_router.websocket("/ws/chat/{session_id}")
+async def chat_websocket(websocket: WebSocket, session_id: str):
+    """
+    Chat ผ่าน WebSocket — ใช้ ChatbotFlowManager ตัวเดียวกับ REST
+
+    Client → Server:
+    - {"type": "message", "message": "..."} (หรือ plain text)
+    - {"type": "ping"} / {"type": "pong"}
+
+    Server → Client:
+    - {"type": "session", ...}        ตอนเชื่อมต่อ (collected_data เต็มครั้งเดียว)
+    - {"type": "step", ...}           ทุกครั้งที่ handler ทำงานเสร็จ + collected_data_delta
+                                      (auto_execute chain: checkpoint 2 → mockup → quote ได้ทีละ step)
+    - {"type": "turn_complete", ...}  จบ turn พร้อม quick_replies
+    - {"type": "error", ...} / {"type": "ping"} / {"type": "pong"}
+
+    Backpressure:
+    - ประมวลผลทีละข้อความ, queue รอได้ WS_INBOUND_QUEUE_SIZE → เกินตอบ error "busy"
+    - outbound queue มีขนาดจำกัด → client อ่านช้า flow จะหยุดรอ แทนที่จะกอง frame ใน memory
+    """
+    await websocket.accept()
+
+    state = session_storage.get_session(session_id)
+    if not state:
+        state = ConversationState(session_id=session_id)
+        session_storage.update_session(session_id, state)
+
+    inbound: asyncio.Queue = asyncio.Queue(maxsize=WS_INBOUND_QUEUE_SIZE)
+    outbound: asyncio.Queue = asyncio.Queue(maxsize=WS_OUTBOUND_QUEUE_SIZE)
+    missed_heartbeats = 0
+
+    async def sender():
+        while True:
+            frame = await outbound.get()
+            await websocket.send_json(frame)
+
+    async def receiver():
+        nonlocal missed_heartbeats
+        while True:
+            try:
+                raw = await asyncio.wait_for(
+                    websocket.receive_text(), timeout=WS_HEARTBEAT_INTERVAL
+                )
+            except asyncio.TimeoutError:
+                missed_heartbeats += 1
+                if missed_heartbeats > WS_MAX_MISSED_HEARTBEATS:
+                    await websocket.close(code=1001)
+                    return
+                await outbound.put({"type": "ping"})
+                continue
+
+            missed_heartbeats = 0
+            frame = _parse_client_frame(raw)
+            frame_type = frame.get("type", "message")
+
+            if frame_type == "ping":
+                await outbound.put({"type": "pong"})
+            elif frame_type == "pong":
+                continue
+            elif frame_type == "message":
+                message = str(frame.get("message", "")).strip()
+                if not message:
+                    await outbound.put({"type": "error", "code": "empty_message",
+                                        "detail": "message is required"})
+                    continue
+                if len(message) > MAX_MESSAGE_LENGTH:
+                    await outbound.put({"type": "error", "code": "message_too_long",
+                                        "detail": f"message must be at most {MAX_MESSAGE_LENGTH} characters"})
+                    continue
+                try:
+                    inbound.put_nowait(message)
+                except asyncio.QueueFull:
+                    await outbound.put({"type": "error", "code": "busy",
+                                        "detail": "Too many pending messages"})
+            else:
+                await outbound.put({"type": "error", "code": "unknown_type",
+                                    "detail": f"Unknown frame type: {frame_type}"})
+
+    async def worker():
+        nonlocal state
+        while True:
+            message = await inbound.get()
+            snapshot = snapshot_collected_data(state.collected_data)
+
+            async def push_step(response: str, step_state: ConversationState):
+                nonlocal snapshot
+                # diff กับ copy ของ step นี้ — frame ถูก serialize ทีหลังโดย sender
+                # ถ้าอ้าง object จริง step ถัดไปใน auto_execute chain อาจแก้ค่าไปก่อน
+                current = snapshot_collected_data(step_state.collected_data)
+                delta = diff_collected_data(snapshot, current)
+                snapshot = current
+                await outbound.put({
+                    "type": "step",
+                    "response": response,
+                    "current_step": int(step_state.current_step),
+                    "collected_data_delta": delta,
+                })
+
+            try:
+                response_text, state = await chatbot_manager.process_message(
+                    user_message=message,
+                    state=state,
+                    on_step=push_step,
+                )
+                session_storage.update_session(session_id, state)
+                await outbound.put({
+                    "type": "turn_complete",
+                    "response": response_text,
+                    **_build_turn_payload(state),
+                })
+            except Exception as e:
+                await outbound.put({"type": "error", "code": "processing_error",
+                                    "detail": f"Error processing message: {str(e)}"})
+
+    await outbound.put({
+        "type": "session",
+        "collected_data": state.collected_data,
+        **_build_turn_payload(state),
+    })
+
+    tasks = [
+        asyncio.create_task(sender()),
+        asyncio.create_task(receiver()),
+        asyncio.create_task(worker()),
+    ]
+    try:
+        # task ใดจบ (disconnect / heartbeat timeout / error) → ปิดทั้งหมด
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            exc = task.exception()
+            if exc and not isinstance(exc, WebSocketDisconnect):
+                print(f"❌ WebSocket error ({session_id}): {exc}")
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
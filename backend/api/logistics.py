@@ -0,0 +1,99 @@
+"""
+Logistics API Endpoints
+ประเมินการขนส่ง: จำนวนมัด, รูปแบบการวางบนพาเลท, จำนวนพาเลท
+"""
+
+from fastapi import APIRouter, HTTPException, status
+from pydantic import BaseModel, Field
+from typing import Any, Dict, Literal, Optional
+
+from api.pricing import DimensionsModel
+from services.load_planner import plan_load
+
+
+# ===================================
+# Request/Response Models
+# ===================================
+
+class LoadPlanRequest(BaseModel):
+    """Request สำหรับวางแผนขนส่ง"""
+    dimensions: DimensionsModel
+    box_type: Literal["rsc", "die_cut"] = Field("rsc", description="ประเภทกล่อง")
+    quantity: int = Field(..., gt=0, description="จำนวนกล่อง")
+    weight_kg: float = Field(0.0, ge=0, description="น้ำหนักสินค้าต่อกล่อง (kg) — 0 = ไม่ทราบ")
+    flute_type: str = Field("C", description="ลอนกระดาษ (A/B/C/E/BC)")
+    pallet: str = Field("standard", description="ชนิดพาเลท (standard / euro)")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "dimensions": {"width": 20, "length": 30, "height": 20},
+                "box_type": "rsc",
+                "quantity": 1000,
+                "weight_kg": 2,
+                "flute_type": "C",
+                "pallet": "standard"
+            }
+        }
+
+
+class StackModel(BaseModel):
+    """แรงกดบนกล่องชั้นล่างสุดเทียบกับที่รับได้ (McKee)"""
+    bottom_load_kg: float
+    max_load_kg: float
+    bct_kgf: float
+    safety_factor: Optional[float] = Field(None, description="None = ชั้นเดียว / ไม่ทราบน้ำหนัก")
+    status: str
+
+
+class LoadPlanResponse(BaseModel):
+    """ผลการวางแผนขนส่ง"""
+    pallet: Dict[str, Any]
+    bundles: Dict[str, Any]
+    layer: Dict[str, Any]
+    layers_per_pallet: int
+    boxes_per_pallet: int
+    limited_by: str = Field(..., description="height / strength / pallet_load")
+    pallet_count: int
+    last_pallet_boxes: int
+    stack_height_cm: float
+    pallet_weight_kg: float
+    stack: StackModel
+
+
+# ===================================
+# Router
+# ===================================
+
+router = APIRouter(
+    prefix="/logistics",
+    tags=["Logistics"],
+    responses={
+        400: {"description": "Bad request"}
+    }
+)
+
+
+@router.post("/plan", response_model=LoadPlanResponse, status_code=status.HTTP_200_OK)
+async def plan_shipping(request: LoadPlanRequest):
+    """
+    วางแผนขนส่ง
+
+    - **bundles**: กล่องพับแบนจากโรงงาน (จำนวนมัด, ขนาดพับแบน)
+    - **layer**: รูปแบบการวาง 1 ชั้นบนพาเลท (หมุนกล่องได้)
+    - **layers_per_pallet / boxes_per_pallet**: จำกัดด้วยความสูง, แรงกดที่กล่องชั้นล่างรับได้ หรือน้ำหนักพาเลท
+    - **stack**: แรงกดบนกล่องชั้นล่างสุดเทียบกับ BCT
+    """
+    try:
+        return plan_load(
+            request.box_type,
+            request.dimensions.width,
+            request.dimensions.length,
+            request.dimensions.height,
+            request.quantity,
+            weight_kg=request.weight_kg,
+            flute_type=request.flute_type,
+            pallet=request.pallet,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -12,8 +12,8 @@ from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from typing import Optional
 
-from middleware.auth import get_current_user, require_admin, AuthUser
-from services.supabase_client import get_supabase
+from middleware.auth import get_current_user, require_admin, require_repositories, AuthUser
+from services.repositories import Repositories
 
 router = APIRouter(prefix="/orders", tags=["orders"])
 
@@ -31,13 +31,13 @@ class UpdateStatusRequest(BaseModel):
 
 
 @router.post("")
-async def create_order(req: CreateOrderRequest, user: AuthUser = Depends(get_current_user)):
+async def create_order(
+    req: CreateOrderRequest,
+    user: AuthUser = Depends(get_current_user),
+    repos: Repositories = Depends(require_repositories),
+):
     """Create a new order"""
-    supabase = get_supabase()
-    if not supabase:
-        raise HTTPException(status_code=503, detail="Supabase not configured")
-
-    result = supabase.table("orders").insert({
+    order = await repos.orders.create({
         "user_id": user.id,
         "session_id": req.session_id,
         "status": "pending",
@@ -45,47 +45,40 @@ async def create_order(req: CreateOrderRequest, user: AuthUser = Depends(get_cur
         "pricing": req.pricing,
         "grand_total": req.grand_total,
         "deposit_amount": req.deposit_amount or round(req.grand_total * 0.5, 2),
-    }).execute()
+    })
 
-    if not result.data:
+    if not order:
         raise HTTPException(status_code=500, detail="Failed to create order")
 
-    return result.data[0]
+    return order
 
 
 @router.get("")
-async def list_orders(user: AuthUser = Depends(get_current_user)):
+async def list_orders(
+    user: AuthUser = Depends(get_current_user),
+    repos: Repositories = Depends(require_repositories),
+):
     """List orders — user sees own, admin sees all"""
-    supabase = get_supabase()
-    if not supabase:
-        raise HTTPException(status_code=503, detail="Supabase not configured")
-
-    query = supabase.table("orders").select("*, profiles(full_name, phone, company)")
-
-    if user.role != "admin":
-        query = query.eq("user_id", user.id)
-
-    result = query.order("created_at", desc=True).execute()
-    return result.data or []
+    return await repos.orders.list(None if user.role == "admin" else user.id)
 
 
 @router.get("/{order_id}")
-async def get_order(order_id: str, user: AuthUser = Depends(get_current_user)):
+async def get_order(
+    order_id: str,
+    user: AuthUser = Depends(get_current_user),
+    repos: Repositories = Depends(require_repositories),
+):
     """Get single order detail"""
-    supabase = get_supabase()
-    if not supabase:
-        raise HTTPException(status_code=503, detail="Supabase not configured")
+    order = await repos.orders.get(order_id)
 
-    result = supabase.table("orders").select("*").eq("id", order_id).single().execute()
-
-    if not result.data:
+    if not order:
         raise HTTPException(status_code=404, detail="Order not found")
 
     # Check access
-    if user.role != "admin" and result.data.get("user_id") != user.id:
+    if user.role != "admin" and order.get("user_id") != user.id:
         raise HTTPException(status_code=403, detail="Access denied")
 
-    return result.data
+    return order
 
 
 @router.patch("/{order_id}/status")
@@ -93,21 +86,16 @@ async def update_order_status(
     order_id: str,
     req: UpdateStatusRequest,
     user: AuthUser = Depends(require_admin),
+    repos: Repositories = Depends(require_repositories),
 ):
     """Update order status (admin only)"""
     valid = ["pending", "deposit_paid", "production", "qc", "shipped", "completed", "cancelled"]
     if req.status not in valid:
         raise HTTPException(status_code=400, detail=f"Invalid status. Must be one of: {valid}")
 
-    supabase = get_supabase()
-    if not supabase:
-        raise HTTPException(status_code=503, detail="Supabase not configured")
-
-    result = supabase.table("orders").update({
-        "status": req.status,
-    }).eq("id", order_id).execute()
+    order = await repos.orders.update(order_id, {"status": req.status})
 
-    if not result.data:
+    if not order:
         raise HTTPException(status_code=404, detail="Order not found")
 
-    return result.data[0]
+    return order
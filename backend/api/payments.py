@@ -11,8 +11,8 @@ from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from typing import Optional
 
-from middleware.auth import get_current_user, require_admin, AuthUser
-from services.supabase_client import get_supabase
+from middleware.auth import get_current_user, require_admin, require_repositories, AuthUser
+from services.repositories import Repositories
 
 router = APIRouter(prefix="/payments", tags=["payments"])
 
@@ -25,70 +25,67 @@ class CreatePaymentRequest(BaseModel):
 
 
 @router.post("")
-async def create_payment(req: CreatePaymentRequest, user: AuthUser = Depends(get_current_user)):
+async def create_payment(
+    req: CreatePaymentRequest,
+    user: AuthUser = Depends(get_current_user),
+    repos: Repositories = Depends(require_repositories),
+):
     """Record a new payment"""
-    supabase = get_supabase()
-    if not supabase:
-        raise HTTPException(status_code=503, detail="Supabase not configured")
-
     # Verify order belongs to user
-    order = supabase.table("orders").select("user_id").eq("id", req.order_id).single().execute()
-    if not order.data:
+    order = await repos.orders.get(req.order_id)
+    if not order:
         raise HTTPException(status_code=404, detail="Order not found")
-    if order.data.get("user_id") != user.id:
+    if order.get("user_id") != user.id:
         raise HTTPException(status_code=403, detail="Access denied")
 
-    result = supabase.table("payments").insert({
+    payment = await repos.payments.create({
         "order_id": req.order_id,
         "amount": req.amount,
         "type": req.type,
         "slip_url": req.slip_url,
         "status": "pending",
-    }).execute()
+    })
 
-    if not result.data:
+    if not payment:
         raise HTTPException(status_code=500, detail="Failed to create payment")
 
-    return result.data[0]
+    return payment
 
 
 @router.patch("/{payment_id}/approve")
-async def approve_payment(payment_id: str, user: AuthUser = Depends(require_admin)):
+async def approve_payment(
+    payment_id: str,
+    user: AuthUser = Depends(require_admin),
+    repos: Repositories = Depends(require_repositories),
+):
     """Approve a payment slip (admin only)"""
-    supabase = get_supabase()
-    if not supabase:
-        raise HTTPException(status_code=503, detail="Supabase not configured")
-
-    result = supabase.table("payments").update({
+    payment = await repos.payments.update(payment_id, {
         "status": "approved",
         "reviewed_by": user.id,
-    }).eq("id", payment_id).execute()
+    })
 
-    if not result.data:
+    if not payment:
         raise HTTPException(status_code=404, detail="Payment not found")
 
     # Auto-update order status to deposit_paid
-    payment = result.data[0]
-    supabase.table("orders").update({
-        "status": "deposit_paid",
-    }).eq("id", payment["order_id"]).execute()
+    await repos.orders.update(payment["order_id"], {"status": "deposit_paid"})
 
-    return result.data[0]
+    return payment
 
 
 @router.patch("/{payment_id}/reject")
-async def reject_payment(payment_id: str, user: AuthUser = Depends(require_admin)):
+async def reject_payment(
+    payment_id: str,
+    user: AuthUser = Depends(require_admin),
+    repos: Repositories = Depends(require_repositories),
+):
     """Reject a payment slip (admin only)"""
-    supabase = get_supabase()
-    if not supabase:
-        raise HTTPException(status_code=503, detail="Supabase not configured")
-
-    result = supabase.table("payments").update({
+    payment = await repos.payments.update(payment_id, {
         "status": "rejected",
         "reviewed_by": user.id,
-    }).eq("id", payment_id).execute()
+    })
 
-    if not result.data:
+    if not payment:
         raise HTTPException(status_code=404, detail="Payment not found")
 
-    return result.data[0]
+    return payment
@@ -3,11 +3,16 @@ Pricing API Endpoints
 คำนวณราคากล่อง
 """
 
+import json
 from fastapi import APIRouter, HTTPException, status
-from pydantic import BaseModel, Field, validator
-from typing import Optional, Dict, Any, List
+from fastapi.responses import Response
+from pydantic import BaseModel, Field, ValidationError, validator
+from typing import Optional, Dict, Any, List, Literal
 
-from services.pricing_calculator import get_price_estimate
+from services.batch_pricing import price_batch
+from services.price_grid import GRID_AXES, price_grid
+from services.pricing_calculator import get_price_estimate, get_pricing_cache_stats
+from services.pricing_catalog import get_pricing_catalog
 
 
 # ===================================
@@ -67,6 +72,9 @@ class PricingRequest(BaseModel):
     inner: Optional[str] = Field(None, description="Inner (Optional)")
     coatings: Optional[List[CoatingModel]] = Field(None, description="การเคลือบ (Optional)")
     stampings: Optional[List[StampingModel]] = Field(None, description="การป๊ัม (Optional)")
+    material_mode: Literal["area", "sheets"] = Field(
+        "area", description="คิดวัสดุจาก พื้นที่ผิว (area) หรือ จำนวนแผ่นตั้งต้นที่ใช้จริง (sheets)"
+    )
     
     @validator('box_type')
     def validate_box_type(cls, v):
@@ -105,6 +113,7 @@ class PricingResponse(BaseModel):
     grand_total: float = Field(..., description="ราคารวมสุทธิ (THB)")
     price_per_box: float = Field(..., description="ราคาต่อกล่อง (THB)")
     breakdown: Dict[str, Any] = Field(..., description="รายละเอียดการคำนวณ")
+    catalog_version: Optional[str] = Field(None, description="version ของ pricing catalog ที่ใช้คำนวณ")
     
     class Config:
         json_schema_extra = {
@@ -117,11 +126,161 @@ class PricingResponse(BaseModel):
                 "vat": 1400.00,
                 "grand_total": 21400.00,
                 "price_per_box": 21.40,
-                "breakdown": {}
+                "breakdown": {},
+                "catalog_version": "builtin"
             }
         }
 
 
+class BatchPricingRequest(BaseModel):
+    """Request model สำหรับคำนวณราคาหลายรายการ (แต่ละรายการ format เดียวกับ PricingRequest)"""
+    items: List[Dict[str, Any]] = Field(..., min_length=1, max_length=5000, description="รายการ PricingRequest")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "items": [
+                    {"dimensions": {"width": 20, "length": 15, "height": 10},
+                     "box_type": "rsc", "material": "corrugated_2layer", "quantity": 1000},
+                    {"dimensions": {"width": 12, "length": 12, "height": 6},
+                     "box_type": "die_cut", "material": "art_300gsm", "quantity": 2000,
+                     "coatings": [{"type": "uv_gloss", "category": "gloss"}]}
+                ]
+            }
+        }
+
+
+class BatchPricingItem(BaseModel):
+    """ผลของแต่ละรายการใน batch (result หรือ error อย่างใดอย่างหนึ่ง)"""
+    index: int = Field(..., description="ลำดับใน items ที่ส่งมา")
+    result: Optional[PricingResponse] = None
+    error: Optional[str] = None
+
+
+class BatchPricingResponse(BaseModel):
+    """Response model สำหรับ batch pricing"""
+    results: List[BatchPricingItem]
+    total: int
+    succeeded: int
+    failed: int
+
+
+class PriceGridAxes(BaseModel):
+    """แกนที่ต้องการ sweep (ไม่ระบุ = ใช้ค่าจาก base)"""
+    quantities: Optional[List[int]] = Field(None, min_length=1, max_length=500)
+    widths: Optional[List[float]] = Field(None, min_length=1, max_length=500)
+    lengths: Optional[List[float]] = Field(None, min_length=1, max_length=500)
+    heights: Optional[List[float]] = Field(None, min_length=1, max_length=500)
+    materials: Optional[List[str]] = Field(None, min_length=1, max_length=20)
+
+    @validator('quantities')
+    def validate_quantities(cls, v):
+        if v is not None and min(v) < 500:
+            raise ValueError('quantities must be at least 500')
+        return v
+
+    @validator('widths', 'lengths', 'heights')
+    def validate_dimensions(cls, v):
+        if v is not None and min(v) <= 0:
+            raise ValueError('dimensions must be greater than 0')
+        return v
+
+
+class PriceGridRequest(BaseModel):
+    """Request model สำหรับตารางราคา"""
+    base: PricingRequest = Field(..., description="spec หลัก")
+    axes: PriceGridAxes = Field(default_factory=PriceGridAxes)
+    metrics: List[Literal["grand_total", "price_per_box", "subtotal"]] = Field(
+        default=["grand_total", "price_per_box"], min_length=1
+    )
+    format: Literal["json", "binary"] = Field(
+        "json", description="json = columnar JSON, binary = float64 little-endian (ดู X-Grid-* headers)"
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "base": {
+                    "dimensions": {"width": 20, "length": 15, "height": 10},
+                    "box_type": "rsc",
+                    "material": "corrugated_2layer",
+                    "quantity": 1000
+                },
+                "axes": {"quantities": [500, 1000, 2000, 5000, 10000], "widths": [15, 20, 25]},
+                "metrics": ["grand_total", "price_per_box"]
+            }
+        }
+
+
+# ===================================
+# Response Mapper
+# ===================================
+
+def build_pricing_response(result: Dict[str, Any], quantity: int) -> PricingResponse:
+    """
+    Map ผลจาก get_price_estimate (nested dict) → flat PricingResponse
+    
+    result["box_base"] เป็น dict: {"price_per_box": X, "total_price": Y, ...}
+    result["inner"] เป็น dict: {"price_per_box": X, "total_price": Y}
+    result["coatings"] เป็น list of dict
+    result["stampings"] เป็น list of dict
+    """
+    box_base_total = result["box_base"]["total_price"]
+    
+    inner_total = result["inner"]["total_price"] if result.get("inner") else 0
+    
+    coatings_total = sum(c["total_price"] for c in result.get("coatings", []))
+    
+    stampings_total = sum(s["total"] for s in result.get("stampings", []))
+    
+    price_per_box = result["grand_total"] / quantity if quantity > 0 else 0
+    
+    return PricingResponse(
+        box_base=round(box_base_total, 2),
+        inner=round(inner_total, 2) if inner_total > 0 else None,
+        coatings=round(coatings_total, 2) if coatings_total > 0 else None,
+        stampings=round(stampings_total, 2) if stampings_total > 0 else None,
+        subtotal=result["subtotal"],
+        vat=result["vat"],
+        grand_total=result["grand_total"],
+        price_per_box=round(price_per_box, 2),
+        breakdown=result,
+        catalog_version=result.get("catalog_version")
+    )
+
+
+def to_pricing_data(request: PricingRequest) -> Dict[str, Any]:
+    """แปลง PricingRequest → dict สำหรับ pricing_calculator (ตัด optional ที่ว่างออก)"""
+    pricing_data = {
+        "dimensions": request.dimensions.dict(),
+        "box_type": request.box_type,
+        "material": request.material,
+        "quantity": request.quantity
+    }
+    
+    if request.inner:
+        pricing_data["inner"] = request.inner
+    
+    if request.coatings:
+        pricing_data["coatings"] = [c.dict() for c in request.coatings]
+    
+    if request.stampings:
+        pricing_data["stampings"] = [s.dict() for s in request.stampings]
+    
+    if request.material_mode != "area":
+        pricing_data["material_mode"] = request.material_mode
+    
+    return pricing_data
+
+
+def _format_validation_error(error: ValidationError) -> str:
+    """ValidationError → ข้อความบรรทัดเดียว เช่น "quantity: Value error, quantity must be at least 500" """
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}" if e["loc"] else e["msg"]
+        for e in error.errors()
+    )
+
+
 # ===================================
 # Router
 # ===================================
@@ -152,61 +311,20 @@ async def calculate_pricing(request: PricingRequest):
     - **inner**: Inner (Optional)
     - **coatings**: การเคลือบ (Optional)
     - **stampings**: การป๊ัม (Optional)
+    - **material_mode**: "area" (พื้นที่ผิว × production factor) หรือ "sheets" (จำนวนแผ่นตั้งต้นที่ใช้จริง
+      — breakdown.box_base.nesting มีจำนวนใบต่อแผ่น, % เศษ, จำนวนแผ่น)
     
     Returns:
     - ราคารวมและรายละเอียดการคำนวณ
     """
     try:
         # แปลง request เป็น dict สำหรับ pricing_calculator
-        pricing_data = {
-            "dimensions": request.dimensions.dict(),
-            "box_type": request.box_type,
-            "material": request.material,
-            "quantity": request.quantity
-        }
-        
-        # เพิ่ม optional fields
-        if request.inner:
-            pricing_data["inner"] = request.inner
-        
-        if request.coatings:
-            pricing_data["coatings"] = [c.dict() for c in request.coatings]
-        
-        if request.stampings:
-            pricing_data["stampings"] = [s.dict() for s in request.stampings]
+        pricing_data = to_pricing_data(request)
         
         # คำนวณราคา
         result = get_price_estimate(pricing_data)
         
-        # Map nested dict → flat PricingResponse
-        # result["box_base"] เป็น dict: {"price_per_box": X, "total_price": Y, ...}
-        # result["inner"] เป็น dict: {"price_per_box": X, "total_price": Y}
-        # result["coatings"] เป็น list of dict
-        # result["stampings"] เป็น list of dict
-        
-        box_base_total = result["box_base"]["total_price"]
-        
-        inner_total = result["inner"]["total_price"] if result.get("inner") else 0
-        
-        coatings_total = sum(c["total_price"] for c in result.get("coatings", []))
-        
-        stampings_total = sum(s["total"] for s in result.get("stampings", []))
-        
-        quantity = request.quantity
-        price_per_box = result["grand_total"] / quantity if quantity > 0 else 0
-        
-        # Return response
-        return PricingResponse(
-            box_base=round(box_base_total, 2),
-            inner=round(inner_total, 2) if inner_total > 0 else None,
-            coatings=round(coatings_total, 2) if coatings_total > 0 else None,
-            stampings=round(stampings_total, 2) if stampings_total > 0 else None,
-            subtotal=result["subtotal"],
-            vat=result["vat"],
-            grand_total=result["grand_total"],
-            price_per_box=round(price_per_box, 2),
-            breakdown=result
-        )
+        return build_pricing_response(result, request.quantity)
         
     except ValueError as e:
         raise HTTPException(
@@ -220,6 +338,133 @@ async def calculate_pricing(request: PricingRequest):
         )
 
 
+@router.post("/calculate-batch", response_model=BatchPricingResponse, status_code=status.HTTP_200_OK)
+async def calculate_pricing_batch(request: BatchPricingRequest):
+    """
+    คำนวณราคาหลายรายการในครั้งเดียว (สูงสุด 5000 รายการ)
+    
+    - แต่ละรายการ format เดียวกับ /calculate
+    - จัดกลุ่มตาม (box_type, material, options) แล้วคำนวณเป็น array (services/batch_pricing.py)
+    - รายการที่ผิด → error เฉพาะรายการนั้น ไม่ทำให้ทั้ง batch ล้ม
+    
+    Returns:
+    - results ตามลำดับ items (result หรือ error)
+    """
+    results: List[Optional[BatchPricingItem]] = [None] * len(request.items)
+    valid_indices: List[int] = []
+    valid_data: List[Dict[str, Any]] = []
+    
+    # 1. ตรวจทีละรายการด้วย PricingRequest (validation เดียวกับ /calculate)
+    for index, item in enumerate(request.items):
+        try:
+            pricing_request = PricingRequest(**item)
+        except ValidationError as e:
+            results[index] = BatchPricingItem(index=index, error=_format_validation_error(e))
+            continue
+        valid_indices.append(index)
+        valid_data.append(to_pricing_data(pricing_request))
+    
+    # 2. คำนวณราคาแบบ batch
+    try:
+        priced = price_batch(valid_data)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error calculating batch pricing: {str(e)}"
+        )
+    
+    for index, data, result in zip(valid_indices, valid_data, priced):
+        if "error" in result:
+            results[index] = BatchPricingItem(index=index, error=result["error"])
+        else:
+            results[index] = BatchPricingItem(
+                index=index,
+                result=build_pricing_response(result, data["quantity"])
+            )
+    
+    failed = sum(1 for item in results if item.error is not None)
+    return BatchPricingResponse(
+        results=results,
+        total=len(results),
+        succeeded=len(results) - failed,
+        failed=failed
+    )
+
+
+@router.post("/grid", status_code=status.HTTP_200_OK)
+async def calculate_price_grid(request: PriceGridRequest):
+    """
+    ตารางราคา (quantity × dimensions × material) จาก spec หลักชุดเดียว
+    
+    - ลำดับมิติ: material, width, length, height, quantity (row-major)
+    - **format=json**: {"axes", "order", "shape", "values": {metric: [ค่าเรียงแบบ row-major]}}
+    - **format=binary**: float64 little-endian ต่อกันตามลำดับ metrics
+      (headers: X-Grid-Shape, X-Grid-Order, X-Grid-Metrics, X-Grid-Axes, X-Catalog-Version)
+    
+    ทุกช่องเท่ากับ /calculate ของ spec นั้น (services/price_grid.py)
+    """
+    try:
+        grid = price_grid(
+            to_pricing_data(request.base),
+            request.axes.dict(exclude_none=True),
+            request.metrics
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    if request.format == "binary":
+        payload = b"".join(
+            grid["values"][metric].astype("<f8").tobytes() for metric in request.metrics
+        )
+        return Response(
+            content=payload,
+            media_type="application/octet-stream",
+            headers={
+                "X-Grid-Shape": ",".join(str(n) for n in grid["shape"]),
+                "X-Grid-Order": ",".join(GRID_AXES),
+                "X-Grid-Metrics": ",".join(request.metrics),
+                "X-Grid-Axes": json.dumps(grid["axes"], ensure_ascii=True),
+                "X-Catalog-Version": grid["catalog_version"],
+            }
+        )
+    
+    return {
+        "axes": grid["axes"],
+        "order": list(GRID_AXES),
+        "shape": grid["shape"],
+        "values": {metric: grid["values"][metric].ravel().tolist() for metric in request.metrics},
+        "catalog_version": grid["catalog_version"],
+    }
+
+
+@router.get("/cache-stats")
+async def get_cache_stats():
+    """
+    สถิติ cache ผลราคา (get_price_estimate)
+    
+    Returns:
+    - size, maxsize, hits, misses, evictions, hit_rate + catalog_version ปัจจุบัน
+    """
+    return {
+        **get_pricing_cache_stats(),
+        "catalog_version": get_pricing_catalog().version
+    }
+
+
+@router.get("/catalog")
+async def get_catalog_info():
+    """
+    ดู version ของ pricing catalog ที่ใช้อยู่
+    
+    Returns:
+    - version, source (ไฟล์หรือ constants), fingerprint, loaded_at
+    """
+    return get_pricing_catalog().info()
+
+
 @router.get("/materials")
 async def get_available_materials():
     """
@@ -228,18 +473,7 @@ async def get_available_materials():
     Returns:
     - รายการวัสดุทั้งหมด
     """
-    materials = {
-        "rsc": [
-            {"id": "corrugated_2layer", "name": "กระดาษลูกฟูก 2 ชั้น"},
-            {"id": "kraft_200gsm", "name": "กระดาษคราฟท์ 200 GSM"}
-        ],
-        "die_cut": [
-            {"id": "corrugated_2layer", "name": "กระดาษลูกฟูก 2 ชั้น"},
-            {"id": "chipboard", "name": "กระดาษแข็ง (จั่วปัง)"},
-            {"id": "art_300gsm", "name": "กระดาษอาร์ต 300 GSM"},
-            {"id": "white_box_350gsm", "name": "กระดาษกล่องขาว 350 GSM"}
-        ]
-    }
+    materials = get_pricing_catalog().list_materials()
     
     return {
         "materials": materials,
@@ -255,18 +489,7 @@ async def get_available_coatings():
     Returns:
     - รายการการเคลือบทั้งหมด
     """
-    coatings = {
-        "gloss": [
-            {"type": "aq_gloss", "name": "Gloss AQ Coating"},
-            {"type": "uv_gloss", "name": "UV Gloss Coating"},
-            {"type": "opp_gloss", "name": "OPP Gloss Film"}
-        ],
-        "matte": [
-            {"type": "uv_matte", "name": "UV Matte"},
-            {"type": "pvc_matte", "name": "PVC Matte Laminate"},
-            {"type": "varnish_matte", "name": "Varnish Matte"}
-        ]
-    }
+    coatings = get_pricing_catalog().list_coatings()
     
     return {
         "coatings": coatings,
@@ -282,13 +505,7 @@ async def get_available_stampings():
     Returns:
     - รายการการป๊ัมทั้งหมด
     """
-    stampings = [
-        {"type": "emboss", "name": "ป๊ัมนูน"},
-        {"type": "deboss", "name": "ป๊ัมจม"},
-        {"type": "foil_regular", "name": "ป๊ัมฟอยล์ธรรมดา"},
-        {"type": "foil_detailed", "name": "ป๊ัมฟอยล์ละเอียด"},
-        {"type": "foil_emboss", "name": "ป๊ัมฟอยล์ + นูน"}
-    ]
+    stampings = get_pricing_catalog().list_stampings()
     
     return {
         "stampings": stampings,
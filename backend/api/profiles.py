@@ -0,0 +1,39 @@
+"""
+Profiles API — จัดการ role ของผู้ใช้
+
+Endpoints:
+- PATCH  /api/profiles/{id}/role — Change role (admin only)
+"""
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel
+
+from middleware.auth import invalidate_role, require_admin, require_repositories, AuthUser
+from services.repositories import Repositories
+
+router = APIRouter(prefix="/profiles", tags=["profiles"])
+
+
+class UpdateRoleRequest(BaseModel):
+    role: str
+
+
+@router.patch("/{user_id}/role")
+async def update_role(
+    user_id: str,
+    req: UpdateRoleRequest,
+    user: AuthUser = Depends(require_admin),
+    repos: Repositories = Depends(require_repositories),
+):
+    """Change a user's role (admin only) — มีผลทันที (ล้าง role cache)"""
+    valid = ["customer", "admin"]
+    if req.role not in valid:
+        raise HTTPException(status_code=400, detail=f"Invalid role. Must be one of: {valid}")
+
+    profile = await repos.profiles.update_role(user_id, req.role)
+    invalidate_role(user_id)
+
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    return profile
@@ -0,0 +1,228 @@
+"""
+Express Quote API
+ใบเสนอราคาแบบเร็ว — ส่ง requirement ครบชุดครั้งเดียว ได้ราคา + ผลวิเคราะห์ความแข็งแรงทันที
+
+ใช้สำหรับ:
+- ลูกค้า B2B ที่รู้ spec อยู่แล้ว (ไม่ต้องคุยผ่านแชท 14 ขั้นตอน)
+- DimensionsForm ฝั่ง frontend ส่งข้อมูลเข้ามาตรงๆ
+
+ไม่เรียก LLM เลย: RequirementValidator → analyze_box_strength → get_price_estimate
+"""
+
+import uuid
+from fastapi import APIRouter, HTTPException, status
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any, List, Literal
+
+from api.analyze import cached_box_strength, suggest_alternatives
+from api.pricing import DimensionsModel, PricingResponse, build_pricing_response
+from models.chat_state import ChatbotStep, session_storage
+from models.requirement import CompleteRequirement, CheckpointSummary
+from services.pricing_calculator import get_price_estimate
+from services.requirement_validator import get_validator
+
+
+# ===================================
+# Request/Response Models
+# ===================================
+
+class ExpressQuoteRequest(BaseModel):
+    """
+    Requirement ครบชุด — fields เดียวกับ collected_data
+    (ที่ CompleteRequirement.from_collected_data รองรับ)
+    """
+    product_type: Literal["general", "non_food", "food_grade", "cosmetic"] = "general"
+    box_type: Literal["rsc", "die_cut"] = Field(..., description="ประเภทกล่อง")
+    material: Optional[str] = Field(None, description="วัสดุ (ไม่ระบุ = เลือกให้ตาม box_type)")
+    dimensions: DimensionsModel = Field(..., description="ขนาดกล่อง (cm)")
+    quantity: int = Field(..., description="จำนวนกล่อง (ขั้นต่ำ 500)")
+    inner: Optional[List[Dict[str, Any]]] = Field(
+        None, description='Inner เช่น [{"type": "shredded_paper", "category": "cushion"}]'
+    )
+    weight_kg: float = Field(0.0, ge=0, description="น้ำหนักสินค้า (kg) — 0 = ไม่ได้ระบุ")
+    flute_type: str = Field("C", description="ลอนกระดาษ (A/B/C/E/BC)")
+
+    # Design (Optional)
+    mood_tone: Optional[str] = None
+    has_logo: Optional[bool] = None
+    logo_positions: Optional[List[str]] = None
+    special_effects: Optional[List[Dict[str, Any]]] = Field(
+        None, description='ลูกเล่นพิเศษ เช่น [{"type": "uv_gloss", "category": "gloss"}]'
+    )
+
+    create_session: bool = Field(False, description="สร้าง chat session ที่ checkpoint 2 ไว้คุยต่อ")
+    user_id: Optional[str] = None
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "product_type": "general",
+                "box_type": "rsc",
+                "dimensions": {"width": 20, "length": 15, "height": 10},
+                "quantity": 1000,
+                "weight_kg": 5,
+                "flute_type": "C",
+                "special_effects": [{"type": "uv_gloss", "category": "gloss"}],
+                "create_session": False
+            }
+        }
+
+    def to_collected_data(self) -> Dict[str, Any]:
+        """แปลงเป็น collected_data format (ตัด field ที่ไม่ได้ระบุออก)"""
+        data = self.dict(exclude={"create_session", "user_id"}, exclude_none=True)
+        data["flute_type"] = self.flute_type.upper()
+        return data
+
+
+class ExpressQuoteResponse(BaseModel):
+    """Response model สำหรับ express quote"""
+    quote: PricingResponse
+    strength: Dict[str, Any] = Field(..., description="ผลวิเคราะห์ความแข็งแรง (เหมือน /analyze)")
+    alternatives: Optional[Dict[str, Any]] = Field(None, description="ทางเลือกเมื่อผลเป็น DANGER")
+    material: str = Field(..., description="วัสดุที่ใช้คำนวณจริง")
+    session_id: Optional[str] = Field(None, description="Session ที่สร้างไว้ (ถ้า create_session)")
+    current_step: Optional[int] = None
+
+
+# ===================================
+# Router
+# ===================================
+
+router = APIRouter(
+    prefix="/quote",
+    tags=["Quote"],
+    responses={
+        400: {"description": "Bad request"},
+        500: {"description": "Internal server error"}
+    }
+)
+
+
+# ===================================
+# Helpers
+# ===================================
+
+def _flatten_validation_errors(errors: Dict[str, List[str]]) -> List[str]:
+    """error_dict จาก validator → list เดียว (ตัด group ว่างออก)"""
+    return [msg for group in ("structure", "design", "general") for msg in errors.get(group, []) if msg]
+
+
+def _create_prefilled_session(
+    collected_data: Dict[str, Any],
+    pricing: Dict[str, Any],
+    user_id: Optional[str]
+) -> str:
+    """
+    สร้าง chat session ที่กรอกข้อมูลครบแล้ว → อยู่ที่ Checkpoint 2 (รอยืนยัน)
+    ลูกค้าตอบ "ถูกต้อง" ได้เลย หรือขอแก้ไขผ่านแชทตามปกติ
+    """
+    session_id = str(uuid.uuid4())
+    state = session_storage.create_session(session_id, user_id=user_id)
+
+    state.collected_data.update(collected_data)
+    state.current_step = ChatbotStep.CHECKPOINT_2
+    state.is_structure_confirmed = True
+    state.is_waiting_for_confirmation = True
+    state.temp_data["pricing"] = pricing
+
+    dims = collected_data["dimensions"]
+    effects = [e.get("type", "") for e in collected_data.get("special_effects") or []]
+    summary = CheckpointSummary(
+        checkpoint_number=2,
+        dimensions=dims,
+        mood_tone=collected_data.get("mood_tone"),
+        has_logo=collected_data.get("has_logo", False),
+        logo_positions=collected_data.get("logo_positions"),
+        special_effects=effects or None,
+    ).format_for_display()
+    state.add_message(
+        "assistant",
+        f"{summary}\n\nข้อมูลถูกต้องไหมคะ? ตอบ 'ถูกต้อง' เพื่อไปต่อ หรือบอกส่วนที่ต้องการแก้ไขได้เลยค่ะ",
+        metadata={"source": "express_quote"}
+    )
+    state.bump_version()
+
+    session_storage.update_session(session_id, state)
+    return session_id
+
+
+# ===================================
+# Endpoints
+# ===================================
+
+@router.post("/express", response_model=ExpressQuoteResponse, status_code=status.HTTP_200_OK)
+async def express_quote(request: ExpressQuoteRequest):
+    """
+    ใบเสนอราคาแบบเร็ว (ไม่ผ่านแชท, ไม่เรียก LLM)
+
+    1. ตรวจ requirement ด้วย RequirementValidator
+    2. วิเคราะห์ความแข็งแรง (McKee)
+    3. คำนวณราคา (CompleteRequirement → get_price_estimate — pipeline เดียวกับขั้นที่ 12)
+    4. (Optional) สร้าง chat session ที่ checkpoint 2
+
+    Returns:
+    - ราคา + ผลวิเคราะห์ความแข็งแรง (+ session_id)
+    """
+    collected_data = request.to_collected_data()
+
+    is_valid, errors = get_validator().validate_complete_requirement(collected_data)
+    if not is_valid:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=_flatten_validation_errors(errors)
+        )
+
+    dims = collected_data["dimensions"]
+
+    try:
+        strength = cached_box_strength(
+            length_cm=dims["length"],
+            width_cm=dims["width"],
+            height_cm=dims["height"],
+            weight_kg=request.weight_kg,
+            flute_type=request.flute_type,
+        )
+        alternatives = None
+        if strength["status"] == "DANGER" and request.weight_kg > 0:
+            alternatives = suggest_alternatives(
+                weight_kg=request.weight_kg,
+                length_cm=dims["length"],
+                width_cm=dims["width"],
+                height_cm=dims["height"],
+                current_flute=request.flute_type,
+            )
+            collected_data["strength_warning"] = True
+
+        requirement = CompleteRequirement.from_collected_data(
+            session_id="express",
+            collected_data=collected_data
+        )
+        pricing_request = requirement.to_pricing_request()
+        pricing = get_price_estimate(pricing_request)
+
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error calculating express quote: {str(e)}"
+        )
+
+    session_id = None
+    current_step = None
+    if request.create_session:
+        collected_data.setdefault("material", pricing_request["material"])
+        session_id = _create_prefilled_session(collected_data, pricing, request.user_id)
+        current_step = int(ChatbotStep.CHECKPOINT_2)
+
+    return ExpressQuoteResponse(
+        quote=build_pricing_response(pricing, request.quantity),
+        strength=strength,
+        alternatives=alternatives,
+        material=pricing_request["material"],
+        session_id=session_id,
+        current_step=current_step,
+    )
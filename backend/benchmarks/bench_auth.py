@@ -0,0 +1,112 @@
+"""
+Micro-benchmark: Auth overhead ต่อ request
+วัดเวลาของ get_current_user (middleware/auth.py) ต่อ 1 request
+
+วิธีใช้:
+    cd backend && python benchmarks/bench_auth.py
+    cd backend && python benchmarks/bench_auth.py --rtt-ms 40 --requests 200
+
+แบบที่วัด:
+- remote   : ถาม Supabase Auth + profiles ทุก request (เดิม) — จำลอง network ด้วย asyncio.sleep(--rtt-ms)
+- local    : ตรวจ JWT ในเครื่อง (HS256) + role cache hit
+- memo     : dependency ซ้อน (เช่น require_admin) เรียกซ้ำใน request เดียว → คืนผลที่ตรวจแล้ว
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import Dict
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from jose import jwt  # noqa: E402
+from starlette.requests import Request  # noqa: E402
+
+import middleware.auth as auth  # noqa: E402
+from services.jwt_verifier import JWTVerifier, set_token_verifier  # noqa: E402
+from services.repositories import Repositories, set_repositories  # noqa: E402
+
+SECRET = "bench-secret"
+USER_ID = "user-1"
+
+
+class SlowAuth:
+    """Supabase Auth จำลอง: 1 round-trip ต่อครั้ง"""
+
+    def __init__(self, rtt: float):
+        self.rtt = rtt
+
+    async def get_user(self, access_token: str):
+        await asyncio.sleep(self.rtt)
+        return {"id": USER_ID, "email": "user-1@lumopack.test"}
+
+
+class SlowProfiles:
+    """profiles จำลอง: 1 round-trip ต่อครั้ง"""
+
+    def __init__(self, rtt: float):
+        self.rtt = rtt
+
+    async def get_role(self, user_id: str):
+        await asyncio.sleep(self.rtt)
+        return "admin"
+
+
+def _request() -> Request:
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": []})
+
+
+async def _run(requests: int, header: str, calls_per_request: int = 1, cold_role: bool = False) -> float:
+    """µs ต่อ request (ทุก request ใหม่ = Request ใหม่ → memo ไม่ข้าม request)"""
+    start = time.perf_counter()
+    for _ in range(requests):
+        if cold_role:
+            auth.invalidate_role()
+        request = _request()
+        for _ in range(calls_per_request):
+            await auth.get_current_user(request, header)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+async def bench(requests: int, remote_requests: int, rtt_ms: float) -> Dict[str, float]:
+    set_repositories(Repositories(None, None, SlowProfiles(rtt_ms / 1000), SlowAuth(rtt_ms / 1000)))
+    token = jwt.encode({"sub": USER_ID, "aud": "authenticated", "exp": int(time.time()) + 3600}, SECRET, "HS256")
+    header = f"Bearer {token}"
+
+    results: Dict[str, float] = {}
+    try:
+        # ไม่มี secret = ตรวจในเครื่องไม่ได้ → ถาม Supabase ทุกครั้ง (เหมือนก่อนมี verifier)
+        set_token_verifier(JWTVerifier())
+        results["remote"] = await _run(remote_requests, header, cold_role=True)
+
+        set_token_verifier(JWTVerifier(secret=SECRET))
+        await auth.get_current_user(_request(), header)  # เติม role cache
+        results["local"] = await _run(requests, header)
+        results["memo (×3 / request)"] = await _run(requests, header, calls_per_request=3)
+    finally:
+        auth.invalidate_role()
+        set_token_verifier(None)
+        set_repositories(None)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark auth overhead per request")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--rtt-ms", type=float, default=20.0, help="round-trip จำลองของ Supabase ต่อครั้ง")
+    args = parser.parse_args()
+
+    # remote ช้าตาม RTT → จำกัดจำนวน request (~2 วินาที)
+    remote_requests = max(1, min(args.requests, int(2000 / max(args.rtt_ms, 1))))
+    print(f"📏 {args.requests} requests (remote: {remote_requests}), RTT {args.rtt_ms:g} ms\n")
+    print(f"{'path':<22} {'µs/request':>12}")
+    print("-" * 36)
+    results = asyncio.run(bench(args.requests, remote_requests, args.rtt_ms))
+    for label, us in results.items():
+        print(f"{label:<22} {us:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Benchmark: Data Extractors บน corpus ขนาดใหญ่
+throughput + p99 ต่อ extractor และ guard กัน catastrophic backtracking
+
+วิธีใช้:
+    cd backend && python benchmarks/bench_corpus.py
+    cd backend && python benchmarks/bench_corpus.py --size 20000 --budget-ms 50
+    cd backend && python benchmarks/bench_corpus.py --compare /tmp/old_data_extractor.py
+
+ส่วนของรายงาน:
+1. corpus   — ข้อความสมจริง (generate_corpus): calls/s, p50, p99 ต่อ extractor
+2. pastes   — ข้อความยาวแบบวางทั้งก้อน: p99, max
+3. guard    — ADVERSARIAL ทุกตัว × ทุก extractor: เกิน --budget-ms หรือ raise → exit code 1
+
+หมายเหตุ: ล้าง _scan cache ก่อนทุกข้อความ (เหมือน bench_extractors.py)
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import services.data_extractor as current  # noqa: E402
+from bench_extractors import EXTRACTORS, _clear_cache, _load_module  # noqa: E402
+from corpus import ADVERSARIAL, generate_corpus, long_pastes  # noqa: E402
+
+
+def extractor_table(module) -> Dict[str, Callable[[str], object]]:
+    """ชื่อ → ฟังก์ชันที่รับข้อความเดียว (รวม extract_material และ extract_all)"""
+    table = {name: getattr(module, name) for name in EXTRACTORS if hasattr(module, name)}
+    table["extract_material"] = lambda message: module.extract_material(message, "die_cut")
+    if hasattr(module, "extract_all"):
+        table["extract_all"] = module.extract_all
+    return table
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def time_calls(module, func: Callable[[str], object], messages: List[str]) -> List[float]:
+    """เวลาต่อ call (µs) ของแต่ละข้อความ"""
+    timings: List[float] = []
+    for message in messages:
+        _clear_cache(module)
+        start = time.perf_counter()
+        func(message)
+        timings.append((time.perf_counter() - start) * 1e6)
+    return timings
+
+
+def check_adversarial(module, budget_ms: float) -> List[Tuple[str, str, float, str]]:
+    """
+    รัน ADVERSARIAL ทุกตัวกับทุก extractor
+    Returns: [(extractor, input, ms, error)] เฉพาะที่เกิน budget หรือ raise
+    """
+    failures = []
+    for name, func in extractor_table(module).items():
+        for label, message in ADVERSARIAL.items():
+            _clear_cache(module)
+            start = time.perf_counter()
+            error = ""
+            try:
+                func(message)
+            except Exception as e:  # noqa: BLE001 — รายงานทุก error
+                error = f"{type(e).__name__}: {e}"[:60]
+            ms = (time.perf_counter() - start) * 1000
+            if error or ms > budget_ms:
+                failures.append((name, label, ms, error))
+    return failures
+
+
+def report(label: str, module, corpus: List[str], pastes: List[str], budget_ms: float) -> bool:
+    print(f"\n=== {label} ===")
+    print(f"{'extractor':<28} {'calls/s':>10} {'p50 µs':>8} {'p99 µs':>8} "
+          f"{'paste p99':>10} {'paste max':>10}")
+    print("-" * 80)
+
+    for name, func in extractor_table(module).items():
+        timings = time_calls(module, func, corpus)
+        paste_timings = time_calls(module, func, pastes)
+        throughput = len(timings) / (sum(timings) / 1e6) if sum(timings) else float("inf")
+        print(f"{name:<28} {throughput:>10.0f} {percentile(timings, 50):>8.1f} "
+              f"{percentile(timings, 99):>8.1f} {percentile(paste_timings, 99):>10.1f} "
+              f"{max(paste_timings):>10.1f}")
+
+    failures = check_adversarial(module, budget_ms)
+    if failures:
+        print(f"\n❌ {len(failures)} adversarial case(s) over {budget_ms:.0f} ms or raised:")
+        for name, case, ms, error in failures:
+            print(f"   {name:<28} {case:<24} {ms:>9.1f} ms  {error}")
+        return False
+
+    print(f"\n✅ adversarial guard: {len(ADVERSARIAL)} inputs × "
+          f"{len(extractor_table(module))} extractors ภายใน {budget_ms:.0f} ms")
+    return True
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark data extractors on a generated corpus")
+    parser.add_argument("--size", type=int, default=5000, help="จำนวนข้อความใน corpus")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--budget-ms", type=float, default=50.0,
+                        help="เวลาสูงสุดต่อ call สำหรับ adversarial input")
+    parser.add_argument("--compare", help="path ของ data_extractor.py เวอร์ชันที่จะเทียบ")
+    args = parser.parse_args()
+
+    corpus = generate_corpus(args.size, args.seed)
+    pastes = long_pastes(seed=args.seed)
+    print(f"📏 corpus {len(corpus)} messages, {len(pastes)} pastes "
+          f"(~{sum(map(len, pastes)) // len(pastes)} chars), {len(ADVERSARIAL)} adversarial inputs")
+
+    modules = {"current": current}
+    if args.compare:
+        modules["compare"] = _load_module(args.compare)
+
+    ok = True
+    for label, module in modules.items():
+        ok = report(label, module, corpus, pastes, args.budget_ms) and ok
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Micro-benchmark: Data Extractors
+วัดเวลาต่อข้อความของ extractor ทุกตัวใน services/data_extractor.py
+
+วิธีใช้:
+    cd backend && python benchmarks/bench_extractors.py
+    cd backend && python benchmarks/bench_extractors.py --compare /tmp/old_data_extractor.py
+    cd backend && python benchmarks/bench_extractors.py --warm
+
+--compare: โหลด data_extractor เวอร์ชันอื่น (เช่น จาก git show) มาวัดเทียบกันในรอบเดียว
+    git show <commit>:backend/services/data_extractor.py > /tmp/old_data_extractor.py
+
+หมายเหตุ: _scan และ memo cache ของ extractor เก็บผลต่อข้อความ → ล้าง cache ก่อนทุกข้อความ
+(วัดเวลาของข้อความใหม่จริงๆ — --warm วัดแบบ cache hit)
+"""
+
+import argparse
+import importlib.util
+import os
+import sys
+import time
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import services.data_extractor as current  # noqa: E402
+
+
+# ===================================
+# Sample Messages (ข้อความลูกค้าจริงแบบย่อ)
+# ===================================
+SAMPLE_MESSAGES: List[str] = [
+    "1",
+    "2",
+    "ข้าม",
+    "ถูกต้อง",
+    "สินค้าทั่วไป",
+    "เครื่องสำอางค่ะ",
+    "RSC",
+    "กล่องไดคัท",
+    "กระดาษอาร์ต",
+    "1, 4",
+    "กระดาษฝอย กับ AQ coating กันชื้น",
+    "20x15x10 จำนวน 1000 ชิ้น",
+    "กว้าง 20 ยาว 15 สูง 10 ซม. จำนวน 2,000 กล่อง น้ำหนัก 2.5 kg ลอน BC",
+    "มินิมอล โทนขาวดำ เรียบหรู",
+    "มีโลโก้ค่ะ",
+    "ด้านบนและล่าง กับ ด้านกว้าง 2 ด้าน",
+    "เคลือบด้าน + ป๊ัมฟอยล์ทอง ลายละเอียด",
+    "ไม่เคยทำบล็อกค่ะ",
+    "ขอแก้ไขขนาดกล่องหน่อยค่ะ",
+    "กล่องไดคัท ใส่เครื่องสำอาง 20x15x10 จำนวน 2000 ลอน BC มีโลโก้ ฟอยล์ทอง",
+]
+
+# extractor ที่ handler เรียกจริงต่อ 1 ข้อความ (ไม่นับ extract_all)
+EXTRACTORS: List[str] = [
+    "extract_product_type", "extract_box_type", "extract_inner",
+    "extract_dimensions", "extract_quantity", "extract_weight", "extract_flute",
+    "extract_has_logo", "extract_logo_positions", "extract_special_effects",
+    "extract_has_existing_block", "is_confirmation", "is_rejection",
+    "is_skip_response", "is_add_request", "detect_edit_target",
+]
+
+
+def _load_module(path: str):
+    """โหลด data_extractor จาก path อื่น (สำหรับ --compare)"""
+    spec = importlib.util.spec_from_file_location("compare_data_extractor", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _all_extractors(module) -> Callable[[str], None]:
+    """ฟังก์ชันที่รัน extractor ทุกตัวกับข้อความเดียว (จำลองงานรวมต่อข้อความ)"""
+    funcs = [getattr(module, name) for name in EXTRACTORS if hasattr(module, name)]
+    extract_material = module.extract_material
+
+    def run(message: str) -> None:
+        for func in funcs:
+            func(message)
+        extract_material(message, "die_cut")
+
+    return run
+
+
+def _clear_cache(module) -> None:
+    clear = getattr(module, "clear_extraction_cache", None)
+    if clear is not None:
+        clear()
+        return
+    scan = getattr(module, "_scan", None)
+    if scan is not None and hasattr(scan, "cache_clear"):
+        scan.cache_clear()
+
+
+def bench(module, rounds: int, cold: bool = True) -> Dict[str, float]:
+    """วัดเวลาเฉลี่ยต่อข้อความ (µs) — cold=False ไม่ล้าง cache (ข้อความซ้ำ = cache hit)"""
+    run = _all_extractors(module)
+    extract_all = getattr(module, "extract_all", None)
+
+    results: Dict[str, float] = {}
+    for label, func in (("all extractors", run), ("extract_all", extract_all)):
+        if func is None:
+            continue
+        _clear_cache(module)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for message in SAMPLE_MESSAGES:
+                if cold:
+                    _clear_cache(module)
+                func(message)
+        elapsed = time.perf_counter() - start
+        results[label] = elapsed / (rounds * len(SAMPLE_MESSAGES)) * 1e6
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark data extractors")
+    parser.add_argument("--rounds", type=int, default=300)
+    parser.add_argument("--compare", help="path ของ data_extractor.py เวอร์ชันที่จะเทียบ")
+    parser.add_argument("--warm", action="store_true", help="ไม่ล้าง cache ระหว่างข้อความ (วัดแบบ cache hit)")
+    args = parser.parse_args()
+
+    modules = {"current": current}
+    if args.compare:
+        modules["compare"] = _load_module(args.compare)
+
+    print(f"📏 {len(SAMPLE_MESSAGES)} messages × {args.rounds} rounds\n")
+    print(f"{'version':<10} {'workload':<16} {'µs/message':>12}")
+    print("-" * 40)
+    for name, module in modules.items():
+        for label, us in bench(module, args.rounds, cold=not args.warm).items():
+            print(f"{name:<10} {label:<16} {us:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Extraction Corpus
+ชุดข้อความลูกค้า (ไทย/อังกฤษ) สำหรับ benchmark และ fuzz ของ services/data_extractor.py
+
+ประกอบด้วย:
+- generate_corpus(): ข้อความสมจริงที่สุ่มประกอบจากชิ้นส่วนคำตอบแต่ละ step (seed เดิม → ข้อความเดิม)
+- long_pastes(): ข้อความยาวแบบที่ลูกค้าวาง spec/อีเมลทั้งก้อนลงแชท
+- ADVERSARIAL: input ที่ตั้งใจให้ regex backtrack หนัก (ตัวเลขยาว, ตัวคั่นซ้ำ, keyword ไม่ครบชุด)
+
+ใช้กับ:
+- benchmarks/bench_corpus.py → throughput / p99 ต่อ extractor
+- tests/test_extractor_perf.py → guard กัน catastrophic backtracking
+"""
+
+import random
+from typing import Dict, List
+
+
+# ===================================
+# Fragments (ชิ้นส่วนคำตอบแต่ละ step)
+# ===================================
+PRODUCT_FRAGMENTS = [
+    "สินค้าทั่วไป", "ของใช้ทั่วไปค่ะ", "เครื่องสำอาง", "ครีมบำรุงผิว", "เซรั่ม", "ลิปสติก",
+    "อาหารแห้ง", "ขนมคุกกี้", "เบเกอรี่", "เสื้อผ้า", "อุปกรณ์อิเล็กทรอนิกส์",
+    "cosmetic", "food", "snack", "skincare", "general goods", "clothing",
+]
+BOX_FRAGMENTS = [
+    "RSC", "กล่องฝาชน", "กล่องลูกฟูกมาตรฐาน", "กล่องไดคัท", "die-cut", "die cut",
+    "กล่องพับ", "mailer box", "กล่องไปรษณีย์",
+]
+MATERIAL_FRAGMENTS = [
+    "กระดาษลูกฟูก", "กระดาษคราฟท์", "กระดาษอาร์ต", "art card", "กระดาษแข็ง",
+    "ไวท์บอร์ด", "kraft", "corrugated", "อาร์ตการ์ด 350 แกรม",
+]
+INNER_FRAGMENTS = [
+    "กระดาษฝอย", "บับเบิ้ล", "air cushion", "ถุงลม", "กระดาษรองกันกระแทก",
+    "เคลือบแว็กซ์กันชื้น", "AQ coating", "ไม่ต้องใส่ค่ะ", "ไม่ต้องมี inner",
+]
+DIMENSION_FRAGMENTS = [
+    "{w}x{l}x{h}", "{w} x {l} x {h} ซม.", "{w}*{l}*{h}", "{w}×{l}×{h} cm",
+    "กว้าง {w} ยาว {l} สูง {h}", "กว้าง {w} ซม. ยาว {l} ซม. สูง {h} ซม.",
+    "width {w} length {l} height {h}",
+]
+QUANTITY_FRAGMENTS = [
+    "จำนวน {q}", "{q} ชิ้น", "{q} กล่อง", "{q} ใบ", "quantity {q}", "qty {q} pcs", "{q}",
+]
+WEIGHT_FRAGMENTS = [
+    "น้ำหนัก {kg} kg", "{kg} กิโล", "{kg}kg", "{kg} กก.", "weight {kg}",
+]
+FLUTE_FRAGMENTS = ["ลอน C", "ลอน BC", "ลอนบี", "ลอนอี", "flute B", "BC flute", "ลอนซี"]
+MOOD_FRAGMENTS = [
+    "มินิมอล โทนขาวดำ", "สไตล์วินเทจ", "หรูหรา สีทอง", "น่ารัก สีพาสเทล",
+    "modern clean look", "ธรรมชาติ โทนน้ำตาล",
+]
+LOGO_FRAGMENTS = [
+    "มีโลโก้ค่ะ", "ไม่มีโลโก้", "มี logo", "no logo", "โลโก้ด้านบน", "ด้านบนและด้านข้าง",
+    "ด้านหน้า กับ ด้านหลัง", "1, 3",
+]
+EFFECT_FRAGMENTS = [
+    "เคลือบเงา", "เคลือบด้าน", "ปั๊มฟอยล์ทอง", "ปั๊มนูน", "spot UV", "ฟอยล์เงิน",
+    "ไม่เอาลูกเล่น", "emboss + foil",
+]
+BLOCK_FRAGMENTS = ["มีบล็อกเดิมแล้ว", "ยังไม่เคยทำบล็อก", "ไม่มีบล็อก", "มี block แล้วค่ะ"]
+CHATTER_FRAGMENTS = [
+    "สวัสดีค่ะ", "รบกวนสอบถามค่ะ", "ขอบคุณครับ", "ได้เลย", "ถูกต้อง", "ยืนยันค่ะ",
+    "ไม่ใช่ค่ะ", "ข้าม", "ขอแก้ไขขนาด", "อยากเปลี่ยนวัสดุ", "เพิ่มอีกอย่าง",
+    "ราคาประมาณเท่าไหร่คะ", "ส่งภายในเดือนนี้ได้ไหม", "ok", "yes", "1", "2", "3",
+]
+
+_STEP_FRAGMENTS = [
+    PRODUCT_FRAGMENTS, BOX_FRAGMENTS, MATERIAL_FRAGMENTS, INNER_FRAGMENTS,
+    DIMENSION_FRAGMENTS, QUANTITY_FRAGMENTS, WEIGHT_FRAGMENTS, FLUTE_FRAGMENTS,
+    MOOD_FRAGMENTS, LOGO_FRAGMENTS, EFFECT_FRAGMENTS, BLOCK_FRAGMENTS,
+]
+
+_JOINERS = [" ", " ", ", ", " และ ", " กับ ", " / ", "\n", " ครับ ", " ค่ะ "]
+
+
+def _fill(fragment: str, rng: random.Random) -> str:
+    """เติมตัวเลขใน fragment ({w}, {q}, {kg} ...) ด้วยค่าสุ่มที่สมจริง"""
+    return fragment.format(
+        w=rng.choice([10, 12.5, 15, 20, 25, 30, 45]),
+        l=rng.choice([8, 10, 15, 20, 30, 40]),
+        h=rng.choice([3, 5, 7.5, 10, 15, 25]),
+        q=rng.choice(["500", "1000", "2,000", "3000", "5,000", "10000"]),
+        kg=rng.choice([0.5, 1, 2.5, 5, 12]),
+    )
+
+
+# ===================================
+# Generators
+# ===================================
+def generate_corpus(size: int = 2000, seed: int = 42) -> List[str]:
+    """
+    ข้อความลูกค้าแบบสมจริง (deterministic ตาม seed)
+
+    สัดส่วนโดยประมาณ:
+    - 50% คำตอบสั้นๆ ของ step เดียว ("RSC", "1000 ชิ้น")
+    - 35% ข้อความรวมหลาย step ในข้อความเดียว (แบบที่ fast-forward รองรับ)
+    - 15% คำทั่วไป/ยืนยัน/ขอแก้ไข
+    """
+    rng = random.Random(seed)
+    messages: List[str] = []
+
+    for _ in range(size):
+        roll = rng.random()
+        if roll < 0.50:
+            fragments = rng.choice(_STEP_FRAGMENTS)
+            message = _fill(rng.choice(fragments), rng)
+        elif roll < 0.85:
+            steps = rng.sample(_STEP_FRAGMENTS, rng.randint(2, 6))
+            parts = [_fill(rng.choice(fragments), rng) for fragments in steps]
+            message = "".join(
+                part + (rng.choice(_JOINERS) if i < len(parts) - 1 else "")
+                for i, part in enumerate(parts)
+            )
+        else:
+            message = rng.choice(CHATTER_FRAGMENTS)
+
+        if rng.random() < 0.1:
+            message = message.upper()
+        messages.append(message)
+
+    return messages
+
+
+def long_pastes(count: int = 20, seed: int = 7, target_chars: int = 8000) -> List[str]:
+    """
+    ข้อความยาว (~target_chars ตัวอักษร) แบบวาง spec/อีเมล/ใบสั่งซื้อทั้งก้อน
+    มีหลายขนาด หลายจำนวน ปนข้อความอื่น → extractor ต้องวนทั้งข้อความ
+    """
+    rng = random.Random(seed)
+    pastes: List[str] = []
+
+    for _ in range(count):
+        lines: List[str] = []
+        length = 0
+        while length < target_chars:
+            fragments = rng.choice(_STEP_FRAGMENTS + [CHATTER_FRAGMENTS])
+            line = f"{rng.randint(1, 99)}. {_fill(rng.choice(fragments), rng)}"
+            if rng.random() < 0.2:
+                line += f" (อ้างอิง PO-{rng.randint(10**7, 10**8)})"
+            lines.append(line)
+            length += len(line) + 1
+        pastes.append("\n".join(lines))
+
+    return pastes
+
+
+# ===================================
+# Adversarial Inputs
+# ===================================
+ADVERSARIAL_SIZE = 20000
+
+ADVERSARIAL: Dict[str, str] = {
+    # ตัวเลขยาวไม่มีหน่วย → pattern "(\d+)\s*ชิ้น" เคยลองเริ่มใหม่ทุกหลัก (O(n²))
+    "long_digits": "1" * ADVERSARIAL_SIZE,
+    "long_digits_then_x": "1" * ADVERSARIAL_SIZE + "x",
+    "long_digits_then_unit": "1" * ADVERSARIAL_SIZE + " ชิ้น",
+    "comma_digits": "1," * (ADVERSARIAL_SIZE // 2),
+    "x_then_comma_digits": "x" + "1," * (ADVERSARIAL_SIZE // 2),
+    "dotted_digits": "1." * (ADVERSARIAL_SIZE // 2),
+    # ตัวคั่นขนาดซ้ำๆ ไม่ครบ 3 มิติ
+    "x_chain": "1x" * (ADVERSARIAL_SIZE // 2),
+    "x_space_chain": "12 x " * (ADVERSARIAL_SIZE // 5),
+    # keyword ขึ้นต้น pattern ซ้ำโดยไม่มีคำปิด
+    "thai_width_only": "กว้าง 1 " * (ADVERSARIAL_SIZE // 8),
+    "thai_width_length": "กว้าง 1 ยาว 2 " * (ADVERSARIAL_SIZE // 14),
+    "en_width_only": "width 1 " * (ADVERSARIAL_SIZE // 8),
+    "weight_prefix": "น้ำหนัก 1 " * (ADVERSARIAL_SIZE // 10),
+    "quantity_prefix": "quantity : " * (ADVERSARIAL_SIZE // 11),
+    "flute_prefix": "ลอน " * (ADVERSARIAL_SIZE // 4),
+    # keyword จริงซ้ำมาก (automaton + logo positions)
+    "keyword_flood": "กล่องไดคัท ฟอยล์ทอง ด้านบน " * (ADVERSARIAL_SIZE // 25),
+    "whitespace": " " * ADVERSARIAL_SIZE + "1000 ชิ้น",
+    "mixed_separators": ",\n\t " * (ADVERSARIAL_SIZE // 4),
+    "emoji_flood": "📦" * (ADVERSARIAL_SIZE // 2),
+}
@@ -7,13 +7,22 @@ from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
+import asyncio
+import os
 import time
 
-from api.chat import router as chat_router
+from api.chat import router as chat_router, ws_router as chat_ws_router
 from api.pricing import router as pricing_router
 from api.analyze import router as analyze_router
 from api.orders import router as orders_router
 from api.payments import router as payments_router
+from api.profiles import router as profiles_router
+from api.quote import router as quote_router
+from api.logistics import router as logistics_router
+from services.data_extractor import COMMON_SHORT_REPLIES, warm_extraction_cache
+from services.pricing_catalog import CATALOG_PATH_ENV, get_pricing_catalog, watch_catalog
+from services.repositories import close_repositories
+from utils.quick_replies import iter_quick_reply_labels
 
 
 # ===================================
@@ -30,11 +39,24 @@ async def lifespan(app: FastAPI):
     # Startup
     print("🚀 LumoPack API Server Starting...")
     print("📍 Groq LLM: llama-3.3-70b-versatile")
+
+    # Warm extraction cache: ปุ่ม quick reply + คำตอบสั้นที่พบบ่อย → ไม่ต้องรัน regex ตอนลูกค้ากด
+    cached = warm_extraction_cache([*iter_quick_reply_labels(), *COMMON_SHORT_REPLIES])
+    print(f"🧠 Extraction cache warmed: {cached} entries")
+
+    # Pricing catalog: ตั้ง PRICING_CATALOG_PATH → watch ไฟล์ราคา แก้แล้วสลับ catalog ได้โดยไม่ต้อง restart
+    print(f"💱 Pricing catalog: {get_pricing_catalog().version}")
+    catalog_watcher = None
+    if os.getenv(CATALOG_PATH_ENV):
+        catalog_watcher = asyncio.create_task(watch_catalog())
     print("✅ Ready to serve!")
     
     yield
     
     # Shutdown
+    if catalog_watcher:
+        catalog_watcher.cancel()
+    await close_repositories()
     print("👋 LumoPack API Server Shutting Down...")
 
 
@@ -117,9 +139,13 @@ async def global_exception_handler(request: Request, exc: Exception):
 
 # Register API routers
 app.include_router(chat_router, prefix="/api")
+app.include_router(chat_ws_router)  # /ws/chat/{session_id} — WebSocket
 app.include_router(pricing_router, prefix="/api")
 app.include_router(orders_router, prefix="/api")
 app.include_router(payments_router, prefix="/api")
+app.include_router(profiles_router, prefix="/api")
+app.include_router(quote_router, prefix="/api")
+app.include_router(logistics_router, prefix="/api")
 app.include_router(analyze_router)  # /analyze — root level ตาม frontend
 
 
@@ -137,7 +163,10 @@ async def root():
         "endpoints": {
             "docs": "/docs",
             "chat": "/api/chat",
-            "pricing": "/api/pricing"
+            "chat_ws": "/ws/chat/{session_id}",
+            "pricing": "/api/pricing",
+            "quote": "/api/quote/express",
+            "logistics": "/api/logistics/plan"
         }
     }
 
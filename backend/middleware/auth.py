@@ -1,13 +1,28 @@
 """
 Auth Middleware — Verify Supabase JWT tokens
+
+ต่อ request:
+1. request.state.auth_user → ตรวจแล้วใน request นี้ (dependency ซ้อนกัน เช่น require_admin) ไม่ตรวจซ้ำ
+2. ตรวจ JWT ในเครื่อง (services/jwt_verifier.py — signature + exp + aud, key cache ไว้)
+   ตรวจในเครื่องไม่ได้ (ไม่ได้ตั้ง secret / JWKS) → ถาม Supabase Auth แบบเดิม
+3. role จาก TTL cache ต่อ user id (ROLE_CACHE_TTL_S) — เปลี่ยน role ผ่าน API → invalidate_role ทันที
 """
 
 import os
-from typing import Optional
-from fastapi import Depends, HTTPException, Header
+from typing import Any, Dict, Optional
+from fastapi import Depends, HTTPException, Header, Request
 from pydantic import BaseModel
 
-from services.supabase_client import get_supabase
+from services.jwt_verifier import TokenInvalid, get_token_verifier
+from services.repositories import Repositories, get_repositories
+from utils.lru_cache import TTLCache
+
+ROLE_CACHE_SIZE = int(os.getenv("ROLE_CACHE_SIZE", "10000"))
+ROLE_CACHE_TTL_S = float(os.getenv("ROLE_CACHE_TTL_S", "60"))
+_ROLE_CACHE = TTLCache(maxsize=ROLE_CACHE_SIZE, ttl_seconds=ROLE_CACHE_TTL_S)
+# generation ต่อ user — invalidate_role เพิ่มค่า, lookup ที่ค้างอยู่ระหว่างนั้นจะไม่เขียน role เก่าทับ
+_ROLE_GENERATION: Dict[str, int] = {}
+_ROLE_EPOCH = 0  # invalidate_role() ทั้งหมด
 
 
 class AuthUser(BaseModel):
@@ -16,11 +31,68 @@ class AuthUser(BaseModel):
     role: str = "customer"
 
 
-async def get_current_user(authorization: str = Header(None)) -> AuthUser:
+def require_repositories() -> Repositories:
+    """repository ของ DB ที่ตั้งค่าไว้ — ไม่ได้ตั้ง → 503"""
+    repos = get_repositories()
+    if not repos:
+        raise HTTPException(status_code=503, detail="Database not configured")
+    return repos
+
+
+# ===================================
+# Role Cache
+# ===================================
+async def _get_role(repos: Repositories, user_id: str) -> str:
+    role = _ROLE_CACHE.get(user_id)
+    if role is None:
+        generation = (_ROLE_EPOCH, _ROLE_GENERATION.get(user_id, 0))
+        role = await repos.profiles.get_role(user_id) or "customer"
+        # ถูก invalidate ระหว่างรอ DB → role นี้อาจเก่าแล้ว ใช้กับ request นี้แต่ไม่ cache
+        if generation == (_ROLE_EPOCH, _ROLE_GENERATION.get(user_id, 0)):
+            _ROLE_CACHE.put(user_id, role)
+    return role
+
+
+def invalidate_role(user_id: Optional[str] = None) -> None:
+    """ลบ role ที่ cache ไว้ของ user (None = ทั้งหมด) — เรียกทุกครั้งที่เปลี่ยน role"""
+    global _ROLE_EPOCH
+    if user_id is None:
+        _ROLE_EPOCH += 1
+        _ROLE_GENERATION.clear()
+        _ROLE_CACHE.clear()
+    else:
+        _ROLE_GENERATION[user_id] = _ROLE_GENERATION.get(user_id, 0) + 1
+        _ROLE_CACHE.invalidate(user_id)
+
+
+def get_role_cache_stats() -> Dict[str, Any]:
+    return _ROLE_CACHE.stats()
+
+
+async def _verify_token(repos: Repositories, token: str) -> Optional[Dict[str, Any]]:
+    """{"id", "email"} ของเจ้าของ token หรือ None ถ้า token ใช้ไม่ได้"""
+    verifier = get_token_verifier()
+    if verifier:
+        try:
+            claims = await verifier.verify(token)
+        except TokenInvalid:
+            return None
+        if claims is not None:
+            return {"id": claims["sub"], "email": claims.get("email")}
+
+    # Verify JWT with Supabase Auth (async — ไม่บล็อก event loop)
+    return await repos.auth.get_user(token)
+
+
+async def get_current_user(request: Request, authorization: str = Header(None)) -> AuthUser:
     """
     Extract and verify user from Authorization header.
     Returns AuthUser with id, email, role.
     """
+    memo = getattr(request.state, "auth_user", None)
+    if memo is not None:
+        return memo
+
     if not authorization:
         raise HTTPException(status_code=401, detail="Authorization header missing")
 
@@ -30,26 +102,20 @@ async def get_current_user(authorization: str = Header(None)) -> AuthUser:
         raise HTTPException(status_code=401, detail="Invalid authorization format")
 
     token = parts[1]
-    supabase = get_supabase()
-
-    if not supabase:
-        raise HTTPException(status_code=503, detail="Supabase not configured")
+    repos = require_repositories()
 
     try:
-        # Verify JWT with Supabase
-        user_response = supabase.auth.get_user(token)
-        user = user_response.user
+        user = await _verify_token(repos, token)
 
         if not user:
             raise HTTPException(status_code=401, detail="Invalid token")
 
-        # Fetch role from profiles table
-        profile = supabase.table("profiles").select("role").eq("id", user.id).single().execute()
-        role = profile.data.get("role", "customer") if profile.data else "customer"
+        # Fetch role from profiles table (TTL cache)
+        role = await _get_role(repos, user["id"])
 
-        return AuthUser(
-            id=user.id,
-            email=user.email,
+        auth_user = AuthUser(
+            id=user["id"],
+            email=user.get("email"),
             role=role,
         )
     except HTTPException:
@@ -57,6 +123,9 @@ async def get_current_user(authorization: str = Header(None)) -> AuthUser:
     except Exception as e:
         raise HTTPException(status_code=401, detail=f"Token verification failed: {str(e)}")
 
+    request.state.auth_user = auth_user
+    return auth_user
+
 
 async def require_admin(user: AuthUser = Depends(get_current_user)) -> AuthUser:
     """Require admin role"""
@@ -117,11 +117,15 @@ class ConversationState(BaseModel):
     messages: List[ChatMessage] = []
     collected_data: Dict[str, Any] = {}
     partial_data: Dict[str, Any] = {}  # ข้อมูลชั่วคราวระหว่างรอข้อมูลเพิ่ม
+    prefilled_data: Dict[str, Any] = {}  # field ของ step ถัดๆ ไปที่ลูกค้าบอกมาล่วงหน้า (one-shot extraction)
     temp_data: Dict[str, Any] = {}
     
     # --- Flags ---
     is_complete: bool = False
     
+    # --- Versioning (เพิ่มขึ้นทุกครั้งที่ state เปลี่ยน → ใช้ทำ delta / ETag) ---
+    state_version: int = 0
+    
     # --- Metadata ---
     created_at: datetime = Field(default_factory=datetime.now)
     last_activity: datetime = Field(default_factory=datetime.now)
@@ -142,6 +146,21 @@ class ConversationState(BaseModel):
         msgs = self.messages[-limit:] if limit else self.messages
         return [{"role": m.role, "content": m.content} for m in msgs]
     
+    # ===================================
+    # Versioning
+    # ===================================
+    def bump_version(self) -> int:
+        """เพิ่ม state_version (monotonic ต่อ session)"""
+        self.state_version += 1
+        return self.state_version
+    
+    def get_etag(self) -> str:
+        """
+        ETag ของ session ปัจจุบัน
+        รวม created_at ด้วย เพื่อไม่ให้ session ที่ถูกลบแล้วสร้างใหม่ด้วย id เดิมชน version เก่า
+        """
+        return f'"{self.session_id}-{int(self.created_at.timestamp())}-{self.state_version}"'
+    
     # ===================================
     # Step Navigation
     # ===================================
@@ -0,0 +1,322 @@
+"""
+Batch Pricing
+คำนวณราคาหลายรายการในครั้งเดียวด้วย NumPy (ทีมขาย quote หลายร้อย SKU พร้อมกัน)
+
+หลักการ:
+- จัดกลุ่มรายการตาม (box_type, material, inner, coatings, stampings)
+  → ในกลุ่มเดียวกัน ค่าคงที่ทุกตัว (ราคาฐาน 10x10x10, ราคา coating เฉลี่ย, ราคาบล็อก) เท่ากัน
+    และอ่านจาก services/pricing_catalog ที่ compile ไว้แล้ว
+- ต่อกลุ่ม: พื้นที่ผิว, ratio, ราคาวัสดุ / inner / coating / stamping คำนวณเป็น array ครั้งเดียว
+- ผลต่อรายการเหมือน get_price_estimate ทุกตัวเลข
+  (ลำดับการคูณ/หารเดียวกัน และปัดเศษด้วย round() ของ Python — np.round ปัดค่า .xx5 ต่างออกไป)
+- รายการที่ผิด (เช่น วัสดุไม่มีในระบบ) → {"error": ...} เฉพาะรายการนั้น ไม่ทำให้ทั้ง batch ล้ม
+- material_mode="sheets" (คิดวัสดุจากจำนวนแผ่น) ใช้ scalar path ทีละรายการ
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from services.pricing_calculator import canonical_options, get_price_estimate, restore_order
+from services.pricing_catalog import PricingCatalog, get_pricing_catalog
+from utils.constants import BOX_TYPES
+
+# กลุ่มที่มีรายการน้อยกว่านี้คำนวณแบบ scalar
+VECTOR_MIN_GROUP = 16
+
+# (box_type, material, inner, ((coating_type, category), ...), ((stamp_type, has_block), ...))
+GroupKey = Tuple[str, str, Optional[str], Tuple[Tuple[str, str], ...], Tuple[Tuple[str, bool], ...]]
+
+
+# ===================================
+# Grouping & Validation
+# ===================================
+def _group_key(item: Dict[str, Any], catalog: PricingCatalog) -> GroupKey:
+    """ตรวจรายการ + สร้าง key ของกลุ่ม (raise ValueError/KeyError ถ้าข้อมูลไม่ครบ)"""
+    box_type = item["box_type"]
+    material = item["material"]
+
+    if box_type not in BOX_TYPES:
+        raise ValueError(f"ไม่รู้จักประเภทกล่อง '{box_type}'")
+
+    material = catalog.resolve_material(box_type, material)
+
+    dims = item["dimensions"]
+    for axis in ("width", "length", "height"):
+        if not isinstance(dims[axis], (int, float)):
+            raise ValueError(f"dimensions.{axis} ต้องเป็นตัวเลข")
+    if not isinstance(item["quantity"], int):
+        raise ValueError("quantity ต้องเป็นจำนวนเต็ม")
+
+    # เรียง coatings/stampings แบบเดียวกับ get_price_estimate → ลำดับต่างกันอยู่กลุ่มเดียวกัน
+    coatings, stampings, _, _ = canonical_options(item)
+    return box_type, material, item.get("inner") or None, coatings, stampings
+
+
+def _error_message(error: Exception) -> str:
+    if isinstance(error, KeyError):
+        return f"ข้อมูลไม่ครบ: ไม่มี field {error}"
+    return str(error)
+
+
+# ===================================
+# Vectorized Rounding
+# ===================================
+def round2_array(values: np.ndarray) -> np.ndarray:
+    """
+    ปัดทศนิยม 2 ตำแหน่งแบบ array (shape ใดก็ได้) ให้ได้ค่าเท่ากับ round(x, 2) ของ Python ทุกตัว
+
+    np.round คูณ 100 ก่อนปัด → ค่าที่อยู่ใกล้ .xx5 มากๆ อาจปัดคนละทางกับ round()
+    → ตัวที่ใกล้ครึ่งเกิน tolerance ส่งไปปัดด้วย round() ทีละตัว (น้อยมากในข้อมูลจริง)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    scaled = values * 100
+    rounded = np.rint(scaled) / 100
+    ambiguous = np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) < 1e-6
+    for j in np.flatnonzero(ambiguous).tolist():
+        rounded.flat[j] = round(float(values.flat[j]), 2)
+    return rounded
+
+
+def round2(values: np.ndarray) -> List[float]:
+    """round2_array → list ของ float"""
+    return round2_array(values).tolist()
+
+
+# ===================================
+# Vectorized Pricing Core
+# ===================================
+def price_arrays(
+    box_type: str,
+    material: str,
+    inner_type: Optional[str],
+    coatings: Sequence[Tuple[str, str]],
+    stampings: Sequence[Tuple[str, bool]],
+    width: np.ndarray,
+    length: np.ndarray,
+    height: np.ndarray,
+    quantity: np.ndarray,
+    catalog: Optional[PricingCatalog] = None,
+    base_price: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    คำนวณราคาแบบ array — สูตรและลำดับการปัดเศษเดียวกับ PricingCalculator.calculate_total_price
+
+    width/length/height/quantity ต้อง broadcast กันได้
+    (batch: 1-D ยาวเท่ากัน, grid: คนละแกน เช่น width[:, None] กับ quantity[None, :])
+    catalog ไม่ระบุ = ตัวที่ใช้อยู่ตอนนี้
+    base_price: ราคาฐาน 10x10x10 แทนค่าใน catalog (เช่น ลูกฟูกที่เปลี่ยนลอน — catalog.board_base_price)
+
+    Returns:
+        dict ของ array ที่ปัดเศษแล้ว: ratio, box_per_box, box_total, inner, coatings,
+        stampings, subtotal, vat, grand_total (+ material_info)
+    """
+    catalog = catalog or get_pricing_catalog()
+
+    # --- พื้นที่ผิว + ratio (สูตรเดียวกับ calculate_price_ratio) ---
+    area = 2 * ((width * length) + (width * height) + (length * height))
+    ratio = catalog.price_ratio(box_type, width, length, height)
+
+    # --- กล่องเปล่า (ราคาฐาน 10x10x10 จาก catalog) ---
+    entry = catalog.material(box_type, material)
+    box_per_box = (entry.base_price if base_price is None else base_price) * ratio
+    box_total = round2_array(box_per_box * quantity)
+    subtotal = box_total
+
+    # --- Inner (ไม่รู้จัก / ไม่ระบุ → 0 เหมือน scalar path) ---
+    inner = None
+    inner_entry = catalog.inner(inner_type)
+    if inner_entry is not None:
+        inner_per_box = 10 + (10 * (area / 600) * 0.5)
+        inner_total = round2_array(inner_per_box * quantity)
+        subtotal = subtotal + inner_total
+        inner = (inner_entry.name, round2_array(inner_per_box), inner_total)
+
+    # --- Coatings (บวกเข้า subtotal ตามลำดับเดียวกับ scalar path) ---
+    coating_columns = []
+    coating_sum = 0.0
+    for coating_type, category in coatings:
+        coating = catalog.coating(coating_type, category)
+        if coating is None:
+            coating_columns.append(None)
+            continue
+        per_box = coating.base_price * ratio
+        total = round2_array(per_box * quantity)
+        coating_sum = coating_sum + total
+        coating_columns.append((coating.name, round2_array(per_box), total))
+
+    # --- Stampings ---
+    stamping_columns = []
+    stamping_sum = 0.0
+    for stamp_type, has_block in stampings:
+        stamping = catalog.stamping(stamp_type)
+        if stamping is None:
+            stamping_columns.append(None)
+            continue
+        block_cost = 0 if has_block else stamping.block_cost
+        stamp_cost_per_box = stamping.stamp_cost_per_box
+        total_stamp = stamp_cost_per_box * quantity
+        total = round2_array(block_cost + total_stamp)
+        stamping_sum = stamping_sum + total
+        stamping_columns.append(
+            (stamping.name, round(block_cost, 2), round(stamp_cost_per_box, 2), round2_array(total_stamp), total)
+        )
+
+    subtotal = subtotal + coating_sum + stamping_sum
+    vat = subtotal * 0.07
+    grand_total = subtotal + vat
+
+    return {
+        "material_info": entry.data,
+        "ratio": round2_array(ratio),
+        "box_per_box": round2_array(box_per_box),
+        "box_total": box_total,
+        "inner": inner,
+        "coatings": coating_columns,
+        "stampings": stamping_columns,
+        "subtotal": round2_array(subtotal),
+        "vat": round2_array(vat),
+        "grand_total": round2_array(grand_total),
+    }
+
+
+# ===================================
+# Batch (1 กลุ่ม = 1 ชุด array)
+# ===================================
+def _price_group(key: GroupKey, items: List[Dict[str, Any]], catalog: PricingCatalog) -> List[Dict[str, Any]]:
+    """คำนวณราคาทุกรายการในกลุ่มเดียวกันด้วย price_arrays แล้วประกอบ dict ต่อรายการ"""
+    box_type, material, inner_type, coatings, stampings = key
+
+    priced = price_arrays(
+        box_type, material, inner_type, coatings, stampings,
+        width=np.array([it["dimensions"]["width"] for it in items], dtype=np.float64),
+        length=np.array([it["dimensions"]["length"] for it in items], dtype=np.float64),
+        height=np.array([it["dimensions"]["height"] for it in items], dtype=np.float64),
+        quantity=np.array([it["quantity"] for it in items], dtype=np.float64),
+        catalog=catalog,
+    )
+
+    inner = priced["inner"]
+    return _build_results(
+        items, priced["material_info"], catalog.version, [stamp_type for stamp_type, _ in stampings],
+        ratio=priced["ratio"].tolist(),
+        box_per_box=priced["box_per_box"].tolist(),
+        box_total=priced["box_total"].tolist(),
+        inner_columns=(inner[0], inner[1].tolist(), inner[2].tolist()) if inner else None,
+        coating_columns=[
+            (c[0], c[1].tolist(), c[2].tolist()) if c else None for c in priced["coatings"]
+        ],
+        stamping_columns=[
+            (s[0], s[1], s[2], s[3].tolist(), s[4].tolist()) if s else None for s in priced["stampings"]
+        ],
+        subtotal=priced["subtotal"].tolist(),
+        vat=priced["vat"].tolist(),
+        grand_total=priced["grand_total"].tolist(),
+    )
+
+
+def _build_results(
+    items, mat_data, catalog_version, stamp_types, ratio, box_per_box, box_total, inner_columns,
+    coating_columns, stamping_columns, subtotal, vat, grand_total,
+) -> List[Dict[str, Any]]:
+    """ประกอบ dict ผลลัพธ์ต่อรายการจากคอลัมน์ที่ปัดเศษแล้ว (format เดียวกับ calculate_total_price)"""
+    results = []
+
+    for j, item in enumerate(items):
+        qty = item["quantity"]
+        dims = item["dimensions"]
+
+        if inner_columns is not None:
+            inner_name, inner_per_box, inner_total = inner_columns
+            inner = {"price_per_box": inner_per_box[j], "total_price": inner_total[j], "name": inner_name}
+        else:
+            inner = {"price_per_box": 0, "total_price": 0}
+
+        coating_list = [
+            {"price_per_box": 0, "total_price": 0, "name": ""} if column is None
+            else {"price_per_box": column[1][j], "total_price": column[2][j], "name": column[0]}
+            for column in coating_columns
+        ]
+
+        stamping_list = [
+            {"type": stamp_type, "block_cost": 0, "stamp_cost_per_box": 0, "total": 0} if column is None
+            else {
+                "type": stamp_type,
+                "name": column[0],
+                "block_cost": column[1],
+                "stamp_cost_per_box": column[2],
+                "total_stamp_cost": column[3][j],
+                "total": column[4][j],
+            }
+            for stamp_type, column in zip(stamp_types, stamping_columns)
+        ]
+
+        # คอลัมน์เรียงตาม canonical → คืนลำดับเดียวกับ request ของรายการนี้
+        if len(coating_list) > 1 or len(stamping_list) > 1:
+            _, _, coating_order, stamping_order = canonical_options(item)
+            coating_list = restore_order(coating_list, coating_order)
+            stamping_list = restore_order(stamping_list, stamping_order)
+
+        results.append({
+            "box_base": {
+                "price_per_box": box_per_box[j],
+                "total_price": box_total[j],
+                "material_info": mat_data,
+                "ratio": ratio[j],
+                "quantity": qty,
+            },
+            "inner": inner,
+            "coatings": coating_list,
+            "stampings": stamping_list,
+            "subtotal": subtotal[j],
+            "vat": vat[j],
+            "grand_total": grand_total[j],
+            "dimensions": {"width": dims["width"], "length": dims["length"], "height": dims["height"]},
+            "quantity": qty,
+            "catalog_version": catalog_version,
+        })
+
+    return results
+
+
+# ===================================
+# Public API
+# ===================================
+def price_batch(items: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    คำนวณราคาหลายรายการ (input format เดียวกับ get_price_estimate)
+
+    Returns:
+        list ตามลำดับ input — แต่ละตัวเป็นผลแบบ get_price_estimate
+        หรือ {"error": "..."} สำหรับรายการที่คำนวณไม่ได้
+    """
+    catalog = get_pricing_catalog()  # ทั้ง batch ใช้ version เดียวกัน แม้ระหว่างนั้นจะมีการ reload
+    results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+    groups: Dict[GroupKey, List[int]] = {}
+
+    for index, item in enumerate(items):
+        if item.get("material_mode", "area") != "area":
+            # คิดวัสดุจากแผ่นตั้งต้น (จัดวางทีละขนาด) → scalar path
+            try:
+                results[index] = get_price_estimate(item, catalog)
+            except (KeyError, TypeError, ValueError) as e:
+                results[index] = {"error": _error_message(e)}
+            continue
+        try:
+            key = _group_key(item, catalog)
+        except (KeyError, TypeError, ValueError) as e:
+            results[index] = {"error": _error_message(e)}
+            continue
+        groups.setdefault(key, []).append(index)
+
+    for key, indices in groups.items():
+        group_items = [items[i] for i in indices]
+        if len(group_items) < VECTOR_MIN_GROUP:
+            # กลุ่มเล็ก: overhead ของ NumPy มากกว่างานจริง → scalar path (ผลเท่ากันทุกตัวเลข)
+            priced = [get_price_estimate(item, catalog) for item in group_items]
+        else:
+            priced = _price_group(key, group_items, catalog)
+        for index, result in zip(indices, priced):
+            results[index] = result
+
+    return results
@@ -0,0 +1,188 @@
+"""
+Board Nesting
+วาง blank (กล่องที่กางออก) ลงแผ่นกระดาษตั้งต้น → จำนวนใบต่อแผ่น, % เศษ, จำนวนแผ่นที่ต้องใช้
+
+หลักการ:
+- dieline_blank: ขนาด blank ของ RSC / Die-cut (ผนัง 4 ด้าน + ลิ้นกาว, ฝาบน-ล่าง / ฝาเสียบ)
+- จัดวางแบบ guillotine (ตัดตรงทะลุแผ่นได้ทุกครั้ง) — หมุน blank ได้ 90°
+  * block แรกวางแบบเดียวกันทั้ง block, พื้นที่ที่เหลือจัดซ้ำ (ลึกสุด NESTING_DEPTH ชั้น)
+  * ทุกขนาดเป็น mm จำนวนเต็ม → ไม่มีปัญหาเศษ float ตอนหารหาจำนวนแถว
+- ผลของแต่ละขนาด blank ถูก cache (lru_cache) → quote ซ้ำขนาดเดิมไม่ต้องจัดวางใหม่
+"""
+
+import math
+from functools import lru_cache
+from typing import Any, Dict, Tuple
+
+from utils.constants import BOARD_SHEETS, DIELINE_ALLOWANCES
+
+# จำนวน block สูงสุดในแผ่น = NESTING_DEPTH + 1
+NESTING_DEPTH = 2
+
+# (x_mm, y_mm, cols, rows, rotated) — ตำแหน่งวัดจากขอบที่ตัด trim แล้ว
+Block = Tuple[int, int, int, int, bool]
+Layout = Tuple[int, Tuple[Block, ...]]
+
+
+# ===================================
+# Dieline
+# ===================================
+def dieline_blank(box_type: str, width: float, length: float, height: float) -> Tuple[float, float]:
+    """
+    ขนาด blank ที่กางออกแล้ว (cm)
+
+    RSC:     ยาว = 2×(ยาว+กว้าง) + ลิ้นกาว, กว้าง = สูง + กว้าง (ฝาบน/ล่างด้านละครึ่งความกว้าง)
+    Die-cut: ยาว = 2×(ยาว+กว้าง) + ลิ้นกาว, กว้าง = สูง + 2×(กว้าง + ลิ้นเสียบ) (ฝาเสียบหัว-ท้าย)
+
+    Returns:
+        (blank_length, blank_width)
+    """
+    allowance = DIELINE_ALLOWANCES[box_type]
+    blank_length = 2 * (length + width) + allowance["glue_tab_cm"]
+    if box_type == "rsc":
+        blank_width = height + width
+    else:
+        blank_width = height + 2 * (width + allowance["tuck_flap_cm"])
+    return blank_length, blank_width
+
+
+def fits_board_sheet(box_type: str, width: float, length: float, height: float) -> bool:
+    """blank ของกล่องขนาดนี้วางบนแผ่นตั้งต้นได้อย่างน้อย 1 ใบไหม (หมุน 90° ได้) — ไม่ได้ = ผลิตไม่ได้"""
+    sheet = BOARD_SHEETS[box_type]
+    usable = sorted((sheet["length_cm"] - 2 * sheet["trim_cm"], sheet["width_cm"] - 2 * sheet["trim_cm"]))
+    blank = sorted(dieline_blank(box_type, width, length, height))
+    return blank[0] <= usable[0] and blank[1] <= usable[1]
+
+
+def to_mm(value_cm: float) -> int:
+    """cm → mm (ปัดขึ้น, เผื่อ blank ไม่ให้เล็กกว่าจริง)"""
+    return math.ceil(round(value_cm * 10, 6))
+
+
+# ===================================
+# Guillotine Layout (หน่วย mm, ขนาดรวมระยะห่างใบมีดแล้ว)
+# ===================================
+def _uniform(W: int, H: int, a: int, b: int) -> Layout:
+    """วางแบบเดียวกันทั้งพื้นที่ — ลองทั้งแนวปกติ (a×b) และหมุน (b×a)"""
+    normal = (W // a) * (H // b)
+    rotated = (W // b) * (H // a)
+    if normal == 0 and rotated == 0:
+        return 0, ()
+    if normal >= rotated:
+        return normal, ((0, 0, W // a, H // b, False),)
+    return rotated, ((0, 0, W // b, H // a, True),)
+
+
+def _shift(blocks: Tuple[Block, ...], dx: int, dy: int) -> Tuple[Block, ...]:
+    return tuple((x + dx, y + dy, cols, rows, rotated) for x, y, cols, rows, rotated in blocks)
+
+
+@lru_cache(maxsize=8192)
+def _best_layout(W: int, H: int, a: int, b: int, depth: int) -> Layout:
+    """
+    จำนวนชิ้นสูงสุดในพื้นที่ W×H (guillotine)
+
+    ตัดแผ่นเป็น 2 ส่วน: ส่วนแรก = block แบบเดียวกัน n คอลัมน์ (หรือ n แถว) ชิดซ้าย (ชิดล่าง),
+    ส่วนที่เหลือจัดซ้ำด้วย depth - 1 (depth 0 = วางแบบเดียวกันทั้งพื้นที่)
+    """
+    best = _uniform(W, H, a, b)
+    if depth == 0:
+        return best
+
+    for p, q, rotated in ((a, b, False), (b, a, True)):
+        rows_full = H // q
+        if rows_full:
+            for cols in range(1, W // p):
+                rest = _best_layout(W - cols * p, H, a, b, depth - 1)
+                count = cols * rows_full + rest[0]
+                if count > best[0]:
+                    best = (count, ((0, 0, cols, rows_full, rotated),) + _shift(rest[1], cols * p, 0))
+        cols_full = W // p
+        if cols_full:
+            for rows in range(1, H // q):
+                rest = _best_layout(W, H - rows * q, a, b, depth - 1)
+                count = cols_full * rows + rest[0]
+                if count > best[0]:
+                    best = (count, ((0, 0, cols_full, rows, rotated),) + _shift(rest[1], 0, rows * q))
+    return best
+
+
+def guillotine_layout(area_length_mm: int, area_width_mm: int, item_length_mm: int, item_width_mm: int) -> Layout:
+    """
+    จัดวางสี่เหลี่ยมขนาดเดียวกัน (หมุนได้) ลงพื้นที่ (mm) — ใช้กับ blank บนแผ่น และกล่องบนพาเลท
+
+    Returns:
+        (จำนวน, blocks)
+    """
+    return _best_layout(area_length_mm, area_width_mm, item_length_mm, item_width_mm, NESTING_DEPTH)
+
+
+def get_nesting_cache_info() -> Dict[str, int]:
+    """สถิติ cache ของ layout (hits, misses, currsize)"""
+    info = _best_layout.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize}
+
+
+# ===================================
+# Public API
+# ===================================
+def nest_blank(box_type: str, blank_length: float, blank_width: float) -> Dict[str, Any]:
+    """
+    จัดวาง blank ขนาดนี้ลงแผ่นตั้งต้นของ box_type
+
+    Returns:
+        {
+            "sheet": {"name", "length_cm", "width_cm"},
+            "blank": {"length_cm", "width_cm"},
+            "blanks_per_sheet": int,
+            "waste_pct": % พื้นที่แผ่นที่ไม่ได้เป็น blank,
+            "blocks": [{"x_cm", "y_cm", "cols", "rows", "rotated"}]
+        }
+    """
+    sheet = BOARD_SHEETS[box_type]
+    gap = to_mm(sheet["gap_cm"])
+    trim = to_mm(sheet["trim_cm"])
+    usable_length = to_mm(sheet["length_cm"]) - 2 * trim
+    usable_width = to_mm(sheet["width_cm"]) - 2 * trim
+
+    # บวก gap ทั้งพื้นที่และ blank → n ใบใช้ n×blank + (n-1)×gap พอดี
+    count, blocks = guillotine_layout(
+        usable_length + gap, usable_width + gap, to_mm(blank_length) + gap, to_mm(blank_width) + gap
+    )
+
+    sheet_area = sheet["length_cm"] * sheet["width_cm"]
+    return {
+        "sheet": {"name": sheet["name"], "length_cm": sheet["length_cm"], "width_cm": sheet["width_cm"]},
+        "blank": {"length_cm": round(blank_length, 2), "width_cm": round(blank_width, 2)},
+        "blanks_per_sheet": count,
+        "waste_pct": round((1 - count * blank_length * blank_width / sheet_area) * 100, 2),
+        "blocks": [
+            {"x_cm": (trim + x) / 10, "y_cm": (trim + y) / 10, "cols": cols, "rows": rows, "rotated": rotated}
+            for x, y, cols, rows, rotated in blocks
+        ],
+    }
+
+
+def nest_boxes(box_type: str, width: float, length: float, height: float, quantity: int) -> Dict[str, Any]:
+    """
+    dieline + จัดวาง + จำนวนแผ่นสำหรับ quantity กล่อง
+
+    Returns:
+        ผลของ nest_blank + {"quantity", "sheets_needed", "sheet_area_cm2"}
+
+    Raises:
+        ValueError: blank ใหญ่เกินแผ่นตั้งต้น (วางไม่ได้แม้แต่ใบเดียว)
+    """
+    blank_length, blank_width = dieline_blank(box_type, width, length, height)
+    layout = nest_blank(box_type, blank_length, blank_width)
+    if layout["blanks_per_sheet"] == 0:
+        sheet = layout["sheet"]
+        raise ValueError(
+            f"กล่อง {width}x{length}x{height} ซม. กางออก {blank_length:g}x{blank_width:g} ซม. "
+            f"ใหญ่เกินแผ่น {sheet['length_cm']}x{sheet['width_cm']} ซม."
+        )
+
+    layout["quantity"] = quantity
+    layout["sheets_needed"] = math.ceil(quantity / layout["blanks_per_sheet"])
+    layout["sheet_area_cm2"] = layout["sheet"]["length_cm"] * layout["sheet"]["width_cm"]
+    return layout
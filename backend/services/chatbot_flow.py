@@ -10,10 +10,16 @@ Changes:
 """
 
 from dataclasses import dataclass
-from typing import Dict, Any, Optional, Tuple
-from models.chat_state import ConversationState, ChatbotStep
-from services.step_handlers.structure_steps import StructureStepHandlers
-from services.step_handlers.design_steps import DesignStepHandlers
+from typing import Dict, Any, Optional, Tuple, Callable, Awaitable
+from models.chat_state import ConversationState, ChatbotStep, DEFAULT_NEXT_STEP, STEP_TO_FIELD
+from services.data_extractor import extract_all
+from services.step_handlers.structure_steps import (
+    StructureStepHandlers, BOX_TYPE_QUESTION, INNER_QUESTION, DIMENSIONS_QUESTION,
+)
+from services.step_handlers.design_steps import (
+    DesignStepHandlers, LOGO_QUESTION, LOGO_POSITION_QUESTION,
+    SPECIAL_EFFECTS_QUESTION, BLOCK_QUESTION,
+)
 from services.step_handlers.finalize_steps import FinalizeStepHandlers
 from services.groq_service import get_groq_service
 
@@ -35,6 +41,17 @@ class StepResult:
                                                 # ใช้เมื่อ handler generate checkpoint summary ในรอบเดียวกัน
     auto_execute: bool = False                  # หลัง advance ให้ orchestrator call handler ถัดไปทันที
                                                 # (ไม่รอ user message) ใช้กับ step 10→11→12→13
+    transition: Optional[str] = None            # คำถามของ step ถัดไป — orchestrator ต่อท้าย response
+                                                # (ถูกแทนด้วย landing prompt ถ้า fast-forward ข้าม step)
+
+
+# Step ที่เก็บข้อมูล (2-9 ยกเว้น checkpoint) + ข้อความแรก (greeting) — รับ prefill จาก one-shot extraction ได้
+PREFILL_STEPS = {
+    ChatbotStep.GREETING, ChatbotStep.COLLECT_PRODUCT_TYPE, ChatbotStep.COLLECT_BOX_TYPE,
+    ChatbotStep.COLLECT_INNER, ChatbotStep.COLLECT_DIMENSIONS,
+    ChatbotStep.COLLECT_MOOD_TONE, ChatbotStep.COLLECT_LOGO,
+    ChatbotStep.COLLECT_SPECIAL_EFFECTS,
+}
 
 
 # ===================================
@@ -78,14 +95,19 @@ class ChatbotFlowManager:
     edit_mode:     Checkpoint → enter_edit_mode(target, checkpoint) → handler → exit_edit_mode → checkpoint
     partial_data:  Step 5 dims/qty อาจมาแยกรอบ → merge_partial → commit เมื่อครบ
     skip logic:    RSC → ข้าม Step 4 (inner) ผ่าน _resolve_next_step
+    fast-forward:  extract_all เก็บ field ของ step ถัดๆ ไปไว้ใน prefilled_data
+                   → _resolve_next_step ข้าม step ที่มีข้อมูลครบแล้ว (step 5 ไม่ข้าม — seed แล้ว auto-execute)
     inner format:  List[Dict] — cushion→inner_type, moisture/food_grade→coatings ใน to_pricing_request
+    on_step:       callback หลังแต่ละ step (ใช้ push ผลทีละ step ผ่าน WebSocket)
     """
     
-    def __init__(self):
-        self.groq_service = get_groq_service()
+    def __init__(self, groq_service=None, persist_orders: bool = True):
+        # groq_service: inject LLM อื่นได้ (เช่น fake LLM สำหรับ test) — default ใช้ Groq singleton
+        # persist_orders=False: จบแชทแล้วไม่บันทึก order ลง DB (replay / load test)
+        self.groq_service = groq_service or get_groq_service()
         self.structure_handlers = StructureStepHandlers(self.groq_service)
         self.design_handlers = DesignStepHandlers(self.groq_service)
-        self.finalize_handlers = FinalizeStepHandlers(self.groq_service)
+        self.finalize_handlers = FinalizeStepHandlers(self.groq_service, persist_orders=persist_orders)
     
     # ===================================
     # Main Entry Point
@@ -93,7 +115,8 @@ class ChatbotFlowManager:
     async def process_message(
         self,
         user_message: str,
-        state: ConversationState
+        state: ConversationState,
+        on_step: Optional[Callable[[str, ConversationState], Awaitable[None]]] = None
     ) -> Tuple[str, ConversationState]:
         """
         ประมวลผลข้อความจากลูกค้า
@@ -103,11 +126,17 @@ class ChatbotFlowManager:
         2. Route → handler
         3. Apply StepResult
         4. บันทึก bot response
+
+        on_step: (Optional) ถูกเรียกหลังแต่ละ handler ทำงานเสร็จ ด้วย response ของ step นั้น
+                 → WebSocket push ผลของแต่ละ step ได้ทันทีระหว่าง auto_execute chain
         """
         state.add_message("user", user_message)
+        self._collect_prefill(user_message, state)
 
         result = await self._route_to_handler(user_message, state)
         self._apply_result(result, state)
+        if on_step:
+            await on_step(result.response, state)
 
         # auto_execute: หลัง advance ให้ call handler ถัดไปทันที (ไม่รอ user)
         # ใช้กับ checkpoint 2 → step 11 (mockup) → step 12 (quote) → step 13
@@ -120,11 +149,14 @@ class ChatbotFlowManager:
             # combine response: ต่อท้ายด้วย separator
             combined_response = result.response + "\n\n" + next_result.response
             self._apply_result(next_result, state)
+            if on_step:
+                await on_step(next_result.response, state)
             # สร้าง result ใหม่ที่ combine response แล้ว แต่ใช้ flag จาก next_result
             next_result.response = combined_response
             result = next_result
 
         state.add_message("assistant", result.response)
+        state.bump_version()
         return result.response, state
     
     # ===================================
@@ -169,7 +201,7 @@ class ChatbotFlowManager:
     # Apply StepResult → Update State
     # ===================================
     def _apply_result(self, result: StepResult, state: ConversationState):
-        """นำ StepResult ไป update state"""
+        """นำ StepResult ไป update state (+ ต่อ transition / landing prompt เข้า result.response)"""
         
         # 1. Update collected_data
         if result.update_data:
@@ -190,21 +222,34 @@ class ChatbotFlowManager:
         
         # 5. Advance step (with smart skip logic)
         if result.advance:
-            next_step = result.next_step_override or self._resolve_next_step(state)
-            state.advance_step(next_step)
+            if result.next_step_override:
+                state.advance_step(result.next_step_override)
+                landing = None
+            else:
+                natural_step = self._natural_next_step(state)
+                next_step = self._resolve_next_step(state)
+                state.advance_step(next_step)
+                landing = self._land_on_step(state, fast_forwarded=next_step != natural_step)
             # 6. Post-advance: restore waiting flag ถ้า handler pre-generated checkpoint
             #    (advance_step() จะ reset flag → ต้อง set คืนทีหลัง)
             if result.post_advance_waiting:
                 state.is_waiting_for_confirmation = True
+            # 7. Landing หลัง fast-forward → แทน transition ด้วยคำถามของ step ที่ไปถึงจริง
+            if landing is not None:
+                prompt, auto_execute = landing
+                if prompt:
+                    result.response += "\n\n" + prompt
+                result.auto_execute = result.auto_execute or auto_execute
+                return
+        
+        if result.transition:
+            result.response += "\n\n" + result.transition
     
     # ===================================
     # Smart Step Skip Logic
     # ===================================
-    def _resolve_next_step(self, state: ConversationState) -> Optional[int]:
-        """
-        ตัดสินใจ step ถัดไป โดยพิจารณา skip conditions
-        None = ใช้ DEFAULT_NEXT_STEP
-        """
+    def _natural_next_step(self, state: ConversationState) -> int:
+        """Step ถัดไปตามปกติ (ไม่นับ fast-forward)"""
         current = state.current_step
         
         # Step 3 (Box Type) → ถ้า RSC ข้ามไป Step 5 (ไม่ต้องถาม Inner)
@@ -212,4 +257,160 @@ class ChatbotFlowManager:
             if state.should_skip_inner():
                 return ChatbotStep.COLLECT_DIMENSIONS
         
-        return None
\ No newline at end of file
+        return DEFAULT_NEXT_STEP.get(int(current), int(current))
+    
+    def _resolve_next_step(self, state: ConversationState) -> Optional[int]:
+        """
+        ตัดสินใจ step ถัดไป โดยพิจารณา skip conditions
+        
+        1. RSC → ข้าม Inner
+        2. Fast-forward: ข้าม step ที่ลูกค้าบอกข้อมูลมาครบแล้ว (prefilled_data)
+           → commit field ของ step ที่ข้ามเข้า collected_data
+        """
+        next_step = self._natural_next_step(state)
+        if state.edit_mode:
+            return next_step
+        
+        while self._is_prefill_complete(next_step, state):
+            fields = {
+                key: state.prefilled_data.pop(key)
+                for key in STEP_TO_FIELD.get(next_step, [])
+                if key in state.prefilled_data
+            }
+            state.update_collected_data(fields)
+            next_step = DEFAULT_NEXT_STEP[next_step]
+            if next_step == ChatbotStep.COLLECT_INNER and state.should_skip_inner():
+                next_step = ChatbotStep.COLLECT_DIMENSIONS
+        
+        return next_step
+    
+    def _is_prefill_complete(self, step: int, state: ConversationState) -> bool:
+        """
+        prefilled_data มีข้อมูลพอให้ข้าม step นี้ได้ไหม
+        
+        Step 5 ไม่ข้าม (ต้องวิเคราะห์ความแข็งแรง + สร้าง checkpoint 1) — ใช้ _land_on_step แทน
+        Step 8/9 ข้ามได้เฉพาะเมื่อไม่ต้องถาม sub_step ต่อ (ตำแหน่งโลโก้ / บล็อกป๊ัม)
+        """
+        prefilled = state.prefilled_data
+        if not prefilled:
+            return False
+        
+        if step == ChatbotStep.COLLECT_PRODUCT_TYPE:
+            return "product_type" in prefilled
+        if step == ChatbotStep.COLLECT_BOX_TYPE:
+            return "box_type" in prefilled and "material" in prefilled
+        if step == ChatbotStep.COLLECT_INNER:
+            return "inner" in prefilled
+        if step == ChatbotStep.COLLECT_LOGO:
+            has_logo = prefilled.get("has_logo")
+            return has_logo is False or (has_logo is True and "logo_positions" in prefilled)
+        if step == ChatbotStep.COLLECT_SPECIAL_EFFECTS:
+            effects = prefilled.get("special_effects")
+            return bool(effects) and not any(e.get("category") == "stamping" for e in effects)
+        
+        return False
+    
+    def _land_on_step(
+        self, state: ConversationState, fast_forwarded: bool
+    ) -> Optional[Tuple[Optional[str], bool]]:
+        """
+        เตรียม step ที่ไปถึง ด้วยข้อมูลบางส่วนจาก prefilled_data
+        
+        Returns:
+            None = ใช้ transition ของ handler ตามปกติ
+            (prompt, auto_execute) = ใช้ prompt นี้แทน transition / ให้ orchestrator รัน handler ต่อทันที
+        """
+        step = state.current_step
+        prefilled = state.prefilled_data
+        
+        # Step 3: รู้ box_type แล้ว → ถามวัสดุเลย
+        if step == ChatbotStep.COLLECT_BOX_TYPE and "box_type" in prefilled:
+            box_type = prefilled.pop("box_type")
+            state.merge_partial_data({"box_type": box_type})
+            state.sub_step = 1
+            return self.structure_handlers.get_material_question(box_type), False
+        
+        # Step 5: seed partial_data → ครบ dims+qty ให้ handler วิเคราะห์ + checkpoint 1 ทันที
+        if step == ChatbotStep.COLLECT_DIMENSIONS:
+            seed = {
+                key: prefilled.pop(key)
+                for key in STEP_TO_FIELD[ChatbotStep.COLLECT_DIMENSIONS]
+                if key in prefilled
+            }
+            if seed:
+                state.merge_partial_data(seed)
+                dims = seed.get("dimensions")
+                if dims and seed.get("quantity"):
+                    return None, True
+                if dims:
+                    return (
+                        f"📐 ขนาดกล่อง {dims['width']}×{dims['length']}×{dims['height']} ซม. รับทราบค่ะ\n\n"
+                        f"ขอทราบจำนวนที่ต้องการผลิตด้วยนะคะ (ขั้นต่ำ 500 ชิ้น)"
+                    ), False
+                if seed.get("quantity"):
+                    return (
+                        f"📦 จำนวน {seed['quantity']:,} ชิ้น รับทราบค่ะ\n\n"
+                        f"ขอทราบขนาดกล่องด้วยนะคะ (กว้าง×ยาว×สูง เป็น ซม.)"
+                    ), False
+        
+        # Step 8: รู้ว่ามีโลโก้ → ถามตำแหน่งเลย
+        if step == ChatbotStep.COLLECT_LOGO and prefilled.get("has_logo") is True:
+            prefilled.pop("has_logo")
+            state.update_collected_data({"has_logo": True})
+            state.sub_step = 1
+            return LOGO_POSITION_QUESTION, False
+        
+        # Step 9: มีป๊ัม → ถามเรื่องบล็อกเลย
+        if step == ChatbotStep.COLLECT_SPECIAL_EFFECTS and prefilled.get("special_effects"):
+            state.merge_partial_data({"special_effects": prefilled.pop("special_effects")})
+            state.sub_step = 1
+            return BLOCK_QUESTION, False
+        
+        if not fast_forwarded:
+            return None
+        
+        # ข้ามมาถึง checkpoint → ให้ handler สร้าง summary ทันที
+        if step in (ChatbotStep.CHECKPOINT_1, ChatbotStep.CHECKPOINT_2):
+            return None, True
+        
+        return self._step_question(step), False
+    
+    def _step_question(self, step: int) -> Optional[str]:
+        """คำถามเริ่มต้นของแต่ละ step (สำหรับ landing หลัง fast-forward)"""
+        return {
+            ChatbotStep.COLLECT_BOX_TYPE: BOX_TYPE_QUESTION,
+            ChatbotStep.COLLECT_INNER: INNER_QUESTION,
+            ChatbotStep.COLLECT_DIMENSIONS: DIMENSIONS_QUESTION,
+            ChatbotStep.COLLECT_LOGO: LOGO_QUESTION,
+            ChatbotStep.COLLECT_SPECIAL_EFFECTS: SPECIAL_EFFECTS_QUESTION,
+        }.get(step)
+    
+    # ===================================
+    # One-shot Prefill
+    # ===================================
+    def _collect_prefill(self, user_message: str, state: ConversationState):
+        """
+        Extract ทุก field จากข้อความ → เก็บ field ของ step ถัดๆ ไปไว้ใน prefilled_data
+        
+        - field ของ step ปัจจุบันปล่อยให้ handler จัดการเอง
+        - ไม่ทับข้อมูลที่ collected แล้ว
+        - ไม่ทำตอน edit mode / รอยืนยัน checkpoint (ข้อความเป็นคำสั่งแก้ไข ไม่ใช่ข้อมูลใหม่)
+        """
+        current = state.current_step
+        if (
+            current not in PREFILL_STEPS
+            or state.edit_mode
+            or state.is_waiting_for_confirmation
+        ):
+            return
+        
+        box_type = state.partial_data.get("box_type") or state.collected_data.get("box_type")
+        found = extract_all(user_message, box_type=box_type)
+        if not found:
+            return
+        
+        current_fields = set(STEP_TO_FIELD.get(current, []))
+        for key, value in found.items():
+            if key in current_fields or key in state.collected_data:
+                continue
+            state.prefilled_data[key] = value
@@ -0,0 +1,195 @@
+"""
+Configuration Optimizer
+หากล่องที่ถูกที่สุดที่ยังรับน้ำหนักได้ ("กล่องถูกสุดที่ SAFE สำหรับ 8 kg คืออะไร?")
+
+หลักการ:
+- พื้นที่ค้นหา: box_type × วัสดุลูกฟูก × ลอน (FLUTE_SPECS) × ขนาดที่ยอมขยาย (slack ของ ยาว/กว้าง)
+  * McKee ใช้ได้กับกระดาษลูกฟูกเท่านั้น → วัสดุ GSM / กระดาษแข็งไม่อยู่ในพื้นที่ค้นหา
+  * ลอนเปลี่ยน → ความหนาแผ่นเปลี่ยน (caliper) → ราคาวัสดุเปลี่ยนตามสูตรเดิม (catalog.board_base_price)
+- ตัดทิ้งก่อนคิดราคา: safety factor ของทุกลอน × ทุกขนาดคำนวณเป็น array ครั้งเดียว
+  เหลือเฉพาะช่องที่ถึง min_safety_factor แล้วค่อยคิดราคาด้วย price_arrays (สูตรเดียวกับ batch)
+- ผลลัพธ์: Pareto front ของ ราคา (ต่ำดี) vs safety factor (สูงดี)
+  → ตัวแรกคือตัวถูกที่สุดที่ SAFE, ตัวถัดไปแพงขึ้นแต่แข็งแรงขึ้นเสมอ
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from api.analyze import FLUTE_SPECS, analyze_box_strength, mckee_bct
+from services.batch_pricing import price_arrays, round2_array
+from services.pricing_calculator import canonical_options
+from services.pricing_catalog import PricingCatalog, get_pricing_catalog
+from utils.constants import BOX_TYPES
+
+# safety factor ขั้นต่ำที่ analyze_box_strength ให้ SAFE (คะแนน ≥ 40)
+SAFE_SAFETY_FACTOR = 1.5
+STACKING_FACTOR = 3
+MAX_SLACK_STEPS = 41
+
+
+def corrugated_materials(box_type: str, catalog: Optional[PricingCatalog] = None) -> List[str]:
+    """วัสดุลูกฟูกของ box_type นี้ (วัสดุที่ใช้ McKee ได้) — catalog ไม่ระบุ = ตัวที่ใช้อยู่ตอนนี้"""
+    catalog = catalog or get_pricing_catalog()
+    return [
+        material_id for (entry_box_type, material_id), entry in catalog.materials.items()
+        if entry_box_type == box_type and material_id.startswith("corrugated") and "thickness_cm" in entry.data
+    ]
+
+
+def optimize_configuration(
+    base: Dict[str, Any],
+    weight_kg: float,
+    max_slack_cm: float = 0.0,
+    slack_step_cm: float = 1.0,
+    min_safety_factor: float = SAFE_SAFETY_FACTOR,
+    box_types: Optional[Sequence[str]] = None,
+    flutes: Optional[Sequence[str]] = None,
+) -> Dict[str, Any]:
+    """
+    หา Pareto front ของราคา vs safety factor
+
+    Args:
+        base: spec หลัก (dimensions, quantity, inner/coatings/stampings ถ้ามี — format เดียวกับ get_price_estimate)
+              box_type / material ใน base ไม่ถูกใช้ (ค้นหาทุกตัว)
+        weight_kg: น้ำหนักสินค้า (kg, ต้อง > 0)
+        max_slack_cm: ยอมให้ ยาว/กว้าง ขยายได้สูงสุดกี่ ซม. (0 = ขนาดเดิม)
+        slack_step_cm: ระยะห่างของขนาดที่ลอง
+        min_safety_factor: safety factor ขั้นต่ำ (default = เกณฑ์ SAFE)
+        box_types: จำกัดประเภทกล่อง (ไม่ระบุ = ทุกประเภท)
+        flutes: จำกัดลอน (ไม่ระบุ = ทุกลอน)
+
+    Returns:
+        {
+            "front": [{box_type, material, flute, flute_name, dimensions, grand_total, price_per_box,
+                       safety_factor, max_load_kg, status, safety_score}]  (เรียงจากถูกไปแพง),
+            "evaluated": จำนวนตัวเลือกทั้งหมด, "feasible": จำนวนที่ถึงเกณฑ์,
+            "catalog_version": version ของ catalog ที่ใช้คิดราคา
+        }
+
+    Raises:
+        ValueError: น้ำหนัก ≤ 0, ประเภทกล่อง/ลอนไม่รู้จัก, slack ไม่ถูกต้อง
+    """
+    if weight_kg <= 0:
+        raise ValueError("ต้องระบุน้ำหนักสินค้า (kg) มากกว่า 0")
+    if max_slack_cm < 0 or slack_step_cm <= 0:
+        raise ValueError("max_slack_cm ต้อง ≥ 0 และ slack_step_cm ต้อง > 0")
+
+    box_types = list(box_types or BOX_TYPES)
+    unknown = [b for b in box_types if b not in BOX_TYPES]
+    if unknown:
+        raise ValueError(f"ไม่รู้จักประเภทกล่อง: {', '.join(unknown)}")
+    flutes = [f.upper() for f in flutes] if flutes else list(FLUTE_SPECS)
+    unknown = [f for f in flutes if f not in FLUTE_SPECS]
+    if unknown:
+        raise ValueError(f"ไม่รู้จักลอน: {', '.join(unknown)}")
+
+    slack = np.arange(0.0, max_slack_cm + slack_step_cm / 2, slack_step_cm)
+    if len(slack) > MAX_SLACK_STEPS:
+        raise ValueError(f"ขนาดที่ต้องลองมากเกินไป ({len(slack)} ขั้น, สูงสุด {MAX_SLACK_STEPS})")
+
+    dims = base["dimensions"]
+    quantity = base["quantity"]
+    # (ยาว + slack) × (กว้าง + slack) → ravel เป็น 1-D
+    length, width = np.meshgrid(float(dims["length"]) + slack, float(dims["width"]) + slack, indexing="ij")
+    length, width = length.ravel(), width.ravel()
+    height = float(dims["height"])
+    perimeter_mm = 2 * (length + width) * 10
+
+    # --- ตัดทิ้งด้วย safety factor (ไม่ขึ้นกับวัสดุ/ราคา) ---
+    feasible_cells = {}
+    for flute in flutes:
+        spec = FLUTE_SPECS[flute]
+        safety = mckee_bct(spec["ect"], spec["caliper"], perimeter_mm) / STACKING_FACTOR / weight_kg
+        cells = np.flatnonzero(safety >= min_safety_factor)
+        if len(cells):
+            feasible_cells[flute] = (cells, safety[cells])
+
+    catalog = get_pricing_catalog()
+    coatings, stampings, _, _ = canonical_options(base)
+    inner_type = base.get("inner") or None
+
+    # --- คิดราคาเฉพาะช่องที่ผ่าน ---
+    candidates = []  # (box_type, material, flute, cells, safety, grand_total)
+    evaluated = 0
+    for box_type in box_types:
+        for material in corrugated_materials(box_type, catalog):
+            for flute in flutes:
+                evaluated += len(length)
+                if flute not in feasible_cells:
+                    continue
+                cells, safety = feasible_cells[flute]
+                priced = price_arrays(
+                    box_type, material, inner_type, coatings, stampings,
+                    width[cells], length[cells], np.full(len(cells), height),
+                    np.full(len(cells), float(quantity)), catalog,
+                    base_price=catalog.board_base_price(box_type, material, FLUTE_SPECS[flute]["caliper"] / 10),
+                )
+                candidates.append((box_type, material, flute, cells, safety, priced["grand_total"]))
+
+    front = []
+    feasible = sum(len(c[3]) for c in candidates)
+    if candidates:
+        price = np.concatenate([c[5] for c in candidates])
+        safety = np.concatenate([c[4] for c in candidates])
+        owner = np.concatenate([np.full(len(c[3]), i) for i, c in enumerate(candidates)])
+        cell = np.concatenate([c[3] for c in candidates])
+
+        # เรียงราคาจากน้อยไปมาก (ราคาเท่ากัน → แข็งแรงกว่าก่อน)
+        # ตัวที่อยู่ใน front = แข็งแรงกว่าทุกตัวที่ถูกกว่า
+        order = np.lexsort((-safety, price))
+        best_before = np.maximum.accumulate(safety[order])
+        keep = order[np.concatenate(([True], safety[order][1:] > best_before[:-1]))]
+
+        for j in keep.tolist():
+            box_type, material, flute = candidates[owner[j]][:3]
+            c = cell[j]
+            strength = analyze_box_strength(
+                length_cm=float(length[c]), width_cm=float(width[c]), height_cm=height,
+                weight_kg=weight_kg, flute_type=flute,
+            )
+            front.append({
+                "box_type": box_type,
+                "material": material,
+                "flute": flute,
+                "flute_name": FLUTE_SPECS[flute]["name"],
+                "dimensions": {"width": float(width[c]), "length": float(length[c]), "height": height},
+                "grand_total": float(price[j]),
+                "price_per_box": float(round2_array(price[j] / quantity)),
+                "safety_factor": strength["safety_factor"],
+                "max_load_kg": strength["max_load_kg"],
+                "status": strength["status"],
+                "safety_score": strength["safety_score"],
+            })
+
+    return {
+        "front": front,
+        "evaluated": evaluated,
+        "feasible": feasible,
+        "catalog_version": catalog.version,
+    }
+
+
+def format_optimization_for_chat(result: Dict[str, Any], dimensions: Dict[str, float], limit: int = 3) -> str:
+    """สรุป Pareto front เป็นข้อความแชท — ถูกสุดก่อน, ลอนละ 1 บรรทัด (ตัวถูกสุดของลอนนั้น)"""
+    if not result["front"]:
+        return "  • ไม่พบกล่องลูกฟูกที่รับน้ำหนักนี้ได้ในช่วงขนาดที่ลอง"
+
+    lines = []
+    shown_flutes = set()
+    for option in result["front"]:
+        if option["flute"] in shown_flutes:
+            continue
+        shown_flutes.add(option["flute"])
+
+        size = option["dimensions"]
+        resized = size["width"] != float(dimensions["width"]) or size["length"] != float(dimensions["length"])
+        size_text = f", ขนาด {size['width']:g}x{size['length']:g}x{size['height']:g} ซม." if resized else ""
+        label = "ถูกที่สุดที่ SAFE" if not lines else "แข็งแรงขึ้น"
+        lines.append(
+            f"  • {label}: **{option['flute_name']}**{size_text} — "
+            f"≈{option['price_per_box']:,.2f} บาท/ใบ (safety factor {option['safety_factor']}×)"
+        )
+        if len(lines) == limit:
+            break
+    return "\n".join(lines)
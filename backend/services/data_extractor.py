@@ -8,74 +8,302 @@ Data Extractor
 - เพิ่ม special effects ให้ครบทุกตัวเลือกจาก Requirement
 - เพิ่ม extract_logo_positions, extract_material
 - เพิ่ม detect_edit_target สำหรับ checkpoint edits
+- keyword ทั้งหมดอยู่ใน _KEYWORD_GROUPS → compile เป็น Aho-Corasick automaton ครั้งเดียวตอน import
+  ทุก extractor อ่านผลจาก _scan(msg) (วนข้อความรอบเดียว, cache ต่อข้อความ) แทน any(...) หลายสิบรอบ
+- ผลของ extractor ทุกตัว memo ไว้ต่อข้อความ (lower + strip) + context (เช่น box_type)
+  → คำตอบซ้ำๆ ("1", "ข้าม", "ถูกต้อง", ปุ่ม quick reply) ไม่ต้องรัน regex ซ้ำ
+  ข้อความยาวกว่า MEMO_MAX_MESSAGE_CHARS ไม่ memo (key = ข้อความทั้งก้อน → ข้อความที่วางมายาวๆ กิน memory)
 """
 
 import re
-from typing import Optional, Dict, List, Any
+from functools import lru_cache, wraps
+from typing import Optional, Dict, List, Any, FrozenSet, Iterable
 from models.chat_state import EDIT_KEYWORDS_TO_STEP
+from utils.keyword_automaton import KeywordAutomaton
+from utils.lru_cache import LRUCache
+
+
+# ===================================
+# 0. Keyword Groups + Precompiled Patterns
+# ===================================
+# group → keywords (substring match บนข้อความ lowercase)
+# ลำดับความสำคัญระหว่าง group ยังอยู่ในแต่ละ extractor (if/elif เหมือนเดิม)
+
+# ตำแหน่งโลโก้ (ตาม Requirement: ด้านบน/ล่าง/บนและล่าง/กว้าง 1-2 ด้าน/ยาว 1-2 ด้าน/ทุกด้าน)
+_LOGO_POSITION_MAP: Dict[str, str] = {
+    "ทุกด้าน": "all_sides",
+    "ด้านบนและล่าง": "top_bottom",
+    "บนและล่าง": "top_bottom",
+    "ด้านบน": "top",
+    "ด้านล่าง": "bottom",
+    "ด้านกว้าง 2 ด้าน": "width_both",
+    "กว้าง 2 ด้าน": "width_both",
+    "ด้านกว้าง 1 ด้าน": "width_one",
+    "กว้าง 1 ด้าน": "width_one",
+    "ด้านกว้าง": "width_one",
+    "ด้านยาว 2 ด้าน": "length_both",
+    "ยาว 2 ด้าน": "length_both",
+    "ด้านยาว 1 ด้าน": "length_one",
+    "ยาว 1 ด้าน": "length_one",
+    "ด้านยาว": "length_one",
+    "ด้านกว้างและยาว": "width_and_length",
+    "กว้างและยาว": "width_and_length",
+}
+
+# compound terms ก่อน (ยาวกว่า = specific กว่า) — sort ครั้งเดียวตอน import
+_LOGO_POSITION_TERMS = sorted(_LOGO_POSITION_MAP.items(), key=lambda x: -len(x[0]))
+
+_KEYWORD_GROUPS: Dict[str, List[str]] = {
+    # --- Product type ---
+    "product.cosmetic": ["เครื่องสำอาง", "cosmetic", "สำอาง", "ครีม", "เซรั่ม"],
+    "product.food_grade": ["food-grade", "food grade", "อาหาร", "ขนม", "เบเกอรี่"],
+    "product.non_food": ["non-food", "non food", "ไม่ใช่อาหาร"],
+    "product.general": ["ทั่วไป", "general", "ธรรมดา"],
+
+    # --- Box type ---
+    "box.rsc": ["rsc", "มาตรฐาน", "standard"],
+
+    # --- Material ---
+    "material.corrugated": ["ลูกฟูก", "corrugated"],
+    "material.kraft": ["คราฟท์", "craft", "kraft"],
+    "material.cardboard": ["จั่วปัง", "กระดาษแข็ง", "cardboard"],
+    "material.art": ["อาร์ต", "art"],
+    "material.whiteboard": ["กล่องขาว", "กล่องแป้ง", "whiteboard"],
+
+    # --- Inner ---
+    "inner.shredded": ["กระดาษฝอย", "shredded", "ฝอย"],
+    "inner.bubble": ["บับเบิ้ล", "bubble"],
+    "inner.air_cushion": ["ถุงลม", "air cushion"],
+    "inner.aq": ["aq coating", "acrylic"],
+    "inner.pe": ["pe coating", "polyethylene"],
+    "inner.moisture": ["กันชื้น"],
+    "inner.wax": ["wax", "paraffin"],
+    "inner.bio_barrier": ["bio barrier", "water-based barrier"],
+    "inner.water_based_food": ["water-based food", "food coating"],
+    "inner.pe_food": ["pe food", "pe food-grade"],
+    "inner.pla": ["pla", "bio coating"],
+    "inner.grease": ["grease", "กันน้ำมัน"],
+
+    # --- Logo ---
+    "logo.no": ["ไม่มี", "ไม่ต้อง", "ไม่เอา", "no"],
+    "logo.yes": ["มี", "ใช่", "yes", "ต้องการ", "อยาก"],
+
+    # --- Special effects ---
+    "fx.opp": ["opp", "opp gloss"],
+    "fx.uv_gloss": ["uv gloss", "uv เงา"],
+    "fx.aq": ["aq"],
+    "fx.gloss_word": ["เงา", "gloss"],
+    "fx.gloss_generic": ["เคลือบเงา"],
+    "fx.varnish": ["วานิช", "varnish"],
+    "fx.pvc": ["ลามิเนต", "laminate", "pvc matte", "pvc"],
+    "fx.uv_matte": ["uv ด้าน", "uv matte"],
+    "fx.matte_generic": ["เคลือบด้าน"],
+    "fx.emboss": ["ป๊ัมนูน", "emboss", "นูน"],
+    "fx.deboss": ["ป๊ัมจม", "deboss", "จม"],
+    "fx.foil": ["ฟอยล์", "foil"],
+    "fx.foil_thai": ["ฟอยล์"],
+    "fx.foil_emboss": ["นูน", "emboss", "ฟอยล์+นูน", "foil+emboss"],
+    "fx.foil_special": ["โฮโลแกรม", "hologram", "rainbow", "เรนโบว์", "ลาย"],
+    "fx.foil_detailed": ["ละเอียด", "ลายใหญ่", "detailed"],
+
+    # --- Existing block ---
+    "block.no": ["ไม่เคย", "ไม่มี", "ยังไม่", "ครั้งแรก", "no"],
+    "block.yes": ["เคย", "มี", "ใช่", "yes", "มีบล็อก"],
+
+    # --- Confirmation / rejection / skip / add ---
+    # ต้องขึ้นต้นหรือมีคำยืนยันชัดเจน (ไม่ใช่แค่มีในประโยค)
+    "confirm.strong": ["ถูกต้องแล้ว", "ยืนยันสั่ง", "ข้อมูลถูก", "ข้อมูลครบ", "โอเคเลย",
+                       "ตกลง", "agree", "accept", "ไปต่อเลย", "ไปต่อได้"],
+    "reject": ["แก้ไข", "เปลี่ยน", "ไม่ถูก", "ไม่ใช่", "ผิด",
+               "wrong", "แก้ขนาด", "แก้ลอน", "แก้จำนวน", "ขอแก้",
+               "แก้ประเภท", "แก้วัสดุ", "อยากแก้", "ต้องการแก้"],
+    # ไม่ใช้ bare "ไม่" เพราะจะ match "ยังไม่แน่ใจ", "จำไม่ได้" ฯลฯ
+    "skip": ["ไม่ต้อง", "ไม่ต้องการ", "ไม่เอา", "ไม่มี", "ข้าม", "skip", "pass"],
+    "add": ["เพิ่ม", "add", "อยากได้เพิ่ม", "เพิ่มเติม"],
+
+    # --- One-shot ---
+    "logo.word": ["โลโก้", "logo"],
+
+    # --- Logo positions (1 term = 1 group เพื่อคงลำดับตาม _LOGO_POSITION_TERMS) ---
+    **{f"logo_pos:{term}": [term] for term in _LOGO_POSITION_MAP},
+
+    # --- Edit targets (คงลำดับตาม EDIT_KEYWORDS_TO_STEP) ---
+    **{f"edit:{step}": list(keywords) for step, keywords in EDIT_KEYWORDS_TO_STEP.items()},
+}
+
+_AUTOMATON = KeywordAutomaton(_KEYWORD_GROUPS)
+
+
+# ข้อความยาวกว่านี้ไม่เก็บใน cache ไหนเลย (คำตอบที่ซ้ำกันจริงสั้นทั้งนั้น — ปุ่ม, ตัวเลือก, spec สั้นๆ)
+MEMO_MAX_MESSAGE_CHARS = 512
+
+
+@lru_cache(maxsize=1024)
+def _scan_cached(msg: str) -> FrozenSet[str]:
+    return _AUTOMATON.scan(msg)
+
+
+def _scan(msg: str) -> FrozenSet[str]:
+    """
+    หา keyword group ทั้งหมดในข้อความ (msg ต้อง lower + strip แล้ว)
+    cache ต่อข้อความ → extract_all / handler ที่เรียกหลาย extractor กับข้อความเดียวกัน scan แค่ครั้งเดียว
+    """
+    if len(msg) > MEMO_MAX_MESSAGE_CHARS:
+        return _AUTOMATON.scan(msg)
+    return _scan_cached(msg)
+
+
+# ===================================
+# Extraction Memo Cache
+# ===================================
+# key = (ชื่อ extractor, ข้อความ lower + strip, context args)
+# ทุก extractor ให้ผลเท่ากันระหว่างข้อความดิบกับ lower + strip (ทดสอบกับ corpus ใน benchmarks/)
+_EXTRACTION_CACHE = LRUCache(maxsize=4096)
+_MISSING = object()
+
+
+def _copy_result(value: Any) -> Any:
+    """คืนสำเนาของ list/dict (caller แก้ผลลัพธ์ได้โดยไม่กระทบ cache)"""
+    if isinstance(value, dict):
+        return {k: _copy_result(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy_result(v) for v in value]
+    return value
+
+
+def _memoized(func):
+    """memo ผลของ extractor ด้วย _EXTRACTION_CACHE"""
+    name = func.__name__
+
+    @wraps(func)
+    def wrapper(message: str, *args, **kwargs):
+        if len(message) > MEMO_MAX_MESSAGE_CHARS:
+            return func(message, *args, **kwargs)
+        key = (name, message.lower().strip(), args, tuple(kwargs.items()) if kwargs else ())
+        result = _EXTRACTION_CACHE.get(key, _MISSING)
+        if result is _MISSING:
+            result = func(message, *args, **kwargs)
+            _EXTRACTION_CACHE.put(key, result)
+        return _copy_result(result)
+
+    return wrapper
+
+
+# --- Precompiled regexes ---
+_PRODUCT_NUMBER = re.compile(r'^\s*([1-4])\s*$')
+_BOX_DIE_CUT = re.compile(r'die[\s-]?cut|ไดคัท|ไดค์ท')
+_BOX_NUMBER = re.compile(r'^\s*([12])\s*$')
+_MATERIAL_NUMBER = re.compile(r'^\s*([1-5])\s*$')
+_INNER_NUMBERS = re.compile(r'\b(1[01]?|[2-9])\b')
+
+_WHITESPACE_COMMA = re.compile(r'[,\s]+')
+_DIMS_X = re.compile(r'(?<!\d)(\d+(?:\.\d+)?)\s*[x*×]\s*(\d+(?:\.\d+)?)\s*[x*×]\s*(\d+(?:\.\d+)?)', re.IGNORECASE)
+_DIMS_THAI = re.compile(r'กว้าง\s*(\d+(?:\.\d+)?).{0,10}ยาว\s*(\d+(?:\.\d+)?).{0,10}สูง\s*(\d+(?:\.\d+)?)')
+_DIMS_EN = re.compile(r'width\s*(\d+(?:\.\d+)?).{0,10}length\s*(\d+(?:\.\d+)?).{0,10}height\s*(\d+(?:\.\d+)?)', re.IGNORECASE)
+
+# ตัวเลขต้องเริ่มที่ต้นก้อน (ไม่ต่อจากตัวเลข/ตัวเลข+comma) → regex ไม่ต้องลองเริ่มใหม่ทุกหลักของตัวเลขยาวๆ
+# ผลเท่าเดิม (match ซ้ายสุดเริ่มที่ต้นก้อนอยู่แล้ว) แต่ข้อความที่มีตัวเลขยาวไม่กลายเป็น O(n²)
+_NUM_START = r'(?<!\d)(?<!\d,)'
+
+_QUANTITY_PATTERNS = [
+    re.compile(r'จำนวน\s*(\d[\d,]*)', re.IGNORECASE),
+    re.compile(_NUM_START + r'(\d[\d,]*)\s*ชิ้น', re.IGNORECASE),
+    re.compile(_NUM_START + r'(\d[\d,]*)\s*กล่อง', re.IGNORECASE),
+    re.compile(_NUM_START + r'(\d[\d,]*)\s*ใบ', re.IGNORECASE),
+    re.compile(r'quantity\s*[:\s]*(\d[\d,]*)', re.IGNORECASE),
+]
+_MAX_COUNT_DIGITS = 18
+_QUANTITY_FALLBACK = re.compile(r'(?<![x*×\d])(?<!\d,)(\d[\d,]*)(?![x*×\d])')
+
+_WEIGHT_PATTERNS = [
+    re.compile(r'น้ำหนัก\s*(\d+(?:\.\d+)?)\s*(?:kg|กก|กิโล)', re.IGNORECASE),
+    re.compile(r'(?<!\d)(\d+(?:\.\d+)?)\s*(?:kg|กก\.?|กิโลกรัม)', re.IGNORECASE),
+    re.compile(r'weight\s*[:\s]*(\d+(?:\.\d+)?)', re.IGNORECASE),
+]
+
+# BC ก่อน B/C เพื่อหลีกเลี่ยง partial match
+# ใช้ (?![A-Z]) แทน \b เพราะตัวอักษรไทยติดกัน ("ลอน Cครับ") นับเป็น word char
+_FLUTE_PATTERNS = [
+    (re.compile(r'(?:ลอน|FLUTE)\s*BC(?![A-Z])'), 'BC'),
+    (re.compile(r'(?:ลอน|FLUTE)\s*A(?![A-Z])'), 'A'),
+    (re.compile(r'(?:ลอน|FLUTE)\s*B(?![A-Z])'), 'B'),
+    (re.compile(r'(?:ลอน|FLUTE)\s*C(?![A-Z])'), 'C'),
+    (re.compile(r'(?:ลอน|FLUTE)\s*E(?![A-Z])'), 'E'),
+    (re.compile(r'(?<![A-Z])BC\s*FLUTE'), 'BC'),
+    # ภาษาไทย
+    (re.compile(r'ลอนบีซี'), 'BC'),
+    (re.compile(r'ลอนเอ'), 'A'),
+    (re.compile(r'ลอนบี(?!ซี)'), 'B'),
+    (re.compile(r'ลอนซี'), 'C'),
+    (re.compile(r'ลอนอี'), 'E'),
+]
 
 
 # ===================================
 # 1. Product Type (Step 2)
 # ===================================
+@_memoized
 def extract_product_type(message: str) -> Optional[str]:
     """
     Extract ประเภทสินค้า
     Returns: "general" | "non_food" | "food_grade" | "cosmetic" | None
     """
     msg = message.lower().strip()
-    
+    hits = _scan(msg)
+
     # เช็คแบบเรียงลำดับความจำเพาะ (specific → general)
     # cosmetic ก่อน เพราะ "เครื่องสำอาง" ชัดเจน
-    if any(w in msg for w in ["เครื่องสำอาง", "cosmetic", "สำอาง", "ครีม", "เซรั่ม"]):
+    if "product.cosmetic" in hits:
         return "cosmetic"
-    
+
     # food_grade ก่อน non_food เพราะ "food" อยู่ในทั้งคู่
-    if any(w in msg for w in ["food-grade", "food grade", "อาหาร", "ขนม", "เบเกอรี่"]):
+    if "product.food_grade" in hits:
         return "food_grade"
-    
-    if any(w in msg for w in ["non-food", "non food", "ไม่ใช่อาหาร"]):
+
+    if "product.non_food" in hits:
         return "non_food"
-    
-    if any(w in msg for w in ["ทั่วไป", "general", "ธรรมดา"]):
+
+    if "product.general" in hits:
         return "general"
-    
+
     # Match ตัวเลขเดี่ยวๆ (ต้อง standalone ไม่ใช่ส่วนหนึ่งของตัวเลขอื่น)
-    match = re.match(r'^\s*([1-4])\s*$', msg)
+    match = _PRODUCT_NUMBER.match(msg)
     if match:
         return {"1": "general", "2": "non_food", "3": "food_grade", "4": "cosmetic"}[match.group(1)]
-    
+
     return None
 
 
 # ===================================
 # 2. Box Type (Step 3)
 # ===================================
+@_memoized
 def extract_box_type(message: str) -> Optional[str]:
     """
     Extract ประเภทกล่อง
     Returns: "rsc" | "die_cut" | None
     """
     msg = message.lower().strip()
-    
-    if any(w in msg for w in ["rsc", "มาตรฐาน", "standard"]):
+
+    if "box.rsc" in _scan(msg):
         return "rsc"
-    
+
     # เช็ค die-cut / die cut / ไดคัท เป็นคำรวม
-    if re.search(r'die[\s-]?cut|ไดคัท|ไดค์ท', msg):
+    if _BOX_DIE_CUT.search(msg):
         return "die_cut"
-    
+
     # Match ตัวเลข
-    match = re.match(r'^\s*([12])\s*$', msg)
+    match = _BOX_NUMBER.match(msg)
     if match:
         return {"1": "rsc", "2": "die_cut"}[match.group(1)]
-    
+
     return None
 
 
 # ===================================
 # 3. Material (Step 3 sub-step)
 # ===================================
+@_memoized
 def extract_material(message: str, box_type: str) -> Optional[str]:
     """
     Extract วัสดุกล่อง
@@ -83,20 +311,21 @@ def extract_material(message: str, box_type: str) -> Optional[str]:
     Die-cut: corrugated_2layer, cardboard, art_300gsm, whiteboard_350gsm
     """
     msg = message.lower().strip()
-    
-    if any(w in msg for w in ["ลูกฟูก", "corrugated"]):
+    hits = _scan(msg)
+
+    if "material.corrugated" in hits:
         return "corrugated_2layer"
-    if any(w in msg for w in ["คราฟท์", "craft", "kraft"]):
+    if "material.kraft" in hits:
         return "kraft_200gsm"
-    if any(w in msg for w in ["จั่วปัง", "กระดาษแข็ง", "cardboard"]):
+    if "material.cardboard" in hits:
         return "cardboard"
-    if any(w in msg for w in ["อาร์ต", "art"]):
+    if "material.art" in hits:
         return "art_300gsm"
-    if any(w in msg for w in ["กล่องขาว", "กล่องแป้ง", "whiteboard"]):
+    if "material.whiteboard" in hits:
         return "whiteboard_350gsm"
-    
+
     # Match ตัวเลข
-    match = re.match(r'^\s*([1-5])\s*$', msg)
+    match = _MATERIAL_NUMBER.match(msg)
     if match:
         num = match.group(1)
         if box_type == "rsc":
@@ -106,7 +335,7 @@ def extract_material(message: str, box_type: str) -> Optional[str]:
                 "1": "corrugated_2layer", "2": "cardboard",
                 "3": "art_300gsm", "4": "whiteboard_350gsm"
             }.get(num)
-    
+
     return None
 
 
@@ -130,14 +359,18 @@ _INNER_NUMBER_MAP: Dict[str, Dict[str, str]] = {
 }
 
 
-def extract_inner(message: str) -> Optional[List[Dict[str, Any]]]:
+@_memoized
+def extract_inner(message: str, allow_numbers: bool = True) -> Optional[List[Dict[str, Any]]]:
     """
     Extract inner selections (multi-select, Approach B)
-    
+
     รองรับทั้ง:
     - Number selection: "1", "1, 4", "1 และ 8"
     - Keyword selection: "กระดาษฝอย", "AQ coating กันชื้น"
-    
+
+    allow_numbers=False: ใช้เฉพาะ keyword (สำหรับ extract_all — ตัวเลขในข้อความยาว
+    เช่น "20x15x10" ไม่ใช่หมายเลขตัวเลือก)
+
     Returns: List[Dict] | "skip" | None
     Categories: cushion (กันกระแทก), moisture (กันชื้น), food_grade
     """
@@ -146,6 +379,7 @@ def extract_inner(message: str) -> Optional[List[Dict[str, Any]]]:
     if is_skip_response(msg):
         return "skip"
 
+    hits = _scan(msg)
     inners: List[Dict[str, Any]] = []
     seen_types: set = set()
 
@@ -157,37 +391,38 @@ def extract_inner(message: str) -> Optional[List[Dict[str, Any]]]:
 
     # 1. Number-based selection (e.g. "1", "1, 3, 8", "ข้อ 2 และ 5")
     #    ใช้ \b เพื่อ match ตัวเลข 1-11 แบบ standalone เท่านั้น
-    for num in re.findall(r'\b(1[01]?|[2-9])\b', msg):
-        if num in _INNER_NUMBER_MAP:
-            _add(_INNER_NUMBER_MAP[num])
+    if allow_numbers:
+        for num in _INNER_NUMBERS.findall(msg):
+            if num in _INNER_NUMBER_MAP:
+                _add(_INNER_NUMBER_MAP[num])
 
     # 2. Keyword-based selection (fallback เมื่อลูกค้าพิมพ์ชื่อแทน)
     # --- กลุ่ม 1: แผ่นกันกระแทก ---
-    if any(w in msg for w in ["กระดาษฝอย", "shredded", "ฝอย"]):
+    if "inner.shredded" in hits:
         _add({"type": "shredded_paper", "category": "cushion"})
-    if any(w in msg for w in ["บับเบิ้ล", "bubble"]):
+    if "inner.bubble" in hits:
         _add({"type": "air_bubble", "category": "cushion"})
-    if any(w in msg for w in ["ถุงลม", "air cushion"]):
+    if "inner.air_cushion" in hits:
         _add({"type": "air_cushion", "category": "cushion"})
 
     # --- กลุ่ม 2: เคลือบกันชื้น ---
-    if any(w in msg for w in ["aq coating", "acrylic"]) and "กันชื้น" in msg:
+    if "inner.aq" in hits and "inner.moisture" in hits:
         _add({"type": "aq_coating", "category": "moisture"})
-    if any(w in msg for w in ["pe coating", "polyethylene"]) and "กันชื้น" in msg:
+    if "inner.pe" in hits and "inner.moisture" in hits:
         _add({"type": "pe_coating", "category": "moisture"})
-    if any(w in msg for w in ["wax", "paraffin"]):
+    if "inner.wax" in hits:
         _add({"type": "wax_coating", "category": "moisture"})
-    if any(w in msg for w in ["bio barrier", "water-based barrier"]):
+    if "inner.bio_barrier" in hits:
         _add({"type": "bio_barrier", "category": "moisture"})
 
     # --- กลุ่ม 3: Food-grade coating ---
-    if any(w in msg for w in ["water-based food", "food coating"]):
+    if "inner.water_based_food" in hits:
         _add({"type": "water_based_food", "category": "food_grade"})
-    if any(w in msg for w in ["pe food", "pe food-grade"]):
+    if "inner.pe_food" in hits:
         _add({"type": "pe_food_grade", "category": "food_grade"})
-    if any(w in msg for w in ["pla", "bio coating"]):
+    if "inner.pla" in hits:
         _add({"type": "pla_bio", "category": "food_grade"})
-    if any(w in msg for w in ["grease", "กันน้ำมัน"]):
+    if "inner.grease" in hits:
         _add({"type": "grease_resistant", "category": "food_grade"})
 
     return inners if inners else None
@@ -196,32 +431,26 @@ def extract_inner(message: str) -> Optional[List[Dict[str, Any]]]:
 # ===================================
 # 5. Dimensions & Quantity (Step 5)
 # ===================================
+@_memoized
 def extract_dimensions(message: str) -> Optional[Dict[str, float]]:
     """
     Extract ขนาดกล่อง (กว้าง × ยาว × สูง)
-    
+
     รองรับ:
     - "20x15x10", "20*15*10", "20×15×10"
     - "กว้าง 20 ยาว 15 สูง 10"
     - "width 20 length 15 height 10"
     """
-    text = re.sub(r'[,\s]+', ' ', message)
-    
+    text = _WHITESPACE_COMMA.sub(' ', message)
+
     # Pattern 1: 20x15x10
-    match = re.search(r'(\d+(?:\.\d+)?)\s*[x*×]\s*(\d+(?:\.\d+)?)\s*[x*×]\s*(\d+(?:\.\d+)?)', text, re.IGNORECASE)
-    if match:
-        return _make_dims(match.group(1), match.group(2), match.group(3))
-    
     # Pattern 2: กว้าง X ยาว Y สูง Z
-    match = re.search(r'กว้าง\s*(\d+(?:\.\d+)?).{0,10}ยาว\s*(\d+(?:\.\d+)?).{0,10}สูง\s*(\d+(?:\.\d+)?)', text)
-    if match:
-        return _make_dims(match.group(1), match.group(2), match.group(3))
-    
     # Pattern 3: width X length Y height Z
-    match = re.search(r'width\s*(\d+(?:\.\d+)?).{0,10}length\s*(\d+(?:\.\d+)?).{0,10}height\s*(\d+(?:\.\d+)?)', text, re.IGNORECASE)
-    if match:
-        return _make_dims(match.group(1), match.group(2), match.group(3))
-    
+    for pattern in (_DIMS_X, _DIMS_THAI, _DIMS_EN):
+        match = pattern.search(text)
+        if match:
+            return _make_dims(match.group(1), match.group(2), match.group(3))
+
     return None
 
 
@@ -229,42 +458,48 @@ def _make_dims(w: str, l: str, h: str) -> Dict[str, float]:
     return {"width": float(w), "length": float(l), "height": float(h)}
 
 
+@_memoized
 def extract_quantity(message: str) -> Optional[int]:
     """
     Extract จำนวนกล่อง (ขั้นต่ำ 500)
-    
+
     รองรับ:
     - "จำนวน 1000", "1000 ชิ้น", "1000 กล่อง"
     - "quantity 1000"
     """
-    patterns = [
-        r'จำนวน\s*(\d[\d,]*)',
-        r'(\d[\d,]*)\s*ชิ้น',
-        r'(\d[\d,]*)\s*กล่อง',
-        r'(\d[\d,]*)\s*ใบ',
-        r'quantity\s*[:\s]*(\d[\d,]*)',
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, message, re.IGNORECASE)
+    for pattern in _QUANTITY_PATTERNS:
+        match = pattern.search(message)
         if match:
-            qty = int(match.group(1).replace(",", ""))
-            if qty >= 500:
+            qty = _parse_count(match.group(1))
+            if qty is not None and qty >= 500:
                 return qty
-    
+
     # Fallback: หาตัวเลข >= 500 ที่ไม่ใช่ส่วนหนึ่งของ dimensions
     # (ต้องไม่มี x หรือ * อยู่ข้างๆ)
-    for match in re.finditer(r'(?<![x*×\d])(\d[\d,]*)(?![x*×\d])', message):
-        num = int(match.group(1).replace(",", ""))
-        if num >= 500:
+    for match in _QUANTITY_FALLBACK.finditer(message):
+        num = _parse_count(match.group(1))
+        if num is not None and num >= 500:
             return num
-    
+
     return None
 
 
+def _parse_count(text: str) -> Optional[int]:
+    """
+    "2,000" → 2000
+    ตัวเลขยาวผิดปกติ (เช่น วางเลขบัญชี/เลข tracking) → None
+    (int() ของตัวเลขเกิน 4300 หลักจะ raise ValueError ใน Python 3.11+)
+    """
+    digits = text.replace(",", "")
+    if len(digits) > _MAX_COUNT_DIGITS:
+        return None
+    return int(digits)
+
+
 # ===================================
 # 5b. Weight & Flute (Step 5 — optional)
 # ===================================
+@_memoized
 def extract_weight(message: str) -> Optional[float]:
     """
     Extract น้ำหนักสินค้า (kg)
@@ -273,18 +508,14 @@ def extract_weight(message: str) -> Optional[float]:
     - "น้ำหนัก 2 kg", "2.5 กิโล", "weight 3 kg"
     - "2kg", "1.5 กก."
     """
-    patterns = [
-        r'น้ำหนัก\s*(\d+(?:\.\d+)?)\s*(?:kg|กก|กิโล)',
-        r'(\d+(?:\.\d+)?)\s*(?:kg|กก\.?|กิโลกรัม)',
-        r'weight\s*[:\s]*(\d+(?:\.\d+)?)',
-    ]
-    for pattern in patterns:
-        m = re.search(pattern, message, re.IGNORECASE)
+    for pattern in _WEIGHT_PATTERNS:
+        m = pattern.search(message)
         if m:
             return float(m.group(1))
     return None
 
 
+@_memoized
 def extract_flute(message: str) -> Optional[str]:
     """
     Extract ลอนกระดาษ (A/B/C/E/BC)
@@ -294,23 +525,8 @@ def extract_flute(message: str) -> Optional[str]:
     - ตัวเลข mapping ไม่ได้ทำ (ชื่อลอนชัดเจนอยู่แล้ว)
     """
     msg = message.upper()
-    # BC ก่อน B/C เพื่อหลีกเลี่ยง partial match
-    flute_patterns = [
-        (r'(?:ลอน|FLUTE)\s*BC', 'BC'),
-        (r'(?:ลอน|FLUTE)\s*A', 'A'),
-        (r'(?:ลอน|FLUTE)\s*B', 'B'),
-        (r'(?:ลอน|FLUTE)\s*C', 'C'),
-        (r'(?:ลอน|FLUTE)\s*E', 'E'),
-        (r'BC\s*FLUTE', 'BC'),
-        # ภาษาไทย
-        (r'ลอนบีซี', 'BC'),
-        (r'ลอนเอ', 'A'),
-        (r'ลอนบี', 'B'),
-        (r'ลอนซี', 'C'),
-        (r'ลอนอี', 'E'),
-    ]
-    for pattern, flute_code in flute_patterns:
-        if re.search(pattern, msg):
+    for pattern, flute_code in _FLUTE_PATTERNS:
+        if pattern.search(msg):
             return flute_code
     return None
 
@@ -318,210 +534,333 @@ def extract_flute(message: str) -> Optional[str]:
 # ===================================
 # 6. Logo (Step 8)
 # ===================================
+@_memoized
 def extract_has_logo(message: str) -> Optional[bool]:
     """เช็คว่าลูกค้ามีโลโก้หรือไม่"""
     msg = message.lower().strip()
-    
+
     if is_skip_response(msg):
         return False
+    hits = _scan(msg)
     # เช็ค negative compound ก่อน positive เสมอ
     # เพราะ "ไม่มี" มี "มี" เป็น substring → ต้องเช็ค "ไม่มี" ก่อน
-    if any(w in msg for w in ["ไม่มี", "ไม่ต้อง", "ไม่เอา", "no"]):
+    if "logo.no" in hits:
         return False
-    if any(w in msg for w in ["มี", "ใช่", "yes", "ต้องการ", "อยาก"]):
+    if "logo.yes" in hits:
         return True
     return None
 
 
+@_memoized
 def extract_logo_positions(message: str) -> Optional[List[str]]:
     """
     Extract ตำแหน่งโลโก้
     ตาม Requirement: ด้านบน/ล่าง/บนและล่าง/กว้าง 1-2 ด้าน/ยาว 1-2 ด้าน/ทุกด้าน
     """
     msg = message.lower().strip()
+    hits = _scan(msg)
     positions = []
-    
-    position_map = {
-        "ทุกด้าน": "all_sides",
-        "ด้านบนและล่าง": "top_bottom",
-        "บนและล่าง": "top_bottom",
-        "ด้านบน": "top",
-        "ด้านล่าง": "bottom",
-        "ด้านกว้าง 2 ด้าน": "width_both",
-        "กว้าง 2 ด้าน": "width_both",
-        "ด้านกว้าง 1 ด้าน": "width_one",
-        "กว้าง 1 ด้าน": "width_one",
-        "ด้านกว้าง": "width_one",
-        "ด้านยาว 2 ด้าน": "length_both",
-        "ยาว 2 ด้าน": "length_both",
-        "ด้านยาว 1 ด้าน": "length_one",
-        "ยาว 1 ด้าน": "length_one",
-        "ด้านยาว": "length_one",
-        "ด้านกว้างและยาว": "width_and_length",
-        "กว้างและยาว": "width_and_length",
-    }
-    
+
     # เช็ค compound terms ก่อน (ยาวกว่า = specific กว่า)
-    for thai_term, code in sorted(position_map.items(), key=lambda x: -len(x[0])):
-        if thai_term in msg and code not in positions:
+    for thai_term, code in _LOGO_POSITION_TERMS:
+        if f"logo_pos:{thai_term}" in hits and code not in positions:
             positions.append(code)
-    
+
     return positions if positions else None
 
 
 # ===================================
 # 7. Special Effects (Step 9)
 # ===================================
+@_memoized
 def extract_special_effects(message: str) -> Optional[List[Dict[str, Any]]]:
     """
     Extract ลูกเล่นพิเศษ — ครบทุกตัวเลือกจาก Requirement
     รองรับการเลือกหลายตัวเลือกพร้อมกัน
     """
     msg = message.lower().strip()
-    
+
     if is_skip_response(msg):
         return "skip"
-    
+
+    hits = _scan(msg)
     effects = []
-    
+
     # --- เคลือบเงา (Gloss) ---
-    if any(w in msg for w in ["opp", "opp gloss"]):
+    if "fx.opp" in hits:
         effects.append({"type": "opp_gloss", "category": "gloss"})
-    elif any(w in msg for w in ["uv gloss", "uv เงา"]):
+    elif "fx.uv_gloss" in hits:
         effects.append({"type": "uv_gloss", "category": "gloss"})
-    elif "aq" in msg and any(w in msg for w in ["เงา", "gloss"]):
+    elif "fx.aq" in hits and "fx.gloss_word" in hits:
         effects.append({"type": "aq_gloss", "category": "gloss"})
-    elif any(w in msg for w in ["เคลือบเงา"]):
+    elif "fx.gloss_generic" in hits:
         # Default gloss ถ้าไม่ระบุชนิด
         effects.append({"type": "aq_gloss", "category": "gloss"})
-    
+
     # --- เคลือบด้าน (Matte) ---
-    if any(w in msg for w in ["วานิช", "varnish"]):
+    if "fx.varnish" in hits:
         effects.append({"type": "varnish_matte", "category": "matte"})
-    elif any(w in msg for w in ["ลามิเนต", "laminate", "pvc matte", "pvc"]):
+    elif "fx.pvc" in hits:
         effects.append({"type": "pvc_matte", "category": "matte"})
-    elif any(w in msg for w in ["uv ด้าน", "uv matte"]):
+    elif "fx.uv_matte" in hits:
         effects.append({"type": "uv_matte", "category": "matte"})
-    elif any(w in msg for w in ["เคลือบด้าน"]):
+    elif "fx.matte_generic" in hits:
         effects.append({"type": "uv_matte", "category": "matte"})
-    
+
     # --- ป๊ัมนูน ---
-    if any(w in msg for w in ["ป๊ัมนูน", "emboss", "นูน"]) and "ฟอยล์" not in msg:
+    if "fx.emboss" in hits and "fx.foil_thai" not in hits:
         effects.append({"type": "emboss", "category": "stamping", "has_block": False})
-    
+
     # --- ป๊ัมจม ---
-    if any(w in msg for w in ["ป๊ัมจม", "deboss", "จม"]):
+    if "fx.deboss" in hits:
         effects.append({"type": "deboss", "category": "stamping", "has_block": False})
-    
+
     # --- ป๊ัมฟอยล์ ---
-    if any(w in msg for w in ["ฟอยล์", "foil"]):
+    if "fx.foil" in hits:
         # ฟอยล์ + นูน
-        if any(w in msg for w in ["นูน", "emboss", "ฟอยล์+นูน", "foil+emboss"]):
+        if "fx.foil_emboss" in hits:
             effects.append({"type": "foil_emboss", "category": "stamping", "has_block": False})
         # ฟอยล์พิเศษ
-        elif any(w in msg for w in ["โฮโลแกรม", "hologram", "rainbow", "เรนโบว์", "ลาย"]):
+        elif "fx.foil_special" in hits:
             effects.append({"type": "foil_special", "category": "stamping", "has_block": False})
         # ฟอยล์ทั่วไป (ทอง/เงิน/โรสโกลด์)
         else:
             foil_type = "foil_regular"
-            if any(w in msg for w in ["ละเอียด", "ลายใหญ่", "detailed"]):
+            if "fx.foil_detailed" in hits:
                 foil_type = "foil_detailed"
             effects.append({"type": foil_type, "category": "stamping", "has_block": False})
-    
+
     return effects if effects else None
 
 
+@_memoized
 def extract_has_existing_block(message: str) -> Optional[bool]:
     """เช็คว่าลูกค้าเคยทำบล็อกป๊ัมกับเรามาก่อนหรือไม่"""
     msg = message.lower().strip()
-    
+    hits = _scan(msg)
+
     # เช็ค negative compound ก่อน positive เสมอ
     # เพราะ "ไม่เคย" มี "เคย" เป็น substring → ต้องเช็ค "ไม่เคย" ก่อน
     # ไม่ใช้ bare "ไม่" เพราะ match "จำไม่ได้" ซึ่งเป็นความไม่แน่ใจ
-    if any(w in msg for w in ["ไม่เคย", "ไม่มี", "ยังไม่", "ครั้งแรก", "no"]):
+    if "block.no" in hits:
         return False
-    if any(w in msg for w in ["เคย", "มี", "ใช่", "yes", "มีบล็อก"]):
+    if "block.yes" in hits:
         return True
     return None
 
 
+# ===================================
+# 7b. One-shot Extraction (ทุก field ในข้อความเดียว)
+# ===================================
+
+# ข้อความที่เป็นแค่ตัวเลข = เลือกเมนูของ step ปัจจุบัน → ห้ามตีความเป็น field อื่น
+_MENU_NUMBER_ONLY = re.compile(r'^[\d\s,.]+$')
+
+# quantity ต้องมีคำบอกบริบท (fallback ตัวเลข ≥ 500 ลอยๆ เสี่ยงเกินไปสำหรับข้อความยาว)
+_QTY_CONTEXT = re.compile(r'จำนวน|ชิ้น|กล่อง|ใบ|quantity|pcs', re.IGNORECASE)
+
+# "ไม่มีโลโก้" เป็นคำตอบของ step โลโก้ → ตัดออกก่อนหา special effects (ไม่งั้นถูกตีความเป็น "ข้าม")
+_NO_LOGO_PHRASE = re.compile(r'(?:ไม่มี|ไม่ต้องการ|ไม่เอา|ไม่ใส่|no)\s*(?:โลโก้|logo)')
+
+
+@_memoized
+def extract_all(message: str, box_type: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Extract ทุก field ที่เจอในข้อความเดียว (one-shot)
+    เช่น "กล่องไดคัท ใส่เครื่องสำอาง 20x15x10 จำนวน 2000 ลอน BC มีโลโก้ ฟอยล์ทอง"
+
+    ใช้เฉพาะ keyword ที่ชัดเจน — ไม่ตีความตัวเลขเดี่ยว (เลขเมนู) และไม่ตีความ "ข้าม"
+    เพราะไม่รู้ว่าลูกค้าหมายถึง step ไหน
+
+    Args:
+        message: ข้อความลูกค้า
+        box_type: box_type ที่รู้อยู่แล้ว (ใช้ตีความวัสดุ ถ้าข้อความไม่ได้ระบุ)
+
+    Returns:
+        dict ของ field ที่ extract ได้ (key เดียวกับ collected_data) — ว่าง = ไม่เจออะไร
+    """
+    msg = message.lower().strip()
+    if not msg or _MENU_NUMBER_ONLY.match(msg):
+        return {}
+
+    found: Dict[str, Any] = {}
+
+    product_type = extract_product_type(msg)
+    if product_type:
+        found["product_type"] = product_type
+
+    found_box_type = extract_box_type(msg)
+    if found_box_type:
+        found["box_type"] = found_box_type
+
+    material = extract_material(msg, found_box_type or box_type or "rsc")
+    if material:
+        found["material"] = material
+
+    inner = extract_inner(msg, allow_numbers=False)
+    if inner and inner != "skip":
+        found["inner"] = inner
+
+    dims = extract_dimensions(message)
+    if dims:
+        found["dimensions"] = dims
+
+    if dims or _QTY_CONTEXT.search(message):
+        qty = extract_quantity(message)
+        if qty:
+            found["quantity"] = qty
+
+    weight = extract_weight(message)
+    if weight is not None:
+        found["weight_kg"] = weight
+
+    flute = extract_flute(message)
+    if flute:
+        found["flute_type"] = flute
+
+    # โลโก้: ต้องมีคำว่า "โลโก้" ในข้อความ ("มี" ลอยๆ ตีความไม่ได้)
+    if "logo.word" in _scan(msg):
+        has_logo = extract_has_logo(msg)
+        if has_logo is not None:
+            found["has_logo"] = has_logo
+        positions = extract_logo_positions(msg)
+        if positions and has_logo is not False:
+            found["has_logo"] = True
+            found["logo_positions"] = positions
+
+    effects = extract_special_effects(_NO_LOGO_PHRASE.sub(" ", msg))
+    if effects and effects != "skip":
+        found["special_effects"] = effects
+
+    return found
+
+
 # ===================================
 # 8. Confirmation Responses
 # ===================================
+
+# Exact match — คำยืนยันสั้นๆ ที่ไม่มีความหมายอื่น
+_CONFIRM_EXACT = frozenset({
+    "ใช่", "ถูก", "ถูกต้อง", "yes", "ok", "โอเค", "ยืนยัน", "confirm",
+    "correct", "ถูกต้องค่ะ", "ถูกต้องครับ", "ใช่ค่ะ", "ใช่ครับ",
+    "ยืนยันค่ะ", "ยืนยันครับ", "ถูกต้อง ✓", "✓",
+})
+
+_SKIP_EXACT = frozenset({"ไม่", "no", "pass", "skip", "ไม่ครับ", "ไม่ค่ะ"})
+
+
+@_memoized
 def is_confirmation(message: str) -> bool:
     """
     เช็คว่าลูกค้ายืนยัน
-    
+
     หลักการ: ใช้ exact / prefix match สำหรับคำสั้นๆ
     หลีกเลี่ยง "ค่ะ"/"ครับ" ใน general list เพราะอยู่ใน "ขอแก้ไขค่ะ" ด้วย
     """
     msg = message.lower().strip()
-    
-    # Exact match — คำยืนยันสั้นๆ ที่ไม่มีความหมายอื่น
-    EXACT = {"ใช่", "ถูก", "ถูกต้อง", "yes", "ok", "โอเค", "ยืนยัน", "confirm",
-             "correct", "ถูกต้องค่ะ", "ถูกต้องครับ", "ใช่ค่ะ", "ใช่ครับ",
-             "ยืนยันค่ะ", "ยืนยันครับ", "ถูกต้อง ✓", "✓"}
-    if msg in EXACT:
-        return True
 
-    # ต้องขึ้นต้นหรือมีคำยืนยันชัดเจน (ไม่ใช่แค่มีในประโยค)
-    STRONG = ["ถูกต้องแล้ว", "ยืนยันสั่ง", "ข้อมูลถูก", "ข้อมูลครบ", "โอเคเลย",
-              "ตกลง", "agree", "accept", "ไปต่อเลย", "ไปต่อได้"]
-    if any(w in msg for w in STRONG):
+    if msg in _CONFIRM_EXACT:
         return True
 
-    return False
+    # ต้องขึ้นต้นหรือมีคำยืนยันชัดเจน (ไม่ใช่แค่มีในประโยค)
+    return "confirm.strong" in _scan(msg)
 
 
+@_memoized
 def is_rejection(message: str) -> bool:
     """
     เช็คว่าลูกค้าปฏิเสธ/ขอแก้ไข
-    
+
     หลักการ: ต้องมีคำแก้ไขจริงๆ (ไม่ใช่แค่ "ไม่" ที่อาจอยู่ใน "ไม่ทราบ")
     """
     msg = message.lower().strip()
-    return any(w in msg for w in [
-        "แก้ไข", "เปลี่ยน", "ไม่ถูก", "ไม่ใช่", "ผิด",
-        "wrong", "แก้ขนาด", "แก้ลอน", "แก้จำนวน", "ขอแก้",
-        "แก้ประเภท", "แก้วัสดุ", "อยากแก้", "ต้องการแก้",
-    ])
+    return "reject" in _scan(msg)
 
 
+@_memoized
 def is_skip_response(message: str) -> bool:
     """เช็คว่าลูกค้าอยากข้าม (สำหรับ optional steps)"""
     msg = message.lower().strip()
-    
+
     # Exact match สำหรับคำสั้นๆ
-    if msg in ("ไม่", "no", "pass", "skip", "ไม่ครับ", "ไม่ค่ะ"):
+    if msg in _SKIP_EXACT:
         return True
-    
+
     # Compound keywords (ไม่ใช้ bare "ไม่" เพราะจะ match "ยังไม่แน่ใจ", "จำไม่ได้" ฯลฯ)
-    return any(w in msg for w in [
-        "ไม่ต้อง", "ไม่ต้องการ", "ไม่เอา", "ไม่มี",
-        "ข้าม", "skip", "pass",
-    ])
+    return "skip" in _scan(msg)
 
 
+@_memoized
 def is_add_request(message: str) -> bool:
     """เช็คว่าลูกค้าอยาก 'เพิ่ม' (ไม่ใช่ 'แก้ไข')"""
     msg = message.lower().strip()
-    return any(w in msg for w in ["เพิ่ม", "add", "อยากได้เพิ่ม", "เพิ่มเติม"])
+    return "add" in _scan(msg)
 
 
 # ===================================
 # 9. Edit Target Detection (สำหรับ Checkpoint)
 # ===================================
+@_memoized
 def detect_edit_target(message: str) -> Optional[int]:
     """
     ตรวจจับว่าลูกค้าต้องการแก้ไข step ไหน
     ใช้ EDIT_KEYWORDS_TO_STEP จาก chat_state
-    
+
     Returns: step number | None
     """
     msg = message.lower().strip()
-    
-    for step_num, keywords in EDIT_KEYWORDS_TO_STEP.items():
-        if any(kw in msg for kw in keywords):
+    hits = _scan(msg)
+
+    for step_num in EDIT_KEYWORDS_TO_STEP:
+        if f"edit:{step_num}" in hits:
             return step_num
-    
-    return None
\ No newline at end of file
+
+    return None
+
+
+# ===================================
+# 10. Cache Warm-up & Stats
+# ===================================
+# คำตอบสั้นที่พิมพ์เองบ่อย (เลขเมนู, ยืนยัน/ข้าม) — warm คู่กับ label ปุ่ม quick reply
+COMMON_SHORT_REPLIES = (
+    *(str(n) for n in range(1, 12)),
+    "ข้าม", "ถูกต้อง", "ใช่", "ไม่", "ok", "yes", "no", "skip", "ไม่ต้องการ", "ขอแก้ไข",
+)
+
+
+def warm_extraction_cache(messages: Iterable[str]) -> int:
+    """
+    รัน extractor ทุกตัวกับข้อความล่วงหน้า (เช่น label ของปุ่ม quick reply ตอน startup)
+    → ลูกค้ากดปุ่ม = cache hit ล้วน ไม่มี regex
+
+    context ที่ใส่ต้องตรงกับที่ handler เรียกจริง (extract_material ต่อ box_type,
+    extract_all แบบ keyword box_type)
+
+    Returns: จำนวน entry ใน cache หลัง warm
+    """
+    for message in messages:
+        for func in (
+            extract_product_type, extract_box_type, extract_inner,
+            extract_dimensions, extract_quantity, extract_weight, extract_flute,
+            extract_has_logo, extract_logo_positions, extract_special_effects,
+            extract_has_existing_block, is_confirmation, is_rejection,
+            is_skip_response, is_add_request, detect_edit_target,
+        ):
+            func(message)
+        for box_type in ("rsc", "die_cut"):
+            extract_material(message, box_type)
+        for box_type in (None, "rsc", "die_cut"):
+            extract_all(message, box_type=box_type)
+
+    return len(_EXTRACTION_CACHE)
+
+
+def get_extraction_cache_stats() -> Dict[str, Any]:
+    """สถิติของ memo cache (size, hits, misses, evictions, hit_rate)"""
+    return _EXTRACTION_CACHE.stats()
+
+
+def clear_extraction_cache() -> None:
+    """ล้าง memo cache + keyword scan cache (ใช้ใน benchmark/tests)"""
+    _EXTRACTION_CACHE.clear()
+    _scan_cached.cache_clear()
@@ -0,0 +1,60 @@
+"""
+Fake LLM Service
+LLM ปลอมที่มี interface เหมือน GroqService.generate_response
+
+ใช้สำหรับ:
+- Replay บทสนทนาจำนวนมาก (/api/chat/replay) เพื่อวัด throughput ของ flow จริง
+  (extractors, handlers, state transitions) โดยไม่เสียเวลา/ค่าใช้จ่าย LLM
+- Unit tests ที่ต้องการ ChatbotFlowManager แต่ไม่อยากเรียก Groq
+"""
+
+import asyncio
+from typing import List, Dict, Optional
+
+
+class FakeLLMService:
+    """
+    LLM ปลอม (ไม่เรียก network)
+
+    โหมด:
+    - recorded_responses: ตอบตามลำดับที่บันทึกไว้ (วนซ้ำเมื่อหมด)
+    - ไม่มี recorded: ตอบข้อความ placeholder ที่อ้างอิงข้อความ input
+    - latency_ms: จำลองเวลาตอบของ LLM (asyncio.sleep — ไม่กิน CPU)
+    """
+
+    def __init__(
+        self,
+        recorded_responses: Optional[List[str]] = None,
+        latency_ms: float = 0.0
+    ):
+        self.recorded_responses = list(recorded_responses or [])
+        self.latency_ms = latency_ms
+        self.call_count = 0
+        self.model = "fake-llm"
+
+    async def generate_response(
+        self,
+        system_prompt: str,
+        user_message: str,
+        conversation_history: Optional[List[Dict[str, str]]] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None
+    ) -> str:
+        """คืน response ปลอม — signature เดียวกับ GroqService.generate_response"""
+        index = self.call_count
+        self.call_count += 1
+
+        if self.latency_ms > 0:
+            await asyncio.sleep(self.latency_ms / 1000)
+
+        if self.recorded_responses:
+            return self.recorded_responses[index % len(self.recorded_responses)]
+
+        return f"[fake-llm #{index + 1}] {user_message[:80]}"
+
+    def get_model_info(self) -> Dict:
+        return {
+            "model": self.model,
+            "latency_ms": self.latency_ms,
+            "recorded_responses": len(self.recorded_responses),
+        }
@@ -0,0 +1,220 @@
+"""
+Incremental Pricing
+คำนวณราคาใหม่เฉพาะส่วนที่เปลี่ยน (ลูกค้าแก้ field เดียวที่ checkpoint แล้วกลับมาดูราคา)
+
+หลักการ:
+- ผลราคาแยกเป็น component (node): กล่องเปล่า, inner, coating แต่ละตัว, การป๊ัมแต่ละตัว
+  แต่ละ node จำ input ที่ใช้คำนวณ → รอบถัดไป input เหมือนเดิมใช้ผลเดิม
+  (เช่น เปลี่ยนแค่ชนิดฟอยล์ → คำนวณใหม่แค่ node ฟอยล์ตัวนั้น)
+- ยอดรวม / VAT คำนวณใหม่ทุกครั้ง (บวกไม่กี่ตัว) ด้วยลำดับเดียวกับ get_price_estimate
+  → ผลเท่ากับ get_price_estimate ทุกตัวเลข
+- catalog เปลี่ยน version → ทิ้ง node ทั้งหมด
+- graph เป็น dict ธรรมดา (เก็บใน state.temp_data ได้)
+- diff_quotes: เทียบใบเสนอราคาเก่า/ใหม่ทีละบรรทัด → บอกลูกค้าว่าราคาเปลี่ยนเท่าไหร่
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.pricing_calculator import PricingCalculator, canonical_options, restore_order
+from services.pricing_catalog import PricingCatalog, get_pricing_catalog
+
+
+# ===================================
+# Dependency Graph
+# ===================================
+def _node_ids(prefix: str, options: Tuple[Tuple[Any, ...], ...]) -> List[str]:
+    """id ของ node ตามเนื้อหา (ตัวซ้ำได้ #2, #3) — เพิ่ม/ลบตัวอื่นไม่ทำให้ id เลื่อน"""
+    seen: Dict[str, int] = {}
+    ids = []
+    for option in options:
+        base = f"{prefix}:{option[0]}:{option[1]}" if prefix == "coating" else f"{prefix}:{option[0]}"
+        seen[base] = seen.get(base, 0) + 1
+        ids.append(base if seen[base] == 1 else f"{base}#{seen[base]}")
+    return ids
+
+
+def reprice(
+    requirement_data: Dict[str, Any],
+    graph: Optional[Dict[str, Any]] = None,
+    catalog: Optional[PricingCatalog] = None,
+) -> Tuple[Dict[str, Any], Dict[str, Any], List[str]]:
+    """
+    คำนวณราคาโดยใช้ผลของ component ที่ input ไม่เปลี่ยนจาก graph รอบก่อน
+
+    Args:
+        requirement_data: format เดียวกับ get_price_estimate
+        graph: ผลจากการเรียกรอบก่อน (None = คำนวณทั้งหมด)
+        catalog: catalog ที่จะใช้ (ไม่ระบุ = ตัวที่ใช้อยู่ตอนนี้)
+
+    Returns:
+        (ผลราคาแบบ get_price_estimate, graph ใหม่, id ของ node ที่คำนวณใหม่)
+
+    Raises:
+        ValueError: วัสดุไม่มีสำหรับ box_type นี้ (เหมือน get_price_estimate)
+    """
+    catalog = catalog or get_pricing_catalog()
+    material_mode = requirement_data.get("material_mode") or "area"
+    calculator = PricingCalculator(catalog, material_mode)
+
+    old_nodes: Dict[str, Any] = {}
+    if graph and graph.get("catalog_version") == catalog.version:
+        old_nodes = graph["nodes"]
+
+    dims = requirement_data["dimensions"]
+    width, length, height = dims["width"], dims["length"], dims["height"]
+    box_type = requirement_data["box_type"]
+    quantity = requirement_data["quantity"]
+    size = [box_type, float(width), float(length), float(height), quantity]
+    coatings, stampings, coating_order, stamping_order = canonical_options(requirement_data)
+
+    nodes: Dict[str, Any] = {}
+    recomputed: List[str] = []
+
+    def node(node_id: str, inputs: List[Any], compute) -> Dict[str, Any]:
+        old = old_nodes.get(node_id)
+        if old is not None and old["inputs"] == inputs:
+            output = old["output"]
+        else:
+            output = compute()
+            recomputed.append(node_id)
+        nodes[node_id] = {"inputs": inputs, "output": output}
+        return output
+
+    material = catalog.resolve_material(box_type, requirement_data["material"])
+    box_base = node(
+        "box_base", [material, material_mode, *size],
+        lambda: calculator.calculate_box_base_price(width, length, height, box_type, material, quantity),
+    )
+
+    inner_type = requirement_data.get("inner") or None
+    inner = {"price_per_box": 0, "total_price": 0}
+    if inner_type:
+        inner = node(
+            "inner", [inner_type, *size],
+            lambda: calculator.calculate_inner_price(inner_type, width, length, height, quantity),
+        )
+
+    # ลำดับการบวกเหมือน calculate_total_price (เรียงแบบ canonical)
+    coating_list = []
+    coating_total = 0
+    for node_id, (coating_type, category) in zip(_node_ids("coating", coatings), coatings):
+        price = node(
+            node_id, size,
+            lambda: calculator.calculate_coating_price(
+                coating_type, category, width, length, height, box_type, quantity
+            ),
+        )
+        coating_list.append(price)
+        coating_total += price["total_price"]
+
+    stamping_list = []
+    stamping_total = 0
+    for node_id, (stamp_type, has_block) in zip(_node_ids("stamping", stampings), stampings):
+        price = node(
+            node_id, [has_block, quantity],
+            lambda: calculator.calculate_stamping_price(stamp_type, has_block, quantity),
+        )
+        stamping_list.append(price)
+        stamping_total += price["total"]
+
+    subtotal = box_base["total_price"] + inner["total_price"] + coating_total + stamping_total
+    vat = subtotal * 0.07
+    grand_total = subtotal + vat
+
+    result = {
+        "box_base": dict(box_base),
+        "inner": dict(inner),
+        "coatings": restore_order([dict(c) for c in coating_list], coating_order),
+        "stampings": restore_order([dict(s) for s in stamping_list], stamping_order),
+        "subtotal": round(subtotal, 2),
+        "vat": round(vat, 2),
+        "grand_total": round(grand_total, 2),
+        "dimensions": {"width": width, "length": length, "height": height},
+        "quantity": quantity,
+        "catalog_version": catalog.version,
+    }
+    return result, {"catalog_version": catalog.version, "nodes": nodes}, recomputed
+
+
+# ===================================
+# Line-item Diff
+# ===================================
+def _line_items(result: Dict[str, Any]) -> Dict[str, Tuple[str, float]]:
+    """{key: (ชื่อบรรทัด, ยอดรวม)} ของใบเสนอราคา"""
+    lines: Dict[str, Tuple[str, float]] = {
+        "box_base": ("กล่องเปล่า", result["box_base"]["total_price"]),
+    }
+    inner = result.get("inner") or {}
+    if inner.get("total_price"):
+        lines["inner"] = (inner.get("name") or "Inner", inner["total_price"])
+
+    for i, coating in enumerate(result.get("coatings", [])):
+        name = coating.get("name") or "Coating"
+        key = f"coating:{name}"
+        lines[key if key not in lines else f"{key}#{i}"] = (name, coating["total_price"])
+
+    for i, stamping in enumerate(result.get("stampings", [])):
+        key = f"stamping:{stamping.get('type', '')}"
+        name = stamping.get("name") or stamping.get("type") or "ป๊ัม"
+        lines[key if key not in lines else f"{key}#{i}"] = (name, stamping["total"])
+
+    lines["vat"] = ("VAT 7%", result["vat"])
+    return lines
+
+
+def diff_quotes(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    เทียบใบเสนอราคา 2 ฉบับทีละบรรทัด
+
+    Returns:
+        {
+            "changed": bool,
+            "lines": [{"item", "label", "old", "new", "delta"}]  (เฉพาะบรรทัดที่เปลี่ยน, None = ไม่มีบรรทัดนี้),
+            "old_grand_total", "new_grand_total", "grand_total_delta"
+        }
+    """
+    old_lines = _line_items(old)
+    new_lines = _line_items(new)
+
+    lines = []
+    for key in [*old_lines, *(k for k in new_lines if k not in old_lines)]:
+        label, old_total = old_lines.get(key, (None, None))
+        new_label, new_total = new_lines.get(key, (None, None))
+        if old_total == new_total:
+            continue
+        lines.append({
+            "item": key,
+            "label": new_label or label,
+            "old": old_total,
+            "new": new_total,
+            "delta": round((new_total or 0) - (old_total or 0), 2),
+        })
+
+    grand_total_delta = round(new["grand_total"] - old["grand_total"], 2)
+    return {
+        "changed": bool(lines) or grand_total_delta != 0,
+        "lines": lines,
+        "old_grand_total": old["grand_total"],
+        "new_grand_total": new["grand_total"],
+        "grand_total_delta": grand_total_delta,
+    }
+
+
+def describe_price_change(diff: Dict[str, Any]) -> str:
+    """ข้อความสั้นๆ บอกลูกค้าว่าราคาเปลี่ยนเท่าไหร่ (ไม่ผ่าน LLM)"""
+    delta = diff["grand_total_delta"]
+    direction = "เพิ่มขึ้น" if delta > 0 else "ลดลง"
+    text = (
+        f"💱 ราคา{direction} {abs(delta):,.2f} บาท "
+        f"({diff['old_grand_total']:,.2f} → {diff['new_grand_total']:,.2f} บาท)"
+    )
+    for line in diff["lines"]:
+        if line["item"] == "vat":
+            continue
+        if line["old"] is None:
+            text += f"\n• เพิ่ม {line['label']}: +{line['new']:,.2f} บาท"
+        elif line["new"] is None:
+            text += f"\n• ตัด {line['label']}: -{line['old']:,.2f} บาท"
+        else:
+            text += f"\n• {line['label']}: {line['delta']:+,.2f} บาท"
+    return text
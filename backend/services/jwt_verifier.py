@@ -0,0 +1,141 @@
+"""
+JWT Verifier — ตรวจ Supabase access token ในเครื่อง (ไม่ต้องถาม /auth/v1/user ทุก request)
+
+- HS256 → SUPABASE_JWT_SECRET (Project Settings → API → JWT Secret), สร้าง key ครั้งเดียวตอนเริ่ม
+- RS256 / ES256 (asymmetric signing keys) → JWKS จาก {SUPABASE_URL}/auth/v1/.well-known/jwks.json
+  cache key ตาม kid ไว้ JWT_JWKS_TTL_S วินาที, เจอ kid ใหม่ (rotate key) → โหลดใหม่ทันที (ไม่ถี่กว่า JWKS_MIN_REFRESH_S)
+- ตรวจ signature + exp + aud (SUPABASE_JWT_AUDIENCE, default "authenticated")
+
+verify(token):
+- claims (dict)  → token ใช้ได้
+- TokenInvalid   → token ปลอม / หมดอายุ / aud ไม่ตรง
+- None           → ตรวจในเครื่องไม่ได้ (alg ที่ไม่มี key, โหลด JWKS ไม่ได้) → ผู้เรียกถาม Supabase Auth แทน
+"""
+
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import httpx
+from jose import jwk, jwt
+from jose.exceptions import JOSEError
+
+JWT_JWKS_TTL_S = float(os.getenv("JWT_JWKS_TTL_S", "600"))
+JWKS_MIN_REFRESH_S = 30.0
+ASYMMETRIC_ALGORITHMS = ("RS256", "ES256")
+
+
+class TokenInvalid(Exception):
+    """token ตรวจในเครื่องแล้วใช้ไม่ได้ (signature / exp / aud)"""
+
+
+async def _http_fetch_jwks(url: str) -> Dict[str, Any]:
+    async with httpx.AsyncClient(timeout=5) as client:
+        response = await client.get(url)
+        response.raise_for_status()
+        return response.json()
+
+
+class JWTVerifier:
+    """
+    Usage:
+        verifier = JWTVerifier(secret=os.getenv("SUPABASE_JWT_SECRET"))
+        claims = await verifier.verify(token)   # {"sub", "email", "exp", ...}
+    """
+
+    def __init__(
+        self,
+        secret: Optional[str] = None,
+        jwks_url: Optional[str] = None,
+        audience: str = "authenticated",
+        jwks_ttl: float = JWT_JWKS_TTL_S,
+        fetch_jwks: Optional[Callable[[str], Awaitable[Dict[str, Any]]]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.audience = audience
+        self.jwks_url = jwks_url
+        self.jwks_ttl = jwks_ttl
+        self._hs_key = jwk.construct(secret, "HS256") if secret else None
+        self._fetch_jwks = fetch_jwks or _http_fetch_jwks
+        self._clock = clock
+        self._jwks: Dict[str, Any] = {}  # kid → jose Key
+        self._jwks_fetched_at: Optional[float] = None
+
+    async def _refresh_jwks(self) -> None:
+        keys = {}
+        for entry in (await self._fetch_jwks(self.jwks_url)).get("keys", []):
+            if entry.get("kid") and entry.get("alg") in ASYMMETRIC_ALGORITHMS:
+                keys[entry["kid"]] = jwk.construct(entry, entry["alg"])
+        self._jwks = keys
+        self._jwks_fetched_at = self._clock()
+
+    async def _signing_key(self, alg: str, kid: Optional[str]) -> Any:
+        """key ที่ใช้ตรวจ token นี้ — None = ไม่มี key ในเครื่อง"""
+        if alg == "HS256":
+            return self._hs_key
+        if alg not in ASYMMETRIC_ALGORITHMS or not self.jwks_url or not kid:
+            return None
+
+        age = None if self._jwks_fetched_at is None else self._clock() - self._jwks_fetched_at
+        stale = age is None or age >= self.jwks_ttl
+        unknown_kid = kid not in self._jwks and (age is None or age >= JWKS_MIN_REFRESH_S)
+        if stale or unknown_kid:
+            try:
+                await self._refresh_jwks()
+            except (httpx.HTTPError, ValueError, JOSEError):
+                # โหลดไม่ได้ → ใช้ key ชุดเดิม (ถ้ามี)
+                self._jwks_fetched_at = self._clock()
+        return self._jwks.get(kid)
+
+    async def verify(self, token: str) -> Optional[Dict[str, Any]]:
+        try:
+            header = jwt.get_unverified_header(token)
+        except JOSEError as e:
+            raise TokenInvalid(f"Malformed token: {e}") from e
+
+        alg = header.get("alg")
+        key = await self._signing_key(alg, header.get("kid"))
+        if key is None:
+            return None
+
+        try:
+            claims = jwt.decode(token, key, algorithms=[alg], audience=self.audience)
+        except JOSEError as e:
+            raise TokenInvalid(str(e)) from e
+        if not claims.get("sub"):
+            raise TokenInvalid("Token has no subject")
+        return claims
+
+
+# ===================================
+# Singleton
+# ===================================
+_verifier: Optional[JWTVerifier] = None
+_configured = False
+
+
+def _from_env() -> Optional[JWTVerifier]:
+    secret = os.getenv("SUPABASE_JWT_SECRET")
+    url = os.getenv("SUPABASE_URL")
+    # SQLite (offline) ใช้ token คงที่ ไม่ใช่ JWT → ไม่ใช้ JWKS ของ Supabase
+    supabase = os.getenv("DB_BACKEND", "").lower() in ("", "supabase")
+    jwks_url = f"{url.rstrip('/')}/auth/v1/.well-known/jwks.json" if url and supabase else None
+    if not secret and not jwks_url:
+        return None
+    return JWTVerifier(secret, jwks_url, os.getenv("SUPABASE_JWT_AUDIENCE", "authenticated"))
+
+
+def get_token_verifier() -> Optional[JWTVerifier]:
+    """Get or create verifier ตาม env (singleton) — None = ตรวจในเครื่องไม่ได้ ใช้ Supabase Auth อย่างเดียว"""
+    global _verifier, _configured
+    if not _configured:
+        _verifier = _from_env()
+        _configured = True
+    return _verifier
+
+
+def set_token_verifier(verifier: Optional[JWTVerifier]) -> None:
+    """แทน verifier (test / benchmark) — None = กลับไปอ่าน env ใหม่ครั้งถัดไป"""
+    global _verifier, _configured
+    _verifier = verifier
+    _configured = verifier is not None
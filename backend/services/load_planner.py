@@ -0,0 +1,187 @@
+"""
+Load Planner
+ประเมินการขนส่ง: มัดกล่องพับแบนจากโรงงาน + กล่องบรรจุสินค้าบนพาเลท
+
+หลักการ:
+- มัด: กล่องพับแบน BUNDLE_SIZES ใบต่อมัด
+- พาเลท (layer-based 3D heuristic):
+  1. ชั้นละกี่ใบ: จัดวางพื้นกล่อง (ยาว × กว้าง, หมุนได้) บนพาเลทด้วย guillotine_layout
+     (ตัวเดียวกับจัด blank บนแผ่น — cache ตามขนาด)
+  2. ซ้อนกี่ชั้น: น้อยสุดของ ความสูงที่รถรับได้ / แรงกดที่กล่องชั้นล่างสุดรับได้ (McKee) / น้ำหนักที่พาเลทรับได้
+  3. จำนวนพาเลท + น้ำหนักต่อพาเลท + แรงกดบนกล่องชั้นล่างเทียบกับ BCT
+- กล่องตั้งตามแนวปกติเสมอ (BCT วัดตามแนวตั้งของกล่อง)
+"""
+
+import math
+from functools import lru_cache
+from typing import Any, Dict, Tuple
+
+from api.analyze import cached_box_strength
+from services.board_nesting import dieline_blank, guillotine_layout, to_mm
+from utils.constants import BUNDLE_SIZES, DIELINE_ALLOWANCES, PALLET_SPECS
+
+
+# ===================================
+# Layer Pattern
+# ===================================
+@lru_cache(maxsize=1024)
+def _layer_pattern(pallet: str, length_mm: int, width_mm: int) -> Tuple[int, Tuple[Tuple[int, int, int, int, bool], ...]]:
+    """จำนวนกล่องต่อชั้น + blocks (ไม่ให้ยื่นเกินขอบพาเลท)"""
+    spec = PALLET_SPECS[pallet]
+    return guillotine_layout(to_mm(spec["length_cm"]), to_mm(spec["width_cm"]), length_mm, width_mm)
+
+
+def layer_pattern(pallet: str, length: float, width: float) -> Dict[str, Any]:
+    """
+    รูปแบบการวางกล่อง 1 ชั้นบนพาเลท
+
+    Returns:
+        {"boxes_per_layer", "utilization_pct", "blocks": [{"x_cm", "y_cm", "cols", "rows", "rotated"}]}
+    """
+    spec = PALLET_SPECS[pallet]
+    count, blocks = _layer_pattern(pallet, to_mm(length), to_mm(width))
+    return {
+        "boxes_per_layer": count,
+        "utilization_pct": round(count * length * width / (spec["length_cm"] * spec["width_cm"]) * 100, 2),
+        "blocks": [
+            {"x_cm": x / 10, "y_cm": y / 10, "cols": cols, "rows": rows, "rotated": rotated}
+            for x, y, cols, rows, rotated in blocks
+        ],
+    }
+
+
+# ===================================
+# Bundles (กล่องพับแบนจากโรงงาน)
+# ===================================
+def plan_bundles(box_type: str, width: float, length: float, height: float, quantity: int) -> Dict[str, Any]:
+    """
+    จำนวนมัดกล่องพับแบน
+
+    ขนาดพับแบน = ครึ่งของ blank ตามความยาว (2 ผนังซ้อนกัน) + ลิ้นกาว
+    """
+    blank_length, blank_width = dieline_blank(box_type, width, length, height)
+    per_bundle = BUNDLE_SIZES[box_type]
+    return {
+        "per_bundle": per_bundle,
+        "count": math.ceil(quantity / per_bundle),
+        "flat_size_cm": {
+            "length": round(blank_length - (length + width), 2),
+            "width": round(blank_width, 2),
+        },
+        "glue_tab_cm": DIELINE_ALLOWANCES[box_type]["glue_tab_cm"],
+    }
+
+
+# ===================================
+# Pallet Plan
+# ===================================
+def plan_load(
+    box_type: str,
+    width: float,
+    length: float,
+    height: float,
+    quantity: int,
+    weight_kg: float = 0.0,
+    flute_type: str = "C",
+    pallet: str = "standard",
+) -> Dict[str, Any]:
+    """
+    แผนการขนส่งกล่องบรรจุสินค้า quantity ใบ
+
+    Args:
+        box_type: "rsc" หรือ "die_cut"
+        width, length, height: ขนาดกล่อง (cm)
+        quantity: จำนวนกล่อง
+        weight_kg: น้ำหนักสินค้าต่อกล่อง (0 = ไม่ทราบ → จำกัดด้วยความสูงอย่างเดียว)
+        flute_type: ลอนกระดาษ (ใช้คำนวณ BCT)
+        pallet: ชนิดพาเลทใน PALLET_SPECS
+
+    Returns:
+        {
+            "pallet": ข้อมูลพาเลท, "bundles": ผลของ plan_bundles, "layer": ผลของ layer_pattern,
+            "layers_per_pallet", "boxes_per_pallet", "limited_by": "height" | "strength" | "pallet_load",
+            "pallet_count", "last_pallet_boxes", "stack_height_cm", "pallet_weight_kg",
+            "stack": {"bottom_load_kg", "max_load_kg", "bct_kgf", "safety_factor", "status"}
+        }
+
+    Raises:
+        ValueError: พาเลทไม่รู้จัก, กล่องใหญ่/สูงเกินพาเลท
+    """
+    if pallet not in PALLET_SPECS:
+        raise ValueError(f"ไม่รู้จักพาเลท '{pallet}' (ใช้ได้: {', '.join(PALLET_SPECS)})")
+    spec = PALLET_SPECS[pallet]
+
+    layer = layer_pattern(pallet, length, width)
+    per_layer = layer["boxes_per_layer"]
+    if per_layer == 0:
+        raise ValueError(f"กล่อง {width}x{length} ซม. ใหญ่เกินพาเลท {spec['length_cm']}x{spec['width_cm']} ซม.")
+
+    by_height = int((spec["max_stack_height_cm"] - spec["deck_height_cm"]) // height)
+    if by_height == 0:
+        raise ValueError(f"กล่องสูง {height} ซม. เกินความสูงที่ซ้อนบนพาเลทได้")
+
+    # แรงกดที่กล่องชั้นล่างสุดรับได้ (max_load_kg = BCT / stacking factor 3)
+    strength = cached_box_strength(length, width, height, weight_kg, flute_type)
+    layers, limited_by = by_height, "height"
+    if weight_kg > 0:
+        by_strength = int(strength["max_load_kg"] // weight_kg) + 1
+        if by_strength < layers:
+            layers, limited_by = by_strength, "strength"
+
+    boxes_per_pallet = per_layer * layers
+    if weight_kg > 0:
+        by_load = int(spec["max_load_kg"] // weight_kg)
+        if by_load < boxes_per_pallet:
+            boxes_per_pallet, limited_by = max(by_load, 1), "pallet_load"
+            layers = math.ceil(boxes_per_pallet / per_layer)
+
+    pallet_count = math.ceil(quantity / boxes_per_pallet)
+    bottom_load = (layers - 1) * weight_kg
+
+    return {
+        "pallet": {
+            "type": pallet,
+            "name": spec["name"],
+            "length_cm": spec["length_cm"],
+            "width_cm": spec["width_cm"],
+            "max_load_kg": spec["max_load_kg"],
+        },
+        "bundles": plan_bundles(box_type, width, length, height, quantity),
+        "layer": layer,
+        "layers_per_pallet": layers,
+        "boxes_per_pallet": boxes_per_pallet,
+        "limited_by": limited_by,
+        "pallet_count": pallet_count,
+        "last_pallet_boxes": quantity - (pallet_count - 1) * boxes_per_pallet,
+        "stack_height_cm": round(spec["deck_height_cm"] + layers * height, 2),
+        "pallet_weight_kg": round(boxes_per_pallet * weight_kg + spec["tare_kg"], 2),
+        "stack": {
+            "bottom_load_kg": round(bottom_load, 2),
+            "max_load_kg": strength["max_load_kg"],
+            "bct_kgf": strength["bct_kgf"],
+            "safety_factor": round(strength["max_load_kg"] / bottom_load, 2) if bottom_load > 0 else None,
+            "status": "SAFE" if bottom_load <= strength["max_load_kg"] else "DANGER",
+        },
+    }
+
+
+def format_load_plan_for_chat(plan: Dict[str, Any]) -> str:
+    """สรุปแผนขนส่งสั้นๆ ต่อท้ายใบเสนอราคา (ไม่ผ่าน LLM)"""
+    limited = {
+        "height": "ความสูงที่ซ้อนได้",
+        "strength": "แรงกดที่กล่องชั้นล่างรับได้",
+        "pallet_load": "น้ำหนักที่พาเลทรับได้",
+    }[plan["limited_by"]]
+    lines = [
+        "🚚 **การขนส่ง (ประมาณการ)**",
+        f"• ส่งจากโรงงาน: {plan['bundles']['count']:,} มัด (มัดละ {plan['bundles']['per_bundle']} ใบ พับแบน)",
+        f"• บรรจุสินค้าแล้ว: ชั้นละ {plan['layer']['boxes_per_layer']} กล่อง × {plan['layers_per_pallet']} ชั้น "
+        f"= {plan['boxes_per_pallet']:,} กล่อง/{plan['pallet']['name']} (จำกัดด้วย{limited})",
+        f"• ใช้ {plan['pallet_count']:,} พาเลท (พาเลทสุดท้าย {plan['last_pallet_boxes']:,} กล่อง)",
+    ]
+    if plan["stack"]["bottom_load_kg"] > 0:
+        lines.append(
+            f"• กล่องชั้นล่างรับน้ำหนัก {plan['stack']['bottom_load_kg']:.1f} kg "
+            f"(รับได้ {plan['stack']['max_load_kg']:.1f} kg)"
+        )
+    return "\n".join(lines)
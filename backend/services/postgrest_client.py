@@ -0,0 +1,150 @@
+"""
+PostgREST Client — Supabase แบบ async (Service Key)
+แทน supabase-py (sync) ที่บล็อก event loop ทุกครั้งที่ query จาก async handler
+
+- httpx.AsyncClient ตัวเดียวใช้ร่วมกันทั้ง process → connection pool (keep-alive) ไม่ต้อง handshake ใหม่ทุก query
+- timeout ต่อ request (DB_TIMEOUT_S) + retry แบบ exponential backoff (DB_MAX_RETRIES)
+  - ต่อไม่ติด / รอ pool เกินเวลา (request ยังไม่ถึง server) → retry ได้ทุก method
+  - อ่านไม่ทัน / 502-504 → retry เฉพาะ request ที่ทำซ้ำได้ (GET, PATCH ตาม id) — POST insert ไม่ retry กันแถวซ้ำ
+- ใช้ service_key → bypass RLS (สิทธิ์ตรวจที่ API layer เหมือนเดิม)
+"""
+
+import asyncio
+import os
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+DB_TIMEOUT_S = float(os.getenv("DB_TIMEOUT_S", "5"))
+DB_MAX_RETRIES = int(os.getenv("DB_MAX_RETRIES", "2"))
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+RETRY_BACKOFF_S = 0.1
+RETRY_STATUS = (502, 503, 504)
+
+# request ยังไม่ถึง server → ส่งซ้ำได้แม้เป็น POST
+_NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class PostgrestError(Exception):
+    """query ไม่สำเร็จ (HTTP error จาก PostgREST หรือ retry ครบแล้วยังต่อไม่ได้)"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class PostgrestClient:
+    """
+    Async client สำหรับ Supabase REST (/rest/v1) + ตรวจ access token (/auth/v1/user)
+
+    Usage:
+        client = PostgrestClient(url, service_key)
+        rows = await client.select("orders", {"user_id": uid}, order="created_at.desc")
+        await client.aclose()
+    """
+
+    def __init__(
+        self,
+        url: str,
+        service_key: str,
+        timeout: float = DB_TIMEOUT_S,
+        max_retries: int = DB_MAX_RETRIES,
+        pool_size: int = DB_POOL_SIZE,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.max_retries = max_retries
+        self._service_key = service_key
+        self._http = httpx.AsyncClient(
+            base_url=url.rstrip("/"),
+            headers={"apikey": service_key, "Authorization": f"Bearer {service_key}"},
+            timeout=httpx.Timeout(timeout),
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            transport=transport,
+        )
+
+    async def _send(
+        self,
+        method: str,
+        path: str,
+        idempotent: bool,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """ส่ง request + retry ตามกติกาด้านบน"""
+        attempt = 0
+        while True:
+            retry = attempt < self.max_retries
+            try:
+                response = await self._http.request(method, path, **kwargs)
+            except _NOT_SENT_ERRORS as e:
+                if not retry:
+                    raise PostgrestError(f"{method} {path}: {type(e).__name__}") from e
+            except httpx.TransportError as e:
+                if not (retry and idempotent):
+                    raise PostgrestError(f"{method} {path}: {type(e).__name__}") from e
+            else:
+                if not (retry and idempotent and response.status_code in RETRY_STATUS):
+                    return response
+            await asyncio.sleep(RETRY_BACKOFF_S * 2 ** attempt)
+            attempt += 1
+
+    async def _rest(
+        self,
+        method: str,
+        table: str,
+        idempotent: bool,
+        params: Optional[Dict[str, str]] = None,
+        json: Any = None,
+    ) -> List[Dict[str, Any]]:
+        headers = {"Prefer": "return=representation"} if method in ("POST", "PATCH") else None
+        response = await self._send(
+            method, f"/rest/v1/{table}", idempotent, params=params, json=json, headers=headers
+        )
+        if response.status_code >= 400:
+            raise PostgrestError(f"{method} {table}: {response.text}", response.status_code)
+        return response.json()
+
+    @staticmethod
+    def _filters(filters: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """{"id": 1} → {"id": "eq.1"} (PostgREST horizontal filtering)"""
+        return {column: f"eq.{value}" for column, value in (filters or {}).items()}
+
+    async def select(
+        self,
+        table: str,
+        filters: Optional[Dict[str, Any]] = None,
+        columns: str = "*",
+        order: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """SELECT columns FROM table WHERE col = value ... (order เช่น "created_at.desc")"""
+        params = {"select": columns, **self._filters(filters)}
+        if order:
+            params["order"] = order
+        if limit is not None:
+            params["limit"] = str(limit)
+        return await self._rest("GET", table, True, params=params)
+
+    async def insert(self, table: str, row: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """INSERT แล้วคืนแถวที่สร้าง (ไม่ retry เมื่อส่งไปแล้ว — กันแถวซ้ำ)"""
+        return await self._rest("POST", table, False, json=row)
+
+    async def update(
+        self, table: str, values: Dict[str, Any], filters: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """UPDATE ... WHERE col = value แล้วคืนแถวที่แก้ (ไม่มีแถวตรง → [])"""
+        return await self._rest("PATCH", table, True, params=self._filters(filters), json=values)
+
+    async def get_user(self, access_token: str) -> Optional[Dict[str, Any]]:
+        """ตรวจ access token กับ Supabase Auth → {"id", "email", ...} หรือ None ถ้า token ใช้ไม่ได้"""
+        response = await self._send(
+            "GET", "/auth/v1/user", True,
+            headers={"apikey": self._service_key, "Authorization": f"Bearer {access_token}"},
+        )
+        if response.status_code in (401, 403):
+            return None
+        if response.status_code >= 400:
+            raise PostgrestError(f"GET /auth/v1/user: {response.text}", response.status_code)
+        return response.json()
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
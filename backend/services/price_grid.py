@@ -0,0 +1,105 @@
+"""
+Price Grid
+ตารางราคาแบบ dense สำหรับ sweep จำนวน × ขนาด × วัสดุ (กราฟราคา vs จำนวน, ตาราง tier ราคา)
+
+หลักการ:
+- spec หลัก 1 ชุด + แกนที่ต้องการ sweep (quantities, widths, lengths, heights, materials)
+- แต่ละแกนวางคนละมิติของ array แล้ว broadcast ผ่าน price_arrays (สูตรเดียวกับ batch/scalar)
+  → วัสดุละ 1 รอบ ไม่ว่าจะมีกี่ช่องในตาราง
+- ทุกช่องมีค่าเท่ากับ get_price_estimate ของ spec นั้น (ปัดเศษแบบเดียวกัน)
+"""
+
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+from services.batch_pricing import price_arrays, round2_array
+from services.pricing_calculator import canonical_options
+from services.pricing_catalog import get_pricing_catalog
+from utils.constants import BOX_TYPES
+
+# ลำดับมิติของ array ผลลัพธ์ (row-major)
+GRID_AXES = ("material", "width", "length", "height", "quantity")
+GRID_METRICS = ("grand_total", "price_per_box", "subtotal")
+MAX_GRID_CELLS = 250_000
+
+
+def price_grid(
+    base: Dict[str, Any],
+    axes: Dict[str, Sequence[Any]],
+    metrics: Sequence[str] = ("grand_total", "price_per_box"),
+) -> Dict[str, Any]:
+    """
+    คำนวณตารางราคา
+
+    Args:
+        base: spec หลัก (format เดียวกับ get_price_estimate)
+        axes: {"quantities": [...], "widths": [...], "lengths": [...], "heights": [...], "materials": [...]}
+              แกนที่ไม่ระบุใช้ค่าจาก base (ขนาด 1)
+        metrics: ค่าที่ต้องการ (grand_total, price_per_box, subtotal)
+
+    Returns:
+        {"axes": {แกน: ค่า}, "shape": [...], "values": {metric: ndarray shape เดียวกับ "shape"},
+         "catalog_version": version ของ catalog ที่ใช้คำนวณ}
+
+    Raises:
+        ValueError: วัสดุไม่มีสำหรับ box_type นี้, metric ไม่รู้จัก, ตารางใหญ่เกิน MAX_GRID_CELLS,
+                    material_mode ไม่ใช่ "area"
+    """
+    box_type = base["box_type"]
+    if box_type not in BOX_TYPES:
+        raise ValueError(f"ไม่รู้จักประเภทกล่อง '{box_type}'")
+    if base.get("material_mode", "area") != "area":
+        raise ValueError("ตารางราคารองรับเฉพาะ material_mode 'area'")
+
+    dims = base["dimensions"]
+    axis_values: Dict[str, List[Any]] = {
+        "material": list(axes.get("materials") or [base["material"]]),
+        "width": [float(v) for v in axes.get("widths") or [dims["width"]]],
+        "length": [float(v) for v in axes.get("lengths") or [dims["length"]]],
+        "height": [float(v) for v in axes.get("heights") or [dims["height"]]],
+        "quantity": [int(v) for v in axes.get("quantities") or [base["quantity"]]],
+    }
+
+    unknown = [m for m in metrics if m not in GRID_METRICS]
+    if unknown:
+        raise ValueError(f"ไม่รู้จัก metric: {', '.join(unknown)}")
+
+    catalog = get_pricing_catalog()
+    for material in axis_values["material"]:
+        catalog.resolve_material(box_type, material)
+
+    shape = tuple(len(axis_values[axis]) for axis in GRID_AXES)
+    cells = int(np.prod(shape))
+    if cells > MAX_GRID_CELLS:
+        raise ValueError(f"ตารางใหญ่เกินไป ({cells:,} ช่อง, สูงสุด {MAX_GRID_CELLS:,})")
+
+    # แต่ละแกนอยู่คนละมิติ → broadcast เป็น (W, L, H, Q)
+    width = np.array(axis_values["width"])[:, None, None, None]
+    length = np.array(axis_values["length"])[None, :, None, None]
+    height = np.array(axis_values["height"])[None, None, :, None]
+    quantity = np.array(axis_values["quantity"], dtype=np.float64)[None, None, None, :]
+
+    coatings, stampings, _, _ = canonical_options(base)  # ลำดับเดียวกับ get_price_estimate
+
+    values = {metric: np.empty(shape) for metric in metrics}
+    for m, material in enumerate(axis_values["material"]):
+        priced = price_arrays(
+            box_type, material, base.get("inner") or None, coatings, stampings,
+            width, length, height, quantity, catalog,
+        )
+        grand_total = np.broadcast_to(priced["grand_total"], shape[1:])
+        if "grand_total" in values:
+            values["grand_total"][m] = grand_total
+        if "subtotal" in values:
+            values["subtotal"][m] = np.broadcast_to(priced["subtotal"], shape[1:])
+        if "price_per_box" in values:
+            # เหมือน build_pricing_response: round(grand_total / quantity, 2)
+            values["price_per_box"][m] = round2_array(grand_total / quantity)
+
+    return {
+        "axes": axis_values,
+        "shape": list(shape),
+        "values": values,
+        "catalog_version": catalog.version,
+    }
@@ -6,22 +6,36 @@ Logic หลัก:
 1. คำนวณพื้นที่ผิวกล่อง (Surface Area)
 2. หา Factor เทียบกับกล่องมาตรฐาน 10x10x10
 3. คำนวณราคาวัสดุ
+   - material_mode="area" (default): พื้นที่ผิว × production factor
+   - material_mode="sheets": จำนวนแผ่นตั้งต้นที่ใช้จริง (services/board_nesting)
 4. บวกราคา Inner, Coating, ลูกเล่นพิเศษ
+
+get_price_estimate มี LRU cache (key = spec แบบ canonical + version ของ catalog)
+→ spec เดิมซ้ำ (/calculate, ขั้น quote, ย้อนจากขั้น 13 ไป 11) ไม่ต้องคำนวณใหม่
 """
 
-from typing import Dict, Optional, List, Tuple
-from utils.constants import (
-    STANDARD_BOX, BOX_TYPES, RSC_MATERIALS, DIE_CUT_MATERIALS,
-    INNER_MATERIALS, MOISTURE_COATINGS, FOOD_GRADE_COATINGS,
-    GLOSS_COATINGS, MATTE_COATINGS, EMBOSS_PRICING, FOIL_STAMPING
-)
+import os
+from typing import Any, Dict, Optional, List, Tuple
+from services.board_nesting import nest_boxes
+from services.pricing_catalog import PricingCatalog, get_pricing_catalog
+from utils.constants import STANDARD_BOX, BOX_TYPES
+from utils.lru_cache import LRUCache
+
+
+# วิธีคิดราคาวัสดุ: area = พื้นที่ผิว × production factor, sheets = จำนวนแผ่นตั้งต้นที่ใช้จริง
+MATERIAL_MODES = ("area", "sheets")
 
 
 class PricingCalculator:
     """คำนวณราคากล่อง"""
     
-    def __init__(self):
+    def __init__(self, catalog: Optional[PricingCatalog] = None, material_mode: str = "area"):
+        if material_mode not in MATERIAL_MODES:
+            raise ValueError(f"ไม่รู้จัก material_mode '{material_mode}' (ใช้ได้: {', '.join(MATERIAL_MODES)})")
         self.standard_area = STANDARD_BOX["surface_area_cm2"]
+        # ยึด catalog ตัวเดียวตลอดอายุ calculator → ทุกบรรทัดในใบเสนอราคามาจาก version เดียวกัน
+        self.catalog = catalog or get_pricing_catalog()
+        self.material_mode = material_mode
     
     # ===================================
     # 1. คำนวณพื้นที่ผิว
@@ -107,38 +121,71 @@ class PricingCalculator:
                 "price_per_box": ราคาต่อใบ,
                 "total_price": ราคารวม,
                 "material_info": ข้อมูลวัสดุ,
-                "ratio": Factor ที่ใช้คำนวณ
+                "ratio": Factor ที่ใช้คำนวณ,
+                "nesting": ผลจัดวางบนแผ่น (เฉพาะ material_mode="sheets")
             }
         """
-        # เลือก material database
-        materials_db = RSC_MATERIALS if box_type == "rsc" else DIE_CUT_MATERIALS
-        
-        if material not in materials_db:
-            raise ValueError(f"ไม่มีวัสดุ '{material}' สำหรับกล่อง {box_type}")
-        
-        mat_data = materials_db[material]
-        
-        # คำนวณราคาวัสดุขนาด 10x10x10 (base price)
-        base_price = self._calculate_material_cost(
-            10, 10, 10, box_type, mat_data
-        )
+        # วัสดุจาก catalog (รับ id เก่าได้, ไม่มี → ValueError)
+        entry = self.catalog.material(box_type, material)
+        mat_data = entry.data
         
         # หา Factor
         ratio = self.calculate_price_ratio(width, length, height, box_type)
         
-        # ราคาต่อกล่อง = base_price × ratio
-        price_per_box = base_price * ratio
+        nesting = None
+        if self.material_mode == "sheets":
+            # ราคาต่อกล่อง = ค่าแผ่นที่ใช้จริง / จำนวนกล่อง + ค่าแรง
+            price_per_box, nesting = self._calculate_sheet_material_cost(
+                width, length, height, box_type, mat_data, quantity
+            )
+        else:
+            # ราคาต่อกล่อง = base_price (ราคาวัสดุขนาด 10x10x10 — คำนวณไว้แล้วใน catalog) × ratio
+            price_per_box = entry.base_price * ratio
         
         # ถ้าสั่งมากอาจได้ส่วนลด (ตอนนี้ยังไม่ใส่)
         total_price = price_per_box * quantity
         
-        return {
+        result = {
             "price_per_box": round(price_per_box, 2),
             "total_price": round(total_price, 2),
             "material_info": mat_data,
             "ratio": round(ratio, 2),
             "quantity": quantity
         }
+        if nesting is not None:
+            result["nesting"] = nesting
+        return result
+    
+    def _calculate_sheet_material_cost(
+        self,
+        width: float,
+        length: float,
+        height: float,
+        box_type: str,
+        material_data: Dict,
+        quantity: int
+    ) -> Tuple[float, Dict]:
+        """
+        ต้นทุนวัสดุจากจำนวนแผ่นตั้งต้นที่ใช้จริง (แทนพื้นที่ผิว × production factor)
+        
+        Returns:
+            (ต้นทุนต่อกล่อง, ผลจัดวางจาก nest_boxes)
+        
+        Raises:
+            ValueError: กล่องกางออกแล้วใหญ่เกินแผ่น
+        """
+        nesting = nest_boxes(box_type, width, length, height, quantity)
+        
+        # ความหนาแบบเดียวกับ _calculate_material_cost
+        if "gsm" in material_data:
+            thickness = material_data["gsm"] / (material_data["density"] * 10000)
+        else:
+            thickness = material_data["thickness_cm"]
+        
+        sheet_weight_kg = nesting["sheet_area_cm2"] * thickness * material_data["density"] / 1000
+        sheets_cost = nesting["sheets_needed"] * sheet_weight_kg * material_data["paper_cost_per_kg"]
+        
+        return sheets_cost / quantity + material_data["labor_cost"], nesting
     
     def _calculate_material_cost(
         self,
@@ -202,14 +249,10 @@ class PricingCalculator:
         Returns:
             {"price_per_box": X, "total_price": Y}
         """
-        if inner_type not in INNER_MATERIALS:
+        inner_entry = self.catalog.inner(inner_type)
+        if inner_entry is None:
             return {"price_per_box": 0, "total_price": 0}
         
-        inner_data = INNER_MATERIALS[inner_type]
-        
-        # ใช้ราคาเฉลี่ย (ไว้ใช้ในอนาคตถ้าต้องการคำนวณแบบละเอียด)
-        avg_price_per_kg = sum(inner_data["price_per_kg"]) / 2
-        
         # Inner pricing: ใช้ Base price + Factor ตามขนาด
         # ราคาฐาน (สำหรับกล่อง 10x10x10) ประมาณ 10 บาท
         # กระดาษฝอย/บับเบิ้ลใช้เป็น padding ไม่ได้ใช้มาก
@@ -227,7 +270,7 @@ class PricingCalculator:
         return {
             "price_per_box": round(price_per_box, 2),
             "total_price": round(price_per_box * quantity, 2),
-            "name": inner_data["name"]
+            "name": inner_entry.name
         }
     
     # ===================================
@@ -256,27 +299,12 @@ class PricingCalculator:
         Returns:
             {"price_per_box": X, "total_price": Y, "name": "..."}
         """
-        # เลือก database ตาม category
-        coatings_db = {
-            "moisture": MOISTURE_COATINGS,
-            "food_grade": FOOD_GRADE_COATINGS,
-            "gloss": GLOSS_COATINGS,
-            "matte": MATTE_COATINGS
-        }
-        
-        if coating_category not in coatings_db:
-            return {"price_per_box": 0, "total_price": 0, "name": ""}
-        
-        coating_db = coatings_db[coating_category]
-        
-        if coating_type not in coating_db:
+        coating_entry = self.catalog.coating(coating_type, coating_category)
+        if coating_entry is None:
             return {"price_per_box": 0, "total_price": 0, "name": ""}
         
-        coating_data = coating_db[coating_type]
-        
-        # ราคาฐาน (กล่อง 10x10x10)
-        base_price_range = coating_data["price_range_10x10x10"]
-        avg_base_price = sum(base_price_range) / 2
+        # ราคาฐาน (เฉลี่ย กล่อง 10x10x10)
+        avg_base_price = coating_entry.base_price
         
         # หา Factor
         ratio = self.calculate_price_ratio(width, length, height, box_type)
@@ -287,7 +315,7 @@ class PricingCalculator:
         return {
             "price_per_box": round(price_per_box, 2),
             "total_price": round(price_per_box * quantity, 2),
-            "name": coating_data["name"]
+            "name": coating_entry.name
         }
     
     # ===================================
@@ -295,7 +323,7 @@ class PricingCalculator:
     # ===================================
     def calculate_stamping_price(
         self,
-        stamp_type: str,  # "emboss", "foil_regular", "foil_detailed", "foil_emboss"
+        stamp_type: str,  # "emboss", "deboss", "foil_regular", "foil_detailed", "foil_emboss"
         has_existing_block: bool,
         quantity: int
     ) -> Dict:
@@ -310,31 +338,20 @@ class PricingCalculator:
         Returns:
             {"block_cost": X, "stamp_cost_per_box": Y, "total": Z}
         """
-        # ราคาบล็อก (ถ้ายังไม่มี)
-        block_cost = 0
-        stamp_cost_per_box = 0
+        stamping_entry = self.catalog.stamping(stamp_type)
+        if stamping_entry is None:
+            return {"type": stamp_type, "block_cost": 0, "stamp_cost_per_box": 0, "total": 0}
         
-        if stamp_type == "emboss":
-            if not has_existing_block:
-                block_cost = sum(EMBOSS_PRICING["block_cost"]) / 2
-            stamp_cost_per_box = EMBOSS_PRICING["stamp_cost_per_box"]
-            
-        elif stamp_type.startswith("foil"):
-            foil_key = stamp_type.replace("foil_", "")
-            if foil_key not in FOIL_STAMPING:
-                return {"block_cost": 0, "stamp_cost_per_box": 0, "total": 0}
-            
-            foil_data = FOIL_STAMPING[foil_key]
-            
-            if not has_existing_block:
-                block_cost = sum(foil_data["block_cost"]) / 2
-            
-            stamp_cost_per_box = sum(foil_data["stamp_cost_per_box"]) / 2
+        # ราคาบล็อก (ถ้ายังไม่มี)
+        block_cost = 0 if has_existing_block else stamping_entry.block_cost
+        stamp_cost_per_box = stamping_entry.stamp_cost_per_box
         
         total_stamp_cost = stamp_cost_per_box * quantity
         total = block_cost + total_stamp_cost
         
         return {
+            "type": stamp_type,
+            "name": stamping_entry.name,
             "block_cost": round(block_cost, 2),
             "stamp_cost_per_box": round(stamp_cost_per_box, 2),
             "total_stamp_cost": round(total_stamp_cost, 2),
@@ -431,14 +448,90 @@ class PricingCalculator:
             "vat": round(vat, 2),
             "grand_total": round(grand_total, 2),
             "dimensions": {"width": width, "length": length, "height": height},
-            "quantity": quantity
+            "quantity": quantity,
+            "catalog_version": self.catalog.version
         }
 
 
+# ===================================
+# Canonical Spec & Result Cache
+# ===================================
+# จำนวนผลราคาที่เก็บไว้ (ผล 1 ตัว ≈ 2-3 KB → 2048 ตัว ≈ 5 MB)
+PRICING_CACHE_SIZE = int(os.getenv("PRICING_CACHE_SIZE", "2048"))
+_PRICING_CACHE = LRUCache(maxsize=PRICING_CACHE_SIZE)
+_MISSING = object()
+
+# ((coating_type, category), ...) / ((stamp_type, has_block), ...) เรียงแล้ว
+CoatingKey = Tuple[Tuple[str, str], ...]
+StampingKey = Tuple[Tuple[str, bool], ...]
+
+
+def canonical_options(
+    requirement_data: Dict,
+) -> Tuple[CoatingKey, StampingKey, List[int], List[int]]:
+    """
+    coatings / stampings แบบเรียงลำดับ (ลำดับที่ลูกค้าเลือกไม่มีผลต่อราคา)
+
+    Returns:
+        (coatings, stampings, coating_order, stamping_order)
+        order[j] = index ใน request ของรายการที่ j หลังเรียง (ใช้กับ restore_order)
+    """
+    raw_coatings = [(c["type"], c["category"]) for c in requirement_data.get("coatings") or ()]
+    raw_stampings = [
+        (s["type"], bool(s.get("has_block", False))) for s in requirement_data.get("stampings") or ()
+    ]
+    coating_order = sorted(range(len(raw_coatings)), key=raw_coatings.__getitem__)
+    stamping_order = sorted(range(len(raw_stampings)), key=raw_stampings.__getitem__)
+    return (
+        tuple(raw_coatings[i] for i in coating_order),
+        tuple(raw_stampings[i] for i in stamping_order),
+        coating_order,
+        stamping_order,
+    )
+
+
+def restore_order(values: List[Any], order: List[int]) -> List[Any]:
+    """list ที่เรียงตาม canonical → กลับเป็นลำดับเดียวกับ request"""
+    if len(values) < 2:
+        return values
+    restored = [None] * len(values)
+    for j, index in enumerate(order):
+        restored[index] = values[j]
+    return restored
+
+
+def _copy_result(
+    result: Dict[str, Any], coating_order: List[int], stamping_order: List[int]
+) -> Dict[str, Any]:
+    """
+    สำเนาของผลราคาใน cache (caller แก้ได้โดยไม่กระทบ cache) + คืนลำดับ coatings/stampings ตาม request
+
+    copy เฉพาะ dict/list ของผลราคา — material_info ยังชี้ตารางใน catalog เหมือนที่ไม่มี cache
+    (nesting ใช้ร่วมกับผลใน cache เช่นกัน — อ่านอย่างเดียว)
+    (deep copy ทั้งก้อนแพงกว่าคำนวณใหม่)
+    """
+    copied = dict(result)
+    copied["box_base"] = dict(result["box_base"])
+    copied["inner"] = dict(result["inner"])
+    copied["coatings"] = restore_order([dict(c) for c in result["coatings"]], coating_order)
+    copied["stampings"] = restore_order([dict(s) for s in result["stampings"]], stamping_order)
+    return copied
+
+
+def get_pricing_cache_stats() -> Dict[str, Any]:
+    """สถิติของ pricing cache (size, maxsize, hits, misses, evictions, hit_rate)"""
+    return _PRICING_CACHE.stats()
+
+
+def clear_pricing_cache() -> None:
+    """ล้าง pricing cache + สถิติ (ใช้ใน benchmark/tests)"""
+    _PRICING_CACHE.clear()
+
+
 # ===================================
 # Helper Function สำหรับ API
 # ===================================
-def get_price_estimate(requirement_data: Dict) -> Dict:
+def get_price_estimate(requirement_data: Dict, catalog: Optional[PricingCatalog] = None) -> Dict:
     """
     Function สำหรับเรียกใช้จาก API
     
@@ -450,24 +543,49 @@ def get_price_estimate(requirement_data: Dict) -> Dict:
             "quantity": 1000,
             "inner": "shredded_paper" (optional),
             "coatings": [...] (optional),
-            "stampings": [...] (optional)
+            "stampings": [...] (optional),
+            "material_mode": "area" | "sheets" (optional, default "area")
         }
+        catalog: catalog ที่จะใช้ (ไม่ระบุ = ตัวที่ใช้อยู่ตอนนี้)
     
     Returns:
-        ข้อมูลราคาทั้งหมด
+        ข้อมูลราคาทั้งหมด (+ catalog_version ที่ใช้คำนวณ)
+        coatings / stampings ในผลเรียงตามลำดับเดียวกับ request
     """
-    calculator = PricingCalculator()
+    catalog = catalog or get_pricing_catalog()
     
     dims = requirement_data["dimensions"]
+    box_type = requirement_data["box_type"]
+    material_mode = requirement_data.get("material_mode") or "area"
+    coatings, stampings, coating_order, stamping_order = canonical_options(requirement_data)
     
-    return calculator.calculate_total_price(
-        width=dims["width"],
-        length=dims["length"],
-        height=dims["height"],
-        box_type=requirement_data["box_type"],
-        material=requirement_data["material"],
-        quantity=requirement_data["quantity"],
-        inner_type=requirement_data.get("inner"),
-        coatings=requirement_data.get("coatings"),
-        stampings=requirement_data.get("stampings")
+    # key: ตัวเลขเป็น float (20 กับ 20.0 คือ spec เดียวกัน), วัสดุเป็น id หลัก (รวม alias),
+    #      coatings/stampings เรียงแล้ว, catalog version + fingerprint (reload แล้ว key เปลี่ยนเอง)
+    key = (
+        catalog.version, catalog.fingerprint, box_type,
+        catalog.resolve_material(box_type, requirement_data["material"]) if box_type in BOX_TYPES
+        else requirement_data["material"],
+        float(dims["width"]), float(dims["length"]), float(dims["height"]),
+        requirement_data["quantity"], requirement_data.get("inner") or None,
+        coatings, stampings, material_mode,
     )
+    
+    result = _PRICING_CACHE.get(key, _MISSING)
+    if result is _MISSING:
+        # คำนวณตามลำดับ canonical เสมอ → ผลจาก cache กับคำนวณใหม่เท่ากันทุกตัวเลข
+        result = PricingCalculator(catalog, material_mode).calculate_total_price(
+            width=dims["width"],
+            length=dims["length"],
+            height=dims["height"],
+            box_type=box_type,
+            material=requirement_data["material"],
+            quantity=requirement_data["quantity"],
+            inner_type=requirement_data.get("inner"),
+            coatings=[{"type": t, "category": c} for t, c in coatings],
+            stampings=[{"type": t, "has_block": b} for t, b in stampings]
+        )
+        _PRICING_CACHE.put(key, result)
+    
+    result = _copy_result(result, coating_order, stamping_order)
+    result["dimensions"] = {"width": dims["width"], "length": dims["length"], "height": dims["height"]}
+    return result
@@ -0,0 +1,476 @@
+"""
+Pricing Catalog
+แคตตาล็อกราคาที่ compile แล้ว — ตั้งต้นจาก utils/constants หรือไฟล์ JSON ที่มี version (hot-reload ได้)
+
+หลักการ:
+- ค่าคงที่ต่อวัสดุ / coating / การป๊ัม (ราคาฐาน 10x10x10, ราคาเฉลี่ยจากช่วงราคา) คำนวณไว้ล่วงหน้า
+  → ตอน quote เหลือแค่ ratio × ราคาฐาน × จำนวน (ไม่ต้องคำนวณน้ำหนักกระดาษ / สร้าง dict ใหม่ทุกครั้ง)
+- เป็นแหล่ง id เดียวของระบบ: PricingCalculator, batch_pricing, price_grid
+  และ /api/pricing/materials|coatings|stampings อ่านจากที่นี่
+- id เก่าที่เคยใช้ (chipboard, white_box_350gsm, whiteboard_350gsm) map ไปยัง id ใน constants
+- ค่าทุกตัวใช้ลำดับการคำนวณเดียวกับ PricingCalculator เดิม → ราคาเท่าเดิมทุกตัวเลข
+
+Hot reload (เปลี่ยนราคากระดาษ/coating โดยไม่ต้อง deploy หรือ restart):
+- ตั้ง PRICING_CATALOG_PATH → ไฟล์ JSON {"version": "...", "rsc_materials": {...}, ...}
+  ตารางที่ไม่ใส่ในไฟล์ใช้ค่าจาก constants
+- watch_catalog() เช็ค mtime ของไฟล์เป็นระยะ → validate + compile catalog ใหม่ทั้งก้อน
+  แล้วสลับ reference เดียว (atomic) — ฝั่งอ่านไม่ต้อง lock
+- ไฟล์ผิด → CatalogError, catalog เดิมยังใช้ต่อ
+- ผลราคาทุกตัวมี "catalog_version" → cache ที่เก็บผลราคาต้องใส่ version ใน key
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.constants import (
+    STANDARD_BOX, BOX_TYPES, RSC_MATERIALS, DIE_CUT_MATERIALS,
+    INNER_MATERIALS, MOISTURE_COATINGS, FOOD_GRADE_COATINGS,
+    GLOSS_COATINGS, MATTE_COATINGS, EMBOSS_PRICING, FOIL_STAMPING
+)
+
+# id เก่า (endpoint /materials เดิม, data_extractor) → id ใน constants
+MATERIAL_ALIASES = {
+    "chipboard": "cardboard",
+    "white_box_350gsm": "ivory_350gsm",
+    "whiteboard_350gsm": "ivory_350gsm",
+}
+
+# หมวด coating (ลำดับนี้คือลำดับใน /coatings)
+COATING_CATEGORIES = ("moisture", "food_grade", "gloss", "matte")
+
+BUILTIN_VERSION = "builtin"
+CATALOG_PATH_ENV = "PRICING_CATALOG_PATH"
+POLL_SECONDS_ENV = "PRICING_CATALOG_POLL_SECONDS"
+
+# version ไปอยู่ใน cache key และ HTTP header → จำกัดตัวอักษร
+_VERSION_PATTERN = re.compile(r"^[A-Za-z0-9._:-]{1,64}$")
+
+
+# ตารางที่แก้ได้จากไฟล์ (ชื่อเดียวกับใน constants แต่เป็นตัวเล็ก)
+TABLE_KEYS = (
+    "rsc_materials", "die_cut_materials", "inner_materials",
+    "moisture_coatings", "food_grade_coatings", "gloss_coatings", "matte_coatings",
+    "emboss_pricing", "foil_stamping",
+)
+
+
+class CatalogError(ValueError):
+    """ไฟล์ catalog ผิดรูปแบบ / ค่าไม่ถูกต้อง"""
+
+
+# ป๊ัมนูน/ป๊ัมจมใช้ราคาเดียวกัน (emboss_pricing), ฟอยล์ใช้ foil_stamping ตาม key
+_EMBOSS_NAMES = {"emboss": "ป๊ัมนูน", "deboss": "ป๊ัมจม"}
+_FOIL_TYPES = {"foil_regular": "regular", "foil_detailed": "detailed", "foil_emboss": "foil_emboss"}
+
+
+def builtin_tables() -> Dict[str, Any]:
+    """ตารางราคาจาก utils/constants (ค่าตั้งต้น)"""
+    return {
+        "rsc_materials": RSC_MATERIALS,
+        "die_cut_materials": DIE_CUT_MATERIALS,
+        "inner_materials": INNER_MATERIALS,
+        "moisture_coatings": MOISTURE_COATINGS,
+        "food_grade_coatings": FOOD_GRADE_COATINGS,
+        "gloss_coatings": GLOSS_COATINGS,
+        "matte_coatings": MATTE_COATINGS,
+        "emboss_pricing": EMBOSS_PRICING,
+        "foil_stamping": FOIL_STAMPING,
+    }
+
+
+# ===================================
+# Validation
+# ===================================
+def _number(value: Any, where: str, minimum: float = 0.0, strict: bool = False) -> None:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise CatalogError(f"{where} ต้องเป็นตัวเลข")
+    if value < minimum or (strict and value == minimum):
+        raise CatalogError(f"{where} ต้อง{'มากกว่า' if strict else 'ไม่น้อยกว่า'} {minimum}")
+
+
+def _price_range(value: Any, where: str) -> None:
+    if not isinstance(value, (list, tuple)) or len(value) != 2:
+        raise CatalogError(f"{where} ต้องเป็นช่วงราคา [ต่ำสุด, สูงสุด]")
+    _number(value[0], f"{where}[0]")
+    _number(value[1], f"{where}[1]")
+    if value[0] > value[1]:
+        raise CatalogError(f"{where} ต่ำสุดมากกว่าสูงสุด")
+
+
+def _entries(tables: Dict[str, Any], key: str) -> Dict[str, Dict[str, Any]]:
+    table = tables[key]
+    if not isinstance(table, dict) or not table:
+        raise CatalogError(f"{key} ต้องเป็น object ที่มีอย่างน้อย 1 รายการ")
+    for entry_id, entry in table.items():
+        if not isinstance(entry, dict):
+            raise CatalogError(f"{key}.{entry_id} ต้องเป็น object")
+        if key != "emboss_pricing" and not isinstance(entry.get("name"), str):
+            raise CatalogError(f"{key}.{entry_id}.name ต้องเป็นข้อความ")
+    return table
+
+
+def validate_tables(tables: Dict[str, Any]) -> None:
+    """ตรวจตารางราคาทั้งชุดก่อน compile — ผิดจุดไหน raise CatalogError พร้อม path"""
+    for key in ("rsc_materials", "die_cut_materials"):
+        for material_id, data in _entries(tables, key).items():
+            where = f"{key}.{material_id}"
+            _number(data.get("density"), f"{where}.density", strict=True)
+            _number(data.get("paper_cost_per_kg"), f"{where}.paper_cost_per_kg")
+            _number(data.get("labor_cost"), f"{where}.labor_cost")
+            if "gsm" in data:
+                _number(data["gsm"], f"{where}.gsm", strict=True)
+            else:
+                _number(data.get("thickness_cm"), f"{where}.thickness_cm", strict=True)
+
+    _entries(tables, "inner_materials")
+
+    for key in ("moisture_coatings", "food_grade_coatings", "gloss_coatings", "matte_coatings"):
+        for coating_type, data in _entries(tables, key).items():
+            _price_range(data.get("price_range_10x10x10"), f"{key}.{coating_type}.price_range_10x10x10")
+
+    emboss = tables["emboss_pricing"]
+    if not isinstance(emboss, dict):
+        raise CatalogError("emboss_pricing ต้องเป็น object")
+    _price_range(emboss.get("block_cost"), "emboss_pricing.block_cost")
+    _number(emboss.get("stamp_cost_per_box"), "emboss_pricing.stamp_cost_per_box")
+
+    foils = _entries(tables, "foil_stamping")
+    for foil_key in _FOIL_TYPES.values():
+        if foil_key not in foils:
+            raise CatalogError(f"foil_stamping ต้องมี '{foil_key}'")
+        _price_range(foils[foil_key].get("block_cost"), f"foil_stamping.{foil_key}.block_cost")
+        _price_range(foils[foil_key].get("stamp_cost_per_box"), f"foil_stamping.{foil_key}.stamp_cost_per_box")
+
+
+def _fingerprint(tables: Dict[str, Any]) -> str:
+    """hash ของเนื้อหาตาราง (tuple กับ list ถือว่าเท่ากัน) — ใช้เช็คว่า version เดิมแต่ราคาเปลี่ยนหรือไม่"""
+    payload = json.dumps(tables, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ===================================
+# Entries
+# ===================================
+class MaterialEntry:
+    """วัสดุ 1 ตัวของกล่อง 1 ประเภท"""
+
+    __slots__ = ("id", "box_type", "name", "data", "base_price")
+
+    def __init__(self, id: str, box_type: str, data: Dict[str, Any], base_price: float):
+        self.id = id
+        self.box_type = box_type
+        self.name = data["name"]
+        self.data = data              # dict จากตาราง (ส่งกลับเป็น material_info)
+        self.base_price = base_price  # ราคาต่อใบของกล่อง 10x10x10
+
+
+class InnerEntry:
+    __slots__ = ("type", "name", "category")
+
+    def __init__(self, type: str, data: Dict[str, Any]):
+        self.type = type
+        self.name = data["name"]
+        self.category = data.get("category", "")
+
+
+class CoatingEntry:
+    __slots__ = ("type", "category", "name", "base_price")
+
+    def __init__(self, type: str, category: str, data: Dict[str, Any]):
+        self.type = type
+        self.category = category
+        self.name = data["name"]
+        self.base_price = sum(data["price_range_10x10x10"]) / 2  # ราคาเฉลี่ยที่ 10x10x10
+
+
+class StampingEntry:
+    __slots__ = ("type", "name", "block_cost", "stamp_cost_per_box")
+
+    def __init__(self, type: str, name: str, block_cost: float, stamp_cost_per_box: float):
+        self.type = type
+        self.name = name
+        self.block_cost = block_cost                  # ค่าบล็อก (ครั้งแรก)
+        self.stamp_cost_per_box = stamp_cost_per_box  # ค่าป๊ัมต่อใบ
+
+
+def _standard_material_cost(box_type: str, material_data: Dict[str, Any]) -> float:
+    """
+    ต้นทุนวัสดุของกล่อง 10x10x10 — สูตรเดียวกับ PricingCalculator._calculate_material_cost
+    (ลำดับการคูณ/หารเดียวกัน → ได้ float ตัวเดียวกัน)
+    """
+    surface_area = 2 * ((10 * 10) + (10 * 10) + (10 * 10))
+    area_with_factor = surface_area * BOX_TYPES[box_type]["production_factor"]
+
+    if "gsm" in material_data:
+        thickness = material_data["gsm"] / (material_data["density"] * 10000)
+    else:
+        thickness = material_data["thickness_cm"]
+
+    weight_kg = area_with_factor * thickness * material_data["density"] / 1000
+    return weight_kg * material_data["paper_cost_per_kg"] + material_data["labor_cost"]
+
+
+# ===================================
+# Catalog
+# ===================================
+class PricingCatalog:
+    """
+    ตารางราคาที่ compile แล้ว (อ่านอย่างเดียว — เปลี่ยนราคา = สร้าง catalog ใหม่แล้วสลับ)
+
+    Usage:
+        catalog = get_pricing_catalog()
+        entry = catalog.material("die_cut", "art_300gsm")
+        price_per_box = entry.base_price * catalog.price_ratio("die_cut", 20, 15, 10)
+    """
+
+    __slots__ = (
+        "version", "source", "fingerprint", "loaded_at",
+        "standard_area", "production_factors", "materials", "inners", "coatings", "stampings",
+    )
+
+    def __init__(
+        self,
+        tables: Optional[Dict[str, Any]] = None,
+        version: str = BUILTIN_VERSION,
+        source: str = "utils/constants.py",
+    ):
+        tables = builtin_tables() if tables is None else tables
+        validate_tables(tables)
+
+        self.version = version
+        self.source = source
+        self.fingerprint = _fingerprint(tables)
+        self.loaded_at = time.time()
+        self.standard_area = STANDARD_BOX["surface_area_cm2"]
+        self.production_factors = {
+            box_type: data["production_factor"] for box_type, data in BOX_TYPES.items()
+        }
+
+        self.materials: Dict[Tuple[str, str], MaterialEntry] = {}
+        for box_type, key in (("rsc", "rsc_materials"), ("die_cut", "die_cut_materials")):
+            for material_id, data in tables[key].items():
+                self.materials[(box_type, material_id)] = MaterialEntry(
+                    material_id, box_type, data, _standard_material_cost(box_type, data)
+                )
+
+        self.inners: Dict[str, InnerEntry] = {
+            inner_type: InnerEntry(inner_type, data)
+            for inner_type, data in tables["inner_materials"].items()
+        }
+
+        self.coatings: Dict[Tuple[str, str], CoatingEntry] = {
+            (coating_type, category): CoatingEntry(coating_type, category, data)
+            for category in COATING_CATEGORIES
+            for coating_type, data in tables[f"{category}_coatings"].items()
+        }
+
+        emboss = tables["emboss_pricing"]
+        self.stampings: Dict[str, StampingEntry] = {}
+        for stamp_type, name in _EMBOSS_NAMES.items():
+            self.stampings[stamp_type] = StampingEntry(
+                stamp_type, name,
+                sum(emboss["block_cost"]) / 2,
+                emboss["stamp_cost_per_box"],
+            )
+        for stamp_type, foil_key in _FOIL_TYPES.items():
+            foil_data = tables["foil_stamping"][foil_key]
+            self.stampings[stamp_type] = StampingEntry(
+                stamp_type, foil_data["name"],
+                sum(foil_data["block_cost"]) / 2,
+                sum(foil_data["stamp_cost_per_box"]) / 2,
+            )
+
+    # ---------- lookups ----------
+    def resolve_material(self, box_type: str, material: str) -> str:
+        """id วัสดุใน catalog (รับ id เก่าได้) — ไม่มีสำหรับ box_type นี้ → ValueError"""
+        canonical = MATERIAL_ALIASES.get(material, material)
+        if (box_type, canonical) not in self.materials:
+            raise ValueError(f"ไม่มีวัสดุ '{material}' สำหรับกล่อง {box_type}")
+        return canonical
+
+    def material(self, box_type: str, material: str) -> MaterialEntry:
+        return self.materials[(box_type, self.resolve_material(box_type, material))]
+
+    def inner(self, inner_type: Optional[str]) -> Optional[InnerEntry]:
+        return self.inners.get(inner_type) if inner_type else None
+
+    def coating(self, coating_type: str, category: str) -> Optional[CoatingEntry]:
+        return self.coatings.get((coating_type, category))
+
+    def stamping(self, stamp_type: str) -> Optional[StampingEntry]:
+        return self.stampings.get(stamp_type)
+
+    def board_base_price(self, box_type: str, material: str, thickness_cm: float) -> float:
+        """
+        ราคาฐาน 10x10x10 ของวัสดุแบบหนา (thickness_cm เช่น ลูกฟูก) ที่ความหนาอื่น
+        (เช่น ลูกฟูกลอน BC หนา 6.1 มม.) — วัสดุแบบ GSM ไม่มีความหนาให้เปลี่ยน → ValueError
+        """
+        entry = self.material(box_type, material)
+        if "thickness_cm" not in entry.data:
+            raise ValueError(f"วัสดุ '{material}' ไม่ได้คิดราคาตามความหนา")
+        return _standard_material_cost(box_type, {**entry.data, "thickness_cm": thickness_cm})
+
+    def price_ratio(self, box_type: str, width: float, length: float, height: float) -> float:
+        """Factor เทียบกับกล่อง 10x10x10 (สูตรเดียวกับ calculate_price_ratio)"""
+        production_factor = self.production_factors[box_type]
+        area = 2 * ((width * length) + (width * height) + (length * height))
+        return (area * production_factor) / (self.standard_area * production_factor)
+
+    # ---------- รายการสำหรับ API ----------
+    def list_materials(self) -> Dict[str, List[Dict[str, str]]]:
+        listing: Dict[str, List[Dict[str, str]]] = {box_type: [] for box_type in self.production_factors}
+        for (box_type, material_id), entry in self.materials.items():
+            listing[box_type].append({"id": material_id, "name": entry.name})
+        return listing
+
+    def list_coatings(self) -> Dict[str, List[Dict[str, str]]]:
+        listing: Dict[str, List[Dict[str, str]]] = {category: [] for category in COATING_CATEGORIES}
+        for (coating_type, category), entry in self.coatings.items():
+            listing[category].append({"type": coating_type, "name": entry.name})
+        return listing
+
+    def list_stampings(self) -> List[Dict[str, str]]:
+        return [{"type": stamp_type, "name": entry.name} for stamp_type, entry in self.stampings.items()]
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "source": self.source,
+            "fingerprint": self.fingerprint[:12],
+            "loaded_at": self.loaded_at,
+        }
+
+
+# ===================================
+# Loading & Atomic Swap
+# ===================================
+def load_catalog_file(path: str) -> PricingCatalog:
+    """
+    อ่านไฟล์ JSON → validate → compile (ยังไม่สลับเข้าใช้งาน)
+
+    Format:
+        {"version": "2026-10-18.1", "rsc_materials": {...}, "gloss_coatings": {...}, ...}
+        ตารางที่ไม่ใส่ใช้ค่าจาก constants, key ที่ไม่รู้จัก → error (กันพิมพ์ผิด)
+
+    Raises:
+        CatalogError: อ่านไฟล์ไม่ได้ / JSON ผิด / ค่าไม่ถูกต้อง
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise CatalogError(f"อ่าน catalog '{path}' ไม่ได้: {e}") from e
+
+    if not isinstance(data, dict):
+        raise CatalogError("catalog ต้องเป็น JSON object")
+
+    version = data.get("version")
+    if not isinstance(version, str) or not _VERSION_PATTERN.match(version):
+        raise CatalogError("catalog ต้องมี version (A-Z a-z 0-9 . _ : - เท่านั้น เช่น \"2026-10-18.1\")")
+
+    unknown = sorted(set(data) - set(TABLE_KEYS) - {"version"})
+    if unknown:
+        raise CatalogError(f"ไม่รู้จักตาราง: {', '.join(unknown)}")
+
+    tables = {**builtin_tables(), **{key: data[key] for key in TABLE_KEYS if key in data}}
+    return PricingCatalog(tables, version=version, source=path)
+
+
+_catalog_lock = threading.Lock()  # กันเขียนพร้อมกัน (ฝั่งอ่านไม่ใช้ lock)
+
+
+def _initial_catalog() -> PricingCatalog:
+    path = os.getenv(CATALOG_PATH_ENV)
+    if path:
+        try:
+            return load_catalog_file(path)
+        except CatalogError as e:
+            print(f"⚠️ Pricing catalog: {e} → ใช้ค่าจาก constants")
+    return PricingCatalog()
+
+
+_catalog = _initial_catalog()
+
+
+def get_pricing_catalog() -> PricingCatalog:
+    """
+    catalog ที่ใช้อยู่ตอนนี้ — อ่าน reference เดียว ไม่มี lock
+
+    ผู้เรียกควรเก็บ catalog ไว้ใช้ตลอดการคำนวณ 1 ครั้ง (ราคาทุกบรรทัดมาจาก version เดียวกัน)
+    """
+    return _catalog
+
+
+def set_pricing_catalog(catalog: PricingCatalog) -> PricingCatalog:
+    """สลับ catalog (atomic) — คืน catalog เดิม"""
+    global _catalog
+    with _catalog_lock:
+        previous, _catalog = _catalog, catalog
+    return previous
+
+
+def reload_catalog(path: Optional[str] = None) -> bool:
+    """
+    โหลดไฟล์ catalog ใหม่แล้วสลับเข้าใช้งาน
+
+    Returns:
+        True ถ้าสลับ catalog, False ถ้าเนื้อหาเหมือนเดิม (ไม่ต้องสลับ)
+
+    Raises:
+        CatalogError: ไฟล์ผิด หรือ version ซ้ำกับที่ใช้อยู่แต่ราคาเปลี่ยน
+                      (cache ผลราคาใช้ version เป็น key → ต้องเปลี่ยน version ทุกครั้งที่แก้ราคา)
+    """
+    path = path or os.getenv(CATALOG_PATH_ENV)
+    if not path:
+        raise CatalogError(f"ไม่ได้ตั้ง {CATALOG_PATH_ENV}")
+
+    catalog = load_catalog_file(path)
+    current = _catalog
+    if catalog.version == current.version:
+        if catalog.fingerprint == current.fingerprint:
+            return False
+        raise CatalogError(f"ราคาเปลี่ยนแต่ version ยังเป็น '{catalog.version}' — ต้องเปลี่ยน version")
+
+    set_pricing_catalog(catalog)
+    print(f"💱 Pricing catalog {current.version} → {catalog.version}")
+    return True
+
+
+def _mtime(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+async def watch_catalog(path: Optional[str] = None, interval: Optional[float] = None) -> None:
+    """
+    background task: เช็ค mtime ของไฟล์ catalog ทุก interval วินาที → เปลี่ยนเมื่อไหร่ reload
+    (ไฟล์ผิด → log แล้วใช้ catalog เดิมต่อ, รอบถัดไปลองใหม่เมื่อไฟล์ถูกแก้อีกครั้ง)
+
+    stat / อ่าน / parse ไฟล์รันใน worker thread → filesystem ช้า (เช่น network mount) ไม่บล็อก event loop
+    """
+    path = path or os.getenv(CATALOG_PATH_ENV)
+    if not path:
+        return
+    interval = interval or float(os.getenv(POLL_SECONDS_ENV, "5"))
+
+    last_mtime = None
+    while True:
+        mtime = await asyncio.to_thread(_mtime, path)
+
+        if mtime is not None and mtime != last_mtime:
+            if last_mtime is not None or _catalog.source != path:
+                try:
+                    await asyncio.to_thread(reload_catalog, path)
+                except CatalogError as e:
+                    print(f"⚠️ Pricing catalog reload failed: {e}")
+            last_mtime = mtime
+
+        await asyncio.sleep(interval)
@@ -0,0 +1,354 @@
+"""
+Repositories — data access ของ orders / payments / profiles (async ทั้งหมด)
+API, auth และ chatbot เรียกผ่าน repository แทน supabase-py (sync) → ไม่บล็อก event loop
+
+Backend (env DB_BACKEND):
+- "supabase" (default เมื่อตั้ง SUPABASE_URL + SUPABASE_SERVICE_KEY)
+  → PostgrestClient ตัวเดียวทั้ง process (connection pool, timeout, retry — services/postgrest_client.py)
+- "sqlite" → sqlite3 (stdlib) รันใน worker thread, ไฟล์ DB_SQLITE_PATH (default ":memory:")
+  ใช้ load test / dev แบบ offline — token ที่ใช้ได้มาจาก OFFLINE_AUTH_TOKENS="token=user_id[:role],..."
+- ไม่ตั้งทั้งคู่ → get_repositories() = None → API ตอบ 503 เหมือนเดิม
+
+ทุก backend มี method ชุดเดียวกัน (duck typing แบบ GroqService / FakeLLMService):
+- orders:   create(row), list(user_id=None), get(order_id), update(order_id, values)
+- payments: create(row), update(payment_id, values)
+- profiles: get_role(user_id), update_role(user_id, role)
+- auth:     get_user(access_token) → {"id", "email"} | None
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from services.postgrest_client import PostgrestClient
+
+load_dotenv()
+
+# column ของ profiles ที่แนบมากับ order (เหมือน select "*, profiles(...)" ของ PostgREST)
+ORDER_PROFILE_COLUMNS = ("full_name", "phone", "company")
+
+
+# ===================================
+# Supabase (PostgREST)
+# ===================================
+class OrdersRepo:
+    """orders บน Supabase"""
+
+    def __init__(self, client: PostgrestClient):
+        self.client = client
+
+    async def create(self, row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        rows = await self.client.insert("orders", row)
+        return rows[0] if rows else None
+
+    async def list(self, user_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """ใหม่สุดก่อน (user_id = None → ทุกคน) + profiles ของเจ้าของ order"""
+        return await self.client.select(
+            "orders",
+            {"user_id": user_id} if user_id else None,
+            columns=f"*, profiles({', '.join(ORDER_PROFILE_COLUMNS)})",
+            order="created_at.desc",
+        )
+
+    async def get(self, order_id: str) -> Optional[Dict[str, Any]]:
+        rows = await self.client.select("orders", {"id": order_id}, limit=1)
+        return rows[0] if rows else None
+
+    async def update(self, order_id: str, values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        rows = await self.client.update("orders", values, {"id": order_id})
+        return rows[0] if rows else None
+
+
+class PaymentsRepo:
+    """payments บน Supabase"""
+
+    def __init__(self, client: PostgrestClient):
+        self.client = client
+
+    async def create(self, row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        rows = await self.client.insert("payments", row)
+        return rows[0] if rows else None
+
+    async def update(self, payment_id: str, values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        rows = await self.client.update("payments", values, {"id": payment_id})
+        return rows[0] if rows else None
+
+
+class ProfilesRepo:
+    """profiles บน Supabase"""
+
+    def __init__(self, client: PostgrestClient):
+        self.client = client
+
+    async def get_role(self, user_id: str) -> Optional[str]:
+        rows = await self.client.select("profiles", {"id": user_id}, columns="role", limit=1)
+        return rows[0].get("role") if rows else None
+
+    async def update_role(self, user_id: str, role: str) -> Optional[Dict[str, Any]]:
+        rows = await self.client.update("profiles", {"role": role}, {"id": user_id})
+        return rows[0] if rows else None
+
+
+class SupabaseAuth:
+    """ตรวจ access token กับ Supabase Auth"""
+
+    def __init__(self, client: PostgrestClient):
+        self.client = client
+
+    async def get_user(self, access_token: str) -> Optional[Dict[str, Any]]:
+        return await self.client.get_user(access_token)
+
+
+# ===================================
+# SQLite (offline)
+# ===================================
+class SQLiteDatabase:
+    """
+    ตารางละ (id, user_id, created_at, data JSON) — เก็บแถวทั้งก้อนเป็น JSON (schema ตาม Supabase ไม่ต้อง migrate)
+
+    connection เดียว + lock (":memory:" แยก connection ไม่ได้), ทุก query รันผ่าน asyncio.to_thread
+    """
+
+    TABLES = ("orders", "payments", "profiles")
+
+    def __init__(self, path: str = ":memory:"):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            for table in self.TABLES:
+                self._conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {table} "
+                    "(id TEXT PRIMARY KEY, user_id TEXT, created_at TEXT NOT NULL, data TEXT NOT NULL)"
+                )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS orders_user_id ON orders (user_id)")
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.to_thread(fn, *args)
+
+    def insert(self, table: str, row: Dict[str, Any]) -> Dict[str, Any]:
+        row = {"id": str(uuid.uuid4()), "created_at": datetime.now(timezone.utc).isoformat(), **row}
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT INTO {table} (id, user_id, created_at, data) VALUES (?, ?, ?, ?)",
+                (row["id"], row.get("user_id"), row["created_at"], json.dumps(row, ensure_ascii=False)),
+            )
+        return row
+
+    def get(self, table: str, row_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            found = self._conn.execute(f"SELECT data FROM {table} WHERE id = ?", (row_id,)).fetchone()
+        return json.loads(found[0]) if found else None
+
+    def update(self, table: str, row_id: str, values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        with self._lock, self._conn:
+            found = self._conn.execute(f"SELECT data FROM {table} WHERE id = ?", (row_id,)).fetchone()
+            if not found:
+                return None
+            row = {**json.loads(found[0]), **values}
+            self._conn.execute(
+                f"UPDATE {table} SET user_id = ?, data = ? WHERE id = ?",
+                (row.get("user_id"), json.dumps(row, ensure_ascii=False), row_id),
+            )
+        return row
+
+    def list(self, table: str, user_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        query = f"SELECT data FROM {table}"
+        params: tuple = ()
+        if user_id:
+            query += " WHERE user_id = ?"
+            params = (user_id,)
+        with self._lock:
+            found = self._conn.execute(query + " ORDER BY created_at DESC, rowid DESC", params).fetchall()
+        return [json.loads(data) for (data,) in found]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class SQLiteOrdersRepo:
+    """orders บน SQLite (ผลรูปแบบเดียวกับ OrdersRepo)"""
+
+    def __init__(self, db: SQLiteDatabase):
+        self.db = db
+
+    async def create(self, row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return await self.db.run(self.db.insert, "orders", row)
+
+    def _list_with_profiles(self, user_id: Optional[str]) -> List[Dict[str, Any]]:
+        orders = self.db.list("orders", user_id)
+        profiles: Dict[str, Optional[Dict[str, Any]]] = {}
+        for order in orders:
+            owner = order.get("user_id")
+            if owner not in profiles:
+                profile = self.db.get("profiles", owner) if owner else None
+                profiles[owner] = {c: profile.get(c) for c in ORDER_PROFILE_COLUMNS} if profile else None
+            order["profiles"] = profiles[owner]
+        return orders
+
+    async def list(self, user_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        return await self.db.run(self._list_with_profiles, user_id)
+
+    async def get(self, order_id: str) -> Optional[Dict[str, Any]]:
+        return await self.db.run(self.db.get, "orders", order_id)
+
+    async def update(self, order_id: str, values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return await self.db.run(self.db.update, "orders", order_id, values)
+
+
+class SQLitePaymentsRepo:
+    """payments บน SQLite"""
+
+    def __init__(self, db: SQLiteDatabase):
+        self.db = db
+
+    async def create(self, row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return await self.db.run(self.db.insert, "payments", row)
+
+    async def update(self, payment_id: str, values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return await self.db.run(self.db.update, "payments", payment_id, values)
+
+
+class SQLiteProfilesRepo:
+    """profiles บน SQLite"""
+
+    def __init__(self, db: SQLiteDatabase):
+        self.db = db
+
+    async def get_role(self, user_id: str) -> Optional[str]:
+        profile = await self.db.run(self.db.get, "profiles", user_id)
+        return profile.get("role") if profile else None
+
+    async def update_role(self, user_id: str, role: str) -> Optional[Dict[str, Any]]:
+        return await self.db.run(self.db.update, "profiles", user_id, {"role": role})
+
+
+class StaticTokenAuth:
+    """token ที่กำหนดไว้ล่วงหน้า (offline) — {token: {"id", "email"}}"""
+
+    def __init__(self, users: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.users = dict(users or {})
+
+    async def get_user(self, access_token: str) -> Optional[Dict[str, Any]]:
+        user = self.users.get(access_token)
+        return dict(user) if user else None
+
+
+# ===================================
+# Bundle + Singleton
+# ===================================
+class Repositories:
+    """repository ครบชุดของ backend เดียว"""
+
+    def __init__(
+        self,
+        orders: Any,
+        payments: Any,
+        profiles: Any,
+        auth: Any,
+        close: Optional[Callable[[], Awaitable[None]]] = None,
+    ):
+        self.orders = orders
+        self.payments = payments
+        self.profiles = profiles
+        self.auth = auth
+        self._close = close
+
+    async def aclose(self) -> None:
+        if self._close:
+            await self._close()
+
+
+def supabase_repositories(url: str, service_key: str, **client_options: Any) -> Repositories:
+    """repository บน Supabase (client_options ส่งต่อให้ PostgrestClient เช่น timeout, transport)"""
+    client = PostgrestClient(url, service_key, **client_options)
+    return Repositories(
+        OrdersRepo(client), PaymentsRepo(client), ProfilesRepo(client), SupabaseAuth(client),
+        close=client.aclose,
+    )
+
+
+def parse_offline_tokens(spec: str) -> Dict[str, Dict[str, str]]:
+    """"tok-a=user-a,tok-admin=admin-1:admin" → {token: {"id", "role"}} (role ไม่ระบุ = customer)"""
+    tokens = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        token, _, user = entry.partition("=")
+        user_id, _, role = user.partition(":")
+        if not token or not user_id:
+            raise ValueError(f"OFFLINE_AUTH_TOKENS ไม่ถูกต้อง: '{entry}' (ใช้ token=user_id[:role])")
+        tokens[token] = {"id": user_id, "role": role or "customer"}
+    return tokens
+
+
+def sqlite_repositories(path: str = ":memory:", tokens: Optional[Dict[str, Dict[str, str]]] = None) -> Repositories:
+    """
+    repository บน SQLite
+
+    tokens: {token: {"id", "role", "email"(optional)}} — สร้าง profile ตาม role ให้ด้วย
+    """
+    db = SQLiteDatabase(path)
+    users = {}
+    for token, user in (tokens or {}).items():
+        users[token] = {"id": user["id"], "email": user.get("email")}
+        if db.get("profiles", user["id"]) is None:
+            db.insert("profiles", {"id": user["id"], "role": user.get("role", "customer")})
+
+    async def close() -> None:
+        db.close()
+
+    return Repositories(
+        SQLiteOrdersRepo(db), SQLitePaymentsRepo(db), SQLiteProfilesRepo(db), StaticTokenAuth(users),
+        close=close,
+    )
+
+
+_repositories: Optional[Repositories] = None
+_configured = False
+
+
+def _from_env() -> Optional[Repositories]:
+    backend = os.getenv("DB_BACKEND", "").lower()
+    url = os.getenv("SUPABASE_URL")
+    key = os.getenv("SUPABASE_SERVICE_KEY")
+
+    if backend == "sqlite":
+        path = os.getenv("DB_SQLITE_PATH", ":memory:")
+        print(f"🗄️ DB backend: SQLite ({path})")
+        return sqlite_repositories(path, parse_offline_tokens(os.getenv("OFFLINE_AUTH_TOKENS", "")))
+    if backend in ("", "supabase") and url and key:
+        return supabase_repositories(url, key)
+
+    print("⚠️ SUPABASE_URL or SUPABASE_SERVICE_KEY not set — DB features disabled")
+    return None
+
+
+def get_repositories() -> Optional[Repositories]:
+    """Get or create repositories ตาม env (singleton) — None = ไม่ได้ตั้งค่า DB"""
+    global _repositories, _configured
+    if not _configured:
+        _repositories = _from_env()
+        _configured = True
+    return _repositories
+
+
+def set_repositories(repositories: Optional[Repositories]) -> None:
+    """ใช้ repository ที่กำหนดเอง (tests / benchmark) — None = กลับไปอ่านจาก env ครั้งถัดไป"""
+    global _repositories, _configured
+    _repositories = repositories
+    _configured = repositories is not None
+
+
+async def close_repositories() -> None:
+    """ปิด connection pool (ตอน server shutdown)"""
+    global _repositories, _configured
+    if _repositories:
+        await _repositories.aclose()
+    _repositories = None
+    _configured = False
@@ -19,6 +19,35 @@ from services.data_extractor import (
 from utils.prompts import SYSTEM_PROMPT, get_prompt_for_step
 
 
+# ===================================
+# คำถามของแต่ละ step (ใช้เป็น transition และ landing prompt ตอน fast-forward)
+# ===================================
+LOGO_QUESTION = (
+    "คุณมีโลโก้ที่อยากใส่บนกล่องไหมคะ? 🎨\n"
+    "(หรือพิมพ์ 'ข้าม' ถ้ายังไม่มี)"
+)
+
+LOGO_POSITION_OPTIONS = (
+    "• ด้านบน / ด้านล่าง / บนและล่าง\n"
+    "• ด้านกว้าง 1 ด้าน / ด้านกว้าง 2 ด้าน\n"
+    "• ด้านยาว 1 ด้าน / ด้านยาว 2 ด้าน\n"
+    "• ด้านกว้างและยาว / ทุกด้าน"
+)
+
+LOGO_POSITION_QUESTION = f"ต้องการใส่โลโก้ตำแหน่งไหนบ้างคะ? 📍\n\n{LOGO_POSITION_OPTIONS}"
+
+SPECIAL_EFFECTS_QUESTION = (
+    "คุณต้องการลูกเล่นพิเศษบนกล่องไหมคะ? ✨\n"
+    "เช่น: เคลือบเงา / เคลือบด้าน / ป๊ัมนูน / ป๊ัมฟอยล์\n"
+    "(หรือพิมพ์ 'ข้าม' ถ้าไม่ต้องการ)"
+)
+
+BLOCK_QUESTION = (
+    "สำหรับการป๊ัม: เคยทำบล็อกป๊ัมกับทางเรามาก่อนหรือเปล่าคะ?\n"
+    "(ถ้าไม่เคย จะมีค่าทำบล็อกพิมพ์เพิ่มค่ะ)"
+)
+
+
 def _make_result(**kwargs):
     from services.chatbot_flow import StepResult
     return StepResult(**kwargs)
@@ -42,21 +71,15 @@ class DesignStepHandlers:
         )
 
         # Transition ไปถามโลโก้
-        logo_transition = (
-            "\n\nคุณมีโลโก้ที่อยากใส่บนกล่องไหมคะ? 🎨\n"
-            "(หรือพิมพ์ 'ข้าม' ถ้ายังไม่มี)"
-        )
+        logo_transition = None if state.edit_mode else LOGO_QUESTION
 
         if is_skip_response(user_message):
-            if not state.edit_mode:
-                response += logo_transition
-            result = _make_result(response=response, advance=True)
+            result = _make_result(response=response, advance=True, transition=logo_transition)
         else:
-            if not state.edit_mode:
-                response += logo_transition
             result = _make_result(
                 response=response, advance=True,
-                update_data={"mood_tone": user_message.strip()}
+                update_data={"mood_tone": user_message.strip()},
+                transition=logo_transition
             )
 
         if state.edit_mode:
@@ -99,15 +122,10 @@ class DesignStepHandlers:
 
         if has_logo is False:
             # ไม่มี → ข้ามไป step 9 พร้อม transition ถามลูกเล่นพิเศษ
-            if not state.edit_mode:
-                response += (
-                    "\n\nสุดท้ายก่อนสรุป: คุณต้องการลูกเล่นพิเศษบนกล่องไหมคะ? ✨\n"
-                    "เช่น: เคลือบเงา / เคลือบด้าน / ป๊ัมนูน / ป๊ัมฟอยล์\n"
-                    "(หรือพิมพ์ 'ข้าม' ถ้าไม่ต้องการ)"
-                )
             result = _make_result(
                 response=response, advance=True,
-                update_data={"has_logo": False}
+                update_data={"has_logo": False},
+                transition=None if state.edit_mode else f"สุดท้ายก่อนสรุป: {SPECIAL_EFFECTS_QUESTION}"
             )
             if state.edit_mode:
                 result.exit_edit = True
@@ -123,18 +141,12 @@ class DesignStepHandlers:
         if positions:
             response = f"รับทราบค่ะ! จะใส่โลโก้ที่ตำแหน่ง: {', '.join(positions)} ✨"
 
-            # เพิ่ม transition ไปถามลูกเล่นพิเศษ
-            if not state.edit_mode:
-                response += (
-                    "\n\nคุณต้องการลูกเล่นพิเศษบนกล่องไหมคะ? ✨\n"
-                    "เช่น: เคลือบเงา / เคลือบด้าน / ป๊ัมนูน / ป๊ัมฟอยล์\n"
-                    "(หรือพิมพ์ 'ข้าม' ถ้าไม่ต้องการ)"
-                )
-
+            # transition ไปถามลูกเล่นพิเศษ
             result = _make_result(
                 response=response,
                 advance=True,
-                update_data={"logo_positions": positions}
+                update_data={"logo_positions": positions},
+                transition=None if state.edit_mode else SPECIAL_EFFECTS_QUESTION
             )
             if state.edit_mode:
                 result.exit_edit = True
@@ -144,10 +156,7 @@ class DesignStepHandlers:
         return _make_result(
             response=(
                 "ขออภัยค่ะ ไม่ค่อยเข้าใจตำแหน่ง กรุณาเลือกจากตัวเลือกเหล่านี้นะคะ:\n\n"
-                "• ด้านบน / ด้านล่าง / บนและล่าง\n"
-                "• ด้านกว้าง 1 ด้าน / ด้านกว้าง 2 ด้าน\n"
-                "• ด้านยาว 1 ด้าน / ด้านยาว 2 ด้าน\n"
-                "• ด้านกว้างและยาว / ทุกด้าน"
+                f"{LOGO_POSITION_OPTIONS}"
             )
         )
 
@@ -201,11 +210,7 @@ class DesignStepHandlers:
 
             if has_stamping:
                 return _make_result(
-                    response=(
-                        f"{response}\n\n"
-                        f"สำหรับการป๊ัม: เคยทำบล็อกป๊ัมกับทางเรามาก่อนหรือเปล่าคะ?\n"
-                        f"(ถ้าไม่เคย จะมีค่าทำบล็อกพิมพ์เพิ่มค่ะ)"
-                    ),
+                    response=f"{response}\n\n{BLOCK_QUESTION}",
                     merge_partial={"special_effects": effects},
                     update_sub_step=1
                 )
@@ -18,7 +18,8 @@ from typing import Dict
 from models.chat_state import ConversationState, ChatbotStep
 from models.requirement import CompleteRequirement
 from services.data_extractor import is_confirmation, is_rejection
-from services.pricing_calculator import get_price_estimate
+from services.incremental_pricing import describe_price_change, diff_quotes, reprice
+from services.load_planner import format_load_plan_for_chat, plan_load
 from utils.prompts import SYSTEM_PROMPT, get_prompt_for_step
 
 
@@ -30,8 +31,9 @@ def _make_result(**kwargs):
 class FinalizeStepHandlers:
     """Handlers สำหรับ Steps 11-14"""
 
-    def __init__(self, groq_service):
+    def __init__(self, groq_service, persist_orders: bool = True):
         self.groq = groq_service
+        self.persist_orders = persist_orders  # False → step 14 ไม่บันทึก order (session ชั่วคราว เช่น replay)
 
     # ===================================
     # Step 11: Mockup (รอ user ดู)
@@ -55,14 +57,14 @@ class FinalizeStepHandlers:
 
         # Generate quote ทันที (ไม่รอ user)
         try:
-            pricing_data = self._calculate_pricing(state.session_id, state.collected_data)
-            state.temp_data["pricing"] = pricing_data
+            pricing_data = self._calculate_pricing(state)
             prompt12 = get_prompt_for_step(12, pricing_data=pricing_data)
             response_quote = await self.groq.generate_response(
                 system_prompt=SYSTEM_PROMPT,
                 user_message=prompt12,
                 conversation_history=state.get_conversation_history(limit=3)
             )
+            response_quote = self._with_load_plan(state, self._with_price_change(state, response_quote))
         except Exception as e:
             response_quote = (
                 f"⚠️ เกิดข้อผิดพลาดในการคำนวณราคาค่ะ ({str(e)})\n"
@@ -89,8 +91,7 @@ class FinalizeStepHandlers:
         """
         if state.sub_step == 0:
             try:
-                pricing_data = self._calculate_pricing(state.session_id, state.collected_data)
-                state.temp_data["pricing"] = pricing_data
+                pricing_data = self._calculate_pricing(state)
 
                 prompt = get_prompt_for_step(12, pricing_data=pricing_data)
                 response = await self.groq.generate_response(
@@ -98,6 +99,7 @@ class FinalizeStepHandlers:
                     user_message=prompt,
                     conversation_history=state.get_conversation_history(limit=3)
                 )
+                response = self._with_load_plan(state, self._with_price_change(state, response))
 
                 return _make_result(response=response, update_sub_step=1)
 
@@ -184,54 +186,92 @@ class FinalizeStepHandlers:
         )
         response += f"\n\n📌 หมายเลขอ้างอิง: {state.session_id}"
 
-        # Auto-save order to Supabase (if configured)
-        self._save_order_to_db(state)
+        # Auto-save order to DB (if configured)
+        if self.persist_orders:
+            await self._save_order_to_db(state)
 
         return _make_result(response=response)
 
     # ===================================
-    # Save Order to Supabase
+    # Save Order to DB
     # ===================================
-    def _save_order_to_db(self, state: ConversationState):
-        """Save completed order to Supabase (best-effort, does not block chatbot)"""
+    async def _save_order_to_db(self, state: ConversationState):
+        """Save completed order via OrdersRepo (best-effort, async — ไม่บล็อก event loop / ไม่ทำให้แชทล้ม)"""
         try:
-            from services.supabase_client import get_supabase
-            supabase = get_supabase()
-            if not supabase:
+            from services.repositories import get_repositories
+            repos = get_repositories()
+            if not repos:
                 return
 
             pricing = state.temp_data.get("pricing") or state.collected_data.get("pricing", {})
             grand_total = pricing.get("grand_total", 0)
 
-            supabase.table("orders").insert({
+            await repos.orders.create({
                 "session_id": state.session_id,
                 "status": "pending",
                 "collected_data": state.collected_data,
                 "pricing": pricing,
                 "grand_total": grand_total,
                 "deposit_amount": round(grand_total * 0.5, 2),
-            }).execute()
+            })
         except Exception as e:
             print(f"⚠️ Failed to save order to DB: {e}")
 
     # ===================================
     # Pricing Helper (ใช้ CompleteRequirement เป็น single source of truth)
     # ===================================
-    def _calculate_pricing(self, session_id: str, collected_data: Dict) -> Dict:
+    def _calculate_pricing(self, state: ConversationState) -> Dict:
         """
-        คำนวณราคาจาก collected_data
+        คำนวณราคาจาก collected_data (คำนวณใหม่เฉพาะส่วนที่เปลี่ยน)
         
         Flow:
         1. collected_data dict → CompleteRequirement (แปลง format)
         2. CompleteRequirement.to_pricing_request() → pricing request dict
-        3. get_price_estimate(request) → pricing result
+        3. reprice(request, graph รอบก่อน) → pricing result (ผลเท่ากับ get_price_estimate)
+        4. มีใบเสนอราคาเดิม → diff ทีละบรรทัด เก็บใน temp_data["pricing_delta"]
         
         Logic การแปลง inner (dict→str), แยก coatings/stampings,
         เลือก default material อยู่ใน CompleteRequirement เพียงที่เดียว
         """
         requirement = CompleteRequirement.from_collected_data(
-            session_id=session_id,
-            collected_data=collected_data
+            session_id=state.session_id,
+            collected_data=state.collected_data
         )
         pricing_request = requirement.to_pricing_request()
-        return get_price_estimate(pricing_request)
\ No newline at end of file
+
+        previous = state.temp_data.get("pricing")
+        pricing, graph, _ = reprice(pricing_request, state.temp_data.get("pricing_graph"))
+
+        state.temp_data["pricing"] = pricing
+        state.temp_data["pricing_graph"] = graph
+        state.temp_data["pricing_delta"] = diff_quotes(previous, pricing) if previous else None
+        return pricing
+
+    def _with_price_change(self, state: ConversationState, response: str) -> str:
+        """ราคาเปลี่ยนจากใบเสนอราคาเดิม → แสดงส่วนต่างก่อนใบเสนอราคา (ไม่ผ่าน LLM)"""
+        delta = state.temp_data.get("pricing_delta")
+        if not delta or not delta["changed"]:
+            return response
+        return describe_price_change(delta) + "\n\n" + response
+
+    def _with_load_plan(self, state: ConversationState, response: str) -> str:
+        """
+        ต่อท้ายใบเสนอราคาด้วยแผนขนส่ง (มัด + พาเลท) เก็บใน temp_data["load_plan"]
+
+        คำนวณไม่ได้ (เช่น กล่องใหญ่เกินพาเลท) → ไม่แสดง, ไม่ทำให้ใบเสนอราคาล้มเหลว
+        """
+        structure = CompleteRequirement.from_collected_data(
+            session_id=state.session_id,
+            collected_data=state.collected_data
+        ).structure
+        dims = structure.dimensions
+        try:
+            plan = plan_load(
+                structure.box_type, dims["width"], dims["length"], dims["height"], structure.quantity,
+                weight_kg=structure.weight_kg, flute_type=structure.flute_type,
+            )
+        except (ValueError, KeyError):
+            state.temp_data["load_plan"] = None
+            return response
+        state.temp_data["load_plan"] = plan
+        return response + "\n\n" + format_load_plan_for_chat(plan)
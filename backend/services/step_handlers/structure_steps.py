@@ -20,10 +20,50 @@ from services.data_extractor import (
     is_confirmation, is_rejection, is_skip_response,
     is_add_request, detect_edit_target,
 )
-from api.analyze import analyze_box_strength, suggest_alternatives, format_analysis_for_chat, FLUTE_SPECS
+from api.analyze import cached_box_strength, suggest_alternatives, format_analysis_for_chat, FLUTE_SPECS
+from services.config_optimizer import format_optimization_for_chat, optimize_configuration
+from utils.constants import BOX_TYPES
 from utils.prompts import SYSTEM_PROMPT, get_prompt_for_step
 
 
+# ===================================
+# คำถามของแต่ละ step (ใช้เป็น transition และ landing prompt ตอน fast-forward)
+# ===================================
+BOX_TYPE_QUESTION = (
+    "คุณต้องการกล่องประเภทไหนคะ?\n"
+    "1. RSC (มาตรฐาน) — ประหยัด แข็งแรง เหมาะขนส่ง\n"
+    "2. Die-cut (ไดคัท) — พรีเมียม โชว์แบรนด์"
+)
+
+INNER_QUESTION = (
+    "ต้องการ Inner เพิ่มในกล่องไหมคะ? เลือกได้หลายตัวเลือก "
+    "เพียงพิมพ์หมายเลขรวมกัน เช่น '1' หรือ '2, 5'\n\n"
+    "🛡️ กันกระแทก\n"
+    "  1. กระดาษฝอย (Shredded Paper)\n"
+    "  2. บับเบิ้ล (Air Bubble Roll)\n"
+    "  3. ถุงลม (Air Cushion)\n\n"
+    "💧 เคลือบกันชื้น\n"
+    "  4. AQ Coating (Acrylic polymer)\n"
+    "  5. PE Coating (Polyethylene)\n"
+    "  6. Wax Coating (Paraffin wax)\n"
+    "  7. Bio/Water-based Barrier\n\n"
+    "🍽️ Food-grade Coating\n"
+    "  8. Water-based Food Coating\n"
+    "  9. PE Food-grade Coating\n"
+    "  10. PLA/Bio Coating\n"
+    "  11. Grease-resistant Coating\n\n"
+    "*(หรือพิมพ์ 'ไม่ต้องการ' เพื่อข้ามค่ะ)*"
+)
+
+# DANGER → ลองขยาย ยาว/กว้าง ได้ไม่เกินเท่านี้ตอนหากล่องที่ถูกสุดที่ SAFE
+OPTIMIZER_MAX_SLACK_CM = 5
+
+DIMENSIONS_QUESTION = (
+    "📐 ต่อไป ขอทราบขนาดกล่องที่ต้องการนะคะ "
+    "(กว้าง×ยาว×สูง เป็น ซม.) และจำนวนที่ต้องการผลิต (ขั้นต่ำ 500 ชิ้น)"
+)
+
+
 def _make_result(**kwargs):
     """สร้าง StepResult (lazy import เพื่อหลีกเลี่ยง circular)"""
     from services.chatbot_flow import StepResult
@@ -62,17 +102,11 @@ class StructureStepHandlers:
         )
 
         if product_type:
-            # เพิ่ม transition ถามประเภทกล่อง (ถ้าไม่ได้อยู่ใน edit mode)
-            if not state.edit_mode:
-                response += (
-                    "\n\nคุณต้องการกล่องประเภทไหนคะ?\n"
-                    "1. RSC (มาตรฐาน) — ประหยัด แข็งแรง เหมาะขนส่ง\n"
-                    "2. Die-cut (ไดคัท) — พรีเมียม โชว์แบรนด์"
-                )
-
+            # transition ถามประเภทกล่อง (ถ้าไม่ได้อยู่ใน edit mode)
             result = _make_result(
                 response=response, advance=True,
-                update_data={"product_type": product_type}
+                update_data={"product_type": product_type},
+                transition=None if state.edit_mode else BOX_TYPE_QUESTION
             )
             if state.edit_mode:
                 result.exit_edit = True
@@ -143,39 +177,16 @@ class StructureStepHandlers:
             # สร้าง response หลัก
             response = f"เรียบร้อยค่ะ! เลือกกล่อง {box_type.upper()} วัสดุ {material} 📦"
 
-            # เพิ่ม transition ตาม path (ถ้าไม่ได้อยู่ใน edit mode)
+            # transition ตาม path (ถ้าไม่ได้อยู่ใน edit mode)
+            # RSC ข้าม Inner → ไปถามขนาดเลย / Die-cut → ถาม Inner ครบ 3 กลุ่มตาม Requirement
+            transition = None
             if not state.edit_mode:
-                if box_type == "rsc":
-                    # RSC ข้าม Inner → ไปถามขนาดเลย
-                    response += (
-                        "\n\n📐 ต่อไป ขอทราบขนาดกล่องที่ต้องการนะคะ "
-                        "(กว้าง×ยาว×สูง เป็น ซม.) และจำนวนที่ต้องการผลิต (ขั้นต่ำ 500 ชิ้น)"
-                    )
-                else:
-                    # Die-cut → ถาม Inner ครบ 3 กลุ่มตาม Requirement
-                    response += (
-                        "\n\nต้องการ Inner เพิ่มในกล่องไหมคะ? เลือกได้หลายตัวเลือก "
-                        "เพียงพิมพ์หมายเลขรวมกัน เช่น '1' หรือ '2, 5'\n\n"
-                        "🛡️ กันกระแทก\n"
-                        "  1. กระดาษฝอย (Shredded Paper)\n"
-                        "  2. บับเบิ้ล (Air Bubble Roll)\n"
-                        "  3. ถุงลม (Air Cushion)\n\n"
-                        "💧 เคลือบกันชื้น\n"
-                        "  4. AQ Coating (Acrylic polymer)\n"
-                        "  5. PE Coating (Polyethylene)\n"
-                        "  6. Wax Coating (Paraffin wax)\n"
-                        "  7. Bio/Water-based Barrier\n\n"
-                        "🍽️ Food-grade Coating\n"
-                        "  8. Water-based Food Coating\n"
-                        "  9. PE Food-grade Coating\n"
-                        "  10. PLA/Bio Coating\n"
-                        "  11. Grease-resistant Coating\n\n"
-                        "*(หรือพิมพ์ 'ไม่ต้องการ' เพื่อข้ามค่ะ)*"
-                    )
+                transition = DIMENSIONS_QUESTION if box_type == "rsc" else INNER_QUESTION
 
             result = _make_result(
                 response=response, advance=True,
-                update_data={"box_type": box_type, "material": material}
+                update_data={"box_type": box_type, "material": material},
+                transition=transition
             )
             if state.edit_mode:
                 result.exit_edit = True
@@ -201,6 +212,10 @@ class StructureStepHandlers:
             "whiteboard_350gsm": "กล่องขาว/กล่องแป้ง 350 GSM (ราคาประหยัด)",
         }
 
+    def get_material_question(self, box_type: str) -> str:
+        """คำถามเลือกวัสดุตาม box_type (ใช้ตอน fast-forward มาที่ step 3 sub_step 1)"""
+        return self._format_material_question(box_type, self._get_material_options(box_type))
+
     def _format_material_question(self, box_type: str, options: dict) -> str:
         lines = ["🧱 เลือกวัสดุสำหรับกล่องค่ะ:"]
         for i, (_, desc) in enumerate(options.items(), 1):
@@ -221,25 +236,19 @@ class StructureStepHandlers:
         )
 
         # Transition สำหรับถามขนาดกล่อง (ใช้ร่วมกัน)
-        dims_transition = (
-            "\n\n📐 ต่อไป ขอทราบขนาดกล่องที่ต้องการนะคะ "
-            "(กว้าง×ยาว×สูง เป็น ซม.) และจำนวนที่ต้องการผลิต (ขั้นต่ำ 500 ชิ้น)"
-        )
+        dims_transition = None if state.edit_mode else DIMENSIONS_QUESTION
 
         if inner == "skip":
-            if not state.edit_mode:
-                response += dims_transition
-            result = _make_result(response=response, advance=True)
+            result = _make_result(response=response, advance=True, transition=dims_transition)
             if state.edit_mode:
                 result.exit_edit = True
             return result
 
         if inner:
-            if not state.edit_mode:
-                response += dims_transition
             result = _make_result(
                 response=response, advance=True,
-                update_data={"inner": inner}
+                update_data={"inner": inner},
+                transition=dims_transition
             )
             if state.edit_mode:
                 result.exit_edit = True
@@ -291,7 +300,7 @@ class StructureStepHandlers:
             }
 
             # --- Run Strength Analysis ---
-            analysis = analyze_box_strength(
+            analysis = cached_box_strength(
                 length_cm=final_dims["length"],
                 width_cm=final_dims["width"],
                 height_cm=final_dims["height"],
@@ -323,6 +332,11 @@ class StructureStepHandlers:
                             f"  • ต้องการขอบรอบรวม (กว้าง+ยาว)×2 ≥ {alts['min_perimeter_cm']} ซม. "
                             f"(เพิ่มอีก {extra:.1f} ซม.) + ใช้ลอน BC"
                         )
+                    if alts["min_dimensions"]:
+                        rec_lines.append(
+                            f"  • เช่น ยาว {alts['min_dimensions']['length']:g} × กว้าง "
+                            f"{alts['min_dimensions']['width']:g} ซม. (สัดส่วนเดิม)"
+                        )
                 else:
                     if alts["recommended_flutes"]:
                         best = alts["recommended_flutes"][0]
@@ -337,6 +351,18 @@ class StructureStepHandlers:
                                 f"  • หรือเพิ่มขนาดกล่อง ขอบรอบรวมขั้นต่ำ {alts['min_perimeter_cm']} ซม."
                             )
 
+                # ตัวเลือกลูกฟูกที่ถูกที่สุดที่ SAFE (ลอน × ขนาดที่ขยายได้เล็กน้อย)
+                box_type = state.collected_data.get("box_type")
+                optimized = optimize_configuration(
+                    {"dimensions": final_dims, "quantity": final_qty},
+                    weight_kg=weight_kg,
+                    max_slack_cm=OPTIMIZER_MAX_SLACK_CM,
+                    box_types=[box_type] if box_type in BOX_TYPES else None,
+                )
+                if optimized["front"]:
+                    rec_lines.append("\n💰 **ตัวเลือกที่คุ้มที่สุด (กระดาษลูกฟูก):**")
+                    rec_lines.append(format_optimization_for_chat(optimized, final_dims))
+
                 analysis_text += "\n" + "\n".join(rec_lines)
                 collected["strength_warning"] = True
 
@@ -0,0 +1,199 @@
+"""
+Strength Batch
+วิเคราะห์ความแข็งแรง (McKee) หลายจุดในครั้งเดียว สำหรับ slider ใน Studio
+(กราฟ safety factor vs น้ำหนัก, heatmap ยาว × กว้าง) — frontend ยิงครั้งเดียวแล้ว interpolate เอง
+
+หลักการ:
+- analyze_arrays: ทุกค่าเป็น array (broadcast กันได้) → mckee_bct ลอนละ 1 รอบ
+- ทุกจุดมีค่าเท่ากับ analyze_box_strength ของจุดนั้น:
+  np.power ต่างจาก ** ของ Python ได้ 1 ULP → จุดที่อยู่ใกล้ขอบการปัดเศษ / เกณฑ์คะแนน
+  ส่งไปคำนวณด้วย analyze_box_strength ทีละตัว (น้อยมาก, แนวเดียวกับ round2_array)
+- McKee ใช้เส้นรอบรูป (ยาว + กว้าง) เท่านั้น → ไม่มีแกนความสูง
+- profile (services/strength_derating.py) ใช้ค่าเดียวกับทุกจุด → ตัวคูณคำนวณครั้งเดียวต่อ request
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from api.analyze import FLUTE_SPECS, analyze_box_strength, mckee_bct
+from services.batch_pricing import round2_array
+from services.strength_derating import canonical_profile, profile_derating
+
+STACKING_FACTOR = 3
+# ลำดับมิติของ grid (row-major)
+STRENGTH_GRID_AXES = ("flute_type", "weight", "length", "width")
+STRENGTH_METRICS = ("bct_kgf", "max_load_kg", "safety_factor", "safety_score")
+MAX_STRENGTH_POINTS = 250_000
+
+# เกณฑ์ safety factor ของคะแนนใน analyze_box_strength
+_SCORE_THRESHOLDS = (5, 3, 1.5, 1)
+
+
+def _near_half_cent(values: np.ndarray) -> np.ndarray:
+    """ค่าที่ปัด 2 ตำแหน่งแล้วอาจไปคนละทางถ้าต่างกัน 1 ULP"""
+    scaled = values * 100
+    return np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) < 1e-6
+
+
+def analyze_arrays(
+    length: Any,
+    width: Any,
+    weight: Any,
+    flute_type: Any,
+    profile: Optional[Dict[str, Any]] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    analyze_box_strength แบบ array
+
+    Args:
+        length, width: ขนาดกล่อง (cm)
+        weight: น้ำหนักสินค้า (kg, 0 = ไม่ทราบ → safety factor 999)
+        flute_type: ลอนกระดาษ (ไม่รู้จัก → ลอน C เหมือน analyze_box_strength)
+        ทุกตัว broadcast กันได้ (เช่น weight shape (N,) กับขนาด scalar)
+        profile: สภาพใช้งานจริง (เหมือน analyze_box_strength, ใช้กับทุกจุด)
+
+    Returns:
+        {"bct_kgf", "max_load_kg", "safety_factor", "safety_score", "safe"} — ndarray shape เดียวกัน
+        (ปัดเศษแบบเดียวกับ analyze_box_strength, safe = status "SAFE")
+    """
+    # ลอนที่ไม่ซ้ำกันมีไม่กี่ตัว → upper/lookup เฉพาะตัวที่ไม่ซ้ำ
+    names, codes = np.unique(np.asarray(flute_type, dtype=str), return_inverse=True)
+    specs = [FLUTE_SPECS.get(name.upper(), FLUTE_SPECS["C"]) for name in names.tolist()]
+    length, width, weight, codes = np.broadcast_arrays(
+        np.asarray(length, dtype=np.float64), np.asarray(width, dtype=np.float64),
+        np.asarray(weight, dtype=np.float64), codes.reshape(np.shape(flute_type)),
+    )
+
+    perimeter_mm = 2 * (length + width) * 10
+    bct = np.empty(perimeter_mm.shape)
+    for code, spec in enumerate(specs):
+        mask = codes == code
+        bct[mask] = mckee_bct(spec["ect"], spec["caliper"], perimeter_mm[mask])
+
+    stacking_factor = STACKING_FACTOR
+    profile_key = canonical_profile(profile)
+    if profile_key:
+        derating = profile_derating(profile_key)
+        bct *= derating["combined"]
+        stacking_factor = derating["stacking_factor"]
+
+    max_load = bct / stacking_factor
+    loaded = weight > 0
+    safety = np.where(loaded, max_load / np.where(loaded, weight, 1), 999.0)
+
+    raw_score = np.select(
+        [safety >= 5, safety >= 3, safety >= 1.5, safety >= 1],
+        [np.full(safety.shape, 100.0), 70 + (safety - 3) * 15, 40 + (safety - 1.5) * 20, 20 + (safety - 1) * 40],
+        safety * 20,
+    )
+    score = np.clip(np.trunc(raw_score), 0, 100).astype(np.int64)
+
+    # จุดที่ 1 ULP อาจเปลี่ยนผล → คำนวณด้วย analyze_box_strength
+    fragile = _near_half_cent(bct) | _near_half_cent(max_load) | _near_half_cent(safety)
+    fragile |= (safety < 5) & (np.abs(raw_score - np.rint(raw_score)) < 1e-6)
+    for threshold in _SCORE_THRESHOLDS:
+        fragile |= np.abs(safety - threshold) < 1e-9
+
+    bct, max_load, safety = round2_array(bct), round2_array(max_load), round2_array(safety)
+    for j in np.flatnonzero(fragile).tolist():
+        result = analyze_box_strength(
+            float(length.flat[j]), float(width.flat[j]), 0.0, float(weight.flat[j]), str(names[codes.flat[j]]),
+            profile,
+        )
+        bct.flat[j] = result["bct_kgf"]
+        max_load.flat[j] = result["max_load_kg"]
+        safety.flat[j] = result["safety_factor"]
+        score.flat[j] = result["safety_score"]
+
+    return {
+        "bct_kgf": bct,
+        "max_load_kg": max_load,
+        "safety_factor": safety,
+        "safety_score": score,
+        "safe": score >= 40,
+    }
+
+
+def analyze_batch(
+    length: Sequence[float],
+    width: Sequence[float],
+    weight: Sequence[float],
+    flute_type: Sequence[str],
+    profile: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    วิเคราะห์ N จุด — แต่ละ list ยาว N หรือ 1 (ใช้ค่าเดียวทุกจุด), profile ใช้กับทุกจุด
+
+    Returns:
+        {"count": N, "bct_kgf": [...], "max_load_kg": [...], "safety_factor": [...],
+         "safety_score": [...], "status": ["SAFE" | "DANGER", ...]}
+
+    Raises:
+        ValueError: ความยาวของ list ไม่ตรงกัน, จำนวนจุดเกิน MAX_STRENGTH_POINTS, profile ไม่ถูกต้อง
+    """
+    columns = {"length": length, "width": width, "weight": weight, "flute_type": flute_type}
+    sizes = {len(values) for values in columns.values()} - {1}
+    if len(sizes) > 1:
+        detail = ", ".join(f"{name}={len(values)}" for name, values in columns.items())
+        raise ValueError(f"จำนวนค่าในแต่ละ field ต้องเท่ากันหรือมีค่าเดียว ({detail})")
+    count = sizes.pop() if sizes else 1
+    if count > MAX_STRENGTH_POINTS:
+        raise ValueError(f"จำนวนจุดมากเกินไป ({count:,} จุด, สูงสุด {MAX_STRENGTH_POINTS:,})")
+
+    result = analyze_arrays(
+        np.broadcast_to(np.asarray(length, dtype=np.float64), (count,)),
+        np.asarray(width, dtype=np.float64),
+        np.asarray(weight, dtype=np.float64),
+        np.asarray(flute_type, dtype=str),
+        profile,
+    )
+    return {
+        "count": count,
+        **{metric: result[metric].tolist() for metric in STRENGTH_METRICS},
+        "status": np.where(result["safe"], "SAFE", "DANGER").tolist(),
+    }
+
+
+def analyze_grid(axes: Dict[str, Sequence[Any]]) -> Dict[str, Any]:
+    """
+    ตารางความแข็งแรง (ผลคูณคาร์ทีเซียนของทุกแกน)
+
+    Args:
+        axes: {"flute_types": [...], "weights": [...], "lengths": [...], "widths": [...]}
+              ทุกแกนต้องมีอย่างน้อย 1 ค่า (+ "profile" ถ้ามี — ใช้กับทุกช่อง)
+
+    Returns:
+        {"axes": {แกน: ค่า}, "shape": [...], "values": {metric: ndarray shape เดียวกับ "shape"}}
+
+    Raises:
+        ValueError: แกนว่าง, ตารางใหญ่เกิน MAX_STRENGTH_POINTS
+    """
+    axis_values: Dict[str, List[Any]] = {
+        "flute_type": [str(v).upper() for v in axes.get("flute_types") or []],
+        "weight": [float(v) for v in axes.get("weights") or []],
+        "length": [float(v) for v in axes.get("lengths") or []],
+        "width": [float(v) for v in axes.get("widths") or []],
+    }
+    empty = [axis for axis in STRENGTH_GRID_AXES if not axis_values[axis]]
+    if empty:
+        raise ValueError(f"ต้องระบุค่าอย่างน้อย 1 ค่าในแกน: {', '.join(empty)}")
+
+    shape = tuple(len(axis_values[axis]) for axis in STRENGTH_GRID_AXES)
+    cells = int(np.prod(shape))
+    if cells > MAX_STRENGTH_POINTS:
+        raise ValueError(f"ตารางใหญ่เกินไป ({cells:,} ช่อง, สูงสุด {MAX_STRENGTH_POINTS:,})")
+
+    # แต่ละแกนอยู่คนละมิติ → broadcast เป็น (F, Wt, L, W)
+    result = analyze_arrays(
+        np.array(axis_values["length"])[None, None, :, None],
+        np.array(axis_values["width"])[None, None, None, :],
+        np.array(axis_values["weight"])[None, :, None, None],
+        np.array(axis_values["flute_type"])[:, None, None, None],
+        axes.get("profile"),
+    )
+    return {
+        "axes": axis_values,
+        "shape": list(shape),
+        "values": {metric: result[metric] for metric in STRENGTH_METRICS},
+    }
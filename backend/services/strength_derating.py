@@ -0,0 +1,173 @@
+"""
+Strength Derating
+ลดทอน BCT ตามสภาพใช้งานจริง (ความชื้น, เวลาจัดเก็บ, รูปแบบการซ้อน, ยื่นเกินพาเลท, พื้นที่พิมพ์, ช่องเจาะ die-cut)
+ต่อจาก McKee ใน analyze_box_strength — ตั้งค่าได้ต่อ request ผ่าน profile
+
+หลักการ:
+- แต่ละขั้น (stage) = ตารางตัวคูณใน utils/constants.py (12.3) แบบ piecewise linear
+  ค่าระหว่างจุด interpolate, นอกช่วงใช้ค่าปลาย (เหมือน np.interp)
+- ตอน import ทุกตารางถูก compile เป็น array ชุดเดียว: แกน x ของแต่ละขั้นเลื่อนไปอยู่คนละช่วงที่ไม่ทับกัน
+  → np.interp ครั้งเดียวได้ตัวคูณของทุกขั้น (และทุกจุด ถ้าส่ง array ของ profile มา)
+- BCT จริง = McKee × ผลคูณตัวคูณทุกขั้น, max_load = BCT จริง / stacking_factor
+- default_profile() = พฤติกรรมเดิม (ทุกตัวคูณ = 1, stacking_factor = 3) → analyze_box_strength ไม่เปลี่ยน
+- ผลต่อ profile cache ไว้ (lru_cache) → profile ที่ใช้ซ้ำไม่ต้อง interp ใหม่
+- เพิ่มขั้นใหม่ = เพิ่ม entry ใน DERATING_STAGES (ค่า default ของขั้นต้องให้ตัวคูณ = 1)
+"""
+
+from functools import lru_cache
+from typing import Any, Callable, Dict, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from utils.constants import (
+    CUTOUT_DERATING,
+    HUMIDITY_DERATING,
+    PALLET_OVERHANG_DERATING,
+    PRINT_COVERAGE_DERATING,
+    STACKING_PATTERN_LOSS,
+    STORAGE_TIME_DERATING,
+)
+
+DEFAULT_STACKING_FACTOR = 3
+
+# index 0 = ไม่ระบุรูปแบบการซ้อน (ไม่ลดทอน — พฤติกรรมเดิม)
+STACKING_PATTERNS: Tuple[Optional[str], ...] = (None,) + tuple(STACKING_PATTERN_LOSS)
+
+# ขั้นของ pipeline ตามลำดับ: name, param (key ใน profile), x, factor, default (ค่าที่ให้ตัวคูณ = 1)
+DERATING_STAGES: Tuple[Dict[str, Any], ...] = (
+    {"name": "humidity", "param": "relative_humidity",
+     "x": HUMIDITY_DERATING["rh_pct"], "factor": HUMIDITY_DERATING["factor"], "default": 50.0},
+    {"name": "storage_time", "param": "storage_days",
+     "x": STORAGE_TIME_DERATING["days"], "factor": STORAGE_TIME_DERATING["factor"], "default": 0.0},
+    # ใช้ค่ากลางของช่วงที่เสีย (ความแปรปรวนอยู่ใน Monte Carlo — services/strength_montecarlo.py)
+    {"name": "stacking_pattern", "param": "stacking_pattern",
+     "x": list(range(len(STACKING_PATTERNS))),
+     "factor": [1.0] + [1 - (low + high) / 2 for low, high in STACKING_PATTERN_LOSS.values()],
+     "default": None},
+    {"name": "pallet_overhang", "param": "pallet_overhang_cm",
+     "x": PALLET_OVERHANG_DERATING["overhang_cm"], "factor": PALLET_OVERHANG_DERATING["factor"], "default": 0.0},
+    {"name": "print_coverage", "param": "print_coverage_pct",
+     "x": PRINT_COVERAGE_DERATING["coverage_pct"], "factor": PRINT_COVERAGE_DERATING["factor"], "default": 0.0},
+    {"name": "cutouts", "param": "cutout_area_pct",
+     "x": CUTOUT_DERATING["open_area_pct"], "factor": CUTOUT_DERATING["factor"], "default": 0.0},
+)
+
+# ค่าที่ไม่ใช่ตัวเลข → ตำแหน่งบนแกน x ของขั้นนั้น
+_ENCODERS: Dict[str, Callable[[Any], float]] = {"stacking_pattern": STACKING_PATTERNS.index}
+
+ProfileKey = Tuple[Any, ...]
+
+
+class _LookupTables:
+    """ตารางทุกขั้นรวมเป็น xp / fp ชุดเดียว (แกน x ของแต่ละขั้นเลื่อนไปคนละช่วง)"""
+
+    def __init__(self, stages: Sequence[Dict[str, Any]]):
+        low, high, shift, xp, fp = [], [], [], [], []
+        offset = 0.0
+        for stage in stages:
+            x = np.asarray(stage["x"], dtype=np.float64)
+            f = np.asarray(stage["factor"], dtype=np.float64)
+            if x.ndim != 1 or x.shape != f.shape or x.size < 2 or np.any(np.diff(x) <= 0):
+                raise ValueError(f"ตาราง derating '{stage['name']}' ต้องมี x เพิ่มขึ้นเรื่อยๆ และยาวเท่ากับ factor")
+            low.append(x[0])
+            high.append(x[-1])
+            shift.append(offset - x[0])
+            xp.append(x + (offset - x[0]))
+            fp.append(f)
+            # เว้นช่วง 1 หน่วยระหว่างขั้น → ไม่มี segment ไหน interpolate ข้ามขั้น
+            offset += x[-1] - x[0] + 1.0
+        self.low = np.array(low)
+        self.high = np.array(high)
+        self.shift = np.array(shift)
+        self.xp = np.concatenate(xp)
+        self.fp = np.concatenate(fp)
+
+    def evaluate(self, values: np.ndarray) -> np.ndarray:
+        """values shape (..., ขั้น) → ตัวคูณ shape เดียวกัน (np.interp ครั้งเดียว)"""
+        return np.interp(np.clip(values, self.low, self.high) + self.shift, self.xp, self.fp)
+
+
+_TABLES = _LookupTables(DERATING_STAGES)
+
+
+def profile_params() -> Tuple[str, ...]:
+    """key ของ profile ตามลำดับใน ProfileKey"""
+    return ("stacking_factor",) + tuple(stage["param"] for stage in DERATING_STAGES)
+
+
+def default_profile() -> Dict[str, Any]:
+    """profile ที่ให้ผลเหมือน analyze_box_strength เดิม"""
+    return {"stacking_factor": DEFAULT_STACKING_FACTOR, **{s["param"]: s["default"] for s in DERATING_STAGES}}
+
+
+def canonical_profile(profile: Optional[Mapping[str, Any]]) -> Optional[ProfileKey]:
+    """
+    profile → tuple ตามลำดับ profile_params() (key ที่ไม่ระบุใช้ค่า default, ตัวเลขเป็น float)
+
+    Returns:
+        None ถ้าไม่ระบุ profile หรือให้ผลเท่ากับ default (= พฤติกรรมเดิม, ไม่ต้องลดทอน)
+
+    Raises:
+        ValueError: key ไม่รู้จัก, stacking_factor ไม่เป็นบวก, ค่าติดลบ, รูปแบบการซ้อนไม่รู้จัก
+    """
+    if not profile:
+        return None
+    defaults = default_profile()
+    unknown = [key for key in profile if key not in defaults]
+    if unknown:
+        raise ValueError(f"ไม่รู้จัก profile: {', '.join(unknown)} (ใช้ได้: {', '.join(defaults)})")
+
+    merged = {**defaults, **{k: v for k, v in profile.items() if v is not None}}
+    for param in profile_params():
+        if param in _ENCODERS:
+            try:
+                _ENCODERS[param](merged[param])
+            except ValueError:
+                raise ValueError(f"ค่า {param} '{merged[param]}' ไม่รู้จัก") from None
+        else:
+            merged[param] = float(merged[param])
+            if merged[param] < 0:
+                raise ValueError(f"{param} ต้องไม่ติดลบ")
+    if merged["stacking_factor"] <= 0:
+        raise ValueError("stacking_factor ต้องมากกว่า 0")
+
+    key = tuple(merged[param] for param in profile_params())
+    # ตัวคูณทุกขั้น = 1 (เช่น RH 40% อยู่ในช่วงที่ไม่ลดทอน) + stacking factor เดิม → เท่ากับไม่ระบุ
+    if key[0] == DEFAULT_STACKING_FACTOR and np.all(stage_factors(encode_profile(key)) == 1.0):
+        return None
+    return key
+
+
+def encode_profile(key: ProfileKey) -> np.ndarray:
+    """ProfileKey → ค่าบนแกน x ของแต่ละขั้น (ไม่รวม stacking_factor)"""
+    return np.array([
+        _ENCODERS[stage["param"]](value) if stage["param"] in _ENCODERS else value
+        for stage, value in zip(DERATING_STAGES, key[1:])
+    ], dtype=np.float64)
+
+
+def stage_factors(values: np.ndarray) -> np.ndarray:
+    """
+    ตัวคูณของทุกขั้นในครั้งเดียว
+
+    Args:
+        values: shape (..., จำนวนขั้น) — เช่น encode_profile ของหลาย profile ซ้อนกัน
+    """
+    return _TABLES.evaluate(np.asarray(values, dtype=np.float64))
+
+
+@lru_cache(maxsize=256)
+def profile_derating(key: ProfileKey) -> Dict[str, Any]:
+    """
+    ตัวคูณของ profile (cache ตาม ProfileKey — ห้ามแก้ dict ที่ได้)
+
+    Returns:
+        {"stacking_factor", "combined": ผลคูณทุกขั้น, "factors": {ชื่อขั้น: ตัวคูณ}}
+    """
+    factors = stage_factors(encode_profile(key))
+    return {
+        "stacking_factor": key[0],
+        "combined": float(np.prod(factors)),
+        "factors": {stage["name"]: float(f) for stage, f in zip(DERATING_STAGES, factors)},
+    }
+
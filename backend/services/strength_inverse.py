@@ -0,0 +1,150 @@
+"""
+Strength Inverse Design
+ย้อนสูตร McKee: น้ำหนักสินค้า + safety factor ที่ต้องการ → ขอบรอบ / ขนาดกล่องขั้นต่ำของแต่ละลอน
+
+หลักการ:
+- ที่ลอนเดียวกัน BCT = K_f × (Z / 25.4)^(1-a) — power law ของขอบรอบ Z (mm)
+  K_f = mckee_bct(ect, caliper, 25.4) (ขอบรอบ 1 นิ้ว)
+  → Z_min = 25.4 × (BCT ที่ต้องการ / K_f)^(1 / (1-a))   (ไม่ต้องวนหา, ไม่มีเพดาน 5 เมตร)
+- ทุกลอนคำนวณพร้อมกันเป็น array
+- ขนาดที่แนะนำคงสัดส่วน ยาว:กว้าง เดิม (ขยายทั้งสองด้านด้วยอัตราเดียวกัน)
+"""
+
+import math
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from api.analyze import FLUTE_SPECS, MCKEE_EXPONENT, mckee_bct
+
+# เหมือน analyze_box_strength / config_optimizer
+STACKING_FACTOR = 3
+SAFE_SAFETY_FACTOR = 1.5
+INCH_MM = 25.4
+
+
+def _required_bct(weight_kg: float, safety_factor: float) -> float:
+    """BCT (kgf) ที่ต้องมีเพื่อให้ max_load / weight ≥ safety_factor"""
+    return weight_kg * safety_factor * STACKING_FACTOR
+
+
+def min_perimeter_mm(
+    weight_kg: float,
+    safety_factor: float = SAFE_SAFETY_FACTOR,
+    flutes: Optional[Sequence[str]] = None,
+) -> np.ndarray:
+    """
+    ขอบรอบขั้นต่ำ (mm, ค่าจริงไม่ปัด) ของแต่ละลอนตามลำดับ flutes (ไม่ระบุ = ทุกลอนใน FLUTE_SPECS)
+    """
+    specs = [FLUTE_SPECS[f] for f in (flutes or FLUTE_SPECS)]
+    coefficient = mckee_bct(
+        np.array([s["ect"] for s in specs]), np.array([s["caliper"] for s in specs]), INCH_MM
+    )
+    return INCH_MM * (_required_bct(weight_kg, safety_factor) / coefficient) ** (1 / (1 - MCKEE_EXPONENT))
+
+
+def min_perimeter_on_grid(
+    weight_kg: float,
+    perimeter_mm: float,
+    flute: str,
+    safety_factor: float = SAFE_SAFETY_FACTOR,
+    step_mm: int = 10,
+) -> int:
+    """
+    ขอบรอบ (mm) ตัวแรกบนตาราง int(perimeter_mm) + step_mm × n ที่ผ่านเกณฑ์
+
+    ผลเท่ากับการไล่ทีละ step_mm (แบบ suggest_alternatives เดิม) แต่ไม่จำกัดขอบบน:
+    กระโดดไปที่ค่าจาก closed form แล้วเช็คกับ mckee_bct อีกครั้ง (กันเศษ float ที่ขอบ)
+    """
+    spec = FLUTE_SPECS[flute]
+    required = _required_bct(weight_kg, safety_factor)
+
+    def passes(p_mm: int) -> bool:
+        return mckee_bct(spec["ect"], spec["caliper"], p_mm) / STACKING_FACTOR >= weight_kg * safety_factor
+
+    start = int(perimeter_mm)
+    target = float(min_perimeter_mm(weight_kg, safety_factor, [flute])[0]) if required > 0 else 0.0
+    p_mm = start + step_mm * max(0, math.ceil((target - start) / step_mm))
+    while not passes(p_mm):
+        p_mm += step_mm
+    while p_mm - step_mm >= start and passes(p_mm - step_mm):
+        p_mm -= step_mm
+    return p_mm
+
+
+def inverse_design(
+    length_cm: float,
+    width_cm: float,
+    weight_kg: float,
+    target_safety_factor: float = SAFE_SAFETY_FACTOR,
+    flutes: Optional[Sequence[str]] = None,
+) -> Dict[str, Any]:
+    """
+    ทุกลอนพร้อมกัน: รับน้ำหนักได้เท่าไรที่ขนาดปัจจุบัน + ขนาดขั้นต่ำที่ถึง target_safety_factor
+
+    Args:
+        length_cm, width_cm: ขนาดปัจจุบัน (ความสูงไม่มีผลต่อ McKee)
+        weight_kg: น้ำหนักสินค้า (kg, ต้อง > 0)
+        target_safety_factor: safety factor ที่ต้องการ (default = เกณฑ์ SAFE)
+        flutes: จำกัดลอน (ไม่ระบุ = ทุกลอน)
+
+    Returns:
+        {
+            "weight_kg", "target_safety_factor", "current_perimeter_cm",
+            "flutes": [{
+                "flute", "name", "max_load_kg", "safety_factor",  # ที่ขนาดปัจจุบัน
+                "meets_target": bool,
+                "min_perimeter_cm": ขอบรอบขั้นต่ำ (ปัดขึ้นเป็น mm),
+                "min_dimensions": {"length", "width"}  # คงสัดส่วนเดิม ไม่เล็กกว่าขนาดปัจจุบัน (ปัดขึ้น 0.1 ซม.)
+            }]  # เรียงจากลอนที่ต้องการขนาดเล็กสุด
+        }
+
+    Raises:
+        ValueError: น้ำหนัก / safety factor ไม่เป็นบวก, ลอนไม่รู้จัก
+    """
+    if weight_kg <= 0:
+        raise ValueError("weight_kg ต้องมากกว่า 0")
+    if target_safety_factor <= 0:
+        raise ValueError("target_safety_factor ต้องมากกว่า 0")
+    flutes = [f.upper() for f in flutes] if flutes else list(FLUTE_SPECS)
+    unknown = [f for f in flutes if f not in FLUTE_SPECS]
+    if unknown:
+        raise ValueError(f"ไม่รู้จักลอน: {', '.join(unknown)}")
+
+    perimeter_mm = 2 * (length_cm + width_cm) * 10
+    ect = np.array([FLUTE_SPECS[f]["ect"] for f in flutes])
+    caliper = np.array([FLUTE_SPECS[f]["caliper"] for f in flutes])
+
+    max_load = mckee_bct(ect, caliper, perimeter_mm) / STACKING_FACTOR
+    safety = max_load / weight_kg
+    p_min = min_perimeter_mm(weight_kg, target_safety_factor, flutes)
+
+    # ขยาย ยาว/กว้าง ด้วยอัตราเดียวกัน → สัดส่วนเดิม, ปัดขึ้นทั้งคู่ → ขอบรอบไม่ต่ำกว่า p_min
+    scale = np.maximum(p_min / perimeter_mm, 1.0)
+    min_length = np.ceil(np.round(length_cm * scale * 10, 6)) / 10
+    min_width = np.ceil(np.round(width_cm * scale * 10, 6)) / 10
+    meets = safety >= target_safety_factor
+
+    options = [
+        {
+            "flute": flute,
+            "name": FLUTE_SPECS[flute]["name"],
+            "max_load_kg": round(float(max_load[i]), 2),
+            "safety_factor": round(float(safety[i]), 2),
+            "meets_target": bool(meets[i]),
+            "min_perimeter_cm": math.ceil(round(float(p_min[i]), 6)) / 10,
+            "min_dimensions": (
+                {"length": length_cm, "width": width_cm} if meets[i]
+                else {"length": float(min_length[i]), "width": float(min_width[i])}
+            ),
+        }
+        for i, flute in enumerate(flutes)
+    ]
+    options.sort(key=lambda o: o["min_perimeter_cm"])
+
+    return {
+        "weight_kg": weight_kg,
+        "target_safety_factor": target_safety_factor,
+        "current_perimeter_cm": round(perimeter_mm / 10, 2),
+        "flutes": options,
+    }
@@ -0,0 +1,161 @@
+"""
+Strength Monte Carlo
+วิเคราะห์ความแข็งแรงแบบความเสี่ยง: แผ่นจริงไม่ได้มีค่าตาม FLUTE_SPECS พอดี + ความชื้น / เวลาจัดเก็บ / รูปแบบการซ้อน
+ทำให้ BCT ลดลง → สุ่มตัวอย่างทีละมากๆ (vectorized) แล้วดูว่ามีโอกาสกล่องยุบเท่าไร
+
+หลักการ (ต่อ 1 ตัวอย่าง):
+- ECT, caliper ~ Normal(ค่าระบุ, cv × ค่าระบุ)   (BOARD_VARIATION)
+- RH ~ Normal(RH ที่ระบุ, humidity_sd) → ตัวคูณ HUMIDITY_DERATING (np.interp)
+- ตัวคูณเวลา = STORAGE_TIME_DERATING(วันจัดเก็บ) × Normal(1, time_cv)
+- ส่วนที่เสียจากการซ้อน ~ Uniform(STACKING_PATTERN_LOSS[pattern])
+- BCT จริง = mckee_bct(ECT, caliper, ขอบรอบ) × ความชื้น × เวลา × (1 - ส่วนที่เสีย)
+  (McKee ∝ (ECT × caliper)^a → BCT ตามค่าระบุ × (อัตราส่วน ECT × อัตราส่วน caliper)^a)
+- safety factor = BCT จริง / แรงกดบนกล่องล่างสุด (default = น้ำหนัก × stacking 3 เหมือน analyze_box_strength)
+  → ยุบเมื่อ safety factor < 1
+
+seed เดียวกัน + input เดียวกัน → ผลเหมือนเดิมทุกครั้ง (np.random.default_rng)
+จำนวนตัวอย่างจำกัดที่ MAX_MC_SAMPLES (100k ตัวอย่าง ≈ 10-20 ms ต่อ request)
+"""
+
+import math
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from api.analyze import FLUTE_SPECS, MCKEE_EXPONENT, mckee_bct
+from utils.constants import (
+    BOARD_VARIATION,
+    HUMIDITY_DERATING,
+    STACKING_PATTERN_LOSS,
+    STORAGE_TIME_DERATING,
+)
+
+STACKING_FACTOR = 3
+DEFAULT_MC_SAMPLES = 100_000
+MAX_MC_SAMPLES = 1_000_000
+# โอกาสยุบสูงสุดที่ยังถือว่า SAFE
+DEFAULT_MAX_FAILURE_PROBABILITY = 0.01
+
+_HUMIDITY_RH = np.array(HUMIDITY_DERATING["rh_pct"], dtype=np.float64)
+_HUMIDITY_FACTOR = np.array(HUMIDITY_DERATING["factor"], dtype=np.float64)
+
+
+def _wilson_interval(failures: int, samples: int, z: float = 1.959964) -> tuple:
+    """ช่วงความเชื่อมั่น 95% ของสัดส่วน (Wilson) — ใช้ได้แม้ failures = 0"""
+    p = failures / samples
+    denominator = 1 + z * z / samples
+    center = (p + z * z / (2 * samples)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / samples + z * z / (4 * samples * samples)) / denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+def _summary(values: np.ndarray) -> Dict[str, float]:
+    """ค่าเฉลี่ย + percentile 5/50/95 (ช่วง 90%) — ยังไม่ปัดเศษ"""
+    p05, p50, p95 = np.percentile(values, [5, 50, 95])
+    return {"mean": float(values.mean()), "p05": float(p05), "p50": float(p50), "p95": float(p95)}
+
+
+def simulate_strength(
+    length_cm: float,
+    width_cm: float,
+    weight_kg: float,
+    flute_type: str = "C",
+    relative_humidity: float = 50.0,
+    storage_days: float = 0.0,
+    stacking_pattern: str = "column",
+    stack_load_kg: Optional[float] = None,
+    samples: int = DEFAULT_MC_SAMPLES,
+    seed: int = 0,
+    max_failure_probability: float = DEFAULT_MAX_FAILURE_PROBABILITY,
+) -> Dict[str, Any]:
+    """
+    Monte Carlo ของ BCT / safety factor
+
+    Args:
+        length_cm, width_cm: ขนาดกล่อง (ความสูงไม่มีผลต่อ McKee)
+        weight_kg: น้ำหนักสินค้าต่อกล่อง (kg, ต้อง > 0)
+        flute_type: ลอนกระดาษ (ไม่รู้จัก → ลอน C เหมือน analyze_box_strength)
+        relative_humidity: ความชื้นสัมพัทธ์เฉลี่ยที่จัดเก็บ (%)
+        storage_days: ระยะเวลาที่กล่องรับน้ำหนักซ้อน (วัน)
+        stacking_pattern: รูปแบบการซ้อน (STACKING_PATTERN_LOSS)
+        stack_load_kg: แรงกดบนกล่องล่างสุด (ไม่ระบุ = weight_kg × 3)
+        samples: จำนวนตัวอย่าง (≤ MAX_MC_SAMPLES)
+        seed: seed ของตัวสุ่ม
+        max_failure_probability: โอกาสยุบสูงสุดที่ยังถือว่า SAFE
+
+    Returns:
+        {
+            "status": "SAFE" | "DANGER" (จากโอกาสยุบ), "failure_probability", "failure_ci95": [ต่ำ, สูง],
+            "safety_factor": {"mean", "p05", "p50", "p95"}, "bct_kgf": {...},
+            "nominal_safety_factor": ค่าเดียวกับ analyze_box_strength (ไม่มีความแปรปรวน/ลดทอน),
+            "samples", "seed", "max_failure_probability", "conditions": {...}
+        }
+
+    Raises:
+        ValueError: น้ำหนัก / แรงกด / จำนวนตัวอย่างไม่ถูกต้อง, รูปแบบการซ้อนไม่รู้จัก
+    """
+    if weight_kg <= 0:
+        raise ValueError("weight_kg ต้องมากกว่า 0")
+    if not 1 <= samples <= MAX_MC_SAMPLES:
+        raise ValueError(f"samples ต้องอยู่ระหว่าง 1 ถึง {MAX_MC_SAMPLES:,}")
+    if stacking_pattern not in STACKING_PATTERN_LOSS:
+        raise ValueError(
+            f"ไม่รู้จักรูปแบบการซ้อน '{stacking_pattern}' (ใช้ได้: {', '.join(STACKING_PATTERN_LOSS)})"
+        )
+    load = weight_kg * STACKING_FACTOR if stack_load_kg is None else stack_load_kg
+    if load <= 0:
+        raise ValueError("stack_load_kg ต้องมากกว่า 0")
+
+    flute_key = flute_type.upper() if flute_type.upper() in FLUTE_SPECS else "C"
+    flute = FLUTE_SPECS[flute_key]
+    perimeter_mm = 2 * (length_cm + width_cm) * 10
+
+    rng = np.random.default_rng(seed)
+    # ECT, caliper เป็นอัตราส่วนต่อค่าระบุ: McKee ∝ (ECT × caliper)^a → pow ครั้งเดียวต่อตัวอย่าง
+    board = rng.normal(1.0, BOARD_VARIATION["ect_cv"], samples)
+    caliper = rng.normal(1.0, BOARD_VARIATION["caliper_cv"], samples)
+    rh = rng.normal(relative_humidity, BOARD_VARIATION["humidity_sd_pct"], samples)
+    time_noise = rng.normal(1.0, BOARD_VARIATION["time_cv"], samples)
+    loss_low, loss_high = STACKING_PATTERN_LOSS[stacking_pattern]
+    pattern_loss = rng.uniform(loss_low, loss_high, samples)
+
+    # ค่าติดลบจากหางของ Normal ไม่มีความหมายทางกายภาพ
+    np.maximum(board, 0.0, out=board)
+    np.maximum(caliper, 0.0, out=caliper)
+    np.maximum(time_noise, 0.0, out=time_noise)
+    board *= caliper
+
+    nominal_bct = mckee_bct(flute["ect"], flute["caliper"], perimeter_mm)
+    time_factor = float(np.interp(storage_days, STORAGE_TIME_DERATING["days"], STORAGE_TIME_DERATING["factor"]))
+
+    # safety factor = BCT จริง / แรงกด (คูณ in-place ทีละตัว ไม่สร้าง array ชั่วคราว)
+    safety = np.power(board, MCKEE_EXPONENT, out=board)
+    safety *= np.interp(rh, _HUMIDITY_RH, _HUMIDITY_FACTOR)
+    time_noise *= nominal_bct * time_factor / load
+    safety *= time_noise
+    np.subtract(1.0, pattern_loss, out=pattern_loss)
+    safety *= pattern_loss
+
+    failures = int(np.count_nonzero(safety < 1.0))
+    failure_probability = failures / samples
+    ci_low, ci_high = _wilson_interval(failures, samples)
+    summary = _summary(safety)
+    return {
+        "status": "SAFE" if failure_probability <= max_failure_probability else "DANGER",
+        "failure_probability": round(failure_probability, 6),
+        "failure_ci95": [round(ci_low, 6), round(ci_high, 6)],
+        "safety_factor": {key: round(value, 3) for key, value in summary.items()},
+        "bct_kgf": {key: round(value * load, 3) for key, value in summary.items()},
+        "nominal_safety_factor": round(nominal_bct / load, 2),
+        "samples": samples,
+        "seed": seed,
+        "max_failure_probability": max_failure_probability,
+        "conditions": {
+            "flute_type": flute_key,
+            "relative_humidity": relative_humidity,
+            "storage_days": storage_days,
+            "storage_factor": round(time_factor, 4),
+            "stacking_pattern": stacking_pattern,
+            "stack_load_kg": round(load, 3),
+        },
+    }
@@ -0,0 +1,175 @@
+"""
+Stress Field
+สนามแรงเค้น (utilization = แรงที่รับ / แรงที่รับได้) รายผนังของกล่อง สำหรับ heatmap 3D ใน Studio
+
+หลักการ (แบบจำลองเชิงวิศวกรรมอย่างง่าย อิง McKee):
+- แรงกดจากด้านบน (กล่อง/พาเลทที่ซ้อนอยู่) P = stack_load_kg (default = น้ำหนัก × 3 เหมือน analyze_box_strength)
+  ถ่ายลงผนังข้าง 4 ด้านเป็น line load เท่ากันตลอดขอบรอบ → utilization เฉลี่ย = P / BCT
+- มุมกล่องแข็งกว่ากลางผนัง (corner reinforcement): ความสามารถรับแรงต่อความยาว
+  = 1 + (CORNER_STIFFNESS_RATIO - 1) × exp(-ระยะถึงมุม / (CORNER_ZONE_CALIPERS × caliper))
+  normalize ให้ค่าเฉลี่ยทั้งขอบรอบเท่ากับ BCT → กลางผนังกว้าง utilization สูงกว่ามุม
+- ผนังโป่งกลางความสูง: × (1 + MIDHEIGHT_BULGE × sin(π v))
+- ฝาบน: แรงจากด้านบนเข้าทางขอบ (สูงที่ขอบ ต่ำกลางฝา), ฝาล่าง: แรงบน + น้ำหนักสินค้า ถ่ายลงพาเลท
+
+Layout ผลลัพธ์ (ตรงกับ THREE.BoxGeometry(width, height, depth) — x = กว้าง, y = สูง, z = ยาว):
+- float32 shape (6, resolution, resolution) เรียง face px, nx, py, ny, pz, nz (ลำดับ group ของ BoxGeometry)
+- ทุก profile สมมาตร → ไม่ขึ้นกับทิศ uv ของแต่ละ face
+- ผลเป็น bytes (float32 little-endian) cache ตาม (ขนาด, ลอน, น้ำหนัก, แรงกด, resolution)
+  แยก cache ตาม resolution: ≤ SMALL_RESOLUTION (≤ 24 KB/ชิ้น) เก็บได้มาก, ใหญ่กว่า (สูงสุด ~393 KB/ชิ้น) เก็บน้อย
+  → รวมแล้วไม่เกิน ~12 MB
+"""
+
+import math
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from api.analyze import FLUTE_SPECS, mckee_bct
+
+STACKING_FACTOR = 3
+FACES = ("px", "nx", "py", "ny", "pz", "nz")
+MIN_RESOLUTION = 4
+MAX_RESOLUTION = 128
+
+CORNER_STIFFNESS_RATIO = 3.0   # มุมรับแรงต่อความยาวได้กี่เท่าของกลางผนัง
+CORNER_ZONE_CALIPERS = 10      # ความกว้างโซนมุม = 10 × ความหนาแผ่น
+MIDHEIGHT_BULGE = 0.15         # ผนังโป่งกลางความสูง +15%
+
+SMALL_RESOLUTION = 32          # ≤ 32 → 6×32×32×4 B ≈ 24 KB ต่อชิ้น
+SMALL_CACHE_SIZE = 256         # ≈ 6 MB
+LARGE_CACHE_SIZE = 16          # 128 → ≈ 393 KB ต่อชิ้น × 16 ≈ 6 MB
+
+
+def _relative_capacity(distance_mm: np.ndarray, zone_mm: float) -> np.ndarray:
+    """ความสามารถรับแรงต่อความยาว เทียบกับกลางผนัง (1 = กลางผนัง)"""
+    return 1 + (CORNER_STIFFNESS_RATIO - 1) * np.exp(-distance_mm / zone_mm)
+
+
+def _mean_capacity(panel_mm: float, zone_mm: float) -> float:
+    """ค่าเฉลี่ยของ _relative_capacity ตลอดผนังกว้าง panel_mm (ปิดรูป: มุมทั้งสองข้าง)"""
+    half = panel_mm / 2
+    return 1 + (CORNER_STIFFNESS_RATIO - 1) * (zone_mm / half) * (1 - math.exp(-half / zone_mm))
+
+
+def _edge_distance(n: int, size_mm: float) -> np.ndarray:
+    """ระยะจากกึ่งกลาง texel ถึงขอบที่ใกล้ที่สุด (mm) ตามแกนเดียว"""
+    centers = (np.arange(n, dtype=np.float64) + 0.5) / n
+    return np.minimum(centers, 1 - centers) * size_mm
+
+
+def _stress_field_bytes(
+    length_cm: float,
+    width_cm: float,
+    height_cm: float,
+    weight_kg: float,
+    flute_type: str,
+    stack_load_kg: float,
+    resolution: int,
+) -> Tuple[bytes, float, float]:
+    """คำนวณ field → (float32 bytes, utilization สูงสุด, BCT) — ไม่ cache (ดู _cached_field)"""
+    flute = FLUTE_SPECS[flute_type]
+    length_mm, width_mm, height_mm = length_cm * 10, width_cm * 10, height_cm * 10
+    perimeter_mm = 2 * (length_mm + width_mm)
+    zone_mm = CORNER_ZONE_CALIPERS * flute["caliper"]
+
+    bct = mckee_bct(flute["ect"], flute["caliper"], perimeter_mm)
+    utilization = stack_load_kg / bct
+    mean_capacity = (
+        2 * length_mm * _mean_capacity(length_mm, zone_mm) + 2 * width_mm * _mean_capacity(width_mm, zone_mm)
+    ) / perimeter_mm
+
+    n = resolution
+    v = (np.arange(n, dtype=np.float64) + 0.5) / n
+    bulge = (1 + MIDHEIGHT_BULGE * np.sin(np.pi * v))[:, None]   # แถว = v (ความสูง)
+
+    def side_wall(panel_mm: float) -> np.ndarray:
+        capacity = _relative_capacity(_edge_distance(n, panel_mm), zone_mm)[None, :]
+        return utilization * mean_capacity / capacity * bulge
+
+    # ฝา: แรงเข้าทางขอบ → สูงสุดที่ขอบ ลดลงตามระยะจากขอบ (โซนเดียวกับมุม)
+    edge = np.minimum(_edge_distance(n, length_mm)[:, None], _edge_distance(n, width_mm)[None, :])
+    lid_profile = np.exp(-edge / zone_mm)
+
+    field = np.empty((6, n, n), dtype=np.float32)
+    field[0] = field[1] = side_wall(length_mm)                        # ±x: ผนังด้านยาว (แนว z)
+    field[2] = utilization * lid_profile                              # +y: ฝาบน
+    field[3] = (stack_load_kg + weight_kg) / bct * lid_profile        # -y: ฝาล่าง (รวมน้ำหนักสินค้า)
+    field[4] = field[5] = side_wall(width_mm)                         # ±z: ผนังด้านกว้าง (แนว x)
+
+    return field.astype("<f4").tobytes(), float(field.max()), bct
+
+
+_small_fields = lru_cache(maxsize=SMALL_CACHE_SIZE)(_stress_field_bytes)
+_large_fields = lru_cache(maxsize=LARGE_CACHE_SIZE)(_stress_field_bytes)
+
+
+def _cached_field(*key: Any) -> Tuple[bytes, float, float]:
+    """field จาก cache ตามขนาด resolution (อาร์กิวเมนต์สุดท้าย) — จำกัดหน่วยความจำรวม"""
+    cache = _small_fields if key[-1] <= SMALL_RESOLUTION else _large_fields
+    return cache(*key)
+
+
+def compute_stress_field(
+    length_cm: float,
+    width_cm: float,
+    height_cm: float,
+    weight_kg: float,
+    flute_type: str = "C",
+    stack_load_kg: Optional[float] = None,
+    resolution: int = 32,
+) -> Dict[str, Any]:
+    """
+    สนาม utilization รายผนัง
+
+    Args:
+        length_cm, width_cm, height_cm: ขนาดกล่อง
+        weight_kg: น้ำหนักสินค้า (kg)
+        flute_type: ลอนกระดาษ (ไม่รู้จัก → ลอน C เหมือน analyze_box_strength)
+        stack_load_kg: แรงกดจากด้านบน (ไม่ระบุ = weight_kg × 3)
+        resolution: จำนวน texel ต่อด้านของแต่ละ face
+
+    Returns:
+        {"data": bytes (float32 LE, shape (6, resolution, resolution)), "shape", "faces",
+         "max_utilization", "bct_kgf", "stack_load_kg"}
+        utilization ≥ 1 = จุดนั้นรับแรงเกินที่รับได้
+
+    Raises:
+        ValueError: resolution นอกช่วง, ขนาดปัดแล้วเป็น 0, น้ำหนัก/แรงกดติดลบ
+    """
+    if not MIN_RESOLUTION <= resolution <= MAX_RESOLUTION:
+        raise ValueError(f"resolution ต้องอยู่ระหว่าง {MIN_RESOLUTION} ถึง {MAX_RESOLUTION}")
+    if weight_kg < 0:
+        raise ValueError("weight_kg ต้องไม่ติดลบ")
+    load = weight_kg * STACKING_FACTOR if stack_load_kg is None else stack_load_kg
+    if load < 0:
+        raise ValueError("stack_load_kg ต้องไม่ติดลบ")
+
+    # ปัดก่อนเป็น key ของ cache → ค่าที่ต่างกันแค่เศษ float ใช้ผลเดียวกัน
+    dims = [round(float(value), 2) for value in (length_cm, width_cm, height_cm)]
+    if min(dims) <= 0:
+        # เล็กกว่า 0.005 ซม. ปัดเป็น 0 → ขอบรอบ 0 → BCT 0
+        raise ValueError("ขนาดกล่องต้องไม่น้อยกว่า 0.01 ซม.")
+
+    flute_key = flute_type.upper() if flute_type.upper() in FLUTE_SPECS else "C"
+    data, max_utilization, bct = _cached_field(
+        *dims, round(float(weight_kg), 3), flute_key, round(float(load), 3), int(resolution),
+    )
+    return {
+        "data": data,
+        "shape": [len(FACES), resolution, resolution],
+        "faces": list(FACES),
+        "max_utilization": round(max_utilization, 4),
+        "bct_kgf": round(bct, 2),
+        "stack_load_kg": round(load, 3),
+    }
+
+
+def get_stress_field_cache_info() -> Dict[str, int]:
+    """สถิติ cache ของ stress field (hits, misses, size)"""
+    infos = [_small_fields.cache_info(), _large_fields.cache_info()]
+    return {
+        "hits": sum(info.hits for info in infos),
+        "misses": sum(info.misses for info in infos),
+        "size": sum(info.currsize for info in infos),
+    }
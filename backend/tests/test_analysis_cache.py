@@ -0,0 +1,123 @@
+"""
+Unit Tests for Strength Analysis Cache
+ทดสอบว่า cached_box_strength ให้ผลเท่ากับ analyze_box_strength, key เป็น canonical
+และ GET /analyze ส่ง ETag / Cache-Control + ตอบ 304 ได้
+"""
+
+import sys
+import os
+import random
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("GROQ_API_KEY", "test-key")  # main import api.chat → สร้าง ChatbotFlowManager
+
+from fastapi.testclient import TestClient
+
+from main import app
+from api.analyze import (
+    FLUTE_SPECS, analysis_etag, analyze_box_strength, cached_box_strength,
+    canonical_analysis_key, clear_analysis_cache, get_analysis_cache_stats, model_fingerprint,
+)
+from services.strength_derating import DERATING_STAGES
+
+
+QUERY = {"length": 30, "width": 20, "height": 15, "weight": 4, "flute_type": "C"}
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    clear_analysis_cache()
+    yield
+    clear_analysis_cache()
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def _stats():
+    stats = get_analysis_cache_stats()
+    return stats["hits"], stats["misses"]
+
+
+class TestAnalysisCache:
+
+    def test_matches_uncached_analysis(self):
+        rng = random.Random(3)
+        flutes = list(FLUTE_SPECS) + ["bc", "x"]
+        for _ in range(300):
+            args = (
+                round(rng.uniform(5, 120), 1), round(rng.uniform(5, 120), 1), round(rng.uniform(5, 80), 1),
+                rng.choice([0, 0.5, round(rng.uniform(0.1, 60), 2)]), rng.choice(flutes),
+            )
+            assert cached_box_strength(*args) == analyze_box_strength(*args)
+            # รอบสองมาจาก cache
+            assert cached_box_strength(*args) == analyze_box_strength(*args)
+
+    def test_repeat_is_served_from_cache(self):
+        cached_box_strength(30, 20, 15, 4, "C")
+        cached_box_strength(30, 20, 15, 4, "C")
+        assert _stats() == (1, 1)
+
+    def test_equivalent_inputs_share_entry(self):
+        cached_box_strength(30, 20, 15, 4, "C")
+        cached_box_strength(20.0, 30.0, 50, 4.0, "c")
+        assert _stats() == (1, 1)
+        assert get_analysis_cache_stats()["size"] == 1
+
+    def test_caller_mutation_does_not_leak(self):
+        first = cached_box_strength(30, 20, 15, 4, "C")
+        first["status"] = "mutated"
+        assert cached_box_strength(30, 20, 15, 4, "C") == analyze_box_strength(30, 20, 15, 4, "C")
+
+    @pytest.mark.parametrize("index", range(len(DERATING_STAGES)))
+    def test_fingerprint_covers_derating_tables(self, index):
+        base = model_fingerprint()
+        stages = list(DERATING_STAGES)
+        stage = stages[index]
+        stages[index] = {**stage, "factor": [*stage["factor"][:-1], stage["factor"][-1] * 0.99]}
+        assert model_fingerprint(stages=tuple(stages)) != base
+        assert model_fingerprint(default_stacking_factor=4) != base
+        assert model_fingerprint() == base
+
+    def test_canonical_key(self):
+        key = canonical_analysis_key(30, 20, 4, "bc")
+        assert key == (20.0, 30.0, 4.0, "BC")
+        assert analysis_etag(key) == analysis_etag(canonical_analysis_key(20.0, 30, 4.0, "BC"))
+        assert analysis_etag(key) != analysis_etag(canonical_analysis_key(30, 20, 4.5, "BC"))
+
+
+class TestAnalyzeGet:
+
+    def test_get_matches_post(self, client):
+        res = client.get("/analyze", params=QUERY)
+        assert res.status_code == 200
+        assert res.json() == client.post("/analyze", json=QUERY).json()
+        assert res.headers["Cache-Control"] == "public, max-age=86400"
+        assert res.headers["ETag"].startswith('"') and not res.headers["ETag"].startswith("W/")
+
+    def test_if_none_match_304(self, client):
+        etag = client.get("/analyze", params=QUERY).headers["ETag"]
+
+        # ค่าเท่ากันแต่เขียนต่างกัน → ETag เดียวกัน
+        equivalent = {**QUERY, "length": "20.0", "width": "30", "flute_type": "c"}
+        cached = client.get("/analyze", params=equivalent, headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.headers["ETag"] == etag
+
+        changed = client.get("/analyze", params={**QUERY, "weight": 5}, headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.headers["ETag"] != etag
+
+    def test_invalid_query(self, client):
+        assert client.get("/analyze", params={**QUERY, "length": 0}).status_code == 422
+        assert client.get("/analyze", params={"width": 20, "height": 10}).status_code == 422
+
+    def test_cache_stats(self, client):
+        client.get("/analyze", params=QUERY)
+        client.post("/analyze", json=QUERY)
+        stats = client.get("/analyze/cache-stats").json()
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+        assert stats["model_fingerprint"]
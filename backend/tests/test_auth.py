@@ -0,0 +1,240 @@
+"""
+Unit Tests for Auth
+ทดสอบตรวจ JWT ในเครื่อง (HS256 secret, JWKS ตาม kid), fallback ไป Supabase Auth,
+role cache (TTL + invalidate เมื่อเปลี่ยน role) และ memo ต่อ request
+"""
+
+import sys
+import os
+import asyncio
+import time
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("GROQ_API_KEY", "test-key")  # main import api.chat → สร้าง ChatbotFlowManager
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from jose import jwk, jwt
+from starlette.requests import Request
+
+from main import app
+from middleware.auth import _get_role, get_current_user, get_role_cache_stats, invalidate_role
+from services.jwt_verifier import JWTVerifier, TokenInvalid, set_token_verifier
+from services.repositories import set_repositories, sqlite_repositories
+
+
+SECRET = "super-secret-jwt-key-for-tests-only"
+TOKENS = {"tok-admin": {"id": "admin-1", "role": "admin"}, "tok-a": {"id": "user-a", "role": "customer"}}
+
+
+def _token(sub="user-a", secret=SECRET, expires_in=3600, aud="authenticated", **claims):
+    payload = {"sub": sub, "aud": aud, "exp": int(time.time()) + expires_in, "email": f"{sub}@lumopack.test", **claims}
+    return jwt.encode(payload, secret, algorithm="HS256")
+
+
+def _auth(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _request():
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": []})
+
+
+class CountingAuth:
+    """นับจำนวนครั้งที่ถาม Supabase Auth (ต้องไม่ถูกเรียกเมื่อตรวจในเครื่องได้)"""
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.calls = 0
+
+    async def get_user(self, access_token):
+        self.calls += 1
+        return await self.inner.get_user(access_token)
+
+
+class CountingProfiles:
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.calls = 0
+
+    async def get_role(self, user_id):
+        self.calls += 1
+        return await self.inner.get_role(user_id)
+
+    async def update_role(self, user_id, role):
+        return await self.inner.update_role(user_id, role)
+
+
+@pytest.fixture
+def repos():
+    repositories = sqlite_repositories(tokens=TOKENS)
+    repositories.auth = CountingAuth(repositories.auth)
+    repositories.profiles = CountingProfiles(repositories.profiles)
+    set_repositories(repositories)
+    invalidate_role()
+    yield repositories
+    set_repositories(None)
+    invalidate_role()
+    asyncio.run(repositories.aclose())
+
+
+@pytest.fixture
+def verifier():
+    local = JWTVerifier(secret=SECRET)
+    set_token_verifier(local)
+    yield local
+    set_token_verifier(None)
+
+
+@pytest.fixture
+def client(repos, verifier):
+    return TestClient(app)
+
+
+# ================================================
+# JWTVerifier
+# ================================================
+class TestJWTVerifier:
+
+    def test_valid_token(self):
+        claims = asyncio.run(JWTVerifier(secret=SECRET).verify(_token()))
+        assert claims["sub"] == "user-a" and claims["email"] == "user-a@lumopack.test"
+
+    @pytest.mark.parametrize("token", [
+        _token(expires_in=-10),
+        _token(secret="wrong-secret"),
+        _token(aud="anon"),
+        _token(sub=""),
+        "not-a-jwt",
+    ])
+    def test_invalid_token(self, token):
+        with pytest.raises(TokenInvalid):
+            asyncio.run(JWTVerifier(secret=SECRET).verify(token))
+
+    def test_no_local_key(self):
+        # HS256 แต่ไม่ได้ตั้ง secret → ตรวจในเครื่องไม่ได้ (ไม่ใช่ token ปลอม)
+        assert asyncio.run(JWTVerifier().verify(_token())) is None
+
+    def test_jwks_cached_by_kid(self):
+        private = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        pem = private.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        )
+        public = jwk.construct(pem, "RS256").public_key().to_dict()
+        fetches = []
+
+        async def fetch(url):
+            fetches.append(url)
+            return {"keys": [{**public, "kid": "k1", "alg": "RS256"}]}
+
+        now = [0.0]
+        local = JWTVerifier(jwks_url="https://db.example/jwks", jwks_ttl=600, fetch_jwks=fetch, clock=lambda: now[0])
+
+        def sign(kid):
+            payload = {"sub": "user-a", "aud": "authenticated", "exp": int(time.time()) + 60}
+            return jwt.encode(payload, pem, algorithm="RS256", headers={"kid": kid})
+
+        assert asyncio.run(local.verify(sign("k1")))["sub"] == "user-a"
+        assert asyncio.run(local.verify(sign("k1")))["sub"] == "user-a"
+        assert len(fetches) == 1
+
+        # kid ใหม่ → โหลดใหม่ได้ไม่ถี่เกิน, ไม่มี key → ถาม Supabase Auth แทน
+        now[0] = 60
+        assert asyncio.run(local.verify(sign("k2"))) is None
+        assert asyncio.run(local.verify(sign("k2"))) is None
+        assert len(fetches) == 2
+
+        now[0] = 700  # หมด TTL
+        asyncio.run(local.verify(sign("k1")))
+        assert len(fetches) == 3
+
+
+# ================================================
+# get_current_user
+# ================================================
+class TestCurrentUser:
+
+    def test_local_jwt_skips_remote(self, repos, verifier):
+        user = asyncio.run(get_current_user(_request(), f"Bearer {_token('admin-1')}"))
+        assert user.id == "admin-1" and user.role == "admin" and user.email == "admin-1@lumopack.test"
+        assert repos.auth.calls == 0
+
+    def test_invalid_jwt_rejected_without_remote(self, repos, verifier):
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(get_current_user(_request(), f"Bearer {_token(expires_in=-10)}"))
+        assert error.value.status_code == 401
+        assert repos.auth.calls == 0
+
+    def test_remote_fallback(self, repos):
+        # ไม่มี verifier (ไม่ได้ตั้ง secret) → ถาม auth backend เหมือนเดิม
+        user = asyncio.run(get_current_user(_request(), "Bearer tok-a"))
+        assert user.id == "user-a" and repos.auth.calls == 1
+
+    def test_role_cached(self, repos, verifier):
+        for _ in range(3):
+            asyncio.run(get_current_user(_request(), f"Bearer {_token()}"))
+        assert repos.profiles.calls == 1
+        assert get_role_cache_stats()["hits"] == 2
+
+    def test_request_memo(self, repos, verifier):
+        request = _request()
+        first = asyncio.run(get_current_user(request, f"Bearer {_token()}"))
+        assert asyncio.run(get_current_user(request, f"Bearer {_token()}")) is first
+        assert repos.profiles.calls == 1 and get_role_cache_stats()["hits"] == 0
+
+    @pytest.mark.parametrize("user_id", ["user-a", None])
+    def test_invalidate_during_lookup_not_cached(self, repos, user_id):
+        # lookup อ่าน role เก่าจาก DB → ระหว่างรอ role ถูกเปลี่ยน + invalidate → ห้าม cache role เก่า
+        class SlowProfiles:
+            def __init__(self):
+                self.started = asyncio.Event()
+                self.release = asyncio.Event()
+                self.role = "customer"
+
+            async def get_role(self, user_id):
+                role = self.role
+                self.started.set()
+                await self.release.wait()
+                return role
+
+        profiles = SlowProfiles()
+        repos.profiles = profiles
+
+        async def scenario():
+            lookup = asyncio.create_task(_get_role(repos, "user-a"))
+            await profiles.started.wait()
+            profiles.role = "admin"
+            invalidate_role(user_id)
+            profiles.release.set()
+            assert await lookup == "customer"
+            return await _get_role(repos, "user-a")
+
+        assert asyncio.run(scenario()) == "admin"
+
+
+# ================================================
+# Role change API
+# ================================================
+class TestRoleChange:
+
+    def test_role_change_takes_effect_immediately(self, client, repos):
+        customer = _auth(_token("user-a"))
+        assert client.get("/api/orders", headers=customer).status_code == 200
+        assert client.patch("/api/orders/missing/status", json={"status": "qc"}, headers=customer).status_code == 403
+
+        promoted = client.patch("/api/profiles/user-a/role", json={"role": "admin"}, headers=_auth(_token("admin-1")))
+        assert promoted.status_code == 200 and promoted.json()["role"] == "admin"
+        # role cache ถูกล้าง → เป็น admin ทันที ไม่ต้องรอ TTL
+        assert client.patch("/api/orders/missing/status", json={"status": "qc"}, headers=customer).status_code == 404
+
+    def test_role_change_validation(self, client):
+        admin = _auth(_token("admin-1"))
+        assert client.patch("/api/profiles/user-a/role", json={"role": "root"}, headers=admin).status_code == 400
+        assert client.patch("/api/profiles/nobody/role", json={"role": "admin"}, headers=admin).status_code == 404
+        assert client.patch(
+            "/api/profiles/user-a/role", json={"role": "admin"}, headers=_auth(_token("user-a"))
+        ).status_code == 403
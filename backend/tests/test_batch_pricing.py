@@ -0,0 +1,211 @@
+"""
+Unit Tests for Batch Pricing
+ทดสอบว่า price_batch / price_grid (NumPy) ให้ผลเท่ากับ get_price_estimate ทุกตัวเลข
++ POST /api/pricing/calculate-batch, POST /api/pricing/grid
+"""
+
+import sys
+import os
+import itertools
+import random
+import pytest
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("GROQ_API_KEY", "test-key")  # main import api.chat → สร้าง ChatbotFlowManager
+
+from fastapi.testclient import TestClient
+
+from main import app
+from services.batch_pricing import VECTOR_MIN_GROUP, price_batch, round2
+from services.price_grid import GRID_AXES, price_grid
+from services.pricing_calculator import get_price_estimate
+from utils.constants import RSC_MATERIALS, DIE_CUT_MATERIALS
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+CONFIGS = [
+    {"box_type": "rsc", "material": "corrugated_2layer"},
+    {"box_type": "rsc", "material": "kraft_200gsm", "inner": "shredded_paper"},
+    {
+        "box_type": "die_cut", "material": "art_300gsm",
+        "coatings": [{"type": "uv_gloss", "category": "gloss"}, {"type": "unknown", "category": "gloss"}],
+        "stampings": [{"type": "emboss", "has_block": False}, {"type": "foil_regular", "has_block": True}],
+    },
+]
+
+
+def _random_items(count, seed=0):
+    rng = random.Random(seed)
+    return [
+        {
+            **rng.choice(CONFIGS),
+            "dimensions": {
+                "width": rng.randint(1, 80),
+                "length": round(rng.uniform(1, 80), 2),
+                "height": round(rng.uniform(1, 60), 1),
+            },
+            "quantity": rng.randint(500, 100000),
+        }
+        for _ in range(count)
+    ]
+
+
+class TestPriceBatch:
+
+    def test_matches_scalar_pricing(self):
+        # กลุ่มใหญ่พอให้ใช้ vectorized path ทุกกลุ่ม
+        items = _random_items(VECTOR_MIN_GROUP * 3 * 10)
+        assert price_batch(items) == [get_price_estimate(item) for item in items]
+
+    def test_small_groups_match_scalar_pricing(self):
+        items = _random_items(5, seed=1)
+        assert price_batch(items) == [get_price_estimate(item) for item in items]
+
+    def test_errors_are_per_item_and_keep_order(self):
+        items = _random_items(40)
+        items[3] = {**items[3], "box_type": "rsc", "material": "plastic"}
+        del items[7]["quantity"]
+
+        results = price_batch(items)
+        assert len(results) == len(items)
+        assert "ไม่มีวัสดุ 'plastic'" in results[3]["error"]
+        assert "quantity" in results[7]["error"]
+        assert results[0] == get_price_estimate(items[0])
+
+    def test_round2_matches_python_round(self):
+        values = np.array([0.125, 0.135, 2.675, 1.005, 1234.5649999, 0.0, 99.995, 10.0 / 3])
+        assert round2(values) == [round(float(v), 2) for v in values]
+
+    def test_every_material(self):
+        items = [
+            {"dimensions": {"width": 20, "length": 15, "height": 10},
+             "box_type": box_type, "material": material, "quantity": 1000 + i}
+            for box_type, db in (("rsc", RSC_MATERIALS), ("die_cut", DIE_CUT_MATERIALS))
+            for material in db
+            for i in range(VECTOR_MIN_GROUP)
+        ]
+        assert price_batch(items) == [get_price_estimate(item) for item in items]
+
+
+class TestBatchEndpoint:
+
+    def test_batch_matches_single_calculate(self, client):
+        items = _random_items(3, seed=2)
+        res = client.post("/api/pricing/calculate-batch", json={"items": items})
+        assert res.status_code == 200
+        data = res.json()
+        assert data["total"] == 3 and data["failed"] == 0
+
+        for item, entry in zip(items, data["results"]):
+            single = client.post("/api/pricing/calculate", json=item).json()
+            assert entry["result"] == single
+
+    def test_invalid_items_do_not_fail_batch(self, client):
+        items = _random_items(3, seed=3)
+        items[1] = {**items[1], "quantity": 100}
+        items[2] = {**items[2], "box_type": "rsc", "material": "art_300gsm"}
+
+        res = client.post("/api/pricing/calculate-batch", json={"items": items})
+        assert res.status_code == 200
+        results = res.json()["results"]
+        assert [r["index"] for r in results] == [0, 1, 2]
+        assert results[0]["result"] is not None
+        assert "quantity" in results[1]["error"]
+        assert "art_300gsm" in results[2]["error"]
+        assert res.json()["failed"] == 2
+
+    def test_empty_batch_rejected(self, client):
+        res = client.post("/api/pricing/calculate-batch", json={"items": []})
+        assert res.status_code == 422
+
+
+# ================================================
+# Price grid
+# ================================================
+GRID_BASE = {
+    "dimensions": {"width": 20, "length": 15, "height": 10},
+    "box_type": "die_cut",
+    "material": "art_300gsm",
+    "quantity": 1000,
+    "inner": "shredded_paper",
+    "coatings": [{"type": "uv_gloss", "category": "gloss"}],
+    "stampings": [{"type": "foil_regular", "has_block": False}],
+}
+
+
+class TestPriceGrid:
+
+    def test_every_cell_matches_scalar_pricing(self):
+        axes = {
+            "materials": ["art_300gsm", "corrugated_2layer"],
+            "widths": [10, 12.5, 20],
+            "heights": [5, 7.3],
+            "quantities": [500, 1000, 2500],
+        }
+        grid = price_grid(GRID_BASE, axes, ["grand_total", "price_per_box", "subtotal"])
+        assert grid["shape"] == [2, 3, 1, 2, 3]
+
+        for index in itertools.product(*(range(n) for n in grid["shape"])):
+            material, width, length, height, quantity = (
+                grid["axes"][axis][i] for axis, i in zip(GRID_AXES, index)
+            )
+            expected = get_price_estimate({
+                **GRID_BASE,
+                "material": material,
+                "dimensions": {"width": width, "length": length, "height": height},
+                "quantity": quantity,
+            })
+            assert grid["values"]["grand_total"][index] == expected["grand_total"]
+            assert grid["values"]["subtotal"][index] == expected["subtotal"]
+            assert grid["values"]["price_per_box"][index] == round(expected["grand_total"] / quantity, 2)
+
+    def test_unknown_material_rejected(self):
+        with pytest.raises(ValueError):
+            price_grid(GRID_BASE, {"materials": ["plastic"]})
+
+    def test_too_many_cells_rejected(self):
+        axes = {"widths": list(range(1, 501)), "quantities": list(range(500, 1500))}
+        with pytest.raises(ValueError):
+            price_grid(GRID_BASE, axes)
+
+
+class TestPriceGridEndpoint:
+
+    def test_columnar_json(self, client):
+        payload = {"base": GRID_BASE, "axes": {"quantities": [500, 1000, 5000]}}
+        res = client.post("/api/pricing/grid", json=payload)
+        assert res.status_code == 200
+        data = res.json()
+        assert data["order"] == list(GRID_AXES)
+        assert data["shape"] == [1, 1, 1, 1, 3]
+
+        single = client.post("/api/pricing/calculate", json={**GRID_BASE, "quantity": 5000}).json()
+        assert data["values"]["grand_total"][2] == single["grand_total"]
+        assert data["values"]["price_per_box"][2] == single["price_per_box"]
+
+    def test_binary_layout(self, client):
+        payload = {
+            "base": GRID_BASE,
+            "axes": {"quantities": [500, 1000], "widths": [10, 20, 30]},
+            "metrics": ["grand_total", "subtotal"],
+            "format": "binary",
+        }
+        res = client.post("/api/pricing/grid", json=payload)
+        assert res.status_code == 200
+        assert res.headers["x-grid-shape"] == "1,3,1,1,2"
+        values = np.frombuffer(res.content, dtype="<f8").reshape(2, 1, 3, 1, 1, 2)
+
+        json_res = client.post("/api/pricing/grid", json={**payload, "format": "json"}).json()
+        assert values[0].ravel().tolist() == json_res["values"]["grand_total"]
+        assert values[1].ravel().tolist() == json_res["values"]["subtotal"]
+
+    def test_invalid_axes(self, client):
+        res = client.post("/api/pricing/grid", json={"base": GRID_BASE, "axes": {"quantities": [100]}})
+        assert res.status_code == 422
+        res = client.post("/api/pricing/grid", json={"base": GRID_BASE, "axes": {"materials": ["plastic"]}})
+        assert res.status_code == 400
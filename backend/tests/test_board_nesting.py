@@ -0,0 +1,158 @@
+"""
+Unit Tests for Board Nesting
+ทดสอบ dieline, การจัดวาง blank บนแผ่น (ไม่ทับกัน, อยู่ในขอบ trim) และ material_mode="sheets"
+ของ PricingCalculator / get_price_estimate / batch / API
+"""
+
+import sys
+import os
+import itertools
+import math
+import random
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("GROQ_API_KEY", "test-key")  # main import api.chat → สร้าง ChatbotFlowManager
+
+from fastapi.testclient import TestClient
+
+from main import app
+from services.batch_pricing import price_batch
+from services.board_nesting import dieline_blank, fits_board_sheet, nest_blank, nest_boxes
+from services.incremental_pricing import reprice
+from services.pricing_calculator import PricingCalculator, get_price_estimate
+from utils.constants import BOARD_SHEETS, RSC_MATERIALS
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def _rectangles(layout, box_type):
+    """blocks → รายการสี่เหลี่ยม (x0, y0, x1, y1) ของ blank ทุกใบ"""
+    gap = BOARD_SHEETS[box_type]["gap_cm"]
+    length, width = layout["blank"]["length_cm"], layout["blank"]["width_cm"]
+    rects = []
+    for block in layout["blocks"]:
+        bl, bw = (width, length) if block["rotated"] else (length, width)
+        for i, j in itertools.product(range(block["cols"]), range(block["rows"])):
+            x = block["x_cm"] + i * (bl + gap)
+            y = block["y_cm"] + j * (bw + gap)
+            rects.append((x, y, x + bl, y + bw))
+    return rects
+
+
+class TestDieline:
+
+    def test_rsc_blank(self):
+        assert dieline_blank("rsc", 20, 15, 10) == (2 * 35 + 3.5, 10 + 20)
+
+    def test_die_cut_blank(self):
+        assert dieline_blank("die_cut", 10, 10, 10) == (2 * 20 + 1.5, 10 + 2 * (10 + 2.0))
+
+
+class TestNesting:
+
+    def test_random_layouts_fit_without_overlap(self):
+        rng = random.Random(3)
+        for _ in range(200):
+            box_type = rng.choice(["rsc", "die_cut"])
+            sheet = BOARD_SHEETS[box_type]
+            layout = nest_blank(box_type, rng.uniform(5, 90), rng.uniform(5, 60))
+            rects = _rectangles(layout, box_type)
+            assert len(rects) == layout["blanks_per_sheet"]
+
+            trim = sheet["trim_cm"]
+            for x0, y0, x1, y1 in rects:
+                assert x0 >= trim - 1e-9 and y0 >= trim - 1e-9
+                assert x1 <= sheet["length_cm"] - trim + 1e-9 and y1 <= sheet["width_cm"] - trim + 1e-9
+            for p, q in itertools.combinations(rects, 2):
+                assert p[2] <= q[0] + 1e-9 or q[2] <= p[0] + 1e-9 or p[3] <= q[1] + 1e-9 or q[3] <= p[1] + 1e-9
+
+    def test_mixed_orientation_beats_uniform_grid(self):
+        # 73.5 x 30 บนแผ่น 238 x 118: วางแนวเดียวได้ 9 ใบ, ผสมแนวตั้ง/นอนได้ 10
+        layout = nest_blank("rsc", 73.5, 30)
+        assert layout["blanks_per_sheet"] == 10
+        assert {block["rotated"] for block in layout["blocks"]} == {False, True}
+        assert 0 < layout["waste_pct"] < 100
+
+    def test_sheets_needed(self):
+        nesting = nest_boxes("rsc", 20, 15, 10, 1001)
+        assert nesting["sheets_needed"] == math.ceil(1001 / nesting["blanks_per_sheet"])
+
+    def test_blank_larger_than_sheet(self):
+        with pytest.raises(ValueError, match="ใหญ่เกินแผ่น"):
+            nest_boxes("die_cut", 30, 25, 20, 1000)
+
+    def test_fits_board_sheet(self):
+        assert fits_board_sheet("rsc", 20, 30, 20)
+        assert fits_board_sheet("rsc", 50, 65, 60)           # blank 233.5 x 110 (พอดีแผ่น 238 x 118)
+        assert not fits_board_sheet("rsc", 50, 70, 20)       # ยาว 243.5 เกิน
+        assert not fits_board_sheet("die_cut", 30, 25, 20)
+
+
+# ================================================
+# material_mode="sheets"
+# ================================================
+SPEC = {
+    "dimensions": {"width": 20, "length": 15, "height": 10},
+    "box_type": "rsc",
+    "material": "corrugated_2layer",
+    "quantity": 1000,
+}
+SHEETS = {**SPEC, "material_mode": "sheets"}
+
+
+class TestSheetPricing:
+
+    def test_price_from_sheets_consumed(self):
+        box_base = get_price_estimate(SHEETS)["box_base"]
+        nesting = box_base["nesting"]
+
+        material = RSC_MATERIALS["corrugated_2layer"]
+        sheet_kg = 120 * 240 * material["thickness_cm"] * material["density"] / 1000
+        expected = nesting["sheets_needed"] * sheet_kg * material["paper_cost_per_kg"] / 1000 + material["labor_cost"]
+        assert box_base["price_per_box"] == round(expected, 2)
+
+    def test_area_mode_unchanged(self):
+        area = get_price_estimate(SPEC)
+        assert "nesting" not in area["box_base"]
+        assert area == get_price_estimate({**SPEC, "material_mode": "area"})
+        assert get_price_estimate(SHEETS)["grand_total"] != area["grand_total"]
+
+    def test_unknown_mode_rejected(self):
+        with pytest.raises(ValueError):
+            PricingCalculator(material_mode="volume")
+
+    def test_batch_uses_scalar_path(self):
+        items = [{**SHEETS, "quantity": 1000 + i} for i in range(20)] + [{**SHEETS, "box_type": "die_cut",
+                 "material": "art_300gsm", "dimensions": {"width": 30, "length": 25, "height": 20}}]
+        results = price_batch(items)
+        assert results[:20] == [get_price_estimate(item) for item in items[:20]]
+        assert "ใหญ่เกินแผ่น" in results[20]["error"]
+
+    def test_incremental_mode_switch_recomputes_box_only(self):
+        spec = {**SPEC, "inner": "shredded_paper"}
+        _, graph, _ = reprice(spec)
+        result, _, recomputed = reprice({**spec, "material_mode": "sheets"}, graph)
+        assert recomputed == ["box_base"]
+        assert result == get_price_estimate({**spec, "material_mode": "sheets"})
+
+
+class TestSheetPricingEndpoint:
+
+    def test_calculate_with_sheets(self, client):
+        res = client.post("/api/pricing/calculate", json=SHEETS)
+        assert res.status_code == 200
+        nesting = res.json()["breakdown"]["box_base"]["nesting"]
+        assert nesting["blanks_per_sheet"] > 0 and nesting["sheets_needed"] > 0
+
+    def test_oversized_blank_is_bad_request(self, client):
+        payload = {**SHEETS, "box_type": "die_cut", "material": "art_300gsm",
+                   "dimensions": {"width": 30, "length": 25, "height": 20}}
+        assert client.post("/api/pricing/calculate", json=payload).status_code == 400
+
+    def test_grid_rejects_sheets(self, client):
+        res = client.post("/api/pricing/grid", json={"base": SHEETS, "axes": {"quantities": [500, 1000]}})
+        assert res.status_code == 400
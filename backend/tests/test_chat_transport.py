@@ -0,0 +1,312 @@
+"""
+Unit Tests for Chat Transport
+ทดสอบ WebSocket (/ws/chat/{session_id}) และ delta/ETag ของ REST chat API
+ใช้ stub LLM (ไม่เรียก Groq จริง)
+"""
+
+import sys
+import os
+import json
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("GROQ_API_KEY", "test-key")  # api.chat สร้าง ChatbotFlowManager ตอน import
+
+from fastapi.testclient import TestClient
+
+import api.chat as chat_api
+from main import app
+from middleware.auth import require_admin, AuthUser
+from models.chat_state import ConversationState, ChatbotStep, session_storage
+from services.chatbot_flow import ChatbotFlowManager
+from services.repositories import Repositories, set_repositories
+from utils.state_delta import diff_collected_data
+
+
+class StubLLM:
+    """LLM ปลอม — ตอบข้อความคงที่"""
+
+    async def generate_response(self, system_prompt, user_message, conversation_history=None, **kwargs):
+        return "stub-response"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(chat_api, "chatbot_manager", ChatbotFlowManager(groq_service=StubLLM()))
+    return TestClient(app)
+
+
+# ================================================
+# diff_collected_data
+# ================================================
+class TestDiffCollectedData:
+
+    def test_no_change(self):
+        assert diff_collected_data({"a": 1}, {"a": 1}) == []
+
+    def test_add_replace_remove(self):
+        ops = diff_collected_data({"a": 1, "b": 2}, {"a": 3, "c": 4})
+        assert {"op": "remove", "path": "/b"} in ops
+        assert {"op": "replace", "path": "/a", "value": 3} in ops
+        assert {"op": "add", "path": "/c", "value": 4} in ops
+
+    def test_pointer_escaping(self):
+        ops = diff_collected_data({}, {"a/b~c": 1})
+        assert ops[0]["path"] == "/a~1b~0c"
+
+
+# ================================================
+# WebSocket endpoint
+# ================================================
+class TestChatWebSocket:
+
+    def test_session_frame_and_turn(self, client):
+        with client.websocket_connect("/ws/chat/ws_test_turn") as ws:
+            hello = ws.receive_json()
+            assert hello["type"] == "session"
+            assert hello["current_step"] == 1
+
+            ws.send_json({"type": "message", "message": "สวัสดีครับ"})
+            step = ws.receive_json()
+            assert step["type"] == "step"
+            assert step["current_step"] == 2
+            done = ws.receive_json()
+            assert done["type"] == "turn_complete"
+            assert done["current_step"] == 2
+            assert done["quick_replies"]
+
+        session_storage.delete_session("ws_test_turn")
+
+    def test_step_delta(self, client):
+        state = ConversationState(session_id="ws_test_delta", current_step=ChatbotStep.COLLECT_PRODUCT_TYPE)
+        session_storage.update_session("ws_test_delta", state)
+
+        with client.websocket_connect("/ws/chat/ws_test_delta") as ws:
+            ws.receive_json()
+            ws.send_text("เครื่องสำอาง")
+            step = ws.receive_json()
+            assert step["collected_data_delta"] == [
+                {"op": "add", "path": "/product_type", "value": "cosmetic"}
+            ]
+            ws.receive_json()
+
+        session_storage.delete_session("ws_test_delta")
+
+    def test_step_frame_is_not_changed_by_later_steps(self, monkeypatch):
+        class InPlaceManager:
+            """step ถัดไปแก้ dict ใน collected_data ในที่ ก่อน sender จะ serialize frame แรก"""
+
+            async def process_message(self, user_message, state, on_step=None):
+                state.collected_data["special_effects"] = [{"type": "foil_gold", "has_block": None}]
+                await on_step("step-a", state)
+                state.collected_data["special_effects"][0]["has_block"] = True
+                await on_step("step-b", state)
+                return "done", state
+
+        monkeypatch.setattr(chat_api, "chatbot_manager", InPlaceManager())
+        with TestClient(app).websocket_connect("/ws/chat/ws_test_snapshot") as ws:
+            ws.receive_json()
+            ws.send_text("ปั๊มฟอยล์ทอง")
+            first, second = ws.receive_json(), ws.receive_json()
+            ws.receive_json()
+
+        assert first["collected_data_delta"][0]["value"] == [{"type": "foil_gold", "has_block": None}]
+        assert second["collected_data_delta"][0]["value"] == [{"type": "foil_gold", "has_block": True}]
+        session_storage.delete_session("ws_test_snapshot")
+
+    def test_auto_execute_chain_pushes_each_step(self, client):
+        state = ConversationState(
+            session_id="ws_test_chain",
+            current_step=ChatbotStep.CHECKPOINT_2,
+            is_waiting_for_confirmation=True,
+            collected_data={
+                "product_type": "general", "box_type": "rsc", "material": "corrugated_2layer",
+                "dimensions": {"width": 20, "length": 15, "height": 10}, "quantity": 1000,
+            },
+        )
+        session_storage.update_session("ws_test_chain", state)
+
+        with client.websocket_connect("/ws/chat/ws_test_chain") as ws:
+            ws.receive_json()
+            ws.send_json({"type": "message", "message": "ถูกต้อง"})
+
+            first = ws.receive_json()
+            assert first["type"] == "step"
+            assert first["current_step"] == ChatbotStep.GENERATE_MOCKUP
+
+            second = ws.receive_json()
+            assert second["type"] == "step"
+            assert second["current_step"] == ChatbotStep.CONFIRM_ORDER
+
+            done = ws.receive_json()
+            assert done["type"] == "turn_complete"
+            assert first["response"] in done["response"]
+            assert second["response"] in done["response"]
+
+        session_storage.delete_session("ws_test_chain")
+
+    def test_ping_pong_and_unknown_frame(self, client):
+        with client.websocket_connect("/ws/chat/ws_test_ping") as ws:
+            ws.receive_json()
+            ws.send_json({"type": "ping"})
+            assert ws.receive_json() == {"type": "pong"}
+            ws.send_json({"type": "bogus"})
+            assert ws.receive_json()["code"] == "unknown_type"
+
+        session_storage.delete_session("ws_test_ping")
+
+
+# ================================================
+# REST: state_version / collected_data_delta / ETag
+# ================================================
+class TestChatDeltaAndETag:
+
+    def test_version_and_delta(self, client):
+        first = client.post("/api/chat/message", json={"message": "สวัสดี"}).json()
+        sid = first["session_id"]
+        assert first["state_version"] == 1
+        assert first["collected_data"] == {}
+        assert first["collected_data_delta"] == []
+
+        second = client.post("/api/chat/message", json={
+            "message": "เครื่องสำอาง", "session_id": sid, "base_version": 1
+        }).json()
+        assert second["state_version"] == 2
+        assert "collected_data" not in second  # client in sync → ส่งแค่ delta
+        assert second["collected_data_delta"] == [
+            {"op": "add", "path": "/product_type", "value": "cosmetic"}
+        ]
+        session_storage.delete_session(sid)
+
+    def test_stale_base_version_gets_full_data(self, client):
+        sid = client.post("/api/chat/message", json={"message": "สวัสดี"}).json()["session_id"]
+        data = client.post("/api/chat/message", json={
+            "message": "อาหาร", "session_id": sid, "base_version": 0
+        }).json()
+        assert data["collected_data"] == {"product_type": "food_grade"}
+        session_storage.delete_session(sid)
+
+    def test_session_etag_304(self, client):
+        sid = client.post("/api/chat/message", json={"message": "สวัสดี"}).json()["session_id"]
+
+        res = client.get(f"/api/chat/session/{sid}")
+        assert res.status_code == 200
+        etag = res.headers["ETag"]
+        assert res.json()["state_version"] == 1
+
+        cached = client.get(f"/api/chat/session/{sid}", headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.headers["ETag"] == etag
+
+        client.post("/api/chat/message", json={"message": "อาหาร", "session_id": sid})
+        changed = client.get(f"/api/chat/session/{sid}", headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.headers["ETag"] != etag
+        session_storage.delete_session(sid)
+
+    def test_message_length_limit(self, client):
+        too_long = "ก" * (chat_api.MAX_MESSAGE_LENGTH + 1)
+        assert client.post("/api/chat/message", json={"message": too_long}).status_code == 422
+
+        with client.websocket_connect("/ws/chat/ws_test_too_long") as ws:
+            ws.receive_json()
+            ws.send_text(too_long)
+            assert ws.receive_json()["code"] == "message_too_long"
+        session_storage.delete_session("ws_test_too_long")
+
+    def test_reset_bumps_version(self, client):
+        sid = client.post("/api/chat/message", json={"message": "สวัสดี"}).json()["session_id"]
+        res = client.post(f"/api/chat/session/{sid}/reset").json()
+        assert res["state_version"] == 2
+        session_storage.delete_session(sid)
+
+    def test_reset_clears_prefill(self, client):
+        spec = "กล่องไดคัท ใส่เครื่องสำอาง 20x15x10 จำนวน 2000 ลอน BC มีโลโก้ ด้านบน ฟอยล์ทอง"
+        sid = client.post("/api/chat/message", json={"message": spec}).json()["session_id"]
+        state = session_storage.get_session(sid)
+        assert state.prefilled_data and state.partial_data and state.sub_step == 1
+
+        client.post(f"/api/chat/session/{sid}/reset")
+        state = session_storage.get_session(sid)
+        assert (state.prefilled_data, state.partial_data, state.sub_step) == ({}, {}, 0)
+
+        # บทสนทนาใหม่เดินทีละ step ไม่ข้าม
+        assert client.post("/api/chat/message", json={"message": "สวัสดี", "session_id": sid}).json()["current_step"] == 2
+        data = client.post("/api/chat/message", json={"message": "อาหาร", "session_id": sid}).json()
+        assert data["current_step"] == int(ChatbotStep.COLLECT_BOX_TYPE)
+        assert session_storage.get_session(sid).sub_step == 0
+        session_storage.delete_session(sid)
+
+
+# ============================================================
+# Replay endpoint (/api/chat/replay)
+# ============================================================
+
+class TestChatReplay:
+
+    @pytest.fixture
+    def admin_client(self, client):
+        app.dependency_overrides[require_admin] = lambda: AuthUser(id="admin-1", role="admin")
+        yield client
+        app.dependency_overrides.pop(require_admin, None)
+
+    def _lines(self, res):
+        return [json.loads(line) for line in res.text.splitlines() if line.strip()]
+
+    def test_requires_auth(self, client):
+        res = client.post("/api/chat/replay", json={"conversations": [{"messages": ["สวัสดี"]}]})
+        assert res.status_code == 401
+
+    def test_replay_streams_turns_and_summary(self, admin_client):
+        script = ["สวัสดี", "อาหาร", "RSC"]
+        res = admin_client.post("/api/chat/replay", json={
+            "conversations": [{"id": f"c{i}", "messages": script} for i in range(5)],
+            "concurrency": 2,
+        })
+        assert res.status_code == 200
+        assert res.headers["content-type"].startswith("application/x-ndjson")
+
+        lines = self._lines(res)
+        turns = [l for l in lines if l["type"] == "turn"]
+        done = [l for l in lines if l["type"] == "conversation_done"]
+        assert len(turns) == 15
+        assert len(done) == 5
+        assert lines[-1]["type"] == "summary"
+        assert lines[-1]["turns"] == 15
+
+        # ทุกบทสนทนาเดินเหมือนกัน (session แยกกัน ไม่ปนกัน)
+        for d in done:
+            assert d["collected_data"]["product_type"] == "food_grade"
+            assert d["error"] is None
+        assert len({d["final_step"] for d in done}) == 1
+
+        c0 = [t for t in turns if t["conversation"] == "c0"]
+        assert [t["turn"] for t in c0] == [0, 1, 2]
+        assert c0[0]["step_before"] == 1 and c0[0]["step_after"] == 2
+
+    def test_replay_does_not_persist_sessions(self, admin_client):
+        before = len(session_storage.list_sessions())
+        admin_client.post("/api/chat/replay", json={"conversations": [{"messages": ["สวัสดี"]}]})
+        assert len(session_storage.list_sessions()) == before
+
+    def test_replay_does_not_save_orders(self, admin_client):
+        created = []
+
+        class RecordingOrders:
+            async def create(self, row):
+                created.append(row)
+                return row
+
+        script = [
+            "สวัสดี", "อาหาร", "RSC", "1", "20x15x10", "1000", "ยืนยัน",
+            "ข้าม", "ไม่มีโลโก้", "ไม่ต้องการ", "ยืนยัน", "ยืนยัน", "ขอบคุณค่ะ",  # turn สุดท้าย = handle_end
+        ]
+        set_repositories(Repositories(RecordingOrders(), None, None, None))
+        try:
+            res = admin_client.post("/api/chat/replay", json={"conversations": [{"messages": script}]})
+        finally:
+            set_repositories(None)
+
+        done = [l for l in self._lines(res) if l["type"] == "conversation_done"]
+        assert done[0]["final_step"] == int(ChatbotStep.END) and done[0]["error"] is None
+        assert created == []
@@ -13,6 +13,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 from models.chat_state import ConversationState, ChatbotStep
 from services.chatbot_flow import ChatbotFlowManager
+from services.fake_llm import FakeLLMService
 
 
 @pytest.mark.asyncio
@@ -122,6 +123,104 @@ async def test_chatbot_flow():
     print(f"📊 Data collected: {len(state.collected_data)} fields")
 
 
+
+# ===================================
+# Fast-forward (one-shot extraction)
+# ===================================
+async def _run(messages):
+    """รันบทสนทนาด้วย fake LLM → (state, จำนวน LLM calls)"""
+    llm = FakeLLMService()
+    manager = ChatbotFlowManager(groq_service=llm)
+    state = ConversationState(session_id=f"test_{uuid.uuid4().hex[:8]}")
+    for message in messages:
+        _, state = await manager.process_message(message, state)
+    return state, llm.call_count
+
+
+@pytest.mark.asyncio
+async def test_fast_forward_rsc_one_shot():
+    """ข้อมูลโครงสร้างครบในข้อความเดียว → ไปถึง checkpoint 1 ในรอบเดียว"""
+    state, _ = await _run(["สวัสดี", "สินค้าทั่วไป กล่อง RSC ลูกฟูก 20x15x10 จำนวน 1000"])
+    assert state.current_step == ChatbotStep.CHECKPOINT_1
+    assert state.is_waiting_for_confirmation
+    assert state.collected_data["box_type"] == "rsc"
+    assert state.collected_data["material"] == "corrugated_2layer"
+    assert state.collected_data["quantity"] == 1000
+
+
+@pytest.mark.asyncio
+async def test_fast_forward_lands_on_missing_sub_step():
+    """รู้ box_type แต่ไม่รู้วัสดุ → ถามวัสดุ (sub_step 1) / มีโลโก้ → ถามตำแหน่ง"""
+    state, _ = await _run([
+        "สวัสดี",
+        "กล่องไดคัท ใส่เครื่องสำอาง 20x15x10 จำนวน 2000 ลอน BC มีโลโก้ ฟอยล์ทอง",
+    ])
+    assert state.current_step == ChatbotStep.COLLECT_BOX_TYPE
+    assert state.sub_step == 1
+    assert state.partial_data["box_type"] == "die_cut"
+
+    state, calls = await _run([
+        "สวัสดี",
+        "กล่องไดคัท ใส่เครื่องสำอาง 20x15x10 จำนวน 2000 ลอน BC มีโลโก้ ฟอยล์ทอง",
+        "3", "ไม่ต้องการ", "ถูกต้อง", "มินิมอล",
+    ])
+    assert state.current_step == ChatbotStep.COLLECT_LOGO
+    assert state.sub_step == 1
+    assert state.collected_data["flute_type"] == "BC"
+    assert state.collected_data["has_logo"] is True
+
+
+@pytest.mark.asyncio
+async def test_fast_forward_design_to_checkpoint2():
+    """ไม่มีโลโก้ + ลูกเล่นไม่มีป๊ัม → ข้าม step 8-9 ไป checkpoint 2"""
+    state, calls = await _run([
+        "สวัสดี", "สินค้าทั่วไป กล่อง RSC ลูกฟูก 20x15x10 จำนวน 1000",
+        "ถูกต้อง", "มินิมอล ไม่มีโลโก้ เคลือบเงา",
+    ])
+    assert state.current_step == ChatbotStep.CHECKPOINT_2
+    assert state.is_waiting_for_confirmation
+    assert state.collected_data["has_logo"] is False
+    assert state.collected_data["special_effects"] == [{"type": "aq_gloss", "category": "gloss"}]
+    assert calls <= 5
+
+
+@pytest.mark.asyncio
+async def test_fast_forward_from_first_message():
+    """ข้อความแรกบอก spec ครบ (ไม่ทักทายก่อน) → ข้ามเหมือนส่งหลัง greeting"""
+    message = "กล่องไดคัท ใส่เครื่องสำอาง 20x15x10 จำนวน 2000 ลอน BC มีโลโก้ ฟอยล์ทอง"
+    state, _ = await _run([message])
+    assert state.current_step == ChatbotStep.COLLECT_BOX_TYPE
+    assert state.sub_step == 1
+    assert state.collected_data["product_type"] == "cosmetic"
+    assert state.partial_data["box_type"] == "die_cut"
+
+    state, _ = await _run([message, "3", "ไม่ต้องการ", "ถูกต้อง", "มินิมอล"])
+    assert state.current_step == ChatbotStep.COLLECT_LOGO
+    assert state.sub_step == 1
+    assert state.collected_data["quantity"] == 2000
+    assert state.collected_data["flute_type"] == "BC"
+
+
+@pytest.mark.asyncio
+async def test_plain_greeting_prefills_nothing():
+    state, _ = await _run(["สวัสดีค่ะ"])
+    assert state.current_step == ChatbotStep.COLLECT_PRODUCT_TYPE
+    assert state.prefilled_data == {}
+
+
+@pytest.mark.asyncio
+async def test_step_by_step_unchanged():
+    """ตอบทีละ step → flow เดิม (transition ต่อท้ายตามปกติ)"""
+    llm = FakeLLMService()
+    manager = ChatbotFlowManager(groq_service=llm)
+    state = ConversationState(session_id="test_step_by_step")
+    await manager.process_message("สวัสดี", state)
+    response, state = await manager.process_message("สินค้าทั่วไป", state)
+    assert state.current_step == ChatbotStep.COLLECT_BOX_TYPE
+    assert "คุณต้องการกล่องประเภทไหนคะ?" in response
+    assert state.prefilled_data == {}
+
+
 if __name__ == "__main__":
     try:
         asyncio.run(test_chatbot_flow())
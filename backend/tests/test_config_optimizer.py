@@ -0,0 +1,159 @@
+"""
+Unit Tests for Configuration Optimizer
+ทดสอบว่า optimize_configuration คืน Pareto front ราคา vs safety factor ที่ถูกต้อง (เทียบกับไล่ทีละตัว)
++ POST /analyze/optimize และคำแนะนำในแชทเมื่อผลเป็น DANGER
+"""
+
+import sys
+import os
+import asyncio
+import itertools
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("GROQ_API_KEY", "test-key")  # main import api.chat → สร้าง ChatbotFlowManager
+
+from fastapi.testclient import TestClient
+
+from main import app
+from api.analyze import FLUTE_SPECS, analyze_box_strength
+from models.chat_state import ConversationState, ChatbotStep
+from services.config_optimizer import SAFE_SAFETY_FACTOR, corrugated_materials, optimize_configuration
+from services.pricing_calculator import get_price_estimate
+from services.pricing_catalog import PricingCatalog, builtin_tables
+from services.step_handlers.structure_steps import StructureStepHandlers
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+BASE = {"dimensions": {"width": 20, "length": 30, "height": 20}, "quantity": 1000, "inner": "shredded_paper"}
+
+
+def _flute_catalog(flute):
+    """catalog ที่ลูกฟูกหนาเท่าลอนนี้ → ใช้ get_price_estimate คิดราคาเทียบได้ตรงๆ"""
+    tables = builtin_tables()
+    for key in ("rsc_materials", "die_cut_materials"):
+        tables[key] = {
+            material_id: ({**data, "thickness_cm": FLUTE_SPECS[flute]["caliper"] / 10}
+                          if material_id.startswith("corrugated") else data)
+            for material_id, data in tables[key].items()
+        }
+    return PricingCatalog(tables)
+
+
+def _brute_force(weight_kg, max_slack_cm):
+    """ไล่ทุกตัวเลือกด้วย analyze_box_strength + get_price_estimate"""
+    options = []
+    slack = range(int(max_slack_cm) + 1)
+    for flute in FLUTE_SPECS:
+        catalog = _flute_catalog(flute)
+        for box_type in ("rsc", "die_cut"):
+            for material in corrugated_materials(box_type):
+                for dl, dw in itertools.product(slack, slack):
+                    dims = {"width": 20.0 + dw, "length": 30.0 + dl, "height": 20.0}
+                    strength = analyze_box_strength(dims["length"], dims["width"], 20, weight_kg, flute)
+                    price = get_price_estimate(
+                        {**BASE, "dimensions": dims, "box_type": box_type, "material": material}, catalog
+                    )["grand_total"]
+                    options.append((price, strength["safety_factor"], strength["status"]))
+    return options
+
+
+class TestOptimizeConfiguration:
+
+    def test_front_is_sorted_and_safe(self):
+        result = optimize_configuration(BASE, weight_kg=2, max_slack_cm=10)
+        front = result["front"]
+        assert front and result["feasible"] <= result["evaluated"]
+        for cheaper, pricier in zip(front, front[1:]):
+            assert cheaper["grand_total"] < pricier["grand_total"]
+            assert cheaper["safety_factor"] <= pricier["safety_factor"]
+        assert all(o["status"] == "SAFE" and o["safety_factor"] >= SAFE_SAFETY_FACTOR for o in front)
+
+    def test_matches_brute_force(self):
+        result = optimize_configuration(BASE, weight_kg=2, max_slack_cm=4)
+        options = _brute_force(2, 4)
+        safe = [o for o in options if o[2] == "SAFE"]
+
+        assert result["evaluated"] == len(options)
+        cheapest = min(safe)
+        assert result["front"][0]["grand_total"] == cheapest[0]
+        # ไม่มีตัวเลือกไหนถูกกว่าและแข็งแรงกว่าตัวใน front
+        for option in result["front"]:
+            assert not any(
+                p < option["grand_total"] and sf > option["safety_factor"] for p, sf, _ in safe
+            )
+
+    def test_flute_changes_price(self):
+        result = optimize_configuration(BASE, weight_kg=1, box_types=["rsc"])
+        flutes = [o["flute"] for o in result["front"]]
+        # ลอนบางถูกกว่า → อยู่ต้น front; BC แข็งแรงสุดแต่แพงสุด
+        assert flutes[0] == "B" and flutes[-1] == "BC"
+        assert result["front"][0]["dimensions"] == {"width": 20.0, "length": 30.0, "height": 20.0}
+
+    def test_infeasible_weight_returns_empty_front(self):
+        result = optimize_configuration(BASE, weight_kg=50)
+        assert result["front"] == [] and result["feasible"] == 0
+
+    @pytest.mark.parametrize("kwargs", [
+        {"weight_kg": 0},
+        {"weight_kg": 2, "box_types": ["tube"]},
+        {"weight_kg": 2, "flutes": ["Z"]},
+        {"weight_kg": 2, "max_slack_cm": 100},
+    ])
+    def test_invalid_input(self, kwargs):
+        with pytest.raises(ValueError):
+            optimize_configuration(BASE, **kwargs)
+
+
+class TestOptimizeEndpoint:
+
+    def test_optimize(self, client):
+        payload = {"length": 30, "width": 20, "height": 20, "weight": 2, "quantity": 1000, "max_slack_cm": 5}
+        res = client.post("/analyze/optimize", json=payload)
+        assert res.status_code == 200
+        data = res.json()
+        assert data["front"][0]["status"] == "SAFE"
+        assert data["catalog_version"] == "builtin"
+
+    def test_invalid_request(self, client):
+        base = {"length": 30, "width": 20, "height": 20, "quantity": 1000}
+        assert client.post("/analyze/optimize", json={**base, "weight": 0}).status_code == 422
+        assert client.post("/analyze/optimize", json={**base, "weight": 2, "flutes": ["Z"]}).status_code == 400
+
+
+# ================================================
+# แชท: ขั้น dimensions เมื่อผลเป็น DANGER
+# ================================================
+class StubLLM:
+    async def generate_response(self, system_prompt, user_message, conversation_history=None, **kwargs):
+        return "stub-checkpoint"
+
+
+class TestDimensionsStep:
+
+    def test_danger_suggests_cheapest_safe_option(self):
+        state = ConversationState(session_id="sess_opt")
+        state.current_step = ChatbotStep.COLLECT_DIMENSIONS
+        state.collected_data.update({"product_type": "general", "box_type": "rsc", "material": "corrugated_2layer"})
+
+        handlers = StructureStepHandlers(StubLLM())
+        result = asyncio.run(handlers.handle_dimensions("20x30x20 ซม. จำนวน 1000 ใบ น้ำหนัก 2 kg ลอน E", state))
+
+        assert "DANGER" in result.response
+        assert "💰" in result.response and "ถูกที่สุดที่ SAFE" in result.response
+        assert "strength_options" not in state.temp_data
+
+    def test_danger_hides_unmakeable_size(self):
+        state = ConversationState(session_id="sess_too_heavy")
+        state.current_step = ChatbotStep.COLLECT_DIMENSIONS
+        state.collected_data.update({"product_type": "general", "box_type": "rsc", "material": "corrugated_2layer"})
+
+        handlers = StructureStepHandlers(StubLLM())
+        result = asyncio.run(handlers.handle_dimensions("30x20x15 จำนวน 1000 น้ำหนัก 8kg ลอน C", state))
+
+        assert "เล็กเกินไปสำหรับ 8.0 kg ทุกลอนกระดาษ" in result.response
+        assert "ขอบรอบรวม" not in result.response and "สัดส่วนเดิม" not in result.response
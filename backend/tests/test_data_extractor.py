@@ -22,7 +22,11 @@ from services.data_extractor import (
     extract_special_effects, extract_has_existing_block,
     is_confirmation, is_rejection, is_skip_response,
     is_add_request, detect_edit_target,
+    extract_flute, extract_all,
+    clear_extraction_cache, get_extraction_cache_stats, warm_extraction_cache,
+    MEMO_MAX_MESSAGE_CHARS, _scan_cached,
 )
+from utils.quick_replies import iter_quick_reply_labels
 
 
 # ================================================
@@ -493,6 +497,118 @@ class TestDetectEditTarget:
         assert detect_edit_target("แก้ไขอะไรสักอย่าง") is None
 
 
+# ================================================
+# 13. extract_flute
+# ================================================
+class TestExtractFlute:
+    """ทดสอบ Step 5: ลอนกระดาษ"""
+
+    def test_bc_not_b(self):
+        assert extract_flute("ลอน BC") == "BC"
+
+    def test_single_flute(self):
+        assert extract_flute("ลอน B") == "B"
+
+    def test_thai_suffix(self):
+        assert extract_flute("ขอลอน Cครับ") == "C"
+
+    def test_thai_name(self):
+        assert extract_flute("ลอนบี") == "B"
+        assert extract_flute("ลอนบีซี") == "BC"
+
+    def test_none(self):
+        assert extract_flute("20x15x10") is None
+
+
+# ================================================
+# 14. extract_all (one-shot)
+# ================================================
+class TestExtractAll:
+    """ทดสอบ one-shot extraction หลาย field ในข้อความเดียว"""
+
+    def test_full_message(self):
+        data = extract_all("กล่องไดคัท ใส่เครื่องสำอาง 20x15x10 จำนวน 2000 ลอน BC มีโลโก้ ฟอยล์ทอง")
+        assert data["product_type"] == "cosmetic"
+        assert data["box_type"] == "die_cut"
+        assert data["dimensions"] == {"width": 20, "length": 15, "height": 10}
+        assert data["quantity"] == 2000
+        assert data["flute_type"] == "BC"
+        assert data["has_logo"] is True
+        assert data["special_effects"][0]["type"] == "foil_regular"
+
+    def test_menu_number_ignored(self):
+        assert extract_all("2") == {}
+        assert extract_all("1, 4") == {}
+
+    def test_no_inner_from_dimension_numbers(self):
+        assert "inner" not in extract_all("20x15x10 จำนวน 1000")
+
+    def test_bare_number_not_quantity(self):
+        assert "quantity" not in extract_all("ส่งภายในปี 2025")
+
+    def test_logo_requires_logo_word(self):
+        assert "has_logo" not in extract_all("มีสินค้าทั่วไป")
+
+    def test_no_logo_does_not_skip_effects(self):
+        data = extract_all("ไม่มีโลโก้ เคลือบเงา")
+        assert data["has_logo"] is False
+        assert data["special_effects"] == [{"type": "aq_gloss", "category": "gloss"}]
+
+    def test_logo_positions(self):
+        data = extract_all("มีโลโก้ ด้านบน")
+        assert data["has_logo"] is True
+        assert data["logo_positions"] == ["top"]
+
+    def test_material_uses_known_box_type(self):
+        assert extract_all("กล่องขาว", box_type="die_cut")["material"] == "whiteboard_350gsm"
+
+
+# ================================================
+# Extraction memo cache
+# ================================================
+class TestExtractionCache:
+
+    def setup_method(self):
+        clear_extraction_cache()
+
+    def test_normalized_message_hits_cache(self):
+        assert extract_box_type("RSC") == "rsc"
+        misses = get_extraction_cache_stats()["misses"]
+        assert extract_box_type("  rsc ") == "rsc"
+        assert get_extraction_cache_stats()["misses"] == misses
+
+    def test_context_is_part_of_key(self):
+        assert extract_material("3", "die_cut") == "art_300gsm"
+        assert extract_material("3", "rsc") is None
+
+    def test_result_is_a_copy(self):
+        first = extract_special_effects("เคลือบเงา")
+        first.append({"type": "mutated"})
+        first[0]["type"] = "mutated"
+        assert extract_special_effects("เคลือบเงา") == [{"type": "aq_gloss", "category": "gloss"}]
+
+    def test_long_message_not_memoized(self):
+        message = "กล่อง RSC 20x15x10 จำนวน 1000 " + "รายละเอียด " * MEMO_MAX_MESSAGE_CHARS
+        assert extract_all(message)["dimensions"] == {"width": 20.0, "length": 15.0, "height": 10.0}
+        assert extract_all(message)["box_type"] == "rsc"
+        stats = get_extraction_cache_stats()
+        assert (stats["size"], stats["hits"], stats["misses"]) == (0, 0, 0)
+        assert _scan_cached.cache_info().currsize == 0
+
+    def test_warm_quick_reply_labels(self):
+        labels = list(iter_quick_reply_labels())
+        assert "ไม่มีโลโก้" in labels
+        assert not any(label.startswith("__") for label in labels)
+
+        warm_extraction_cache(labels)
+        misses = get_extraction_cache_stats()["misses"]
+        for label in labels:
+            extract_has_logo(label)
+            extract_material(label, "rsc")
+            extract_all(label, box_type="die_cut")
+        assert get_extraction_cache_stats()["misses"] == misses
+
+
 # ================================================
 # Run
 # ================================================
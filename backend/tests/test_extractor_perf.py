@@ -0,0 +1,84 @@
+"""
+Performance Guards for Data Extractors
+กัน catastrophic backtracking / crash บน input ยาวผิดปกติ (benchmarks/corpus.py)
+
+budget ตั้งไว้หลวมมาก (เครื่อง CI ช้าได้) — จุดประสงค์คือจับ O(n²) ที่ใช้เวลาเป็นวินาที
+ตัวเลข throughput/p99 จริงดูจาก benchmarks/bench_corpus.py
+"""
+
+import sys
+import os
+import time
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmarks.corpus import ADVERSARIAL, generate_corpus, long_pastes
+from services import data_extractor
+from services.data_extractor import (
+    extract_all,
+    extract_dimensions,
+    extract_quantity,
+    extract_weight,
+)
+
+# เวลาสูงสุดต่อ call (วินาที) — ของเดิมที่ backtrack ใช้ 1-20 วินาทีบน input 20k ตัวอักษร
+BUDGET_SECONDS = 0.5
+
+EXTRACTORS = [
+    name for name in dir(data_extractor)
+    if (name.startswith("extract_") or name.startswith("is_") or name == "detect_edit_target")
+    and callable(getattr(data_extractor, name))
+]
+
+
+def _call(name, message):
+    func = getattr(data_extractor, name)
+    if name == "extract_material":
+        return func(message, "die_cut")
+    return func(message)
+
+
+class TestAdversarialInputs:
+    """ทุก extractor × ทุก adversarial input ต้องจบเร็วและไม่ raise"""
+
+    @pytest.mark.parametrize("case", sorted(ADVERSARIAL))
+    def test_all_extractors_within_budget(self, case):
+        message = ADVERSARIAL[case]
+        for name in EXTRACTORS:
+            data_extractor.clear_extraction_cache()
+            start = time.perf_counter()
+            _call(name, message)
+            elapsed = time.perf_counter() - start
+            assert elapsed < BUDGET_SECONDS, f"{name} took {elapsed:.2f}s on {case}"
+
+    def test_long_digit_run_is_not_a_quantity(self):
+        # ตัวเลข 20000 หลัก → ไม่ใช่จำนวน (เดิม int() raise ValueError)
+        assert extract_quantity(ADVERSARIAL["long_digits"]) is None
+        assert extract_quantity(ADVERSARIAL["comma_digits"]) is None
+
+    def test_long_inputs_keep_results(self):
+        assert extract_quantity(ADVERSARIAL["whitespace"]) == 1000
+        assert extract_dimensions("9" * 5000 + " 20x15x10") == {"width": 20.0, "length": 15.0, "height": 10.0}
+        assert extract_weight("5" * 5000 + " น้ำหนัก 2 kg") == 2.0
+
+
+class TestGeneratedCorpus:
+    """corpus ที่สุ่มขึ้น → ไม่มี extractor ตัวไหน raise"""
+
+    def test_corpus_is_deterministic(self):
+        assert generate_corpus(50, seed=1) == generate_corpus(50, seed=1)
+        assert generate_corpus(50, seed=1) != generate_corpus(50, seed=2)
+
+    def test_corpus_runs_without_errors(self):
+        for message in generate_corpus(500):
+            for name in EXTRACTORS:
+                _call(name, message)
+            extract_all(message, box_type="rsc")
+
+    def test_long_pastes_within_budget(self):
+        for paste in long_pastes(count=5):
+            data_extractor.clear_extraction_cache()
+            start = time.perf_counter()
+            extract_all(paste)
+            assert time.perf_counter() - start < BUDGET_SECONDS
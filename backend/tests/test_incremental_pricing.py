@@ -0,0 +1,196 @@
+"""
+Unit Tests for Incremental Pricing
+ทดสอบว่า reprice คำนวณใหม่เฉพาะ component ที่ input เปลี่ยน, ผลเท่ากับ get_price_estimate
+และขั้น quote แสดงส่วนต่างราคาเมื่อลูกค้าแก้ข้อมูลที่ checkpoint
+"""
+
+import sys
+import os
+import asyncio
+import json
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from models.chat_state import ConversationState
+from services.incremental_pricing import describe_price_change, diff_quotes, reprice
+from services.load_planner import format_load_plan_for_chat
+from services.pricing_calculator import get_price_estimate
+from services.pricing_catalog import get_pricing_catalog, reload_catalog, set_pricing_catalog
+from services.step_handlers.finalize_steps import FinalizeStepHandlers
+from utils.constants import RSC_MATERIALS
+
+
+SPEC = {
+    "dimensions": {"width": 25, "length": 30, "height": 15},
+    "box_type": "die_cut",
+    "material": "art_300gsm",
+    "quantity": 2000,
+    "inner": "shredded_paper",
+    "coatings": [{"type": "uv_gloss", "category": "gloss"}],
+    "stampings": [
+        {"type": "foil_regular", "has_block": False},
+        {"type": "emboss", "has_block": False},
+    ],
+}
+
+
+class TestReprice:
+
+    def test_first_call_computes_everything(self):
+        result, graph, recomputed = reprice(SPEC)
+        assert result == get_price_estimate(SPEC)
+        assert sorted(recomputed) == sorted(graph["nodes"])
+        assert set(recomputed) == {
+            "box_base", "inner", "coating:uv_gloss:gloss", "stamping:emboss", "stamping:foil_regular",
+        }
+
+    def test_same_spec_recomputes_nothing(self):
+        _, graph, _ = reprice(SPEC)
+        result, _, recomputed = reprice(SPEC, graph)
+        assert recomputed == []
+        assert result == get_price_estimate(SPEC)
+
+    def test_foil_change_only_touches_that_stamping(self):
+        _, graph, _ = reprice(SPEC)
+        edited = {**SPEC, "stampings": [{"type": "foil_detailed", "has_block": False}, SPEC["stampings"][1]]}
+        result, _, recomputed = reprice(edited, graph)
+        assert recomputed == ["stamping:foil_detailed"]
+        assert result == get_price_estimate(edited)
+
+    def test_quantity_change_touches_all_but_keeps_totals_exact(self):
+        _, graph, _ = reprice(SPEC)
+        edited = {**SPEC, "quantity": 5000}
+        result, _, recomputed = reprice(edited, graph)
+        assert len(recomputed) == 5
+        assert result == get_price_estimate(edited)
+
+    def test_random_edit_sequences_match_full_pricing(self):
+        rng = random.Random(7)
+        options = {
+            "quantity": lambda: rng.randint(500, 50000),
+            "inner": lambda: rng.choice([None, "shredded_paper", "air_bubble"]),
+            "coatings": lambda: [
+                {"type": t, "category": c}
+                for t, c in rng.sample([("uv_gloss", "gloss"), ("uv_matte", "matte"), ("pe_coating", "moisture")], rng.randint(0, 3))
+            ],
+            "stampings": lambda: [
+                {"type": t, "has_block": rng.random() < 0.5}
+                for t in rng.sample(["emboss", "deboss", "foil_regular", "foil_emboss"], rng.randint(0, 2))
+            ],
+            "material": lambda: rng.choice(["art_300gsm", "ivory_350gsm", "corrugated_2layer"]),
+        }
+        spec, graph = dict(SPEC), None
+        for _ in range(300):
+            field = rng.choice(list(options))
+            spec = {**spec, field: options[field]()}
+            result, graph, _ = reprice(spec, graph)
+            assert result == get_price_estimate(spec)
+
+    def test_graph_is_json_serializable(self):
+        _, graph, _ = reprice(SPEC)
+        restored = json.loads(json.dumps(graph))
+        # input ที่ผ่าน JSON แล้วยังเทียบเท่ากัน → ไม่ต้องคำนวณใหม่
+        _, _, recomputed = reprice(SPEC, restored)
+        assert recomputed == []
+
+    def test_catalog_change_recomputes_everything(self, tmp_path):
+        spec = {**SPEC, "box_type": "rsc", "material": "kraft_200gsm"}
+        _, graph, _ = reprice(spec)
+
+        previous = get_pricing_catalog()
+        path = tmp_path / "catalog.json"
+        kraft = {**RSC_MATERIALS["kraft_200gsm"], "paper_cost_per_kg": 70}
+        path.write_text(json.dumps({"version": "inc-v2", "rsc_materials": {**RSC_MATERIALS, "kraft_200gsm": kraft}}))
+        try:
+            reload_catalog(str(path))
+            result, _, recomputed = reprice(spec, graph)
+        finally:
+            set_pricing_catalog(previous)
+
+        assert len(recomputed) == 5
+        assert result["catalog_version"] == "inc-v2"
+
+
+class TestDiffQuotes:
+
+    def test_line_items_and_total(self):
+        old = get_price_estimate(SPEC)
+        new = get_price_estimate({**SPEC, "stampings": [SPEC["stampings"][1]]})
+        diff = diff_quotes(old, new)
+
+        assert diff["changed"] is True
+        assert diff["grand_total_delta"] == round(new["grand_total"] - old["grand_total"], 2)
+        removed = [line for line in diff["lines"] if line["item"] == "stamping:foil_regular"]
+        assert removed[0]["new"] is None and removed[0]["delta"] == -old["stampings"][0]["total"]
+        assert "stamping:emboss" not in {line["item"] for line in diff["lines"]}
+
+        text = describe_price_change(diff)
+        assert text.startswith("💱 ราคาลดลง")
+        assert "ตัด ฟอยล์ธรรมดา" in text
+
+    def test_identical_quotes(self):
+        quote = get_price_estimate(SPEC)
+        diff = diff_quotes(quote, quote)
+        assert diff["changed"] is False and diff["lines"] == []
+
+
+# ================================================
+# ขั้น quote ในแชท
+# ================================================
+class StubLLM:
+    async def generate_response(self, system_prompt, user_message, conversation_history=None, **kwargs):
+        return "stub-quote"
+
+
+def _state():
+    state = ConversationState(session_id="sess_inc")
+    state.collected_data = {
+        "product_type": "cosmetic",
+        "box_type": "die_cut",
+        "material": "art_300gsm",
+        "dimensions": {"width": 25, "length": 30, "height": 15},
+        "quantity": 2000,
+        "mood_tone": "มินิมอล",
+        "has_logo": False,
+        "special_effects": [{"type": "foil_regular", "category": "stamping", "has_block": False}],
+    }
+    return state
+
+
+def _shipping(state):
+    """ข้อความแผนขนส่งที่ต่อท้ายใบเสนอราคา"""
+    return "\n\n" + format_load_plan_for_chat(state.temp_data["load_plan"])
+
+
+class TestQuoteStep:
+
+    def test_edit_shows_price_change(self):
+        handlers = FinalizeStepHandlers(StubLLM())
+        state = _state()
+
+        first = asyncio.run(handlers.handle_quote("", state))
+        assert first.response == "stub-quote" + _shipping(state)
+        first_total = state.temp_data["pricing"]["grand_total"]
+
+        # ลูกค้าแก้ชนิดฟอยล์ที่ checkpoint แล้วกลับมาขั้น quote
+        state.collected_data["special_effects"] = [
+            {"type": "foil_detailed", "category": "stamping", "has_block": False}
+        ]
+        state.sub_step = 0
+        second = asyncio.run(handlers.handle_quote("", state))
+
+        delta = state.temp_data["pricing_delta"]
+        assert delta["old_grand_total"] == first_total
+        assert delta["grand_total_delta"] > 0
+        assert second.response.startswith("💱 ราคาเพิ่มขึ้น")
+        assert second.response.endswith("stub-quote" + _shipping(state))
+
+    def test_unchanged_spec_has_no_delta_text(self):
+        handlers = FinalizeStepHandlers(StubLLM())
+        state = _state()
+        asyncio.run(handlers.handle_quote("", state))
+        state.sub_step = 0
+        again = asyncio.run(handlers.handle_quote("", state))
+        assert again.response == "stub-quote" + _shipping(state)
+        assert state.temp_data["pricing_delta"]["changed"] is False
@@ -0,0 +1,53 @@
+"""
+Unit Tests for Keyword Automaton
+ทดสอบว่า Aho-Corasick ให้ผลเท่ากับ any(w in text for w in words) ทุกกรณี
+"""
+
+import sys
+import os
+import random
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from utils.keyword_automaton import KeywordAutomaton
+from services.data_extractor import _KEYWORD_GROUPS, _scan
+
+
+def _naive(groups, text):
+    return frozenset(g for g, words in groups.items() if any(w in text for w in words))
+
+
+class TestKeywordAutomaton:
+
+    def test_overlapping_keywords(self):
+        groups = {"he": ["he"], "she": ["she"], "hers": ["hers"], "his": ["his"]}
+        automaton = KeywordAutomaton(groups)
+        assert automaton.scan("ushers") == {"he", "she", "hers"}
+        assert automaton.scan("xyz") == frozenset()
+
+    def test_thai_substring(self):
+        automaton = KeywordAutomaton({"no": ["ไม่มี"], "yes": ["มี"]})
+        assert automaton.scan("ไม่มีค่ะ") == {"no", "yes"}
+        assert automaton.scan("มีค่ะ") == {"yes"}
+
+    def test_random_matches_naive(self):
+        rng = random.Random(7)
+        alphabet = "abกข "
+        for _ in range(500):
+            groups = {
+                f"g{i}": ["".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4)))
+                          for _ in range(rng.randint(1, 3))]
+                for i in range(5)
+            }
+            automaton = KeywordAutomaton(groups)
+            text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 20)))
+            assert automaton.scan(text) == _naive(groups, text)
+
+    @pytest.mark.parametrize("message", [
+        "กล่องไดคัท ใส่เครื่องสำอาง 20x15x10 จำนวน 2000 ลอน bc มีโลโก้ ฟอยล์ทอง",
+        "ไม่มีโลโก้ เคลือบเงา uv gloss",
+        "ขอแก้ไขขนาดค่ะ",
+    ])
+    def test_extractor_groups_match_naive(self, message):
+        assert _scan(message) == _naive(_KEYWORD_GROUPS, message)
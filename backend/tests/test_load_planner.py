@@ -0,0 +1,158 @@
+"""
+Unit Tests for Load Planner
+ทดสอบการวางกล่องบนพาเลท (ไม่ทับกัน, ไม่ยื่นเกินขอบ), จำนวนชั้นตามความสูง / แรงกด / น้ำหนักพาเลท,
+จำนวนพาเลท + มัด และ POST /api/logistics/plan + แผนขนส่งในขั้นใบเสนอราคา
+"""
+
+import sys
+import os
+import asyncio
+import itertools
+import math
+import random
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("GROQ_API_KEY", "test-key")  # main import api.chat → สร้าง ChatbotFlowManager
+
+from fastapi.testclient import TestClient
+
+from main import app
+from api.analyze import analyze_box_strength
+from models.chat_state import ConversationState
+from services.load_planner import layer_pattern, plan_load
+from services.step_handlers.finalize_steps import FinalizeStepHandlers
+from utils.constants import BUNDLE_SIZES, PALLET_SPECS
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def _rectangles(layer, length, width):
+    """blocks → รายการสี่เหลี่ยม (x0, y0, x1, y1) ของกล่องทุกใบในชั้น"""
+    rects = []
+    for block in layer["blocks"]:
+        bl, bw = (width, length) if block["rotated"] else (length, width)
+        for i, j in itertools.product(range(block["cols"]), range(block["rows"])):
+            x = block["x_cm"] + i * bl
+            y = block["y_cm"] + j * bw
+            rects.append((x, y, x + bl, y + bw))
+    return rects
+
+
+class TestLayerPattern:
+
+    def test_random_layers_fit_without_overlap(self):
+        rng = random.Random(7)
+        for _ in range(200):
+            pallet = rng.choice(list(PALLET_SPECS))
+            spec = PALLET_SPECS[pallet]
+            length, width = round(rng.uniform(8, 70), 1), round(rng.uniform(8, 60), 1)
+            layer = layer_pattern(pallet, length, width)
+            rects = _rectangles(layer, length, width)
+            assert len(rects) == layer["boxes_per_layer"]
+
+            for x0, y0, x1, y1 in rects:
+                assert x0 >= 0 and y0 >= 0
+                assert x1 <= spec["length_cm"] + 1e-9 and y1 <= spec["width_cm"] + 1e-9
+            for p, q in itertools.combinations(rects, 2):
+                assert p[2] <= q[0] + 1e-9 or q[2] <= p[0] + 1e-9 or p[3] <= q[1] + 1e-9 or q[3] <= p[1] + 1e-9
+
+    def test_rotation_fills_pallet(self):
+        # 40 x 30 บน 120 x 100: แนวเดียวได้ 3×3 = 9, หมุนบางแถวได้ 10
+        layer = layer_pattern("standard", 40, 30)
+        assert layer["boxes_per_layer"] == 10
+        assert {block["rotated"] for block in layer["blocks"]} == {False, True}
+
+
+class TestPlanLoad:
+
+    def test_unknown_weight_limited_by_height(self):
+        plan = plan_load("rsc", 20, 30, 20, 1000)
+        spec = PALLET_SPECS["standard"]
+        assert plan["limited_by"] == "height"
+        assert plan["layers_per_pallet"] == (spec["max_stack_height_cm"] - spec["deck_height_cm"]) // 20
+        assert plan["stack_height_cm"] <= spec["max_stack_height_cm"]
+        assert plan["stack"]["safety_factor"] is None
+
+    def test_strength_limits_layers(self):
+        weight = 2
+        plan = plan_load("rsc", 20, 30, 20, 1000, weight_kg=weight, flute_type="C")
+        max_load = analyze_box_strength(30, 20, 20, weight, "C")["max_load_kg"]
+
+        assert plan["limited_by"] == "strength"
+        # กล่องชั้นล่างรับได้ แต่เพิ่มอีกชั้นจะเกิน
+        assert plan["stack"]["bottom_load_kg"] <= max_load < plan["layers_per_pallet"] * weight
+        assert plan["stack"]["status"] == "SAFE"
+
+    def test_pallet_load_limit(self):
+        plan = plan_load("rsc", 20, 30, 10, 5000, weight_kg=40, flute_type="BC")
+        assert plan["limited_by"] in ("strength", "pallet_load")
+        assert plan["boxes_per_pallet"] * 40 <= PALLET_SPECS["standard"]["max_load_kg"]
+
+    def test_pallet_and_bundle_counts(self):
+        plan = plan_load("die_cut", 15, 20, 10, 2001)
+        assert plan["pallet_count"] == math.ceil(2001 / plan["boxes_per_pallet"])
+        assert 0 < plan["last_pallet_boxes"] <= plan["boxes_per_pallet"]
+        assert (plan["pallet_count"] - 1) * plan["boxes_per_pallet"] + plan["last_pallet_boxes"] == 2001
+        assert plan["bundles"]["count"] == math.ceil(2001 / BUNDLE_SIZES["die_cut"])
+
+    def test_euro_pallet_holds_fewer(self):
+        standard = plan_load("rsc", 20, 30, 20, 1000)
+        euro = plan_load("rsc", 20, 30, 20, 1000, pallet="euro")
+        assert euro["boxes_per_pallet"] < standard["boxes_per_pallet"]
+
+    @pytest.mark.parametrize("kwargs", [
+        {"width": 110, "length": 130, "height": 20},
+        {"width": 20, "length": 30, "height": 200},
+        {"width": 20, "length": 30, "height": 20, "pallet": "us"},
+    ])
+    def test_invalid_input(self, kwargs):
+        with pytest.raises(ValueError):
+            plan_load("rsc", quantity=1000, **kwargs)
+
+
+class TestLogisticsEndpoint:
+
+    def test_plan(self, client):
+        payload = {"dimensions": {"width": 20, "length": 30, "height": 20}, "quantity": 1000, "weight_kg": 2}
+        res = client.post("/api/logistics/plan", json=payload)
+        assert res.status_code == 200
+        data = res.json()
+        assert data["pallet_count"] == plan_load("rsc", 20, 30, 20, 1000, weight_kg=2)["pallet_count"]
+        assert data["stack"]["status"] == "SAFE"
+
+    def test_oversized_box_is_bad_request(self, client):
+        payload = {"dimensions": {"width": 110, "length": 130, "height": 20}, "quantity": 1000}
+        assert client.post("/api/logistics/plan", json=payload).status_code == 400
+
+
+# ================================================
+# แชท: ขั้นใบเสนอราคา
+# ================================================
+class StubLLM:
+    async def generate_response(self, system_prompt, user_message, conversation_history=None, **kwargs):
+        return "stub-quote"
+
+
+class TestQuoteStep:
+
+    def test_quote_includes_load_plan(self):
+        state = ConversationState(session_id="sess_load")
+        state.collected_data = {
+            "product_type": "general",
+            "box_type": "rsc",
+            "material": "corrugated_2layer",
+            "dimensions": {"width": 20, "length": 30, "height": 20},
+            "quantity": 1000,
+            "weight_kg": 2.0,
+            "flute_type": "C",
+        }
+        result = asyncio.run(FinalizeStepHandlers(StubLLM()).handle_quote("", state))
+
+        plan = state.temp_data["load_plan"]
+        assert plan == plan_load("rsc", 20, 30, 20, 1000, weight_kg=2.0, flute_type="C")
+        assert result.response.startswith("stub-quote")
+        assert "🚚" in result.response and f"ใช้ {plan['pallet_count']:,} พาเลท" in result.response
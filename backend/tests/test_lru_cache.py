@@ -0,0 +1,75 @@
+"""
+Unit Tests for LRU Cache
+"""
+
+import sys
+import os
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from utils.lru_cache import LRUCache, TTLCache
+
+
+class TestLRUCache:
+
+    def test_get_put(self):
+        cache = LRUCache(maxsize=2)
+        cache.put("a", 1)
+        assert cache.get("a") == 1
+        assert cache.get("missing", "default") == "default"
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")          # a ใช้ล่าสุด → b ถูกทิ้ง
+        cache.put("c", 3)
+        assert "a" in cache and "c" in cache
+        assert "b" not in cache
+        assert cache.stats()["evictions"] == 1
+
+    def test_cached_none_is_a_hit(self):
+        cache = LRUCache(maxsize=2)
+        cache.put("none", None)
+        sentinel = object()
+        assert cache.get("none", sentinel) is None
+
+    def test_clear_resets_stats(self):
+        cache = LRUCache(maxsize=2)
+        cache.put("a", 1)
+        cache.get("a")
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.stats()["hits"] == 0
+
+    def test_invalid_maxsize(self):
+        with pytest.raises(ValueError):
+            LRUCache(maxsize=0)
+
+
+class TestTTLCache:
+
+    def test_expires_after_ttl(self):
+        now = [0.0]
+        cache = TTLCache(maxsize=4, ttl_seconds=10, clock=lambda: now[0])
+        cache.put("u1", "admin")
+        now[0] = 9.9
+        assert cache.get("u1") == "admin"
+        now[0] = 10.0
+        assert cache.get("u1") is None
+        assert "u1" not in cache
+        assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+    def test_invalidate(self):
+        cache = TTLCache(maxsize=4, ttl_seconds=10)
+        cache.put("u1", "admin")
+        assert cache.invalidate("u1") is True
+        assert cache.invalidate("u1") is False
+        assert cache.get("u1") is None
+
+    def test_invalid_ttl(self):
+        with pytest.raises(ValueError):
+            TTLCache(maxsize=4, ttl_seconds=0)
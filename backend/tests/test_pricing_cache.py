@@ -0,0 +1,146 @@
+"""
+Unit Tests for Pricing Result Cache
+ทดสอบว่า get_price_estimate ที่มี cache ให้ผลเท่ากับคำนวณใหม่ และ key เป็น canonical
+"""
+
+import sys
+import os
+import json
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("GROQ_API_KEY", "test-key")  # main import api.chat → สร้าง ChatbotFlowManager
+
+from fastapi.testclient import TestClient
+
+from main import app
+from services.pricing_calculator import (
+    PricingCalculator, clear_pricing_cache, get_price_estimate, get_pricing_cache_stats,
+)
+from services.pricing_catalog import get_pricing_catalog, reload_catalog, set_pricing_catalog
+from utils.constants import RSC_MATERIALS
+
+
+SPEC = {
+    "dimensions": {"width": 20, "length": 15, "height": 10},
+    "box_type": "die_cut",
+    "material": "art_300gsm",
+    "quantity": 1000,
+    "inner": "shredded_paper",
+    "coatings": [
+        {"type": "uv_gloss", "category": "gloss"},
+        {"type": "aq_coating", "category": "moisture"},
+    ],
+    "stampings": [
+        {"type": "foil_regular", "has_block": True},
+        {"type": "emboss", "has_block": False},
+    ],
+}
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    clear_pricing_cache()
+    yield
+    clear_pricing_cache()
+
+
+def _stats():
+    stats = get_pricing_cache_stats()
+    return stats["hits"], stats["misses"]
+
+
+class TestPricingCache:
+
+    def test_repeat_is_served_from_cache(self):
+        first = get_price_estimate(SPEC)
+        second = get_price_estimate(SPEC)
+        assert first == second
+        assert _stats() == (1, 1)
+
+    def test_cached_result_matches_calculator(self):
+        result = get_price_estimate({**SPEC, "coatings": SPEC["coatings"][:1], "stampings": SPEC["stampings"][:1]})
+        direct = PricingCalculator().calculate_total_price(
+            20, 15, 10, "die_cut", "art_300gsm", 1000, "shredded_paper",
+            SPEC["coatings"][:1], SPEC["stampings"][:1],
+        )
+        assert result == direct
+
+    def test_option_order_shares_entry_and_keeps_request_order(self):
+        first = get_price_estimate(SPEC)
+        swapped = {
+            **SPEC,
+            "coatings": list(reversed(SPEC["coatings"])),
+            "stampings": list(reversed(SPEC["stampings"])),
+        }
+        second = get_price_estimate(swapped)
+        assert _stats() == (1, 1)
+        assert second["coatings"] == list(reversed(first["coatings"]))
+        assert second["stampings"] == list(reversed(first["stampings"]))
+        assert second["grand_total"] == first["grand_total"]
+        assert first["coatings"][0]["name"] == "UV Gloss Coating"
+
+    def test_equivalent_numbers_and_aliases_share_entry(self):
+        get_price_estimate({**SPEC, "material": "ivory_350gsm"})
+        result = get_price_estimate({
+            **SPEC,
+            "material": "whiteboard_350gsm",
+            "dimensions": {"width": 20.0, "length": 15, "height": 10.0},
+        })
+        assert _stats() == (1, 1)
+        # echo ขนาดตามที่ request ส่งมา
+        assert result["dimensions"] == {"width": 20.0, "length": 15, "height": 10.0}
+
+    def test_different_quantity_is_a_miss(self):
+        get_price_estimate(SPEC)
+        get_price_estimate({**SPEC, "quantity": 1001})
+        assert _stats() == (0, 2)
+
+    def test_mutating_result_does_not_touch_cache(self):
+        result = get_price_estimate(SPEC)
+        result["grand_total"] = 0
+        result["coatings"][0]["total_price"] = 0
+        result["box_base"]["price_per_box"] = 0
+        again = get_price_estimate(SPEC)
+        assert again["grand_total"] > 0
+        assert again["coatings"][0]["total_price"] > 0
+        assert again["box_base"]["price_per_box"] > 0
+
+    def test_errors_are_not_cached(self):
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                get_price_estimate({**SPEC, "material": "plastic"})
+        assert get_pricing_cache_stats()["size"] == 0
+
+    def test_catalog_reload_invalidates_by_version(self, tmp_path):
+        previous = get_pricing_catalog()
+        spec = {**SPEC, "box_type": "rsc", "material": "kraft_200gsm"}
+        before = get_price_estimate(spec)
+
+        path = tmp_path / "catalog.json"
+        kraft = {**RSC_MATERIALS["kraft_200gsm"], "paper_cost_per_kg": 80}
+        path.write_text(json.dumps({"version": "cache-v2", "rsc_materials": {**RSC_MATERIALS, "kraft_200gsm": kraft}}))
+        try:
+            reload_catalog(str(path))
+            after = get_price_estimate(spec)
+        finally:
+            set_pricing_catalog(previous)
+
+        assert _stats() == (0, 2)
+        assert after["catalog_version"] == "cache-v2"
+        assert after["grand_total"] > before["grand_total"]
+        assert get_price_estimate(spec) == before  # catalog เดิมกลับมา → entry เดิมยังใช้ได้
+
+
+class TestCacheStatsEndpoint:
+
+    def test_stats_reflect_calculate_calls(self):
+        client = TestClient(app)
+        payload = {**SPEC}
+        for _ in range(3):
+            assert client.post("/api/pricing/calculate", json=payload).status_code == 200
+
+        stats = client.get("/api/pricing/cache-stats").json()
+        assert stats["hits"] == 2 and stats["misses"] == 1
+        assert stats["hit_rate"] == round(2 / 3, 4)
+        assert stats["catalog_version"] == get_pricing_catalog().version
@@ -0,0 +1,255 @@
+"""
+Unit Tests for Pricing Catalog
+ทดสอบว่า catalog ที่ compile แล้วตรงกับ utils/constants และ endpoint รายการวัสดุ/coating/ป๊ัม
+ใช้ id เดียวกับที่ระบบคำนวณราคาได้จริง + hot reload จากไฟล์ JSON
+"""
+
+import sys
+import os
+import asyncio
+import json
+import threading
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("GROQ_API_KEY", "test-key")  # main import api.chat → สร้าง ChatbotFlowManager
+
+from fastapi.testclient import TestClient
+
+from main import app
+from services.batch_pricing import price_batch
+from services.price_grid import price_grid
+import services.pricing_catalog as pricing_catalog
+from services.pricing_catalog import (
+    MATERIAL_ALIASES, CatalogError, PricingCatalog, get_pricing_catalog,
+    load_catalog_file, reload_catalog, set_pricing_catalog, watch_catalog,
+)
+from services.pricing_calculator import PricingCalculator, get_price_estimate
+from utils.constants import (
+    RSC_MATERIALS, DIE_CUT_MATERIALS, GLOSS_COATINGS, MOISTURE_COATINGS, FOOD_GRADE_COATINGS,
+    MATTE_COATINGS, EMBOSS_PRICING, FOIL_STAMPING,
+)
+
+catalog = get_pricing_catalog()
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def _spec(material, box_type="die_cut", **extra):
+    return {
+        "dimensions": {"width": 20, "length": 15, "height": 10},
+        "box_type": box_type,
+        "material": material,
+        "quantity": 1000,
+        **extra,
+    }
+
+
+class TestCompiledValues:
+
+    def test_base_price_matches_material_cost_formula(self):
+        calc = PricingCalculator()
+        for box_type, db in (("rsc", RSC_MATERIALS), ("die_cut", DIE_CUT_MATERIALS)):
+            for material, data in db.items():
+                entry = catalog.material(box_type, material)
+                assert entry.base_price == calc._calculate_material_cost(10, 10, 10, box_type, data)
+                assert entry.data is data
+
+    def test_price_ratio_matches_calculator(self):
+        calc = PricingCalculator()
+        for dims in ((10, 10, 10), (20, 15, 10), (33.3, 7, 12.5)):
+            for box_type in ("rsc", "die_cut"):
+                assert catalog.price_ratio(box_type, *dims) == calc.calculate_price_ratio(*dims, box_type)
+
+    def test_coating_average_price(self):
+        entry = catalog.coating("uv_gloss", "gloss")
+        assert entry.base_price == sum(GLOSS_COATINGS["uv_gloss"]["price_range_10x10x10"]) / 2
+        assert catalog.coating("uv_gloss", "matte") is None
+
+    def test_stamping_types_all_priced(self):
+        # เดิม deboss กับ foil_emboss ได้ราคา 0 (key ไม่ตรงกับ constants)
+        assert catalog.stamping("deboss").block_cost == sum(EMBOSS_PRICING["block_cost"]) / 2
+        foil_emboss = catalog.stamping("foil_emboss")
+        assert foil_emboss.stamp_cost_per_box == sum(FOIL_STAMPING["foil_emboss"]["stamp_cost_per_box"]) / 2
+        assert catalog.stamping("foil_unknown") is None
+
+
+class TestMaterialIds:
+
+    def test_aliases_resolve_to_constants(self):
+        for alias, canonical in MATERIAL_ALIASES.items():
+            assert catalog.resolve_material("die_cut", alias) == canonical
+            assert canonical in DIE_CUT_MATERIALS
+
+    def test_extractor_material_id_is_priced(self):
+        # data_extractor คืน "whiteboard_350gsm" สำหรับ "กล่องขาว"
+        result = get_price_estimate(_spec("whiteboard_350gsm"))
+        assert result == get_price_estimate(_spec("ivory_350gsm"))
+
+    def test_unknown_material_keeps_original_id_in_error(self):
+        with pytest.raises(ValueError, match="ไม่มีวัสดุ 'chipboard' สำหรับกล่อง rsc"):
+            get_price_estimate(_spec("chipboard", box_type="rsc"))
+
+    def test_deboss_is_priced(self):
+        result = get_price_estimate(_spec("art_300gsm", stampings=[{"type": "deboss", "has_block": False}]))
+        assert result["stampings"][0]["total"] > 0
+
+
+class TestCatalogEndpoints:
+
+    def test_materials_match_constants(self, client):
+        materials = client.get("/api/pricing/materials").json()["materials"]
+        assert [m["id"] for m in materials["rsc"]] == list(RSC_MATERIALS)
+        assert [m["id"] for m in materials["die_cut"]] == list(DIE_CUT_MATERIALS)
+
+    def test_every_listed_material_is_priceable(self, client):
+        materials = client.get("/api/pricing/materials").json()["materials"]
+        for box_type, entries in materials.items():
+            for entry in entries:
+                res = client.post("/api/pricing/calculate", json=_spec(entry["id"], box_type=box_type))
+                assert res.status_code == 200, entry
+
+    def test_coatings_cover_all_categories(self, client):
+        coatings = client.get("/api/pricing/coatings").json()["coatings"]
+        for category, table in (
+            ("moisture", MOISTURE_COATINGS), ("food_grade", FOOD_GRADE_COATINGS),
+            ("gloss", GLOSS_COATINGS), ("matte", MATTE_COATINGS),
+        ):
+            assert [c["type"] for c in coatings[category]] == list(table)
+
+    def test_every_listed_stamping_is_priced(self, client):
+        stampings = client.get("/api/pricing/stampings").json()["stampings"]
+        assert {s["type"] for s in stampings} == {"emboss", "deboss", "foil_regular", "foil_detailed", "foil_emboss"}
+        for stamping in stampings:
+            spec = _spec("art_300gsm", stampings=[{"type": stamping["type"], "has_block": True}])
+            assert get_price_estimate(spec)["stampings"][0]["stamp_cost_per_box"] > 0
+
+
+# ================================================
+# Hot reload
+# ================================================
+@pytest.fixture
+def restore_catalog():
+    previous = get_pricing_catalog()
+    yield
+    set_pricing_catalog(previous)
+
+
+def _write_catalog(path, version, kraft_cost=30):
+    kraft = {**RSC_MATERIALS["kraft_200gsm"], "paper_cost_per_kg": kraft_cost}
+    data = {"version": version, "rsc_materials": {**RSC_MATERIALS, "kraft_200gsm": kraft}}
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    return str(path)
+
+
+KRAFT = _spec("kraft_200gsm", box_type="rsc")
+
+
+class TestHotReload:
+
+    def test_file_overrides_tables_and_stamps_version(self, tmp_path, restore_catalog):
+        path = _write_catalog(tmp_path / "catalog.json", "2026-10-01", kraft_cost=60)
+        before = get_price_estimate(KRAFT)
+        assert before["catalog_version"] == "builtin"
+
+        assert reload_catalog(path) is True
+        after = get_price_estimate(KRAFT)
+        assert after["catalog_version"] == "2026-10-01"
+        assert after["grand_total"] > before["grand_total"]
+        # ตารางที่ไม่อยู่ในไฟล์ใช้ค่าจาก constants
+        assert get_price_estimate(_spec("art_300gsm")) == {
+            **get_price_estimate(_spec("art_300gsm"), PricingCatalog()), "catalog_version": "2026-10-01"
+        }
+
+    def test_invalid_file_keeps_current_catalog(self, tmp_path, restore_catalog):
+        current = get_pricing_catalog()
+        bad = tmp_path / "bad.json"
+        _write_catalog(bad, "v2", kraft_cost=-1)
+        with pytest.raises(CatalogError, match="rsc_materials.kraft_200gsm.paper_cost_per_kg"):
+            reload_catalog(str(bad))
+
+        bad.write_text('{"version": "v2", "gloss_coating": {}}')
+        with pytest.raises(CatalogError, match="gloss_coating"):
+            reload_catalog(str(bad))
+
+        bad.write_text("{not json")
+        with pytest.raises(CatalogError):
+            reload_catalog(str(bad))
+        assert get_pricing_catalog() is current
+
+    def test_same_version_requires_same_prices(self, tmp_path, restore_catalog):
+        path = tmp_path / "catalog.json"
+        reload_catalog(_write_catalog(path, "v1"))
+        assert reload_catalog(_write_catalog(path, "v1")) is False
+        with pytest.raises(CatalogError, match="version"):
+            reload_catalog(_write_catalog(path, "v1", kraft_cost=31))
+
+    def test_batch_and_grid_use_one_version(self, tmp_path, restore_catalog):
+        reload_catalog(_write_catalog(tmp_path / "catalog.json", "v7", kraft_cost=45))
+        results = price_batch([KRAFT] * 20)
+        assert {r["catalog_version"] for r in results} == {"v7"}
+        assert results[0] == get_price_estimate(KRAFT)
+        grid = price_grid(KRAFT, {"quantities": [1000]}, ["grand_total"])
+        assert grid["catalog_version"] == "v7"
+        assert grid["values"]["grand_total"][0, 0, 0, 0, 0] == results[0]["grand_total"]
+
+    def test_calculator_keeps_catalog_across_swap(self, tmp_path, restore_catalog):
+        pinned = get_pricing_catalog()
+        reload_catalog(_write_catalog(tmp_path / "catalog.json", "v8", kraft_cost=90))
+        assert get_price_estimate(KRAFT, pinned)["catalog_version"] == pinned.version
+
+    def test_watcher_reloads_on_change(self, tmp_path, restore_catalog):
+        path = tmp_path / "catalog.json"
+        set_pricing_catalog(load_catalog_file(_write_catalog(path, "w1")))
+
+        async def scenario():
+            task = asyncio.create_task(watch_catalog(str(path), interval=0.01))
+            await asyncio.sleep(0.05)
+            assert get_pricing_catalog().version == "w1"  # ไฟล์เดิม → ไม่ reload ซ้ำ
+
+            _write_catalog(path, "w2", kraft_cost=40)
+            os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 10**9))
+            for _ in range(100):
+                await asyncio.sleep(0.01)
+                if get_pricing_catalog().version == "w2":
+                    break
+            task.cancel()
+
+        asyncio.run(scenario())
+        assert get_pricing_catalog().version == "w2"
+
+    def test_watcher_file_io_off_event_loop(self, tmp_path, restore_catalog, monkeypatch):
+        path = tmp_path / "catalog.json"
+        _write_catalog(path, "t1")
+        threads = {}
+
+        def recorded(name, fn):
+            def wrapper(*args):
+                threads.setdefault(name, threading.get_ident())
+                return fn(*args)
+            return wrapper
+
+        monkeypatch.setattr(pricing_catalog, "_mtime", recorded("stat", pricing_catalog._mtime))
+        monkeypatch.setattr(pricing_catalog, "reload_catalog", recorded("reload", pricing_catalog.reload_catalog))
+
+        async def scenario():
+            task = asyncio.create_task(watch_catalog(str(path), interval=0.01))
+            for _ in range(100):
+                await asyncio.sleep(0.01)
+                if get_pricing_catalog().version == "t1":
+                    break
+            task.cancel()
+
+        asyncio.run(scenario())
+        assert get_pricing_catalog().version == "t1"
+        assert set(threads) == {"stat", "reload"}
+        assert threading.get_ident() not in threads.values()  # asyncio.run ใช้ thread นี้เป็น event loop
+
+    def test_catalog_endpoint_and_response_version(self, client, tmp_path, restore_catalog):
+        reload_catalog(_write_catalog(tmp_path / "catalog.json", "api-1"))
+        assert client.get("/api/pricing/catalog").json()["version"] == "api-1"
+        res = client.post("/api/pricing/calculate", json=KRAFT).json()
+        assert res["catalog_version"] == "api-1"
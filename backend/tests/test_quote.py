@@ -0,0 +1,80 @@
+"""
+Unit Tests for Express Quote API
+ทดสอบ POST /api/quote/express (ไม่เรียก LLM)
+"""
+
+import sys
+import os
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("GROQ_API_KEY", "test-key")  # main import api.chat → สร้าง ChatbotFlowManager
+
+from fastapi.testclient import TestClient
+
+from main import app
+from models.chat_state import ChatbotStep, session_storage
+from models.requirement import CompleteRequirement
+from services.pricing_calculator import get_price_estimate
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+BASE_REQUEST = {
+    "product_type": "general",
+    "box_type": "rsc",
+    "dimensions": {"width": 20, "length": 15, "height": 10},
+    "quantity": 1000,
+}
+
+
+class TestExpressQuote:
+
+    def test_quote_matches_chat_pricing_pipeline(self, client):
+        payload = {**BASE_REQUEST, "special_effects": [{"type": "uv_gloss", "category": "gloss"}]}
+        res = client.post("/api/quote/express", json=payload)
+        assert res.status_code == 200
+        data = res.json()
+
+        # ต้องได้ราคาเดียวกับที่ขั้นที่ 12 คำนวณ
+        collected = {**BASE_REQUEST, "special_effects": payload["special_effects"]}
+        expected = get_price_estimate(
+            CompleteRequirement.from_collected_data("x", collected).to_pricing_request()
+        )
+        assert data["quote"]["grand_total"] == expected["grand_total"]
+        assert data["material"] == "corrugated_2layer"
+        assert data["strength"]["status"] == "SAFE"
+        assert data["session_id"] is None
+
+    def test_danger_includes_alternatives(self, client):
+        res = client.post("/api/quote/express", json={
+            **BASE_REQUEST, "weight_kg": 200, "flute_type": "E"
+        })
+        data = res.json()
+        assert data["strength"]["status"] == "DANGER"
+        assert data["alternatives"] is not None
+
+    def test_invalid_requirement_400(self, client):
+        res = client.post("/api/quote/express", json={**BASE_REQUEST, "quantity": 100})
+        assert res.status_code == 400
+        assert any("500" in msg for msg in res.json()["detail"])
+
+    def test_unknown_material_400(self, client):
+        res = client.post("/api/quote/express", json={**BASE_REQUEST, "material": "unobtainium"})
+        assert res.status_code == 400
+
+    def test_create_session_lands_on_checkpoint2(self, client):
+        res = client.post("/api/quote/express", json={**BASE_REQUEST, "create_session": True})
+        data = res.json()
+        sid = data["session_id"]
+        assert data["current_step"] == int(ChatbotStep.CHECKPOINT_2)
+
+        state = session_storage.get_session(sid)
+        assert state.current_step == ChatbotStep.CHECKPOINT_2
+        assert state.is_waiting_for_confirmation
+        assert state.collected_data["quantity"] == 1000
+        assert state.temp_data["pricing"]["grand_total"] == data["quote"]["grand_total"]
+        session_storage.delete_session(sid)
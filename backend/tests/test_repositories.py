@@ -0,0 +1,238 @@
+"""
+Unit Tests for Repositories
+ทดสอบ PostgrestClient (retry / timeout ผ่าน httpx.MockTransport — ไม่ต่อ network),
+repository บน SQLite และ /api/orders, /api/payments + บันทึก order ตอนจบแชท บน SQLite
+"""
+
+import sys
+import os
+import asyncio
+import json
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("GROQ_API_KEY", "test-key")  # main import api.chat → สร้าง ChatbotFlowManager
+
+from fastapi.testclient import TestClient
+
+import services.postgrest_client as postgrest_client
+from main import app
+from models.chat_state import ConversationState
+from services.postgrest_client import PostgrestClient, PostgrestError
+from services.repositories import (
+    get_repositories, parse_offline_tokens, set_repositories, sqlite_repositories, supabase_repositories,
+)
+from services.step_handlers.finalize_steps import FinalizeStepHandlers
+
+
+TOKENS = {
+    "tok-admin": {"id": "admin-1", "role": "admin"},
+    "tok-a": {"id": "user-a", "role": "customer"},
+    "tok-b": {"id": "user-b", "role": "customer"},
+}
+ORDER = {"collected_data": {"box_type": "rsc"}, "pricing": {"grand_total": 1000}, "grand_total": 1000}
+
+
+def _auth(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(postgrest_client, "RETRY_BACKOFF_S", 0)
+
+
+@pytest.fixture
+def repos():
+    repositories = sqlite_repositories(tokens=TOKENS)
+    set_repositories(repositories)
+    yield repositories
+    set_repositories(None)
+    asyncio.run(repositories.aclose())
+
+
+@pytest.fixture
+def client(repos):
+    return TestClient(app)
+
+
+class _Recorder:
+    """MockTransport handler: ตอบตามลำดับ responses (response หรือ exception) + เก็บ request ไว้ตรวจ"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def __call__(self, request):
+        self.requests.append(request)
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+def _client(recorder, **options):
+    return PostgrestClient("https://db.example", "service-key", transport=httpx.MockTransport(recorder), **options)
+
+
+# ================================================
+# PostgrestClient
+# ================================================
+class TestPostgrestClient:
+
+    def test_select_builds_postgrest_query(self):
+        recorder = _Recorder(httpx.Response(200, json=[{"id": "o1"}]))
+        rows = asyncio.run(_client(recorder).select("orders", {"user_id": "u1"}, order="created_at.desc"))
+
+        request = recorder.requests[0]
+        assert rows == [{"id": "o1"}]
+        assert request.url.path == "/rest/v1/orders"
+        assert dict(request.url.params) == {"select": "*", "user_id": "eq.u1", "order": "created_at.desc"}
+        assert request.headers["apikey"] == "service-key"
+
+    def test_get_retries_on_unavailable(self):
+        recorder = _Recorder(httpx.Response(503), httpx.ReadTimeout("slow"), httpx.Response(200, json=[]))
+        assert asyncio.run(_client(recorder, max_retries=2).select("orders")) == []
+        assert len(recorder.requests) == 3
+
+    def test_gives_up_after_max_retries(self):
+        recorder = _Recorder(*[httpx.ConnectError("down")] * 3)
+        with pytest.raises(PostgrestError):
+            asyncio.run(_client(recorder, max_retries=2).select("orders"))
+        assert len(recorder.requests) == 3
+
+    def test_insert_not_retried_once_sent(self):
+        recorder = _Recorder(httpx.ReadTimeout("slow"), httpx.Response(201, json=[{"id": "o1"}]))
+        with pytest.raises(PostgrestError):
+            asyncio.run(_client(recorder).insert("orders", {"status": "pending"}))
+        assert len(recorder.requests) == 1
+
+    def test_insert_retried_when_not_sent(self):
+        recorder = _Recorder(httpx.ConnectError("down"), httpx.Response(201, json=[{"id": "o1"}]))
+        rows = asyncio.run(_client(recorder).insert("orders", {"status": "pending"}))
+        assert rows == [{"id": "o1"}]
+        assert recorder.requests[-1].headers["Prefer"] == "return=representation"
+        assert json.loads(recorder.requests[-1].content) == {"status": "pending"}
+
+    def test_http_error_raises(self):
+        recorder = _Recorder(httpx.Response(400, json={"message": "bad column"}))
+        with pytest.raises(PostgrestError) as error:
+            asyncio.run(_client(recorder).update("orders", {"x": 1}, {"id": "o1"}))
+        assert error.value.status_code == 400
+
+    def test_get_user(self):
+        recorder = _Recorder(httpx.Response(200, json={"id": "u1", "email": "a@b.c"}), httpx.Response(401))
+        client = _client(recorder)
+        assert asyncio.run(client.get_user("good"))["id"] == "u1"
+        assert asyncio.run(client.get_user("bad")) is None
+        assert recorder.requests[0].headers["Authorization"] == "Bearer good"
+
+    def test_supabase_repositories_map_rows(self):
+        recorder = _Recorder(httpx.Response(200, json=[]), httpx.Response(200, json=[{"role": "admin"}]))
+        repositories = supabase_repositories("https://db.example", "key", transport=httpx.MockTransport(recorder))
+        assert asyncio.run(repositories.orders.get("missing")) is None
+        assert asyncio.run(repositories.profiles.get_role("admin-1")) == "admin"
+        assert dict(recorder.requests[1].url.params) == {"select": "role", "id": "eq.admin-1", "limit": "1"}
+
+
+# ================================================
+# SQLite repositories
+# ================================================
+class TestSQLiteRepositories:
+
+    def test_orders_crud(self, repos):
+        async def scenario():
+            first = await repos.orders.create({"user_id": "user-a", "status": "pending", **ORDER})
+            second = await repos.orders.create({"user_id": "user-b", "status": "pending", **ORDER})
+            updated = await repos.orders.update(first["id"], {"status": "production"})
+            return first, second, updated, await repos.orders.list(), await repos.orders.list("user-a")
+
+        first, second, updated, everyone, own = asyncio.run(scenario())
+        assert updated["status"] == "production" and updated["collected_data"] == ORDER["collected_data"]
+        assert [o["id"] for o in everyone] == [second["id"], first["id"]]  # ใหม่สุดก่อน
+        assert [o["id"] for o in own] == [first["id"]]
+        assert asyncio.run(repos.orders.get("missing")) is None
+        assert asyncio.run(repos.orders.update("missing", {"status": "qc"})) is None
+
+    def test_roles_and_tokens(self, repos):
+        assert asyncio.run(repos.profiles.get_role("admin-1")) == "admin"
+        assert asyncio.run(repos.profiles.get_role("nobody")) is None
+        assert asyncio.run(repos.auth.get_user("tok-a"))["id"] == "user-a"
+        assert asyncio.run(repos.auth.get_user("forged")) is None
+
+    def test_parse_offline_tokens(self):
+        assert parse_offline_tokens("t1=u1:admin, t2=u2") == {
+            "t1": {"id": "u1", "role": "admin"}, "t2": {"id": "u2", "role": "customer"},
+        }
+        with pytest.raises(ValueError):
+            parse_offline_tokens("t1")
+
+
+# ================================================
+# Orders / Payments API บน SQLite
+# ================================================
+class TestOrdersPaymentsApi:
+
+    def test_order_access(self, client):
+        order = client.post("/api/orders", json=ORDER, headers=_auth("tok-a")).json()
+        assert order["user_id"] == "user-a" and order["deposit_amount"] == 500
+
+        assert client.get(f"/api/orders/{order['id']}", headers=_auth("tok-a")).status_code == 200
+        assert client.get(f"/api/orders/{order['id']}", headers=_auth("tok-b")).status_code == 403
+        assert client.get(f"/api/orders/{order['id']}", headers=_auth("tok-admin")).status_code == 200
+        assert client.get("/api/orders/missing", headers=_auth("tok-admin")).status_code == 404
+
+        assert client.get("/api/orders", headers=_auth("tok-b")).json() == []
+        listed = client.get("/api/orders", headers=_auth("tok-admin")).json()
+        assert [o["id"] for o in listed] == [order["id"]]
+        assert "profiles" in listed[0]
+
+    def test_status_update_requires_admin(self, client):
+        order = client.post("/api/orders", json=ORDER, headers=_auth("tok-a")).json()
+        path = f"/api/orders/{order['id']}/status"
+        assert client.patch(path, json={"status": "qc"}, headers=_auth("tok-a")).status_code == 403
+        assert client.patch(path, json={"status": "lost"}, headers=_auth("tok-admin")).status_code == 400
+        assert client.patch(path, json={"status": "qc"}, headers=_auth("tok-admin")).json()["status"] == "qc"
+
+    def test_payment_approval_updates_order(self, client):
+        order = client.post("/api/orders", json=ORDER, headers=_auth("tok-a")).json()
+        payload = {"order_id": order["id"], "amount": 500}
+        assert client.post("/api/payments", json=payload, headers=_auth("tok-b")).status_code == 403
+
+        payment = client.post("/api/payments", json=payload, headers=_auth("tok-a")).json()
+        approved = client.patch(f"/api/payments/{payment['id']}/approve", headers=_auth("tok-admin")).json()
+        assert approved["status"] == "approved" and approved["reviewed_by"] == "admin-1"
+        assert client.get(f"/api/orders/{order['id']}", headers=_auth("tok-a")).json()["status"] == "deposit_paid"
+
+    def test_invalid_token(self, client):
+        assert client.get("/api/orders", headers=_auth("forged")).status_code == 401
+        assert client.get("/api/orders").status_code == 401
+
+    def test_not_configured(self, monkeypatch):
+        set_repositories(None)
+        monkeypatch.setenv("DB_BACKEND", "none")
+        assert get_repositories() is None
+        assert TestClient(app).get("/api/orders", headers=_auth("tok-a")).status_code == 503
+        set_repositories(None)
+
+
+# ================================================
+# แชท: บันทึก order ตอนจบ
+# ================================================
+class StubLLM:
+    async def generate_response(self, system_prompt, user_message, conversation_history=None, **kwargs):
+        return "stub-end"
+
+
+class TestSaveOrder:
+
+    def test_end_step_saves_order(self, repos):
+        state = ConversationState(session_id="sess_db")
+        state.collected_data = {"box_type": "rsc", "quantity": 1000}
+        state.temp_data["pricing"] = {"grand_total": 12000}
+        asyncio.run(FinalizeStepHandlers(StubLLM()).handle_end(state))
+
+        orders = asyncio.run(repos.orders.list())
+        assert len(orders) == 1
+        assert orders[0]["session_id"] == "sess_db" and orders[0]["deposit_amount"] == 6000
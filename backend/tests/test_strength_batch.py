@@ -0,0 +1,123 @@
+"""
+Unit Tests for Strength Batch
+ทดสอบว่า analyze_arrays / analyze_batch / analyze_grid ได้ค่าเท่ากับ analyze_box_strength ทุกจุด
++ POST /analyze/batch และ POST /analyze/grid
+"""
+
+import sys
+import os
+import random
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("GROQ_API_KEY", "test-key")  # main import api.chat → สร้าง ChatbotFlowManager
+
+from fastapi.testclient import TestClient
+
+from main import app
+from api.analyze import FLUTE_SPECS, analyze_box_strength
+from services.strength_batch import MAX_STRENGTH_POINTS, analyze_batch, analyze_grid
+
+FIELDS = ("bct_kgf", "max_load_kg", "safety_factor", "safety_score", "status")
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def _random_points(n, seed):
+    rng = random.Random(seed)
+    flutes = list(FLUTE_SPECS) + ["c", "bc", "Z"]
+    return (
+        [round(rng.uniform(1, 150), rng.choice([0, 1, 2])) for _ in range(n)],
+        [round(rng.uniform(1, 150), rng.choice([0, 1, 2])) for _ in range(n)],
+        [rng.choice([0, round(rng.uniform(0.01, 60), rng.choice([0, 1, 2, 3]))]) for _ in range(n)],
+        [rng.choice(flutes) for _ in range(n)],
+    )
+
+
+class TestAnalyzeBatch:
+
+    def test_random_points_match_scalar(self):
+        lengths, widths, weights, flutes = _random_points(20000, seed=11)
+        result = analyze_batch(lengths, widths, weights, flutes)
+        assert result["count"] == 20000
+        for i, point in enumerate(zip(lengths, widths, weights, flutes)):
+            length, width, weight, flute = point
+            expected = analyze_box_strength(length, width, 0, weight, flute)
+            assert {field: result[field][i] for field in FIELDS} == {field: expected[field] for field in FIELDS}
+
+    def test_score_thresholds_match_scalar(self):
+        # น้ำหนักที่ทำให้ safety factor ตกเกณฑ์คะแนนพอดี (5, 3, 1.5, 1)
+        max_load = analyze_box_strength(30, 20, 0, 1, "C")["max_load_kg"]
+        weights = [max_load / sf for sf in (5, 3, 1.5, 1)] + [round(max_load / sf, 2) for sf in (5, 3, 1.5, 1)]
+        result = analyze_batch([30], [20], weights, ["C"])
+        for i, weight in enumerate(weights):
+            expected = analyze_box_strength(30, 20, 0, weight, "C")
+            assert result["safety_score"][i] == expected["safety_score"]
+            assert result["status"][i] == expected["status"]
+
+    def test_single_values_broadcast(self):
+        result = analyze_batch([30], [20], [0.5, 1, 2], ["C"])
+        assert result["count"] == 3
+        assert len(set(result["bct_kgf"])) == 1
+        assert result["safety_factor"] == sorted(result["safety_factor"], reverse=True)
+
+    def test_mismatched_lengths(self):
+        with pytest.raises(ValueError):
+            analyze_batch([30, 40], [20, 25, 30], [1], ["C"])
+
+    def test_too_many_points(self):
+        with pytest.raises(ValueError):
+            analyze_batch([30] * (MAX_STRENGTH_POINTS + 1), [20], [1], ["C"])
+
+
+class TestAnalyzeGrid:
+
+    def test_cells_match_scalar(self):
+        grid = analyze_grid({
+            "flute_types": ["b", "C", "Z"],
+            "weights": [0, 0.5, 2.25, 7],
+            "lengths": [5, 12.5, 30, 58],
+            "widths": [10, 33],
+        })
+        assert grid["shape"] == [3, 4, 4, 2]
+        axes = grid["axes"]
+        for f, flute in enumerate(axes["flute_type"]):
+            for w, weight in enumerate(axes["weight"]):
+                for l, length in enumerate(axes["length"]):
+                    for d, width in enumerate(axes["width"]):
+                        expected = analyze_box_strength(length, width, 0, weight, flute)
+                        for metric, values in grid["values"].items():
+                            assert values[f, w, l, d] == expected[metric]
+
+    def test_empty_axis(self):
+        with pytest.raises(ValueError):
+            analyze_grid({"flute_types": ["C"], "weights": [], "lengths": [30], "widths": [20]})
+
+
+class TestStrengthEndpoints:
+
+    def test_batch(self, client):
+        res = client.post("/analyze/batch", json={"length": [30], "width": [20], "weight": [1, 2, 8]})
+        assert res.status_code == 200
+        data = res.json()
+        single = client.post("/analyze", json={"length": 30, "width": 20, "height": 20, "weight": 8}).json()
+        assert data["status"][2] == single["status"]
+        assert data["safety_factor"][2] == single["safety_factor"]
+
+    def test_batch_invalid(self, client):
+        assert client.post("/analyze/batch", json={"length": [0], "width": [20]}).status_code == 422
+        assert client.post("/analyze/batch", json={"length": [30, 40], "width": [20, 25, 30]}).status_code == 400
+
+    def test_grid(self, client):
+        payload = {"flute_types": ["B", "BC"], "weights": [2], "lengths": [20, 30, 40], "widths": [15, 25]}
+        res = client.post("/analyze/grid", json=payload)
+        assert res.status_code == 200
+        data = res.json()
+        assert data["order"] == ["flute_type", "weight", "length", "width"]
+        assert data["shape"] == [2, 1, 3, 2]
+        assert len(data["values"]["safety_factor"]) == 12
+        # row-major: ช่องสุดท้าย = BC, ยาว 40, กว้าง 25
+        assert data["values"]["safety_factor"][-1] == analyze_box_strength(40, 25, 0, 2, "BC")["safety_factor"]
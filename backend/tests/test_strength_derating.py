@@ -0,0 +1,152 @@
+"""
+Unit Tests for Strength Derating
+ทดสอบตัวคูณลดทอน (ตรงกับ np.interp ของแต่ละตาราง), profile default = ผลเดิม,
+analyze_box_strength / batch / cache + POST, GET /analyze ที่มี profile
+"""
+
+import sys
+import os
+import random
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("GROQ_API_KEY", "test-key")  # main import api.chat → สร้าง ChatbotFlowManager
+
+from fastapi.testclient import TestClient
+
+from main import app
+from api.analyze import FLUTE_SPECS, analyze_box_strength, cached_box_strength, clear_analysis_cache, mckee_bct
+from services.strength_batch import analyze_batch
+from services.strength_derating import (
+    DERATING_STAGES, canonical_profile, default_profile, encode_profile, profile_derating, stage_factors,
+)
+from utils.constants import HUMIDITY_DERATING, STACKING_PATTERN_LOSS, STORAGE_TIME_DERATING
+
+
+PROFILE = {
+    "relative_humidity": 80,
+    "storage_days": 30,
+    "stacking_pattern": "misaligned",
+    "pallet_overhang_cm": 2,
+    "print_coverage_pct": 40,
+    "cutout_area_pct": 5,
+}
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def _random_profile(rng):
+    return {
+        "stacking_factor": rng.choice([2, 3, 4.5]),
+        "relative_humidity": round(rng.uniform(0, 100), 1),
+        "storage_days": round(rng.uniform(0, 500), 1),
+        "stacking_pattern": rng.choice([None, *STACKING_PATTERN_LOSS]),
+        "pallet_overhang_cm": round(rng.uniform(0, 12), 1),
+        "print_coverage_pct": round(rng.uniform(0, 100), 1),
+        "cutout_area_pct": round(rng.uniform(0, 35), 1),
+    }
+
+
+class TestStageFactors:
+
+    def test_matches_interp_of_each_table(self):
+        rng = random.Random(5)
+        for _ in range(200):
+            key = canonical_profile(_random_profile(rng)) or tuple(default_profile().values())
+            factors = stage_factors(encode_profile(key))
+            for stage, x, factor in zip(DERATING_STAGES, encode_profile(key), factors):
+                assert factor == pytest.approx(np.interp(x, stage["x"], stage["factor"]), abs=1e-12)
+
+    def test_vectorized_over_profiles(self):
+        rng = random.Random(6)
+        keys = [canonical_profile({**_random_profile(rng), "stacking_factor": 2}) for _ in range(50)]
+        values = np.stack([encode_profile(key) for key in keys])
+        assert np.array_equal(stage_factors(values), np.stack([stage_factors(v) for v in values]))
+
+    def test_known_values(self):
+        derating = profile_derating(canonical_profile({"relative_humidity": 80, "storage_days": 10}))
+        assert derating["factors"]["humidity"] == HUMIDITY_DERATING["factor"][4]
+        assert derating["factors"]["storage_time"] == STORAGE_TIME_DERATING["factor"][1]
+        assert derating["combined"] == pytest.approx(0.68 * 0.63)
+        # เกินตาราง → ค่าปลาย
+        beyond = profile_derating(canonical_profile({"storage_days": 10_000}))
+        assert beyond["factors"]["storage_time"] == STORAGE_TIME_DERATING["factor"][-1]
+
+
+class TestProfile:
+
+    @pytest.mark.parametrize("profile", [None, {}, {"stacking_factor": 3, "relative_humidity": 40}, default_profile()])
+    def test_default_profile_is_current_behavior(self, profile):
+        assert canonical_profile(profile) is None
+        assert analyze_box_strength(30, 20, 20, 4, "C", profile) == analyze_box_strength(30, 20, 20, 4, "C")
+
+    @pytest.mark.parametrize("profile", [
+        {"stacking_factor": 0}, {"storage_days": -1}, {"stacking_pattern": "pyramid"}, {"temperature": 30},
+    ])
+    def test_invalid_profile(self, profile):
+        with pytest.raises(ValueError):
+            canonical_profile(profile)
+
+    def test_derated_analysis(self):
+        base = analyze_box_strength(30, 20, 20, 2, "C")
+        derated = analyze_box_strength(30, 20, 20, 2, "C", {**PROFILE, "stacking_factor": 4})
+        combined = profile_derating(canonical_profile({**PROFILE, "stacking_factor": 4}))["combined"]
+
+        bct = mckee_bct(FLUTE_SPECS["C"]["ect"], FLUTE_SPECS["C"]["caliper"], 1000) * combined
+        assert derated["bct_kgf"] == round(bct, 2)
+        assert derated["max_load_kg"] == round(bct / 4, 2)
+        assert derated["safety_factor"] < base["safety_factor"]
+        assert derated["derating"]["stacking_factor"] == 4
+        assert set(derated["derating"]["factors"]) == {stage["name"] for stage in DERATING_STAGES}
+
+    def test_batch_and_cache_match_scalar(self):
+        rng = random.Random(8)
+        clear_analysis_cache()
+        for _ in range(20):
+            profile = _random_profile(rng)
+            lengths = [round(rng.uniform(5, 100), 1) for _ in range(30)]
+            widths = [round(rng.uniform(5, 100), 1) for _ in range(30)]
+            weights = [round(rng.uniform(0, 20), 2) for _ in range(30)]
+            batch = analyze_batch(lengths, widths, weights, ["BC"], profile)
+            for i in range(30):
+                expected = analyze_box_strength(lengths[i], widths[i], 10, weights[i], "BC", profile)
+                assert batch["safety_factor"][i] == expected["safety_factor"]
+                assert batch["safety_score"][i] == expected["safety_score"]
+                assert batch["bct_kgf"][i] == expected["bct_kgf"]
+                assert cached_box_strength(lengths[i], widths[i], 10, weights[i], "BC", profile) == expected
+        clear_analysis_cache()
+
+
+class TestEndpoints:
+
+    def test_post_with_profile(self, client):
+        payload = {"length": 30, "width": 20, "height": 20, "weight": 2, "flute_type": "C", "profile": PROFILE}
+        data = client.post("/analyze", json=payload).json()
+        assert data == analyze_box_strength(30, 20, 20, 2, "C", PROFILE)
+
+        plain = client.post("/analyze", json={**payload, "profile": None}).json()
+        assert plain["derating"] is None
+
+    def test_get_with_profile(self, client):
+        query = {"length": 30, "width": 20, "height": 20, "weight": 2}
+        plain = client.get("/analyze", params=query)
+        derated = client.get("/analyze", params={**query, **PROFILE})
+        assert derated.json() == analyze_box_strength(30, 20, 20, 2, "C", PROFILE)
+        assert derated.headers["ETag"] != plain.headers["ETag"]
+
+        # profile ค่า default = ผลเดิม, ETag เดิม
+        neutral = client.get("/analyze", params={**query, "relative_humidity": 45, "stacking_factor": 3})
+        assert neutral.headers["ETag"] == plain.headers["ETag"]
+
+    def test_grid_with_profile(self, client):
+        payload = {"flute_types": ["C"], "weights": [2], "lengths": [30], "widths": [20], "profile": PROFILE}
+        data = client.post("/analyze/grid", json=payload).json()
+        assert data["values"]["safety_factor"] == [analyze_box_strength(30, 20, 0, 2, "C", PROFILE)["safety_factor"]]
+
+    def test_invalid_profile_rejected(self, client):
+        payload = {"length": 30, "width": 20, "height": 20, "profile": {"stacking_pattern": "pyramid"}}
+        assert client.post("/analyze", json=payload).status_code == 422
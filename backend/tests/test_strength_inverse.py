@@ -0,0 +1,131 @@
+"""
+Unit Tests for Strength Inverse Design
+ทดสอบ closed form ของขอบรอบขั้นต่ำเทียบกับการไล่ทีละ 10 mm (suggest_alternatives เดิม),
+ขนาดที่แนะนำ (คงสัดส่วน, ผ่านเกณฑ์จริง) และ POST /analyze/inverse
+"""
+
+import sys
+import os
+import random
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("GROQ_API_KEY", "test-key")  # main import api.chat → สร้าง ChatbotFlowManager
+
+from fastapi.testclient import TestClient
+
+from main import app
+from api.analyze import FLUTE_SPECS, analyze_box_strength, mckee_bct, suggest_alternatives
+from services.strength_inverse import SAFE_SAFETY_FACTOR, inverse_design, min_perimeter_mm, min_perimeter_on_grid
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def _scan(weight_kg, perimeter_mm, flute, limit=None):
+    """ไล่ทีละ 10 mm แบบเดิม (limit=None → ไม่จำกัด)"""
+    spec = FLUTE_SPECS[flute]
+    p_mm = int(perimeter_mm)
+    while limit is None or p_mm < limit:
+        if mckee_bct(spec["ect"], spec["caliper"], p_mm) / 3 >= weight_kg * 1.5:
+            return p_mm
+        p_mm += 10
+    return None
+
+
+class TestMinPerimeter:
+
+    def test_closed_form_is_exact_boundary(self):
+        p_min = min_perimeter_mm(8, 1.5)
+        for flute, p_mm in zip(FLUTE_SPECS, p_min):
+            spec = FLUTE_SPECS[flute]
+            assert mckee_bct(spec["ect"], spec["caliper"], p_mm) / 3 == pytest.approx(8 * 1.5, rel=1e-12)
+
+    def test_grid_matches_scan(self):
+        rng = random.Random(2)
+        checked = 0
+        while checked < 500:
+            weight = round(rng.uniform(0.1, 10), 2)
+            perimeter = rng.uniform(100, 3000)
+            flute = rng.choice(list(FLUTE_SPECS))
+            if min_perimeter_mm(weight, 1.5, [flute])[0] > 20000:
+                continue  # ไล่ทีละ 10 mm นานเกินไปสำหรับ test
+            checked += 1
+            assert min_perimeter_on_grid(weight, perimeter, flute) == _scan(weight, perimeter, flute)
+
+    def test_no_cap_above_five_metres(self):
+        # แบบเดิมไล่ถึง 5000 mm แล้วคืน None
+        assert _scan(7, 800, "BC", limit=5000) is None
+        p_mm = min_perimeter_on_grid(7, 800, "BC")
+        assert p_mm > 5000 and p_mm == _scan(7, 800, "BC")
+
+
+class TestInverseDesign:
+
+    def test_all_flutes_at_once(self):
+        design = inverse_design(30, 20, 8)
+        assert {o["flute"] for o in design["flutes"]} == set(FLUTE_SPECS)
+        perimeters = [o["min_perimeter_cm"] for o in design["flutes"]]
+        assert perimeters == sorted(perimeters)
+        for option in design["flutes"]:
+            current = analyze_box_strength(30, 20, 0, 8, option["flute"])
+            assert option["max_load_kg"] == current["max_load_kg"]
+            assert option["safety_factor"] == current["safety_factor"]
+
+    def test_min_dimensions_keep_ratio_and_pass(self):
+        design = inverse_design(30, 20, 8, target_safety_factor=2)
+        for option in design["flutes"]:
+            dims = option["min_dimensions"]
+            assert dims["length"] / dims["width"] == pytest.approx(1.5, abs=0.01)
+            assert dims["length"] >= 30 and dims["width"] >= 20
+            max_load = analyze_box_strength(dims["length"], dims["width"], 0, 8, option["flute"])["max_load_kg"]
+            assert max_load / 8 >= 2 - 0.01
+            if option["meets_target"]:
+                assert dims == {"length": 30, "width": 20}
+
+    @pytest.mark.parametrize("kwargs", [{"weight_kg": 0}, {"weight_kg": 2, "flutes": ["Z"]},
+                                        {"weight_kg": 2, "target_safety_factor": 0}])
+    def test_invalid_input(self, kwargs):
+        with pytest.raises(ValueError):
+            inverse_design(30, 20, **kwargs)
+
+
+class TestSuggestAlternatives:
+
+    def test_heavy_load_gets_size(self):
+        alts = suggest_alternatives(4.5, 30, 20, 20, "C")
+        assert alts["needs_larger_box"] and alts["recommended_flutes"] == []
+        assert alts["min_perimeter_cm"] * 10 == _scan(4.5, 1000, "BC")
+        dims = alts["min_dimensions"]
+        assert analyze_box_strength(dims["length"], dims["width"], 20, 4.5, "BC")["status"] == "SAFE"
+
+    @pytest.mark.parametrize("weight, dims", [(7, (30, 20, 20)), (8, (30, 20, 15)), (15, (40, 30, 30))])
+    def test_unmakeable_size_hidden(self, weight, dims):
+        # ขนาดที่ SAFE กางออกแล้วใหญ่เกินแผ่นลูกฟูก 120x240 → ไม่แนะนำ
+        alts = suggest_alternatives(weight, *dims, "C")
+        assert alts["needs_larger_box"]
+        assert alts["min_perimeter_cm"] is None and alts["min_dimensions"] is None
+        # /analyze/inverse ยังคืนค่าจริง
+        design = inverse_design(dims[0], dims[1], weight, SAFE_SAFETY_FACTOR, flutes=["BC"])
+        assert design["flutes"][0]["min_perimeter_cm"] > 240
+
+    def test_recommended_flutes_are_safe(self):
+        alts = suggest_alternatives(2, 30, 20, 20, "E")
+        assert alts["recommended_flutes"]
+        for option in alts["recommended_flutes"]:
+            assert analyze_box_strength(30, 20, 20, 2, option["flute"])["safety_factor"] >= 1.5
+
+
+class TestInverseEndpoint:
+
+    def test_inverse(self, client):
+        res = client.post("/analyze/inverse", json={"length": 30, "width": 20, "weight": 8})
+        assert res.status_code == 200
+        assert len(res.json()["flutes"]) == len(FLUTE_SPECS)
+
+    def test_invalid(self, client):
+        assert client.post("/analyze/inverse", json={"length": 30, "width": 20, "weight": 0}).status_code == 422
+        payload = {"length": 30, "width": 20, "weight": 8, "flutes": ["Z"]}
+        assert client.post("/analyze/inverse", json=payload).status_code == 400
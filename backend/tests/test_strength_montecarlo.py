@@ -0,0 +1,98 @@
+"""
+Unit Tests for Strength Monte Carlo
+ทดสอบความ reproducible (seed), ทิศทางของการลดทอน (ความชื้น / เวลา / รูปแบบการซ้อน),
+ช่วงความเชื่อมั่น และ POST /analyze/risk
+"""
+
+import sys
+import os
+import time
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("GROQ_API_KEY", "test-key")  # main import api.chat → สร้าง ChatbotFlowManager
+
+from fastapi.testclient import TestClient
+
+from main import app
+from api.analyze import analyze_box_strength
+from services.strength_montecarlo import simulate_strength
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+class TestSimulateStrength:
+
+    def test_seed_is_reproducible(self):
+        assert simulate_strength(30, 20, 1, seed=7) == simulate_strength(30, 20, 1, seed=7)
+        assert simulate_strength(30, 20, 1, seed=7) != simulate_strength(30, 20, 1, seed=8)
+
+    def test_nominal_matches_deterministic(self):
+        result = simulate_strength(30, 20, 1, "C")
+        deterministic = analyze_box_strength(30, 20, 20, 1, "C")
+        assert result["nominal_safety_factor"] == deterministic["safety_factor"]
+        # ไม่มีความชื้น/เวลา, ซ้อนตรงแนว → ค่ากลางใกล้ค่าระบุ (เสียจากการซ้อนเฉลี่ย 5%)
+        assert result["safety_factor"]["p50"] == pytest.approx(deterministic["safety_factor"] * 0.95, rel=0.03)
+
+    def test_derating_increases_risk(self):
+        base = simulate_strength(30, 20, 1.3, "C")
+        humid = simulate_strength(30, 20, 1.3, "C", relative_humidity=85)
+        stored = simulate_strength(30, 20, 1.3, "C", relative_humidity=85, storage_days=90)
+        interlocked = simulate_strength(30, 20, 1.3, "C", relative_humidity=85, storage_days=90,
+                                        stacking_pattern="interlocked")
+        probabilities = [r["failure_probability"] for r in (base, humid, stored, interlocked)]
+        assert probabilities == sorted(probabilities)
+        assert base["status"] == "SAFE" and interlocked["status"] == "DANGER"
+        assert stored["conditions"]["storage_factor"] == 0.55
+
+    def test_confidence_interval_contains_estimate(self):
+        result = simulate_strength(30, 20, 1.5, "C", relative_humidity=75, samples=20000)
+        low, high = result["failure_ci95"]
+        assert 0 < result["failure_probability"] < 1
+        assert low <= result["failure_probability"] <= high
+        sf = result["safety_factor"]
+        assert sf["p05"] <= sf["p50"] <= sf["p95"]
+
+    def test_zero_failures_has_upper_bound(self):
+        result = simulate_strength(30, 20, 0.1, "BC")
+        assert result["failure_probability"] == 0
+        assert result["failure_ci95"][0] == 0 and 0 < result["failure_ci95"][1] < 1e-4
+
+    def test_within_cpu_budget(self):
+        simulate_strength(30, 20, 1)
+        start = time.perf_counter()
+        simulate_strength(30, 20, 1, samples=100_000)
+        assert time.perf_counter() - start < 0.5
+
+    @pytest.mark.parametrize("kwargs", [
+        {"weight_kg": 0},
+        {"weight_kg": 1, "samples": 0},
+        {"weight_kg": 1, "samples": 10_000_000},
+        {"weight_kg": 1, "stacking_pattern": "pyramid"},
+        {"weight_kg": 1, "stack_load_kg": 0},
+    ])
+    def test_invalid_input(self, kwargs):
+        with pytest.raises(ValueError):
+            simulate_strength(30, 20, **kwargs)
+
+
+class TestRiskEndpoint:
+
+    def test_risk(self, client):
+        payload = {"length": 30, "width": 20, "weight": 1, "relative_humidity": 80, "storage_days": 30,
+                   "samples": 20000, "seed": 3}
+        res = client.post("/analyze/risk", json=payload)
+        assert res.status_code == 200
+        data = res.json()
+        assert data["status"] in ("SAFE", "DANGER")
+        assert data["failure_probability"] == simulate_strength(
+            30, 20, 1, relative_humidity=80, storage_days=30, samples=20000, seed=3
+        )["failure_probability"]
+
+    def test_invalid(self, client):
+        base = {"length": 30, "width": 20, "weight": 1}
+        assert client.post("/analyze/risk", json={**base, "stacking_pattern": "pyramid"}).status_code == 422
+        assert client.post("/analyze/risk", json={**base, "samples": 10}).status_code == 422
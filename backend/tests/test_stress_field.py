@@ -0,0 +1,117 @@
+"""
+Unit Tests for Stress Field
+ทดสอบ layout ของ field (6 face × resolution²), ความสัมพันธ์กับ BCT / แรงกด, มุมแข็งกว่ากลางผนัง,
+cache และ POST /analyze/stress-field (binary / json)
+"""
+
+import sys
+import os
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("GROQ_API_KEY", "test-key")  # main import api.chat → สร้าง ChatbotFlowManager
+
+from fastapi.testclient import TestClient
+
+from main import app
+from api.analyze import analyze_box_strength
+from services.stress_field import (
+    FACES, LARGE_CACHE_SIZE, MAX_RESOLUTION, _large_fields, compute_stress_field, get_stress_field_cache_info,
+)
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def _array(field):
+    return np.frombuffer(field["data"], dtype="<f4").reshape(field["shape"])
+
+
+class TestStressField:
+
+    def test_layout(self):
+        field = compute_stress_field(30, 20, 20, 2, resolution=16)
+        values = _array(field)
+        assert field["faces"] == list(FACES) and values.shape == (6, 16, 16)
+        assert len(field["data"]) == 6 * 16 * 16 * 4
+        assert field["max_utilization"] == pytest.approx(float(values.max()), abs=1e-4)
+        # ผนังคู่ตรงข้ามเหมือนกัน
+        np.testing.assert_array_equal(values[0], values[1])
+        np.testing.assert_array_equal(values[4], values[5])
+
+    def test_scales_with_load_over_bct(self):
+        light = _array(compute_stress_field(30, 20, 20, 1, "C"))
+        heavy = _array(compute_stress_field(30, 20, 20, 2, "C"))
+        np.testing.assert_allclose(heavy[[0, 2, 4]], 2 * light[[0, 2, 4]], rtol=1e-6)
+        strong = compute_stress_field(30, 20, 20, 2, "BC")
+        assert strong["max_utilization"] < compute_stress_field(30, 20, 20, 2, "C")["max_utilization"]
+        assert strong["bct_kgf"] == analyze_box_strength(30, 20, 20, 2, "BC")["bct_kgf"]
+
+    def test_corners_stronger_than_panel_center(self):
+        wall = _array(compute_stress_field(40, 20, 20, 2, resolution=32))[0]
+        middle = wall[16]
+        assert middle[16] > middle[0] and middle[15] > middle[31]
+        # โป่งกลางความสูง
+        assert wall[16, 16] > wall[0, 16]
+
+    def test_wider_wall_more_utilized(self):
+        values = _array(compute_stress_field(60, 15, 20, 2))
+        assert values[0].max() > values[4].max()   # ±x = ผนังยาว 60 ซม.
+
+    def test_bottom_carries_contents(self):
+        values = _array(compute_stress_field(30, 20, 20, 2))
+        assert values[3].max() > values[2].max()
+
+    def test_cached_by_inputs(self):
+        before = get_stress_field_cache_info()
+        first = compute_stress_field(33, 21, 18, 1.5, "b", resolution=8)
+        second = compute_stress_field(33.0, 21.0, 18.0, 1.5, "B", resolution=8)
+        after = get_stress_field_cache_info()
+        assert first["data"] is second["data"]
+        assert after["hits"] == before["hits"] + 1 and after["misses"] == before["misses"] + 1
+
+    def test_high_resolution_cache_bounded(self):
+        # field 128×128 ≈ 393 KB ต่อชิ้น → เก็บแค่ LARGE_CACHE_SIZE ชิ้น
+        for weight in range(LARGE_CACHE_SIZE + 4):
+            compute_stress_field(30, 20, 20, weight, resolution=MAX_RESOLUTION)
+        assert _large_fields.cache_info().currsize == LARGE_CACHE_SIZE
+
+    @pytest.mark.parametrize("kwargs", [{"resolution": 2}, {"resolution": 512}, {"weight_kg": -1}])
+    def test_invalid_input(self, kwargs):
+        with pytest.raises(ValueError):
+            compute_stress_field(30, 20, 20, **{"weight_kg": 1, **kwargs})
+
+    @pytest.mark.parametrize("dims", [(0.001, 0.001, 20), (30, 20, 0.004)])
+    def test_dimensions_rounding_to_zero(self, dims):
+        with pytest.raises(ValueError):
+            compute_stress_field(*dims, weight_kg=1)
+
+
+class TestStressFieldEndpoint:
+
+    def test_binary(self, client):
+        res = client.post("/analyze/stress-field", json={"length": 30, "width": 20, "height": 20, "weight": 2,
+                                                         "resolution": 16})
+        assert res.status_code == 200
+        assert res.headers["content-type"] == "application/octet-stream"
+        assert res.headers["x-field-shape"] == "6,16,16"
+        assert res.headers["x-field-faces"] == "px,nx,py,ny,pz,nz"
+        values = np.frombuffer(res.content, dtype="<f4")
+        assert values.size == 6 * 16 * 16
+        assert float(res.headers["x-field-max"]) == pytest.approx(float(values.max()), abs=1e-4)
+
+    def test_json(self, client):
+        res = client.post("/analyze/stress-field", json={"length": 30, "width": 20, "height": 20, "weight": 2,
+                                                         "resolution": 4, "format": "json"})
+        assert res.status_code == 200
+        data = res.json()
+        assert data["shape"] == [6, 4, 4] and len(data["values"]) == 96
+
+    def test_invalid(self, client):
+        payload = {"length": 30, "width": 20, "height": 20, "resolution": 1024}
+        assert client.post("/analyze/stress-field", json=payload).status_code == 422
+        tiny = {"length": 0.001, "width": 0.001, "height": 20, "weight": 1}
+        assert client.post("/analyze/stress-field", json=tiny).status_code == 400
@@ -254,6 +254,109 @@ STANDARD_BOX = {
     "min_quantity": 500       # ขั้นต่ำ
 }
 
+# ===================================
+# 12.1 แผ่นกระดาษตั้งต้น + Dieline (คิดวัสดุจากจำนวนแผ่นที่ใช้จริง)
+# ===================================
+BOARD_SHEETS = {
+    "rsc": {
+        "name": "แผ่นลูกฟูก 120x240 ซม.",
+        "width_cm": 120,
+        "length_cm": 240,
+        "trim_cm": 1.0,   # ขอบที่ตัดทิ้งแต่ละด้าน
+        "gap_cm": 0.5     # ระยะห่างระหว่าง blank (ใบมีด)
+    },
+    "die_cut": {
+        "name": "แผ่นพิมพ์ 31x43 นิ้ว",
+        "width_cm": 79,
+        "length_cm": 109,
+        "trim_cm": 1.0,
+        "gap_cm": 0.3
+    }
+}
+
+DIELINE_ALLOWANCES = {
+    "rsc": {"glue_tab_cm": 3.5},                        # ฝาบน/ล่าง = ครึ่งความกว้าง
+    "die_cut": {"glue_tab_cm": 1.5, "tuck_flap_cm": 2.0}  # ฝาเสียบหัว-ท้าย (reverse tuck end)
+}
+
+# ===================================
+# 12.2 การขนส่ง (พาเลท + มัดกล่องพับแบน)
+# ===================================
+PALLET_SPECS = {
+    "standard": {
+        "name": "พาเลทมาตรฐาน 120x100 ซม.",
+        "length_cm": 120,
+        "width_cm": 100,
+        "deck_height_cm": 15,         # ความสูงตัวพาเลท
+        "max_stack_height_cm": 165,   # รวมตัวพาเลท (ข้อจำกัดรถ 6 ล้อ)
+        "max_load_kg": 1000,
+        "tare_kg": 25
+    },
+    "euro": {
+        "name": "Euro pallet 120x80 ซม.",
+        "length_cm": 120,
+        "width_cm": 80,
+        "deck_height_cm": 14.4,
+        "max_stack_height_cm": 165,
+        "max_load_kg": 1000,
+        "tare_kg": 25
+    }
+}
+
+# จำนวนกล่องพับแบนต่อมัด (ส่งจากโรงงาน)
+BUNDLE_SIZES = {
+    "rsc": 25,
+    "die_cut": 50
+}
+
+# ===================================
+# 12.3 ค่าลดทอนความแข็งแรงกล่อง (Derating) + ความแปรปรวนของแผ่น
+# ===================================
+# ตัวคูณ BCT ตามสภาพแวดล้อม — ค่าระหว่างจุด interpolate เชิงเส้น, นอกช่วงใช้ค่าปลาย
+HUMIDITY_DERATING = {
+    "rh_pct": [0, 50, 60, 70, 80, 90],
+    "factor": [1.00, 1.00, 0.91, 0.82, 0.68, 0.52]
+}
+
+STORAGE_TIME_DERATING = {
+    "days": [0, 10, 30, 90, 180, 365],
+    "factor": [1.00, 0.63, 0.60, 0.55, 0.50, 0.45]
+}
+
+# สัดส่วน BCT ที่เสียไปตามรูปแบบการซ้อน (ต่ำสุด, สูงสุด)
+STACKING_PATTERN_LOSS = {
+    "column": (0.00, 0.10),       # ซ้อนตรงแนว
+    "misaligned": (0.10, 0.20),   # ซ้อนเหลื่อม
+    "interlocked": (0.40, 0.60),  # ซ้อนสลับ (แบบอิฐ)
+    "overhang": (0.20, 0.40)      # ยื่นเกินขอบพาเลท
+}
+
+# กล่องแถวนอกยื่นเกินขอบพาเลท (cm) — มุมกล่องไม่มีอะไรรองรับ
+PALLET_OVERHANG_DERATING = {
+    "overhang_cm": [0, 1, 2.5, 5, 10],
+    "factor": [1.00, 0.88, 0.78, 0.70, 0.62]
+}
+
+# พื้นที่พิมพ์บนผนังกล่อง (% ของพื้นที่ผนัง) — หมึก/แรงกดลูกกลิ้งทำให้ลอนยุบ
+PRINT_COVERAGE_DERATING = {
+    "coverage_pct": [0, 25, 50, 100],
+    "factor": [1.00, 0.96, 0.92, 0.85]
+}
+
+# ช่องเจาะ/หน้าต่าง die-cut (มือจับ, ช่องระบายอากาศ, หน้าต่างโชว์สินค้า) — % ของพื้นที่ผนังที่ถูกตัดออก
+CUTOUT_DERATING = {
+    "open_area_pct": [0, 5, 10, 20, 30],
+    "factor": [1.00, 0.90, 0.80, 0.65, 0.50]
+}
+
+# ความแปรปรวนของแผ่นจริงเทียบค่าระบุ (coefficient of variation)
+BOARD_VARIATION = {
+    "ect_cv": 0.08,
+    "caliper_cv": 0.05,
+    "humidity_sd_pct": 5.0,   # RH จริงแกว่ง ± จากค่าที่ระบุ
+    "time_cv": 0.05           # ความไม่แน่นอนของตัวคูณตามเวลา
+}
+
 # ===================================
 # 13. ตัวเลือก Mood & Tone
 # ===================================
@@ -0,0 +1,20 @@
+"""
+HTTP Cache Helpers
+ETag / If-None-Match สำหรับ endpoint ที่ตอบ 304 ได้
+
+ใช้กับ:
+- GET /api/chat/session/{session_id} → ETag ตาม state_version
+- GET /api/analyze → ETag ตาม input ที่ canonical แล้ว (browser / reverse proxy cache ได้)
+"""
+
+from typing import Optional
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """เช็ค If-None-Match (รองรับหลายค่าคั่นด้วย comma, weak prefix W/ และ *)"""
+    if not if_none_match:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    return "*" in candidates or any(
+        (c[2:] if c.startswith("W/") else c) == etag for c in candidates
+    )
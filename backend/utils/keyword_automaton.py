@@ -0,0 +1,84 @@
+"""
+Keyword Automaton (Aho-Corasick)
+จับคู่ keyword หลายร้อยคำในข้อความเดียวด้วยการวนข้อความรอบเดียว
+
+ใช้กับ:
+- services/data_extractor.py → แทน any(w in msg for w in [...]) หลายสิบรอบต่อข้อความ
+
+หลักการ:
+- แต่ละ keyword สังกัด "group" (เช่น "product.cosmetic") — 1 keyword อยู่ได้หลาย group
+- compile ครั้งเดียวตอน import → ตาราง transition แบบ DFA (dict ต่อ state)
+- scan(text) → frozenset ของ group ที่เจอ keyword อย่างน้อย 1 คำ (substring match)
+"""
+
+from collections import deque
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Set
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton แบบ precomputed transitions
+
+    ผลลัพธ์เท่ากับ {g for g, words in groups.items() if any(w in text for w in words)}
+    แต่ใช้เวลา O(len(text)) ไม่ขึ้นกับจำนวน keyword
+    """
+
+    def __init__(self, groups: Mapping[str, Iterable[str]]):
+        # --- 1. Trie ---
+        goto: List[Dict[str, int]] = [{}]
+        output: List[Set[str]] = [set()]
+
+        for group, words in groups.items():
+            for word in words:
+                if not word:
+                    continue
+                node = 0
+                for ch in word:
+                    nxt = goto[node].get(ch)
+                    if nxt is None:
+                        nxt = len(goto)
+                        goto[node][ch] = nxt
+                        goto.append({})
+                        output.append(set())
+                    node = nxt
+                output[node].add(group)
+
+        # --- 2. Failure links (BFS) + DFA transitions ---
+        # delta[s] เก็บเฉพาะ transition ที่ไม่กลับ root → scan ใช้ .get(ch, 0)
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict(goto[0])] + [{} for _ in goto[1:]]
+        queue = deque(goto[0].values())
+
+        while queue:
+            node = queue.popleft()
+            output[node] |= output[fail[node]]
+
+            # transition ที่ขาดหาย → ยืมจาก failure state
+            merged = dict(delta[fail[node]])
+            for ch, child in goto[node].items():
+                fail[child] = delta[fail[node]].get(ch, 0) if node else 0
+                merged[ch] = child
+                queue.append(child)
+            delta[node] = merged
+
+        self._delta = delta
+        self._output: List[FrozenSet[str]] = [frozenset(o) for o in output]
+        self.groups: FrozenSet[str] = frozenset(groups)
+
+    @property
+    def state_count(self) -> int:
+        return len(self._delta)
+
+    def scan(self, text: str) -> FrozenSet[str]:
+        """วนข้อความรอบเดียว → group ทั้งหมดที่มี keyword ปรากฏใน text"""
+        delta = self._delta
+        output = self._output
+        state = 0
+        hits: Set[str] = set()
+
+        for ch in text:
+            state = delta[state].get(ch, 0)
+            if output[state]:
+                hits |= output[state]
+
+        return frozenset(hits)
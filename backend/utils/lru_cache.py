@@ -0,0 +1,123 @@
+"""
+LRU Cache
+cache แบบจำกัดขนาด (ทิ้งตัวที่ไม่ได้ใช้นานที่สุด) พร้อมสถิติ hit/miss
+
+ใช้กับ:
+- services/data_extractor.py → memo ผล extractor ต่อข้อความ (normalized)
+- middleware/auth.py → TTLCache ของ role ต่อ user id (หมดอายุเอง + invalidate เมื่อเปลี่ยน role)
+
+ต่างจาก functools.lru_cache:
+- key กำหนดเองได้ (เช่น normalize ข้อความก่อน, ใส่ context อย่าง box_type)
+- ใส่ค่าล่วงหน้าได้ (warm cache ตอน startup)
+- ดูสถิติ hits / misses / evictions ได้
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    LRU cache แบบ thread-safe
+
+    Usage:
+        cache = LRUCache(maxsize=1024)
+        value = cache.get(key, default)
+        cache.put(key, value)
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """คืนค่าของ key (และย้ายไปท้ายสุด = ใช้ล่าสุด) — ไม่เจอคืน default"""
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """ใส่ค่า — ถ้าเต็มทิ้งตัวที่ไม่ได้ใช้นานที่สุด"""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+            self._data[key] = value
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """ล้างข้อมูลและสถิติ"""
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class TTLCache(LRUCache):
+    """
+    LRUCache ที่ค่าแต่ละตัวมีอายุ ttl_seconds (หมดอายุ = miss) + invalidate รายตัว
+
+    Usage:
+        cache = TTLCache(maxsize=10_000, ttl_seconds=60)
+        cache.put(user_id, role)
+        cache.invalidate(user_id)   # ข้อมูลต้นทางเปลี่ยน
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl_seconds: float = 60.0, clock: Callable[[], float] = time.monotonic):
+        super().__init__(maxsize)
+        if ttl_seconds <= 0:
+            raise ValueError("ttl_seconds must be positive")
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING and entry[0] > self._clock():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not _MISSING:
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any) -> None:
+        super().put(key, (self._clock() + self.ttl_seconds, value))
+
+    def invalidate(self, key: Hashable) -> bool:
+        """ลบ key (คืน True ถ้ามีอยู่)"""
+        with self._lock:
+            return self._data.pop(key, _MISSING) is not _MISSING
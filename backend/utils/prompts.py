@@ -325,7 +325,7 @@ def get_quote_generation_prompt(pricing_data: Dict[str, Any]) -> str:
     if stampings:
         parts = []
         for s in stampings:
-            line = f"  - {s.get('type', '')} — ป๊ัม {s.get('stamp_cost_per_box', 0):.2f} บาท/กล่อง"
+            line = f"  - {s.get('name') or s.get('type', '')} — ป๊ัม {s.get('stamp_cost_per_box', 0):.2f} บาท/กล่อง"
             if s.get("block_cost", 0) > 0:
                 line += f", บล็อก {s.get('block_cost', 0):,.0f} บาท"
             line += f" (รวม {s.get('total', 0):,.2f} บาท)"
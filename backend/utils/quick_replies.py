@@ -14,7 +14,7 @@ Quick Replies Mapper v2
 - mapping ต้อง match กับ data_extractor ที่แต่ละ step ใช้ parse
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional
 
 
 def get_quick_replies(
@@ -219,4 +219,28 @@ def get_quick_replies(
     # Step 14: End (จบสนทนา — ไม่ต้องมีปุ่ม)
     # ===================================
 
-    return []
\ No newline at end of file
+    return []
+
+def iter_quick_reply_labels() -> Iterator[str]:
+    """
+    label ของปุ่มทุกปุ่มที่ get_quick_replies คืนได้ (ไม่ซ้ำ, ไม่รวม marker อย่าง __FORM_DIMENSIONS__)
+
+    ใช้ warm extraction cache ตอน startup → ข้อความจากการกดปุ่มไม่ต้องรัน regex
+    """
+    seen = set()
+    for step in range(1, 15):
+        for sub_step in (0, 1):
+            for box_type in ("rsc", "die_cut"):
+                for partial in ({}, {"dimensions": {"width": 1, "length": 1, "height": 1}}):
+                    for waiting in (False, True):
+                        labels = get_quick_replies(
+                            step, sub_step,
+                            collected_data={"box_type": box_type},
+                            partial_data=partial,
+                            is_waiting_confirmation=waiting,
+                        )
+                        for label in labels:
+                            if label.startswith("__") or label in seen:
+                                continue
+                            seen.add(label)
+                            yield label
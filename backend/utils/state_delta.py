@@ -0,0 +1,57 @@
+"""
+State Delta Helpers
+คำนวณความเปลี่ยนแปลงของ collected_data แบบ JSON-patch (RFC 6902)
+
+ใช้กับ:
+- WebSocket chat (/ws/chat/{session_id}) → push เฉพาะ field ที่เปลี่ยนหลังแต่ละ step
+- ลด payload ไม่ต้องส่ง collected_data ทั้งก้อนทุกรอบ
+
+Format ของแต่ละ op:
+    {"op": "add",     "path": "/quantity", "value": 1000}
+    {"op": "replace", "path": "/dimensions", "value": {...}}
+    {"op": "remove",  "path": "/inner"}
+"""
+
+import copy
+from typing import Any, Dict, List
+
+
+def snapshot_collected_data(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Copy collected_data สำหรับเทียบทีหลัง
+    ต้อง deep copy เพราะ handler บางตัวแก้ list/dict ในที่ (เช่น has_block ใน special_effects)
+    """
+    return copy.deepcopy(data)
+
+
+def _escape_pointer(key: str) -> str:
+    """Escape key ตาม JSON Pointer (RFC 6901): ~ → ~0, / → ~1"""
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+
+def diff_collected_data(
+    before: Dict[str, Any],
+    after: Dict[str, Any]
+) -> List[Dict[str, Any]]:
+    """
+    สร้าง JSON-patch ops ระดับ top-level key จาก before → after
+
+    เทียบแค่ top-level (field ใน collected_data มีไม่กี่ตัว
+    และ value แต่ละตัวเล็ก — replace ทั้ง value ง่ายกว่าและ apply ฝั่ง client ได้ทันที)
+
+    Returns:
+        list ของ ops (ว่าง = ไม่มีอะไรเปลี่ยน)
+    """
+    ops: List[Dict[str, Any]] = []
+
+    for key in before:
+        if key not in after:
+            ops.append({"op": "remove", "path": f"/{_escape_pointer(key)}"})
+
+    for key, value in after.items():
+        if key not in before:
+            ops.append({"op": "add", "path": f"/{_escape_pointer(key)}", "value": value})
+        elif before[key] != value:
+            ops.append({"op": "replace", "path": f"/{_escape_pointer(key)}", "value": value})
+
+    return ops
@@ -157,6 +157,33 @@ export async function calculatePrice(requirement) {
   });
 }
 
+/**
+ * Express quote — ส่ง requirement ครบชุด ได้ราคา + ผลวิเคราะห์ความแข็งแรงทันที (ไม่ผ่านแชท)
+ * @param {object} requirement - fields เดียวกับ collected_data (dimensions, quantity, box_type, ...)
+ * @param {boolean} createSession - สร้าง chat session ที่ checkpoint 2 ไว้คุยต่อ
+ * @returns {Promise<object>} - { quote, strength, session_id? }
+ */
+export async function expressQuote(requirement, createSession = false) {
+  return apiFetch('/api/quote/express', {
+    method: 'POST',
+    body: JSON.stringify({ ...requirement, create_session: createSession }),
+  });
+}
+
+/**
+ * ตารางราคา (เช่น ราคา vs จำนวน สำหรับกราฟ/ตาราง tier)
+ * @param {object} base - spec หลัก (format เดียวกับ /api/pricing/calculate)
+ * @param {object} axes - { quantities?, widths?, lengths?, heights?, materials? }
+ * @param {string[]} metrics - grand_total | price_per_box | subtotal
+ * @returns {Promise<object>} - { axes, order, shape, values: { metric: number[] } } (row-major)
+ */
+export async function getPriceGrid(base, axes, metrics = ['grand_total', 'price_per_box']) {
+  return apiFetch('/api/pricing/grid', {
+    method: 'POST',
+    body: JSON.stringify({ base, axes, metrics }),
+  });
+}
+
 
 // ===================================
 // Health Check